@@ -1,8 +1,21 @@
-from app.agents.subgraphs.info_extractor import info_extract_graph
-from app.agents.subgraphs.knowledge_augmentor import knowledge_augment_graph
-from app.agents.subgraphs.answer_gen import answer_gen_graph
-from app.agents.subgraphs.evaluator import evaluate_graph
-from app.agents.workflow import super_graph
+import importlib
+
+# 서브그래프 모듈은 실제로 필요할 때 import (패키지 import만으로 langgraph 빌드를 끌어오지 않도록)
+_GRAPH_MODULES = {
+    "info_extract_graph": "app.agents.subgraphs.info_extractor",
+    "knowledge_augment_graph": "app.agents.subgraphs.knowledge_augmentor",
+    "answer_gen_graph": "app.agents.subgraphs.answer_gen",
+    "evaluate_graph": "app.agents.subgraphs.evaluator",
+    "super_graph": "app.agents.workflow",
+}
+
+
+def __getattr__(name: str):
+    module_name = _GRAPH_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name), name)
+
 
 __all__ = [
     "info_extract_graph",
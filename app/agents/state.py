@@ -23,3 +23,5 @@ class MainState(TypedDict):
     eval_logs: List[BaseMessage]
     process_status: str
     loop_count: int
+    # 답변 컨텍스트를 만든 경로 (rag | augment_reextract | augment_direct | augment_verify)
+    answer_path: str
@@ -1,5 +1,6 @@
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import SystemMessage
+from langchain_core.runnables import RunnableConfig
 from app.agents.state import AnswerGenAgentState
 from app.agents.tools import solar_chat
 
@@ -16,20 +17,34 @@ Your goal is to provide a helpful, accurate, and empathetic medical consultation
 """
 
 from app.core.logger import log_agent_step
+from app.core.llm import invoke_chat
+from app.core.lazy import lazy
+from app.core.tracing import traced
+from app.core.deadline import check_deadline, get_deadline, STAGE_ANSWER_MAX_TOKENS
 
-def answer_gen_agent(state: AnswerGenAgentState):
+@traced("answer_gen_graph.answer_gen_agent")
+def answer_gen_agent(state: AnswerGenAgentState, config: RunnableConfig = None):
     messages = state["messages"]
     if not messages or not isinstance(messages[0], SystemMessage):
         messages = [SystemMessage(content=instruction_answer_gen)] + messages
     
+    llm = solar_chat
+    # 마감이 임박하면 생성 길이를 줄여 응답 시간을 맞춘다
+    if not check_deadline(config, STAGE_ANSWER_MAX_TOKENS):
+        max_tokens = get_deadline(config).config.reduced_max_tokens
+        log_agent_step("MedicalConsultant", "마감 임박 -> 답변 길이 축소", {"max_tokens": max_tokens})
+        llm = solar_chat.bind(max_tokens=max_tokens)
+
     log_agent_step("MedicalConsultant", "답변 생성 시작")
-    response = solar_chat.invoke(messages)
+    response = invoke_chat(llm, messages, "MedicalConsultant")
     log_agent_step("MedicalConsultant", "답변 생성 완료", {"answer": response.content})
     return {"messages": [response]}
 
-workflow = StateGraph(AnswerGenAgentState)
-workflow.add_node("answer_gen_agent", answer_gen_agent)
-workflow.set_entry_point("answer_gen_agent")
-workflow.add_edge("answer_gen_agent", END)
+def build_answer_gen_graph():
+    workflow = StateGraph(AnswerGenAgentState)
+    workflow.add_node("answer_gen_agent", answer_gen_agent)
+    workflow.set_entry_point("answer_gen_agent")
+    workflow.add_edge("answer_gen_agent", END)
+    return workflow.compile()
 
-answer_gen_graph = workflow.compile()
+answer_gen_graph = lazy(build_answer_gen_graph)
@@ -31,21 +31,27 @@ Return ONLY a strictly valid JSON object:
 """
 
 from app.core.logger import log_agent_step
+from app.core.llm import invoke_chat
+from app.core.lazy import lazy
+from app.core.tracing import traced
 
+@traced("evaluate_graph.evaluate_agent")
 def evaluate_agent(state: EvaluateAgentState):
     messages = state["messages"]
     if not messages or not isinstance(messages[0], SystemMessage):
         messages = [SystemMessage(content=instruction_eval_agent)] + messages
     
     log_agent_step("MedicalEvaluator", "평가 시작")
-    response = solar_chat.invoke(messages)
+    response = invoke_chat(solar_chat, messages, "MedicalEvaluator", idempotent=True)
     log_agent_step("MedicalEvaluator", "평가 완료", {"evaluation": response.content})
     # Feedback to LangSmith can be added here if needed, but for production let's keep it simple
     return {"messages": [response]}
 
-workflow = StateGraph(EvaluateAgentState)
-workflow.add_node("evaluate_agent", evaluate_agent)
-workflow.set_entry_point("evaluate_agent")
-workflow.add_edge("evaluate_agent", END)
+def build_evaluate_graph():
+    workflow = StateGraph(EvaluateAgentState)
+    workflow.add_node("evaluate_agent", evaluate_agent)
+    workflow.set_entry_point("evaluate_agent")
+    workflow.add_edge("evaluate_agent", END)
+    return workflow.compile()
 
-evaluate_graph = workflow.compile()
+evaluate_graph = lazy(build_evaluate_graph)
@@ -32,35 +32,38 @@ You are the 'MedicalInfoVerifier'. Your goal is to evaluate the medical informat
 - Do NOT output anything else.
 """
 
-info_extract_tools = [search_medical_qa]
-llm_info_extract = solar_chat.bind_tools(info_extract_tools)
-
+from app.core.lazy import lazy
 from app.core.logger import log_agent_step
+from app.core.llm import invoke_chat
+from app.core.tracing import traced
+
+info_extract_tools = [search_medical_qa]
+llm_info_extract = lazy(lambda: solar_chat.bind_tools(info_extract_tools))
 
+@traced("info_extract_graph.info_extractor")
 def info_extractor(state: InfoExtractAgentState):
     messages = state["messages"]
     if not messages or not isinstance(messages[0], SystemMessage):
         messages = [SystemMessage(content=instruction_info_extract)] + messages
     
     log_agent_step("MedicalInfoExtractor", "검색 에이전트 시작", {"input_messages_count": len(messages)})
-    response = llm_info_extract.invoke(messages)
+    response = invoke_chat(llm_info_extract, messages, "MedicalInfoExtractor")
     
     if response.tool_calls:
-        for tool_call in response.tool_calls:
-            print(f"\n[MedicalInfoExtractor] Tool Call: {tool_call['name']}({tool_call['args']})")
         log_agent_step("MedicalInfoExtractor", "도구 호출 응답 수신", {"tool_calls": response.tool_calls})
     else:
         log_agent_step("MedicalInfoExtractor", "검색 및 추출 완료", {"content": response.content[:100] + "..." if response.content else "None"})
     
     return {"messages": [response]}
 
+@traced("info_extract_graph.info_verifier")
 def info_verifier(state: InfoExtractAgentState):
     messages = state["messages"]
     # 검증을 위한 시스템 메시지 추가
     verify_messages = [SystemMessage(content=instruction_info_verify)] + messages
     
     log_agent_step("MedicalInfoVerifier", "검증 시작")
-    response = solar_chat.invoke(verify_messages)
+    response = invoke_chat(solar_chat, verify_messages, "MedicalInfoVerifier", idempotent=True)
     
     # 결과 파싱 및 로깅
     from app.agents.workflow import clean_and_parse_json
@@ -75,6 +78,7 @@ def info_verifier(state: InfoExtractAgentState):
         
     return {"messages": [response]}
 
+@traced("info_extract_graph.no_results_handler")
 def no_results_handler(state: InfoExtractAgentState):
     """검색 결과가 없을 때 verifier를 건너뛰지 않고, 대신 도메인 판단만 수행"""
     log_agent_step("MedicalInfoExtractor", "내부 검색 결과 없음 -> 도메인 확인 시작")
@@ -91,7 +95,7 @@ def no_results_handler(state: InfoExtractAgentState):
     If it is NOT medical, use "out_of_domain".
     """
     
-    response = solar_chat.invoke(domain_check_prompt)
+    response = invoke_chat(solar_chat, domain_check_prompt, "MedicalInfoExtractor")
     
     from app.agents.workflow import clean_and_parse_json
     parsed = clean_and_parse_json(response.content)
@@ -129,25 +133,27 @@ def should_continue(state: InfoExtractAgentState):
     
     return "verify"
 
-workflow = StateGraph(InfoExtractAgentState)
-workflow.add_node("info_extractor", info_extractor)
-workflow.add_node("info_extract_tools", ToolNode(info_extract_tools))
-workflow.add_node("info_verifier", info_verifier)
-workflow.add_node("no_results_handler", no_results_handler)
-
-workflow.set_entry_point("info_extractor")
-
-workflow.add_conditional_edges(
-    "info_extractor",
-    should_continue,
-    {
-        "tools": "info_extract_tools",
-        "verify": "info_verifier",
-        "no_results": "no_results_handler"
-    }
-)
-workflow.add_edge("info_extract_tools", "info_extractor")
-workflow.add_edge("info_verifier", END)
-workflow.add_edge("no_results_handler", END)
-
-info_extract_graph = workflow.compile()
+def build_info_extract_graph():
+    workflow = StateGraph(InfoExtractAgentState)
+    workflow.add_node("info_extractor", info_extractor)
+    workflow.add_node("info_extract_tools", ToolNode(info_extract_tools))
+    workflow.add_node("info_verifier", info_verifier)
+    workflow.add_node("no_results_handler", no_results_handler)
+
+    workflow.set_entry_point("info_extractor")
+
+    workflow.add_conditional_edges(
+        "info_extractor",
+        should_continue,
+        {
+            "tools": "info_extract_tools",
+            "verify": "info_verifier",
+            "no_results": "no_results_handler"
+        }
+    )
+    workflow.add_edge("info_extract_tools", "info_extractor")
+    workflow.add_edge("info_verifier", END)
+    workflow.add_edge("no_results_handler", END)
+    return workflow.compile()
+
+info_extract_graph = lazy(build_info_extract_graph)
@@ -1,9 +1,14 @@
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from langchain_core.runnables import RunnableConfig
 from app.agents.state import InfoBuildAgentState
 from app.agents.tools import google_search, add_to_medical_qa, solar_chat
 from app.core.logger import log_agent_step
+from app.core.lazy import lazy
+from app.core.llm import invoke_chat
+from app.core.tracing import traced
+from app.core.deadline import check_deadline, STAGE_AUGMENT_TOOL_ROUNDS
 
 instruction_augment = """
 You are the 'MedicalKnowledgeAugmentor'. Your goal is to search Google for medical information and add it to our knowledge base.
@@ -19,9 +24,10 @@ You are the 'MedicalKnowledgeAugmentor'. Your goal is to search Google for medic
 """
 
 augment_tools = [google_search, add_to_medical_qa]
-llm_augment = solar_chat.bind_tools(augment_tools)
+llm_augment = lazy(lambda: solar_chat.bind_tools(augment_tools))
 
-def augment_agent(state: InfoBuildAgentState):
+@traced("knowledge_augment_graph.augment_agent")
+def augment_agent(state: InfoBuildAgentState, config: RunnableConfig = None):
     messages = state["messages"]
     if not messages or not isinstance(messages[0], SystemMessage):
         messages = [SystemMessage(content=instruction_augment)] + messages
@@ -32,8 +38,13 @@ def augment_agent(state: InfoBuildAgentState):
         log_agent_step("KnowledgeAugmentor", "최대 도구 호출 횟수 도달 -> 강제 종료")
         return {"messages": [AIMessage(content='{"status": "success", "info_added": "Maximum tool calls reached"}')]}
 
+    # 이미 한 번 이상 도구를 썼고 마감이 임박하면 추가 라운드 없이 종료 (보강 후 재추출 시간 확보)
+    if tool_call_count >= 1 and not check_deadline(config, STAGE_AUGMENT_TOOL_ROUNDS):
+        log_agent_step("KnowledgeAugmentor", "마감 임박 -> 도구 호출 중단")
+        return {"messages": [AIMessage(content='{"status": "success", "info_added": "Deadline reached"}')]}
+
     log_agent_step("KnowledgeAugmentor", "구글 검색 및 DB 추가 시작")
-    response = llm_augment.invoke(messages)
+    response = invoke_chat(llm_augment, messages, "KnowledgeAugmentor")
     log_agent_step("KnowledgeAugmentor", "응답 수신", {"content": response.content, "tool_calls": response.tool_calls})
     return {"messages": [response]}
 
@@ -46,11 +57,13 @@ def should_continue(state: InfoBuildAgentState):
         return "tools"
     return END
 
-workflow = StateGraph(InfoBuildAgentState)
-workflow.add_node("augment_agent", augment_agent)
-workflow.add_node("augment_tools", ToolNode(augment_tools))
-workflow.set_entry_point("augment_agent")
-workflow.add_conditional_edges("augment_agent", should_continue, {"tools": "augment_tools", END: END})
-workflow.add_edge("augment_tools", "augment_agent")
+def build_knowledge_augment_graph():
+    workflow = StateGraph(InfoBuildAgentState)
+    workflow.add_node("augment_agent", augment_agent)
+    workflow.add_node("augment_tools", ToolNode(augment_tools))
+    workflow.set_entry_point("augment_agent")
+    workflow.add_conditional_edges("augment_agent", should_continue, {"tools": "augment_tools", END: END})
+    workflow.add_edge("augment_tools", "augment_agent")
+    return workflow.compile()
 
-knowledge_augment_graph = workflow.compile()
+knowledge_augment_graph = lazy(build_knowledge_augment_graph)
@@ -1,16 +1,27 @@
+import hashlib
+import json
+import logging
 from typing import Optional, Dict
 
-from langchain.tools import tool
+from langchain_core.tools import tool
 from langchain_core.runnables import RunnableConfig
 
 from app.core.llm import get_solar_chat, get_upstage_embeddings
+from app.core.lazy import lazy
+from app.core.logger import log_agent_step
+from app.core.singleflight import get_group, normalize_key
+from app.core.tracing import span
+from app.service.context_assembler import ContextAssembler
+from app.service.knowledge_writer import KnowledgeWriter
 from app.service.vector_service import VectorService
 from app.repository.client.search_client import SerperSearchClient
 
 
-embedding_fn = get_upstage_embeddings()
-solar_chat = get_solar_chat()
-search_client = SerperSearchClient()
+# 클라이언트는 처음 사용할 때 생성 (import만으로 API 키나 네트워크가 필요하지 않도록)
+embedding_fn = lazy(get_upstage_embeddings)
+solar_chat = lazy(get_solar_chat)
+search_client = lazy(SerperSearchClient)
+context_assembler = lazy(ContextAssembler)
 
 @tool
 def add_to_medical_qa(content: str, config: RunnableConfig, metadata: Optional[Dict] = None) -> str:
@@ -18,18 +29,35 @@ def add_to_medical_qa(content: str, config: RunnableConfig, metadata: Optional[D
     Add new medical information to the knowledge base (ChromaDB).
     Use this to save useful information found from external sources.
     """
-    print(f"\n[Tool: Add Knowledge] Adding content to DB...")
-    print(f"  - Content snippet: {content[:100]}...")
+    log_agent_step("Tool: Add Knowledge", "Adding content to DB", {"content": content})
     try:
+        metadata = metadata or {"source": "google_search"}
+        writer: Optional[KnowledgeWriter] = config["configurable"].get("knowledge_writer")
+        if writer is not None:
+            # 백그라운드 writer가 다른 요청의 문서와 묶어 저장한다 (임베딩/저장을 기다리지 않음)
+            with span("tool.add_to_medical_qa", content_chars=len(content), write_behind=True):
+                writer.submit(content, metadata, scope=config["configurable"].get("write_scope"))
+            log_agent_step("Tool: Add Knowledge", "Queued", {"pending": writer.pending})
+            return "Successfully added information to knowledge base."
+
         vector_service: VectorService = config["configurable"].get("vector_service")
         if not vector_service:
             return "Error: VectorService not found in config"
             
-        vector_service.add_documents([content], [metadata or {"source": "google_search"}])
-        print(f"[Tool: Add Knowledge] Successfully added.")
+        # 동시에 같은 내용을 저장하려는 호출은 한 번만 기록한다
+        key = hashlib.sha256(
+            (content + json.dumps(metadata, sort_keys=True, ensure_ascii=False)).encode("utf-8")
+        ).hexdigest()
+        with span("tool.add_to_medical_qa", content_chars=len(content)) as s:
+            _, shared = get_group("add_to_medical_qa").do(
+                key, lambda: vector_service.add_documents([content], [metadata])
+            )
+            if s is not None:
+                s.set_attribute("coalesced", shared)
+        log_agent_step("Tool: Add Knowledge", "Successfully added")
         return "Successfully added information to knowledge base."
     except Exception as e:
-        print(f"[Tool: Add Knowledge] Error: {e}")
+        log_agent_step("Tool: Add Knowledge", "Error", {"error": str(e)}, level=logging.ERROR)
         return f"Error adding to knowledge base: {e}"
 
 @tool
@@ -38,13 +66,18 @@ def google_search(query: str) -> str:
     Search Google via Serper.dev for up-to-date medical information or news.
     Use this only when internal knowledge is insufficient.
     """
-    print(f"\n[Tool: Google Search] Query: {query}")
+    log_agent_step("Tool: Google Search", "Query", {"query": query})
     try:
-        result = search_client.search(query)
-        print(f"[Tool: Google Search] Result: {result[:200]}...")
+        with span("tool.google_search", query=query) as s:
+            result, shared = get_group("google_search").do(
+                normalize_key(query), lambda: search_client.search(query)
+            )
+            if s is not None:
+                s.set_attribute("coalesced", shared)
+        log_agent_step("Tool: Google Search", "Result", {"result": result})
         return result
     except Exception as e:
-        print(f"[Tool: Google Search] Error: {e}")
+        log_agent_step("Tool: Google Search", "Error", {"error": str(e)}, level=logging.ERROR)
         return f"Google Search Error: {e}"
 
 @tool
@@ -53,23 +86,43 @@ def search_medical_qa(query: str, config: RunnableConfig) -> str:
     Search medical QA database for relevant information.
     Returns a list of relevant QA pairs.
     """
-    print(f"\n[Tool: Internal DB Search] Query: {query}")
+    log_agent_step("Tool: Internal DB Search", "Query", {"query": query})
     try:
         vector_service: VectorService = config["configurable"].get("vector_service")
         if not vector_service:
             return "Error: VectorService not found in config"
 
-        results = vector_service.search(query, n_results=5)
-        documents = results.get("documents", [])
-        
-        print(f"[Tool: Internal DB Search] Found {len(documents)} documents.")
-        
-        context_parts = []
-        for i, doc in enumerate(documents):
-            print(f"  - Document {i+1}: {doc[:100]}...")
-            context_parts.append(f"Source {i+1}:\n{doc}")
-        return "\n\n".join(context_parts)
+        writer: Optional[KnowledgeWriter] = config["configurable"].get("knowledge_writer")
+        if writer is not None and writer.config.read_your_writes_timeout > 0:
+            # 같은 실행에서 방금 큐에 넣은 문서가 저장된 뒤에 검색한다 (read-your-writes)
+            writer.wait_for_scope(config["configurable"].get("write_scope"))
+
+        with span("tool.search_medical_qa", query=query) as s:
+            # 호출 측에서 메타데이터 필터(예: {"domain": ...})를 지정할 수 있다
+            results = vector_service.search(
+                query, n_results=5, where=config["configurable"].get("search_filter")
+            )
+            documents = results.get("documents", [])
+            # 중복/무관한 문장을 덜어내고 토큰 예산 안에서 관련도 순으로 담는다
+            context = context_assembler.assemble(query, documents, results.get("metadatas"))
+            if s is not None:
+                s.set_attribute("documents", len(documents))
+                s.set_attribute("input_tokens", context.input_tokens)
+                s.set_attribute("output_tokens", context.output_tokens)
+
+        log_agent_step(
+            "Tool: Internal DB Search",
+            f"Found {len(documents)} documents",
+            {
+                "documents": documents,
+                "input_tokens": context.input_tokens,
+                "output_tokens": context.output_tokens,
+                "dropped": context.dropped,
+            },
+        )
+
+        return context.render()
     except Exception as e:
-        print(f"[Tool: Internal DB Search] Error: {e}")
+        log_agent_step("Tool: Internal DB Search", "Error", {"error": str(e)}, level=logging.ERROR)
         return f"Search Error: {e}"
 
@@ -4,9 +4,15 @@ import re
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 from app.agents.state import MainState
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
 
-from app.service.agents.knowledge_augmentor_service import KnowledgeAugmentorService
+from app.service.agents.knowledge_augmentor_service import (
+    KnowledgeAugmentorService,
+    AugmentFastPathConfig,
+    FAST_PATH_OFF,
+    FAST_PATH_DIRECT,
+)
 from app.service.agents.info_extractor_service import InfoExtractorService
 from app.service.agents.answer_gen_service import AnswerGenService
 from app.service.agents.evaluator_service import EvaluatorService
@@ -31,10 +37,34 @@ def clean_and_parse_json(text: str):
         return None
 
 from app.core.logger import log_agent_step
+from app.core.lazy import lazy
+from app.core.tracing import traced
+from app.core.usage import check_budget
+from app.core.deadline import check_deadline, run_deferred, STAGE_AUGMENTATION, STAGE_EVALUATION
+from app.core.admission import admission_priority, PRIORITY_AUGMENT
+from app.core.metrics import counter, histogram
+from app.agents.subgraphs.info_extractor import info_verifier
+from app.agents.tools import context_assembler
+
+# 답변 컨텍스트를 만든 경로
+#   rag:                내부 검색 한 번으로 충분
+#   augment_reextract:  구글 보강 후 내부 검색/검증 재실행
+#   augment_direct:     구글 보강 내용을 바로 답변 컨텍스트로 사용
+#   augment_verify:     구글 보강 내용을 검증 한 번 거쳐 사용
+PATH_RAG = "rag"
+PATH_AUGMENT_REEXTRACT = "augment_reextract"
+PATH_AUGMENT_DIRECT = "augment_direct"
+PATH_AUGMENT_VERIFY = "augment_verify"
 
+ANSWER_PATH_TOTAL = counter("answer_path_total", "답변 컨텍스트를 만든 경로별 요청 수", ["path"])
+ANSWER_EVAL_SCORE = histogram(
+    "answer_eval_score", "MedicalEvaluator final_score (경로별 답변 품질 비교용)", ["path"],
+    buckets=(1, 2, 3, 4, 5, 6, 7, 8, 9, 10),
+)
+
+@traced("super_graph.info_extract_agent_workflow")
 def call_info_extractor(state: MainState, config: RunnableConfig):
-    log_agent_step("Workflow", "Step 1: MedicalInfoExtractor 시작 (RAG)")
-    print(f"\n[Workflow] Step 1: MedicalInfoExtractor 시작 (Query: {state['user_query']})")
+    log_agent_step("Workflow", "Step 1: MedicalInfoExtractor 시작 (RAG)", {"query": state["user_query"]})
     
     # loop_count 초기화 및 증가
     current_count = state.get("loop_count", 0) + 1
@@ -50,6 +80,7 @@ def call_info_extractor(state: MainState, config: RunnableConfig):
     
     # loop_count 업데이트 포함
     result["loop_count"] = current_count
+    result["answer_path"] = PATH_RAG if current_count == 1 else PATH_AUGMENT_REEXTRACT
     
     # history 업데이트: 새로 추가된 extract_logs를 로그에 반영
     if "extract_logs" in result:
@@ -57,26 +88,72 @@ def call_info_extractor(state: MainState, config: RunnableConfig):
         parsed = clean_and_parse_json(last_msg)
         status = parsed.get("status") if parsed else "unknown"
         log_agent_step("Workflow", f"Step 1 완료 (반복: {current_count})", {"status": status})
-        print(f"[Workflow] Step 1 완료. Status: {status}, Iteration: {current_count}")
         
     return result
 
+@traced("super_graph.knowledge_augment_workflow")
 def call_knowledge_augmentor(state: MainState, config: RunnableConfig):
     log_agent_step("Workflow", "Step 2: MedicalKnowledgeAugmentor 시작 (Google Search)")
-    print(f"\n[Workflow] Step 2: MedicalKnowledgeAugmentor 시작")
-    result = knowledge_augmentor_service.run(
-        state["user_query"], 
-        config=config,
-        history=state.get("answer_logs", [])
-    )
+    with admission_priority(PRIORITY_AUGMENT):
+        result = knowledge_augmentor_service.run(
+            state["user_query"], 
+            config=config,
+            history=state.get("answer_logs", [])
+        )
     
-    log_agent_step("Workflow", "Step 2 완료")
-    print(f"[Workflow] Step 2 완료. 지식 보강됨.")
+    log_agent_step("Workflow", "Step 2 완료. 지식 보강됨")
     return result
 
+@traced("super_graph.augment_fast_path")
+def call_augment_fast_path(state: MainState, config: RunnableConfig):
+    """
+    보강 직후 추출 루프(추출 LLM -> 내부 검색 -> 검증 LLM)를 다시 돌지 않고, 보강 단계가 가져온 내용으로
+    extract_logs를 바로 만든다. 결과 형식은 MedicalInfoVerifier와 같아 이후 라우팅/답변 생성이 그대로 동작한다.
+    """
+    mode = AugmentFastPathConfig().mode
+    query = state["user_query"]
+    documents = knowledge_augmentor_service.augmented_documents(state.get("augment_logs", []))
+    assembled = context_assembler.assemble(query, documents, node="augment_fast_path")
+    medical_context = assembled.render() or "\n\n".join(documents)
+
+    if mode == FAST_PATH_DIRECT:
+        log_agent_step("Workflow", "Step 2-1: 보강 내용 바로 사용", {"documents": len(documents)})
+        message = AIMessage(content=json.dumps({
+            "status": "success",
+            "medical_context": medical_context,
+            "reason": "Context fetched by knowledge augmentation",
+        }, ensure_ascii=False))
+        path = PATH_AUGMENT_DIRECT
+    else:
+        log_agent_step("Workflow", "Step 2-1: 보강 내용 검증", {"documents": len(documents)})
+        verify_input = HumanMessage(
+            content=f"Original User Query: \"{query}\"\n\nRetrieved documents (web search):\n{medical_context}"
+        )
+        history = list(state.get("answer_logs", []))
+        message = info_verifier({"messages": history + [verify_input]})["messages"][-1]
+        path = PATH_AUGMENT_VERIFY
+
+    # 추출 한 번을 대신하므로 반복 횟수도 올린다 (검증 결과가 부족이면 다시 보강하지 않고 답변한다)
+    return {
+        "extract_logs": [message],
+        "loop_count": state.get("loop_count", 0) + 1,
+        "answer_path": path,
+        "process_status": "success",
+    }
+
+def check_augment_result(state: MainState):
+    if AugmentFastPathConfig().mode == FAST_PATH_OFF:
+        return "reextract"
+    if not knowledge_augmentor_service.augmented_documents(state.get("augment_logs", [])):
+        log_agent_step("Workflow", "보강 내용 없음 -> 내부 검색 재시도")
+        return "reextract"
+    return "fast"
+
+@traced("super_graph.answer_gen_agent_workflow")
 def call_answer_gen(state: MainState, config: RunnableConfig):
-    log_agent_step("Workflow", "Step 3: MedicalConsultant 시작")
-    print(f"\n[Workflow] Step 3: MedicalConsultant (AnswerGen) 시작")
+    log_agent_step("Workflow", "Step 3: MedicalConsultant 시작", {"path": state.get("answer_path")})
+    if state.get("answer_path"):
+        ANSWER_PATH_TOTAL.inc(path=state["answer_path"])
     result = answer_gen_service.run(
         state["user_query"], 
         state.get("extract_logs", []), 
@@ -84,28 +161,44 @@ def call_answer_gen(state: MainState, config: RunnableConfig):
         history=state.get("answer_logs", [])
     )
     
-    log_agent_step("Workflow", "Step 3 완료")
-    if "answer_logs" in result:
-        print(f"[Workflow] Step 3 완료. 답변 생성됨.")
+    log_agent_step("Workflow", "Step 3 완료", {"answer_generated": "answer_logs" in result})
     return result
 
-def call_evaluate_agent(state: MainState):
-    log_agent_step("Workflow", "Step 4: MedicalEvaluator 시작")
-    print(f"\n[Workflow] Step 4: MedicalEvaluator 시작")
-    result = evaluator_service.run(
-        state["user_query"],
-        state.get("answer_logs", []),
-        state.get("extract_logs")
-    )
+def _run_evaluation(user_query, answer_logs, extract_logs, path=None):
+    result = evaluator_service.run(user_query, answer_logs, extract_logs)
     if "eval_logs" in result:
         last_msg = result["eval_logs"][-1].content
         parsed = clean_and_parse_json(last_msg)
         score = parsed.get("final_score") if parsed else "N/A"
-        log_agent_step("Workflow", "Step 4 완료", {"score": score})
-        print(f"[Workflow] Step 4 완료. 최종 점수: {score}")
+        log_agent_step("Workflow", "Step 4 완료", {"score": score, "path": path})
+        if isinstance(score, (int, float)) and path:
+            ANSWER_EVAL_SCORE.observe(score, path=path)
     return result
 
-def check_extract_status(state: MainState):
+@traced("super_graph.evaluate_agent_workflow")
+def call_evaluate_agent(state: MainState, config: RunnableConfig = None):
+    # 토큰 예산을 넘긴 요청은 사용자 응답에 필요 없는 평가 단계를 생략
+    if not check_budget("evaluation"):
+        log_agent_step("Workflow", "토큰 예산 초과 -> 평가 생략")
+        return {"eval_logs": [], "process_status": "evaluation_skipped"}
+
+    # 마감이 임박하면 답변을 먼저 돌려주고 평가는 응답 뒤에 돌린다 (결과는 로그로만 남는다)
+    if not check_deadline(config, STAGE_EVALUATION):
+        answer_logs = list(state.get("answer_logs", []))
+        extract_logs = state.get("extract_logs")
+        path = state.get("answer_path")
+        deferred = run_deferred(
+            "evaluation", lambda: _run_evaluation(state["user_query"], answer_logs, extract_logs, path)
+        )
+        log_agent_step("Workflow", "마감 임박 -> 평가 지연" if deferred else "마감 임박, 지연 대기열 가득 참 -> 평가 생략")
+        return {"eval_logs": [], "process_status": "evaluation_deferred" if deferred else "evaluation_skipped"}
+
+    log_agent_step("Workflow", "Step 4: MedicalEvaluator 시작")
+    return _run_evaluation(
+        state["user_query"], state.get("answer_logs", []), state.get("extract_logs"), state.get("answer_path")
+    )
+
+def check_extract_status(state: MainState, config: RunnableConfig = None):
     if not state.get("extract_logs"): return "augment"
     last_msg = state["extract_logs"][-1].content
     parsed = clean_and_parse_json(last_msg)
@@ -127,7 +220,17 @@ def check_extract_status(state: MainState):
         log_agent_step("Workflow", f"최대 반복 횟수({loop_count}) 도달 -> 답변 생성 이동", {"reason": "Iteration limit reached"})
         return "continue"
 
-    # 4. "insufficient"이거나 파싱 실패 시 구글 검색(augment)으로 이동
+    # 4. 토큰 예산을 넘긴 요청은 보강 없이 현재 정보로 답변 생성
+    if not check_budget("augmentation"):
+        log_agent_step("Workflow", "토큰 예산 초과 -> 보강 생략, 답변 생성 이동")
+        return "continue"
+
+    # 5. 보강(검색 + 재추출)을 마칠 시간이 없으면 현재 정보로 답변 생성
+    if not check_deadline(config, STAGE_AUGMENTATION):
+        log_agent_step("Workflow", "마감 임박 -> 보강 생략, 답변 생성 이동")
+        return "continue"
+
+    # 6. "insufficient"이거나 파싱 실패 시 구글 검색(augment)으로 이동
     log_agent_step("Workflow", "내부 지식 부족 판단 -> Google 검색 이동", {
         "reason": parsed.get("reason") if parsed else "parse error",
         "iteration": loop_count
@@ -137,32 +240,52 @@ def check_extract_status(state: MainState):
 def router_node(state: MainState):
     return "medical"
 
-super_workflow = StateGraph(MainState)
-super_workflow.add_node("info_extract_agent_workflow", call_info_extractor)
-super_workflow.add_node("knowledge_augment_workflow", call_knowledge_augmentor)
-super_workflow.add_node("answer_gen_agent_workflow", call_answer_gen)
-super_workflow.add_node("evaluate_agent_workflow", call_evaluate_agent)
+def build_super_graph():
+    super_workflow = StateGraph(MainState)
+    super_workflow.add_node("info_extract_agent_workflow", call_info_extractor)
+    super_workflow.add_node("knowledge_augment_workflow", call_knowledge_augmentor)
+    super_workflow.add_node("augment_fast_path", call_augment_fast_path)
+    super_workflow.add_node("answer_gen_agent_workflow", call_answer_gen)
+    super_workflow.add_node("evaluate_agent_workflow", call_evaluate_agent)
 
-super_workflow.set_conditional_entry_point(
-    router_node,
-    {
-        "medical": "info_extract_agent_workflow"
-    }
-)
+    super_workflow.set_conditional_entry_point(
+        router_node,
+        {
+            "medical": "info_extract_agent_workflow"
+        }
+    )
 
-super_workflow.add_conditional_edges(
-    "info_extract_agent_workflow", 
-    check_extract_status, 
-    {
-        "continue": "answer_gen_agent_workflow", 
-        "augment": "knowledge_augment_workflow"
-    }
-)
-# Augment 이후 다시 추출을 시도
-super_workflow.add_edge("knowledge_augment_workflow", "info_extract_agent_workflow")
-super_workflow.add_edge("answer_gen_agent_workflow", "evaluate_agent_workflow")
-super_workflow.add_edge("evaluate_agent_workflow", END)
-
-# 메모리 기반 체크포인터 추가 (대화 기록 보존용)
-memory = MemorySaver()
-super_graph = super_workflow.compile(checkpointer=memory)
+    super_workflow.add_conditional_edges(
+        "info_extract_agent_workflow", 
+        check_extract_status, 
+        {
+            "continue": "answer_gen_agent_workflow", 
+            "augment": "knowledge_augment_workflow"
+        }
+    )
+    # Augment 이후: 보강 내용으로 바로 답변 컨텍스트를 만들거나(fast), 추출을 다시 시도
+    super_workflow.add_conditional_edges(
+        "knowledge_augment_workflow",
+        check_augment_result,
+        {
+            "fast": "augment_fast_path",
+            "reextract": "info_extract_agent_workflow"
+        }
+    )
+    super_workflow.add_conditional_edges(
+        "augment_fast_path",
+        check_extract_status,
+        {
+            "continue": "answer_gen_agent_workflow",
+            "augment": "knowledge_augment_workflow"
+        }
+    )
+    super_workflow.add_edge("answer_gen_agent_workflow", "evaluate_agent_workflow")
+    super_workflow.add_edge("evaluate_agent_workflow", END)
+
+    # 메모리 기반 체크포인터 추가 (대화 기록 보존용)
+    memory = MemorySaver()
+    return super_workflow.compile(checkpointer=memory)
+
+# 그래프 컴파일은 첫 실행(또는 컨테이너 warm-up) 시점으로 미룸
+super_graph = lazy(build_super_graph)
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import StreamingResponse
-import json
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, WebSocket
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 
 from app.models.schemas import (
     AddKnowledgeRequest, 
@@ -8,87 +11,191 @@ from app.models.schemas import (
     StatsResponse, 
     ChatRequest,
     ChatResponse,
-    AgentRunRequest
+    AgentRunRequest,
+    BatchChatRequest
+)
+from app.core.admission import find_overload
+from app.core.batch_chat import BatchChatConfig, run_batch
+from app.core.cancellation import cancel_scope, find_cancelled
+from app.core.chat_socket import ChatSocketSession
+from app.core.metrics import render_metrics
+from app.core.streaming import (
+    StreamConfig,
+    SSEEncoder,
+    VERBOSITY_DEBUG,
+    count_bytes,
+    dumps,
+    gzip_stream,
+    resolve_verbosity,
+    serialize_result,
+    watch_disconnect,
 )
-from app.deps import get_agent_service
+from app.core.tracing import start_trace, new_trace_id
+from app.deps import get_agent_service, container_ready
 from app.service.agent_service import AgentService
 
 router = APIRouter(prefix="/agent", tags=["agent"])
+stream_config = StreamConfig()
+batch_config = BatchChatConfig()
+
+
+def _json_response(payload, headers=None) -> Response:
+    # 메시지 목록이 큰 응답이라 pydantic 재검증 없이 orjson으로 바로 직렬화한다
+    return Response(content=dumps(payload), media_type="application/json", headers=headers)
 
 
+def _http_error(e: Exception, detail: str) -> HTTPException:
+    # 업스트림 수용 제어에 걸린 경우는 서버 오류가 아니라 일시적 과부하(503)로 응답한다
+    overload = find_overload(e)
+    if overload is not None:
+        return HTTPException(
+            status_code=503,
+            detail=f"Service overloaded: {overload}",
+            headers={"Retry-After": str(int(max(1, round(overload.retry_after))))},
+        )
+    return HTTPException(status_code=500, detail=f"{detail}: {str(e)}")
 
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
-    request: ChatRequest, agent_service: AgentService = Depends(get_agent_service)
+    request: ChatRequest,
+    agent_service: AgentService = Depends(get_agent_service),
 ):
+    verbosity = resolve_verbosity(request.verbosity, VERBOSITY_DEBUG)
     try:
         inputs = {"user_query": request.query, "process_status": "start"}
-        result = agent_service.run_agent("super", inputs, session_id=request.session_id)
-        
-        # Serialize result for response (handling BaseMessage objects)
-        serializable_result = {}
-        # Ensure we capture logs from the agents
-        relevant_logs = ["build_logs", "extract_logs", "answer_logs", "eval_logs", "augment_logs"]
-        for k, v in result.items():
-            if k in relevant_logs and isinstance(v, list):
-                serializable_result[k] = []
-                for m in v:
-                    msg_dict = {"role": getattr(m, 'type', 'unknown'), "content": getattr(m, 'content', str(m))}
-                    if hasattr(m, 'tool_calls') and m.tool_calls:
-                        msg_dict["tool_calls"] = m.tool_calls
-                    serializable_result[k].append(msg_dict)
-            else:
-                serializable_result[k] = v
-        
-        return serializable_result
+        with start_trace("POST /agent/chat", session_id=request.session_id) as trace:
+            # 그래프 실행은 블로킹이므로 스레드풀에서 돌려 이벤트 루프가 다른 요청을 받게 한다
+            # (그래야 동시에 들어온 같은 질의가 하나의 실행으로 합쳐질 수 있다)
+            result = await run_in_threadpool(
+                agent_service.run_agent, "super", inputs, session_id=request.session_id,
+                deadline_seconds=request.deadline_seconds,
+            )
+
+        serializable_result = serialize_result(result, verbosity)
+        serializable_result["trace_id"] = trace.trace_id
+        return _json_response(serializable_result, headers={"X-Trace-Id": trace.trace_id})
     except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Chat processing failed: {str(e)}"
-        )
+        raise _http_error(e, "Chat processing failed")
 
 
 @router.post("/chat/stream")
 async def chat_stream(
-    request: ChatRequest, agent_service: AgentService = Depends(get_agent_service)
+    request: ChatRequest,
+    http_request: Request,
+    agent_service: AgentService = Depends(get_agent_service),
 ):
+    trace_id = new_trace_id()
+    verbosity = resolve_verbosity(request.verbosity, stream_config.default_verbosity)
+    encoder = SSEEncoder(trace_id, verbosity)
+
     async def event_generator():
+        with start_trace(
+            "POST /agent/chat/stream", trace_id=trace_id, session_id=request.session_id
+        ), cancel_scope("/agent/chat/stream") as token:
+            watcher = asyncio.create_task(
+                watch_disconnect(http_request, token, stream_config.disconnect_poll)
+            )
+            try:
+                async for chunk in _stream_events(token):
+                    yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                # 응답 전송 중 연결이 끊겨 스트림이 닫혔다. 작업 스레드에 남은 호출도 멈춘다
+                token.cancel("client_disconnected")
+                raise
+            finally:
+                watcher.cancel()
+
+    async def _stream_events(token):
+        yield encoder.start()
         try:
             inputs = {"user_query": request.query, "process_status": "start"}
-            async for event in agent_service.stream_agent("super", inputs, session_id=request.session_id):
-                # Handle tuple events when subgraphs=True
-                if isinstance(event, tuple):
-                    event = event[1]
-                
-                # LangGraph update event serialization
-                serializable_event = {}
-                for node_name, state_update in event.items():
-                    serializable_node_update = {}
-                    for k, v in state_update.items():
-                        if isinstance(v, list):
-                            serializable_node_update[k] = []
-                            for m in v:
-                                if hasattr(m, 'content') or isinstance(m, str):
-                                    msg_dict = {
-                                        "role": getattr(m, 'type', 'unknown'), 
-                                        "content": getattr(m, 'content', str(m))
-                                    }
-                                    # Include tool calls if present
-                                    if hasattr(m, 'tool_calls') and m.tool_calls:
-                                        msg_dict["tool_calls"] = m.tool_calls
-                                    serializable_node_update[k].append(msg_dict)
-                        else:
-                            serializable_node_update[k] = v
-                    serializable_event[node_name] = serializable_node_update
-                
-                yield f"data: {json.dumps(serializable_event, ensure_ascii=False)}\n\n"
-            
-            yield "data: [DONE]\n\n"
+            async for event in agent_service.stream_agent(
+                "super", inputs, session_id=request.session_id, deadline_seconds=request.deadline_seconds
+            ):
+                if token.cancelled:
+                    return
+                frame = encoder.encode(event)
+                if frame is not None:
+                    yield frame
+            yield encoder.done()
         except Exception as e:
+            if token.cancelled or find_cancelled(e) is not None:
+                # 받을 클라이언트가 없다
+                return
             error_msg = {"error": str(e)}
-            yield f"data: {json.dumps(error_msg, ensure_ascii=False)}\n\n"
+            if find_overload(e) is not None:
+                error_msg["status"] = 503
+            yield encoder.error(error_msg)
+
+    headers = {"X-Trace-Id": trace_id}
+    encoding = "identity"
+    body = event_generator()
+    if stream_config.gzip and "gzip" in http_request.headers.get("accept-encoding", ""):
+        encoding = "gzip"
+        body = gzip_stream(body, stream_config.gzip_level)
+        headers.update({"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+    return StreamingResponse(
+        count_bytes(body, verbosity, encoding),
+        media_type="text/event-stream",
+        headers=headers,
+    )
+
 
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+@router.post("/chat/batch")
+async def chat_batch(
+    request: BatchChatRequest,
+    http_request: Request,
+    agent_service: AgentService = Depends(get_agent_service),
+):
+    """
+    여러 질문을 제한된 동시성으로 실행하고, 끝나는 순서대로 결과를 한 줄씩(NDJSON) 보낸다.
+    대량 실행은 `python -m app.core.batch_chat`을 쓰면 요청 크기 제한 없이 파일로 받을 수 있다.
+    """
+    if len(request.queries) > batch_config.max_queries:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many queries ({len(request.queries)} > {batch_config.max_queries}); "
+                   "use `python -m app.core.batch_chat` for larger batches",
+        )
+    items = [
+        {"index": i, "id": str(i), "query": q} if isinstance(q, str)
+        else {"index": i, "id": q.id if q.id is not None else str(i), "query": q.query}
+        for i, q in enumerate(request.queries)
+    ]
+    concurrency = min(request.concurrency or batch_config.concurrency, batch_config.concurrency)
+    trace_id = new_trace_id()
+
+    async def records():
+        with start_trace("POST /agent/chat/batch", trace_id=trace_id), \
+                cancel_scope("/agent/chat/batch") as token:
+            watcher = asyncio.create_task(
+                watch_disconnect(http_request, token, stream_config.disconnect_poll)
+            )
+            try:
+                batch = run_batch(
+                    agent_service, items, batch_config, concurrency, request.deadline_seconds, cancel_token=token
+                )
+                async for record in iterate_in_threadpool(batch):
+                    yield dumps(record) + b"\n"
+            except (asyncio.CancelledError, GeneratorExit):
+                # 받을 클라이언트가 없으면 남은 질문을 시작하지 않고 실행 중인 호출도 멈춘다
+                token.cancel("client_disconnected")
+                raise
+            finally:
+                watcher.cancel()
+
+    return StreamingResponse(records(), media_type="application/x-ndjson", headers={"X-Trace-Id": trace_id})
+
+
+@router.websocket("/ws")
+async def chat_socket(
+    websocket: WebSocket,
+    session_id: Optional[str] = None,
+    agent_service: AgentService = Depends(get_agent_service),
+):
+    # 연결 하나 = 세션 하나. 턴마다 새 HTTP 요청/SSE 스트림을 열지 않는다
+    await ChatSocketSession(websocket, agent_service, session_id).run()
 
 
 @router.post("/knowledge", response_model=KnowledgeResponse)
@@ -97,20 +204,19 @@ async def add_knowledge(
     agent_service: AgentService = Depends(get_agent_service),
 ):
     try:
-        result = agent_service.add_knowledge(
-            documents=request.documents, metadatas=request.metadatas
+        # 임베딩/저장은 bulk 우선순위로 수용 한도를 기다릴 수 있으므로 이벤트 루프 밖에서 실행한다
+        result = await run_in_threadpool(
+            agent_service.add_knowledge, documents=request.documents, metadatas=request.metadatas
         )
         return KnowledgeResponse(**result)
     except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Adding knowledge failed: {str(e)}"
-        )
+        raise _http_error(e, "Adding knowledge failed")
 
 
 @router.get("/stats", response_model=StatsResponse)
 async def get_knowledge_stats(agent_service: AgentService = Depends(get_agent_service)):
     try:
-        stats = agent_service.get_knowledge_stats()
+        stats = await run_in_threadpool(agent_service.get_knowledge_stats)
         return StatsResponse(**stats)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get stats: {str(e)}")
@@ -121,7 +227,7 @@ async def delete_knowledge(
     doc_id: str, agent_service: AgentService = Depends(get_agent_service)
 ):
     try:
-        agent_service.vector_service.delete_document(doc_id)
+        await run_in_threadpool(agent_service.vector_service.delete_document, doc_id)
         return {"status": "success", "message": f"Document {doc_id} deleted"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Deletion failed: {str(e)}")
@@ -129,7 +235,16 @@ async def delete_knowledge(
 
 @router.get("/health")
 async def health_check():
-    return {"status": "healthy", "message": "Agent service is running"}
+    return {
+        "status": "healthy",
+        "ready": container_ready(),
+        "message": "Agent service is running",
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 
 @router.post("/{name}")
@@ -138,22 +253,14 @@ async def run_individual_agent(
     request: AgentRunRequest,
     agent_service: AgentService = Depends(get_agent_service),
 ):
+    verbosity = resolve_verbosity(request.verbosity, VERBOSITY_DEBUG)
     try:
-        result = agent_service.run_agent(name, request.inputs, session_id=request.session_id)
+        with start_trace(f"POST /agent/{name}", session_id=request.session_id):
+            result = await run_in_threadpool(
+                agent_service.run_agent, name, request.inputs, session_id=request.session_id,
+                deadline_seconds=request.deadline_seconds,
+            )
         
-        # Simple serialization
-        serializable_result = {}
-        for k, v in result.items():
-            if isinstance(v, list):
-                serializable_result[k] = [
-                    {"role": getattr(m, 'type', 'unknown'), "content": getattr(m, 'content', str(m))}
-                    for m in v
-                ]
-            else:
-                serializable_result[k] = v
-                
-        return serializable_result
+        return _json_response(serialize_result(result, verbosity))
     except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Agent '{name}' execution failed: {str(e)}"
-        )
+        raise _http_error(e, f"Agent '{name}' execution failed")
@@ -0,0 +1,282 @@
+import contextvars
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+from app.core.metrics import counter, gauge, histogram
+
+load_dotenv()
+
+# 우선순위 클래스: 숫자가 작을수록 먼저 처리된다
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_AUGMENT = "augment"
+PRIORITY_BULK = "bulk"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_AUGMENT, PRIORITY_BULK)
+_RANK = {name: rank for rank, name in enumerate(PRIORITIES)}
+
+# 수용 제어로 거절한 응답에 붙이는 헤더 (SDK 재시도 억제 + 라우터에서 503으로 변환)
+ADMISSION_REJECTED_HEADER = "x-admission-rejected"
+
+ADMISSION_QUEUE_DEPTH = gauge(
+    "upstream_admission_queue_depth", "업스트림 호출 대기열 길이", ["lane", "priority"]
+)
+ADMISSION_IN_FLIGHT = gauge(
+    "upstream_admission_in_flight", "수용 제어를 통과해 진행 중인 호출 수", ["lane"]
+)
+ADMISSION_WAIT_SECONDS = histogram(
+    "upstream_admission_wait_seconds",
+    "업스트림 호출이 대기열에서 기다린 시간",
+    ["lane", "priority"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 120.0),
+)
+ADMISSION_REJECTED_TOTAL = counter(
+    "upstream_admission_rejected_total",
+    "대기열 포화/대기 시한 초과로 거절한 호출 수",
+    ["lane", "priority", "reason"],
+)
+
+
+class UpstreamOverloaded(Exception):
+    """업스트림 대기열이 가득 찼거나 대기 시한 안에 차례가 오지 않은 경우"""
+
+    def __init__(self, lane: str, reason: str, retry_after: float = 1.0):
+        super().__init__(f"{lane} upstream overloaded ({reason})")
+        self.lane = lane
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        # x-should-retry: false → OpenAI SDK(ChatUpstage/UpstageEmbeddings)가 재시도하지 않는다
+        return httpx.Response(
+            503,
+            headers={
+                ADMISSION_REJECTED_HEADER: f"{self.lane};{self.reason}",
+                "retry-after": str(int(max(1, round(self.retry_after)))),
+                "x-should-retry": "false",
+            },
+            json={"error": str(self)},
+            request=request,
+        )
+
+
+class AdmissionConfig:
+    """
+    레인별 설정. ADMISSION_EMBEDDINGS_RATE처럼 레인 접두어로 개별 조정하고,
+    없으면 ADMISSION_RATE 등 공통 값을 쓴다.
+    """
+
+    def __init__(self, lane: str):
+        prefix = lane.upper()
+
+        def _env(name: str, default: str) -> str:
+            return os.getenv(f"ADMISSION_{prefix}_{name}", os.getenv(f"ADMISSION_{name}", default))
+
+        self.lane = lane
+        self.enabled = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+        # 초당 허용 호출 수 (0 이하면 속도 제한 없음)와 버스트 크기
+        self.rate = float(_env("RATE", "0"))
+        self.burst = max(1.0, float(_env("BURST", "10")))
+        self.max_concurrency = max(1, int(_env("MAX_CONCURRENCY", "16")))
+        self.max_queue = max(1, int(_env("MAX_QUEUE", "64")))
+        # 낮은 우선순위가 쓸 수 있는 동시 실행/대기열 비율 (나머지는 상위 클래스 몫으로 남긴다)
+        self.shares = {
+            PRIORITY_INTERACTIVE: 1.0,
+            PRIORITY_AUGMENT: float(_env("AUGMENT_SHARE", "0.8")),
+            PRIORITY_BULK: float(_env("BULK_SHARE", "0.5")),
+        }
+        # 우선순위별 최대 대기 시간(초)
+        self.queue_timeouts = {
+            PRIORITY_INTERACTIVE: float(_env("TIMEOUT_INTERACTIVE", "10")),
+            PRIORITY_AUGMENT: float(_env("TIMEOUT_AUGMENT", "20")),
+            PRIORITY_BULK: float(_env("TIMEOUT_BULK", "300")),
+        }
+
+    def concurrency_for(self, priority: str) -> int:
+        return max(1, int(self.max_concurrency * self.shares[priority]))
+
+    def queue_for(self, priority: str) -> int:
+        return max(1, int(self.max_queue * self.shares[priority]))
+
+
+class AdmissionController:
+    """
+    레인 하나의 토큰 버킷 + 동시 실행 상한 + 우선순위 대기열.
+    대기 중인 호출 중 (우선순위, 도착 순서)가 가장 앞선 것부터 통과시킨다.
+    """
+
+    def __init__(self, lane: str, config: Optional[AdmissionConfig] = None):
+        self.lane = lane
+        self.config = config or AdmissionConfig(lane)
+        self._cond = threading.Condition()
+        self._waiting: List[Tuple[int, int]] = []
+        self._queued = {p: 0 for p in PRIORITIES}
+        self._in_flight = 0
+        self._tokens = self.config.burst
+        self._refilled_at = time.monotonic()
+        self._seq = itertools.count()
+        for priority in PRIORITIES:
+            ADMISSION_QUEUE_DEPTH.set_function(
+                lambda p=priority: self._queued[p], lane=lane, priority=priority
+            )
+        ADMISSION_IN_FLIGHT.set_function(lambda: self._in_flight, lane=lane)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def queued(self, priority: Optional[str] = None) -> int:
+        if priority is None:
+            return len(self._waiting)
+        return self._queued[priority]
+
+    def _refill(self, now: float):
+        if self.config.rate > 0:
+            elapsed = now - self._refilled_at
+            self._tokens = min(self.config.burst, self._tokens + elapsed * self.config.rate)
+        self._refilled_at = now
+
+    def _next_eligible(self) -> Optional[Tuple[int, int]]:
+        eligible = [
+            ticket
+            for ticket in self._waiting
+            if self._in_flight < self.config.concurrency_for(PRIORITIES[ticket[0]])
+        ]
+        return min(eligible) if eligible else None
+
+    def _try_admit(self, ticket: Tuple[int, int], now: float) -> Optional[float]:
+        """통과하면 0, 토큰을 기다려야 하면 대기 초, 차례가 아니면 None"""
+        if self._next_eligible() != ticket:
+            return None
+        self._refill(now)
+        if self.config.rate > 0:
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.config.rate
+            self._tokens -= 1
+        self._in_flight += 1
+        return 0.0
+
+    def acquire(self, priority: str = PRIORITY_INTERACTIVE, timeout: Optional[float] = None) -> float:
+        """차례가 올 때까지 대기하고 대기 시간(초)을 반환한다. 거절 시 UpstreamOverloaded."""
+        if timeout is None:
+            timeout = self.config.queue_timeouts[priority]
+        start = time.monotonic()
+        deadline = start + timeout
+        with self._cond:
+            # 대기열이 찼으면 기다리지 않고 바로 거절 (빠른 부하 차단)
+            if len(self._waiting) >= self.config.queue_for(priority):
+                ADMISSION_REJECTED_TOTAL.inc(lane=self.lane, priority=priority, reason="queue_full")
+                raise UpstreamOverloaded(self.lane, "queue_full")
+            ticket = (_RANK[priority], next(self._seq))
+            self._waiting.append(ticket)
+            self._queued[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._try_admit(ticket, now)
+                    if wait == 0:
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        ADMISSION_REJECTED_TOTAL.inc(
+                            lane=self.lane, priority=priority, reason="deadline"
+                        )
+                        raise UpstreamOverloaded(self.lane, "deadline", retry_after=timeout)
+                    self._cond.wait(remaining if wait is None else min(wait, remaining))
+            finally:
+                self._waiting.remove(ticket)
+                self._queued[priority] -= 1
+                self._cond.notify_all()
+        waited = time.monotonic() - start
+        ADMISSION_WAIT_SECONDS.observe(waited, lane=self.lane, priority=priority)
+        return waited
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+
+_controllers: Dict[str, AdmissionController] = {}
+_lock = threading.Lock()
+
+_current_priority: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "admission_priority", default=PRIORITY_INTERACTIVE
+)
+
+
+def get_controller(lane: str) -> AdmissionController:
+    controller = _controllers.get(lane)
+    if controller is None:
+        with _lock:
+            controller = _controllers.get(lane)
+            if controller is None:
+                controller = AdmissionController(lane)
+                _controllers[lane] = controller
+    return controller
+
+
+def reset_controllers():
+    with _lock:
+        _controllers.clear()
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+@contextmanager
+def admission_priority(priority: str):
+    """이 블록에서 나가는 업스트림 호출의 우선순위 클래스를 지정한다."""
+    if priority not in _RANK:
+        raise ValueError(f"Unknown admission priority: {priority}")
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        try:
+            _current_priority.reset(token)
+        except ValueError:
+            pass
+
+
+def admission_lane(upstream: str, request: httpx.Request) -> Optional[str]:
+    """
+    요청을 레인(chat/embeddings/serper)으로 분류한다. Upstage는 채팅과 임베딩이
+    같은 커넥션 풀을 쓰지만 제한은 따로 걸리므로 경로로 구분한다.
+    워밍업용 HEAD 같은 비-API 호출은 None (제어 대상 아님).
+    """
+    if request.method != "POST":
+        return None
+    if upstream == "upstage":
+        return "embeddings" if "embeddings" in request.url.path else "chat"
+    return upstream
+
+
+def find_overload(exc: BaseException) -> Optional[UpstreamOverloaded]:
+    """
+    예외 체인에서 수용 제어 거절을 찾는다. SDK가 503 응답을 자체 예외
+    (openai.InternalServerError, httpx.HTTPStatusError)로 감싸므로 응답 헤더도 확인한다.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, UpstreamOverloaded):
+            return exc
+        try:
+            response = getattr(exc, "response", None)
+        except Exception:
+            response = None
+        marker = response.headers.get(ADMISSION_REJECTED_HEADER) if isinstance(response, httpx.Response) else None
+        if marker:
+            lane, _, reason = marker.partition(";")
+            return UpstreamOverloaded(
+                lane, reason or "rejected", float(response.headers.get("retry-after", "1"))
+            )
+        exc = exc.__cause__ or exc.__context__
+    return None
@@ -0,0 +1,246 @@
+"""
+대량 질의 배치 실행. FAQ 생성/회귀 점검처럼 질문 수천 개를 super 그래프로 돌려 결과를 JSONL로 쓴다.
+
+    python -m app.core.batch_chat --input questions.jsonl --output answers.jsonl
+    python -m app.core.batch_chat --input questions.txt --output answers.jsonl --concurrency 8 --resume
+    cat questions.txt | python -m app.core.batch_chat > answers.jsonl
+
+입력은 한 줄에 질문 하나 (일반 텍스트 또는 {"id": ..., "query": ...}). POST /agent/chat/batch도 같은 실행기를 쓴다.
+
+- 질문마다 HTTP 요청을 만들지 않고 프로세스 안에서 그래프를 직접 돌리며, 동시에 concurrency개까지만 실행한다.
+- 다음에 실행할 질문들의 질의 임베딩을 미리 묶어서 받고(prime_queries), 실행 중 검색 임베딩도 여러 질문의
+  것을 모아 한 번에 요청한다(query_batching). 같은 질문은 한 번만 실행된다(세션 없는 실행 병합).
+- 모든 실행은 PRIORITY_BULK라 같은 프로세스의 실시간 요청이 업스트림 수용 한도를 먼저 쓴다.
+- 결과는 끝나는 순서대로 한 줄씩 쓴다 (index가 입력 순서).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO
+
+from dotenv import load_dotenv
+
+from app.core.admission import admission_priority, find_overload, PRIORITY_BULK
+from app.core.cancellation import CancelToken, bind_cancel_token
+from app.core.metrics import counter, gauge, histogram
+
+load_dotenv()
+
+logger = logging.getLogger("batch_chat")
+
+BATCH_QUERIES_TOTAL = counter("batch_chat_queries_total", "배치 질의 처리 결과", ["result"])
+BATCH_QUERY_SECONDS = histogram("batch_chat_query_seconds", "배치 질의 하나의 그래프 실행 시간")
+BATCH_IN_FLIGHT = gauge("batch_chat_in_flight", "실행 중인 배치 질의 수")
+
+
+class BatchChatConfig:
+    def __init__(self):
+        self.concurrency = int(os.getenv("BATCH_CHAT_CONCURRENCY", "4"))
+        # /agent/chat/batch 요청 하나에 담을 수 있는 질문 수 (CLI는 제한 없음)
+        self.max_queries = int(os.getenv("BATCH_CHAT_MAX_QUERIES", "1000"))
+        # 질의 임베딩을 모으는 시간(ms). 0이면 실행 중에는 묶지 않는다 (미리 받는 prime은 그대로)
+        self.embed_window = float(os.getenv("BATCH_CHAT_EMBED_WINDOW_MS", "20")) / 1000
+        self.prime_embeddings = os.getenv("BATCH_CHAT_PRIME_EMBEDDINGS", "true").lower() == "true"
+        # 한 번에 미리 임베딩할 질문 수
+        self.prime_chunk = int(os.getenv("BATCH_CHAT_PRIME_CHUNK", "64"))
+
+
+def parse_item(line: str, index: int) -> Optional[Dict[str, Any]]:
+    """입력 한 줄을 {"index", "id", "query"}로. 빈 줄이면 None."""
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        item = json.loads(line)
+        query = item.get("query")
+        if not isinstance(query, str) or not query.strip():
+            raise ValueError(f"Line {index + 1}: 'query' must be a non-empty string")
+        return {"index": index, "id": str(item.get("id", index)), "query": query}
+    return {"index": index, "id": str(index), "query": line}
+
+
+def read_items(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    index = 0
+    for line in lines:
+        item = parse_item(line, index)
+        if item is not None:
+            yield item
+            index += 1
+
+
+def _answer(result: Dict[str, Any]) -> Optional[str]:
+    answers = [m for m in result.get("answer_logs") or [] if getattr(m, "type", None) == "ai"]
+    return answers[-1].content if answers else None
+
+
+def _score(result: Dict[str, Any]) -> Optional[float]:
+    from app.agents.workflow import clean_and_parse_json
+
+    eval_logs = result.get("eval_logs") or []
+    if not eval_logs:
+        return None
+    parsed = clean_and_parse_json(eval_logs[-1].content)
+    score = parsed.get("final_score") if parsed else None
+    return score if isinstance(score, (int, float)) else None
+
+
+def run_item(agent_service: Any, item: Dict[str, Any], config: BatchChatConfig,
+             deadline_seconds: Optional[float] = None, cancel_token: Optional[CancelToken] = None) -> Dict[str, Any]:
+    """질문 하나를 실행해 결과 레코드를 만든다. 실패해도 예외 대신 error 레코드를 돌려준다."""
+    # 작업 스레드는 빈 컨텍스트로 시작하므로 우선순위/임베딩 묶음/취소 범위를 여기서 연다
+    from app.service.embedding_service import query_batching
+
+    record = {"index": item["index"], "id": item["id"], "query": item["query"]}
+    started = time.perf_counter()
+    BATCH_IN_FLIGHT.inc()
+    try:
+        with admission_priority(PRIORITY_BULK), query_batching(config.embed_window), \
+                bind_cancel_token(cancel_token):
+            result = agent_service.run_agent(
+                "super", {"user_query": item["query"], "process_status": "start"}, deadline_seconds=deadline_seconds
+            )
+        usage = result.get("token_usage") or {}
+        record.update({
+            "answer": _answer(result),
+            "process_status": result.get("process_status"),
+            "answer_path": result.get("answer_path"),
+            "score": _score(result),
+            "total_tokens": usage.get("total_tokens"),
+            "coalesced": bool(usage.get("coalesced")),
+        })
+        if result.get("deadline"):
+            record["degraded"] = result["deadline"]["degraded"]
+        BATCH_QUERIES_TOTAL.inc(result="ok")
+    except Exception as e:
+        record["error"] = str(e)
+        if find_overload(e) is not None:
+            record["status"] = 503
+        BATCH_QUERIES_TOTAL.inc(result="error")
+    finally:
+        BATCH_IN_FLIGHT.dec()
+    elapsed = time.perf_counter() - started
+    BATCH_QUERY_SECONDS.observe(elapsed)
+    record["elapsed_ms"] = round(elapsed * 1000, 1)
+    return record
+
+
+def run_batch(
+    agent_service: Any,
+    items: Iterable[Dict[str, Any]],
+    config: Optional[BatchChatConfig] = None,
+    concurrency: Optional[int] = None,
+    deadline_seconds: Optional[float] = None,
+    cancel_token: Optional[CancelToken] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    items를 concurrency개씩 동시에 실행하며 끝나는 순서대로 결과 레코드를 내보낸다.
+    입력은 필요한 만큼만 읽으므로 큰 파일도 메모리에 다 올리지 않는다.
+    cancel_token이 취소되면 새 질문을 시작하지 않고, 실행 중인 질문의 남은 LLM/임베딩/검색 호출도 멈춘다.
+    """
+    config = config or BatchChatConfig()
+    workers = max(1, concurrency or config.concurrency)
+    embedding_service = getattr(getattr(agent_service, "vector_service", None), "embedding_service", None)
+    source = iter(items)
+    queued: List[Dict[str, Any]] = []
+    running: Set[Future] = set()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-chat")
+
+    def refill():
+        # 실행 대기열이 비면 다음 묶음을 읽고, 그 질의 임베딩을 요청 한 번에 미리 받아 둔다
+        queued.extend(islice(source, max(workers, config.prime_chunk)))
+        if queued and config.prime_embeddings and embedding_service is not None:
+            try:
+                with admission_priority(PRIORITY_BULK):
+                    embedding_service.prime_queries([item["query"] for item in queued])
+            except Exception as e:
+                # 미리 받지 못해도 검색 때 다시 임베딩하므로 실행은 계속한다
+                logger.warning(f"Priming query embeddings failed: {e}")
+
+    try:
+        while True:
+            while len(running) < workers and not (cancel_token is not None and cancel_token.cancelled):
+                if not queued:
+                    refill()
+                    if not queued:
+                        break
+                item = queued.pop(0)
+                running.add(pool.submit(run_item, agent_service, item, config, deadline_seconds, cancel_token))
+            if not running:
+                return
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        # 소비자가 중간에 멈추면(클라이언트 종료 등) 시작하지 않은 질문은 버리고 실행 중인 것만 끝낸다
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _completed_ids(path: str) -> Set[str]:
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 쓰는 도중 종료된 마지막 줄
+                continue
+            if "error" not in record:
+                done.add(record["id"])
+    return done
+
+
+def write_jsonl(records: Iterable[Dict[str, Any]], out: TextIO) -> Dict[str, int]:
+    stats = {"ok": 0, "error": 0}
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        stats["error" if "error" in record else "ok"] += 1
+    return stats
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.deps import get_agent_service, shutdown_container
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    config = BatchChatConfig()
+    parser = argparse.ArgumentParser(prog="python -m app.core.batch_chat", description="대량 질의 배치 실행")
+    parser.add_argument("--input", default="-", help="질문 파일 (텍스트 또는 JSONL, -면 stdin)")
+    parser.add_argument("--output", default="-", help="결과 JSONL (-면 stdout)")
+    parser.add_argument("--concurrency", type=int, default=config.concurrency)
+    parser.add_argument("--deadline", type=float, default=None, help="질문당 마감(초)")
+    parser.add_argument("--resume", action="store_true", help="출력 파일에 이미 성공한 id는 건너뛰고 이어 쓴다")
+    args = parser.parse_args(argv)
+
+    skip = _completed_ids(args.output) if args.resume and args.output != "-" else set()
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    out = sys.stdout if args.output == "-" else open(args.output, "a" if args.resume else "w", encoding="utf-8")
+    started = time.perf_counter()
+    try:
+        items = (item for item in read_items(source) if item["id"] not in skip)
+        stats = write_jsonl(
+            run_batch(get_agent_service(), items, config, args.concurrency, args.deadline), out
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+        shutdown_container()
+    elapsed = time.perf_counter() - started
+    total = stats["ok"] + stats["error"]
+    print(
+        f"[✓] {total} queries in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.2f}/s): "
+        f"{stats['ok']} ok, {stats['error']} failed, {len(skip)} skipped",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
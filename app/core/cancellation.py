@@ -0,0 +1,111 @@
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from app.core.metrics import counter
+
+REQUESTS_CANCELLED_TOTAL = counter(
+    "requests_cancelled_total", "클라이언트 연결 종료/취소로 중단한 요청 수", ["endpoint", "reason"]
+)
+CANCELLED_CALLS_TOTAL = counter(
+    "cancelled_calls_total", "요청이 취소돼 시작하지 않았거나 결과를 기다리지 않고 버린 호출 수", ["stage"]
+)
+
+
+class RequestCancelled(Exception):
+    """요청이 취소돼 더 진행하지 않는다. 재시도하지 않고, 병합된 다른 요청으로 전파하지 않는다."""
+
+    def __init__(self, stage: str, reason: str):
+        super().__init__(f"Request cancelled ({reason}) before {stage}")
+        self.stage = stage
+        self.reason = reason
+
+
+class CancelToken:
+    """
+    요청 하나의 취소 상태. contextvar로 전달되므로 그래프 노드/재시도 작업 스레드에서도 같은 토큰을 본다.
+    취소는 협조적이다: 각 호출 지점이 시작 전에 확인하고, 결과를 기다리는 쪽은 기다림을 멈춘다.
+    이미 업스트림에 나간 요청 자체를 끊지는 않는다.
+    """
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._future: Optional[Future] = None
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str) -> bool:
+        """처음 취소할 때만 True."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            future = self._future
+        REQUESTS_CANCELLED_TOTAL.inc(endpoint=self.endpoint, reason=reason)
+        if future is not None:
+            future.set_result(reason)
+        return True
+
+    def as_future(self) -> Future:
+        """취소되면 완료되는 Future. concurrent.futures.wait에 다른 작업과 함께 넣어 기다린다."""
+        with self._lock:
+            if self._future is None:
+                self._future = Future()
+                if self._event.is_set():
+                    self._future.set_result(self.reason)
+            return self._future
+
+
+_current: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+
+
+@contextmanager
+def cancel_scope(endpoint: str) -> Iterator[CancelToken]:
+    with bind_cancel_token(CancelToken(endpoint)) as token:
+        yield token
+
+
+@contextmanager
+def bind_cancel_token(token: Optional[CancelToken]) -> Iterator[Optional[CancelToken]]:
+    """이미 만든 토큰을 현재 컨텍스트에 건다. 직접 만든 작업 스레드(컨텍스트가 복사되지 않는다)에서 쓴다."""
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+def current_cancel_token() -> Optional[CancelToken]:
+    return _current.get()
+
+
+def cancel_requested() -> bool:
+    token = _current.get()
+    return token is not None and token.cancelled
+
+
+def check_cancelled(stage: str):
+    """현재 요청이 취소됐으면 RequestCancelled. 비용이 드는 호출을 시작하기 직전에 부른다."""
+    token = _current.get()
+    if token is not None and token.cancelled:
+        CANCELLED_CALLS_TOTAL.inc(stage=stage)
+        raise RequestCancelled(stage, token.reason)
+
+
+def find_cancelled(exc: Optional[BaseException]) -> Optional[RequestCancelled]:
+    """SDK가 감싼 예외 체인에서 RequestCancelled를 찾는다."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, RequestCancelled):
+            return exc
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return None
@@ -0,0 +1,239 @@
+"""
+/agent/ws 멀티턴 WebSocket 세션. 연결 하나가 세션(thread_id) 하나이고, 같은 소켓으로 여러 턴을 주고받는다.
+
+클라이언트 → 서버:
+    {"type": "turn", "query": "...", "verbosity": "status", "deadline_seconds": 20}
+                                                              새 턴 (진행 중인 턴이 있으면 거절)
+    {"type": "cancel"}                                        진행 중인 턴 취소
+    {"type": "ping"}
+
+서버 → 클라이언트:
+    {"type": "session", "session_id": ...}
+    {"type": "turn_start", "turn": n, "trace_id": ...}
+    {"type": "event", "turn": n, "data": {...}}               SSE 스트림과 같은 delta 페이로드
+    {"type": "turn_end", "turn": n, "elapsed_ms": ...}
+    {"type": "cancelled", "turn": n}
+    {"type": "error", "turn": n, "error": ..., "status": 503}
+    {"type": "pong"}
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import orjson
+from dotenv import load_dotenv
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from app.core.admission import find_overload
+from app.core.cancellation import cancel_scope
+from app.core.metrics import counter, gauge, histogram
+from app.core.streaming import SSEEncoder, dumps, resolve_verbosity
+from app.core.tracing import new_trace_id, start_trace
+
+load_dotenv()
+
+logger = logging.getLogger("chat_socket")
+
+WS_CONNECTIONS = gauge("ws_connections", "열려 있는 /agent/ws 연결 수")
+WS_TURNS_TOTAL = counter("ws_turns_total", "WebSocket 턴 결과", ["result"])
+WS_TURN_SECONDS = histogram("ws_turn_seconds", "WebSocket 턴 처리 시간 (turn 수신 ~ turn_end)")
+WS_SLOW_CLIENT_CLOSED_TOTAL = counter(
+    "ws_slow_client_closed_total", "송신 큐가 가득 찬 채 WS_SEND_TIMEOUT을 넘겨 끊은 연결 수"
+)
+
+# 정책 위반(1008)이 아니라 "나중에 다시 시도"(1013)로 닫아 클라이언트가 재연결하게 한다
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class ChatSocketConfig:
+    def __init__(self):
+        self.default_verbosity = os.getenv("STREAM_DEFAULT_VERBOSITY", "status")
+        # 연결별 송신 큐 크기. 가득 차면 그래프 스트림 소비를 멈춰 느린 클라이언트에 맞춘다
+        self.send_queue_size = int(os.getenv("WS_SEND_QUEUE_SIZE", "64"))
+        # 큐가 이 시간(초) 넘게 비지 않으면 클라이언트가 읽지 않는 것으로 보고 연결을 닫는다
+        self.send_timeout = float(os.getenv("WS_SEND_TIMEOUT", "30"))
+        self.max_query_chars = int(os.getenv("WS_MAX_QUERY_CHARS", "4000"))
+
+
+class SlowClient(Exception):
+    pass
+
+
+async def _stop(task: Optional[asyncio.Task]):
+    """태스크를 취소하고 끝날 때까지 기다린다. 이 코루틴 자신이 취소된 경우의 CancelledError는 삼키지 않는다."""
+    if task is None:
+        return
+    task.cancel()
+    await asyncio.wait({task})
+    if not task.cancelled():
+        # 이미 예외로 끝난 태스크의 예외를 회수해 "never retrieved" 경고를 막는다
+        task.exception()
+
+
+class ChatSocketSession:
+    """연결 하나의 수신 루프, 송신 태스크, 진행 중인 턴 태스크를 관리한다."""
+
+    def __init__(self, websocket: WebSocket, agent_service: Any, session_id: Optional[str] = None,
+                 config: Optional[ChatSocketConfig] = None):
+        self.websocket = websocket
+        self.agent_service = agent_service
+        self.session_id = session_id or uuid.uuid4().hex
+        self.config = config or ChatSocketConfig()
+        self._outbox: asyncio.Queue = asyncio.Queue(maxsize=self.config.send_queue_size)
+        self._turn_task: Optional[asyncio.Task] = None
+        self._sender: Optional[asyncio.Task] = None
+        self._turns = 0
+        self._slow = False
+        self._cancel_reason = "client_disconnected"
+
+    async def run(self):
+        await self.websocket.accept()
+        WS_CONNECTIONS.inc()
+        self._sender = asyncio.create_task(self._send_loop())
+        receive: Optional[asyncio.Future] = None
+        try:
+            await self._send({"type": "session", "session_id": self.session_id})
+            while True:
+                receive = asyncio.ensure_future(self.websocket.receive_text())
+                done, _ = await asyncio.wait({receive, self._sender}, return_when=asyncio.FIRST_COMPLETED)
+                if receive not in done:
+                    # 송신이 끊겼으면 (클라이언트 종료/느린 클라이언트) 더 받을 이유가 없다
+                    break
+                await self._handle(receive.result())
+        except (WebSocketDisconnect, SlowClient):
+            pass
+        finally:
+            WS_CONNECTIONS.dec()
+            await _stop(receive)
+            await _stop(self._turn_task)
+            await _stop(self._sender)
+        if self._slow:
+            await self._close(CLOSE_TRY_AGAIN_LATER, "client is not reading")
+
+    # --- inbound ---------------------------------------------------------
+
+    async def _handle(self, raw: str):
+        try:
+            message = orjson.loads(raw)
+            kind = message.get("type")
+        except (orjson.JSONDecodeError, AttributeError):
+            await self._send({"type": "error", "error": "invalid message"})
+            return
+
+        if kind == "ping":
+            await self._send({"type": "pong"})
+        elif kind == "cancel":
+            if self._turn_task is not None and not self._turn_task.done():
+                self._cancel_reason = "client_cancel"
+                await _stop(self._turn_task)
+                self._cancel_reason = "client_disconnected"
+                WS_TURNS_TOTAL.inc(result="cancelled")
+                await self._send({"type": "cancelled", "turn": self._turns})
+        elif kind == "turn":
+            await self._start_turn(message)
+        else:
+            await self._send({"type": "error", "error": f"unknown message type '{kind}'"})
+
+    async def _start_turn(self, message: Dict[str, Any]):
+        query = message.get("query")
+        if not isinstance(query, str) or not query.strip() or len(query) > self.config.max_query_chars:
+            await self._send({"type": "error", "error": "query must be a non-empty string "
+                              f"of at most {self.config.max_query_chars} characters"})
+            return
+        try:
+            verbosity = resolve_verbosity(message.get("verbosity"), self.config.default_verbosity)
+        except ValueError as e:
+            await self._send({"type": "error", "error": str(e)})
+            return
+        deadline_seconds = message.get("deadline_seconds")
+        if deadline_seconds is not None and (
+            isinstance(deadline_seconds, bool) or not isinstance(deadline_seconds, (int, float)) or deadline_seconds <= 0
+        ):
+            await self._send({"type": "error", "error": "deadline_seconds must be a positive number"})
+            return
+        if self._turn_task is not None and not self._turn_task.done():
+            # 같은 세션 체크포인트에 두 턴이 동시에 쓰지 않도록 한 번에 하나만 (먼저 cancel을 보낸다)
+            await self._send({"type": "error", "turn": self._turns, "error": "turn in progress"})
+            return
+        self._turns += 1
+        self._turn_task = asyncio.create_task(self._run_turn(self._turns, query, verbosity, deadline_seconds))
+
+
+    # --- turn ------------------------------------------------------------
+
+    async def _run_turn(self, turn: int, query: str, verbosity: str, deadline_seconds: Optional[float] = None):
+        try:
+            await self._stream_turn(turn, query, verbosity, deadline_seconds)
+        except SlowClient:
+            # 수신 루프가 송신 태스크 종료를 보고 연결을 닫는다
+            pass
+
+    async def _stream_turn(self, turn: int, query: str, verbosity: str, deadline_seconds: Optional[float] = None):
+        trace_id = new_trace_id()
+        encoder = SSEEncoder(trace_id, verbosity)
+        started = time.perf_counter()
+        await self._send({"type": "turn_start", "turn": turn, "trace_id": trace_id})
+        try:
+            with start_trace("WS /agent/ws turn", trace_id=trace_id, session_id=self.session_id), \
+                    cancel_scope("/agent/ws") as token:
+                try:
+                    inputs = {"user_query": query, "process_status": "start"}
+                    async for event in self.agent_service.stream_agent(
+                        "super", inputs, session_id=self.session_id, deadline_seconds=deadline_seconds
+                    ):
+                        payload = encoder.payload(event)
+                        if payload:
+                            await self._send({"type": "event", "turn": turn, "data": payload})
+                except (asyncio.CancelledError, SlowClient):
+                    # 취소 메시지, 연결 종료, 느린 클라이언트: 작업 스레드에 남은 호출도 멈춘다
+                    token.cancel("slow_client" if self._slow else self._cancel_reason)
+                    raise
+        except (asyncio.CancelledError, SlowClient):
+            raise
+        except Exception as e:
+            error = {"type": "error", "turn": turn, "error": str(e)}
+            if find_overload(e) is not None:
+                error["status"] = 503
+            WS_TURNS_TOTAL.inc(result="error")
+            await self._send(error)
+            return
+        elapsed = time.perf_counter() - started
+        WS_TURN_SECONDS.observe(elapsed)
+        WS_TURNS_TOTAL.inc(result="ok")
+        await self._send({"type": "turn_end", "turn": turn, "elapsed_ms": round(elapsed * 1000, 1)})
+
+    # --- outbound --------------------------------------------------------
+
+    async def _send(self, message: Dict[str, Any]):
+        # 큐가 차 있으면 여기서 기다리므로 턴 태스크(그래프 스트림 소비)도 같이 멈춘다
+        try:
+            await asyncio.wait_for(self._outbox.put(dumps(message)), timeout=self.config.send_timeout)
+        except asyncio.TimeoutError:
+            self._give_up_slow_client()
+            raise SlowClient()
+
+    async def _send_loop(self):
+        while True:
+            frame = await self._outbox.get()
+            try:
+                await asyncio.wait_for(self.websocket.send_text(frame.decode()), timeout=self.config.send_timeout)
+            except asyncio.TimeoutError:
+                self._give_up_slow_client()
+                return
+
+    def _give_up_slow_client(self):
+        if not self._slow:
+            self._slow = True
+            WS_SLOW_CLIENT_CLOSED_TOTAL.inc()
+            logger.warning(f"Closing WebSocket session {self.session_id}: client is not reading")
+        if self._sender is not None and self._sender is not asyncio.current_task():
+            self._sender.cancel()
+
+    async def _close(self, code: int, reason: str):
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception as e:
+            logger.debug(f"WebSocket close failed: {e}")
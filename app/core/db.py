@@ -1,9 +1,11 @@
 import logging
 import os
-import chromadb
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    import chromadb
+
 # Suppress all chromadb related logging before it starts
 logging.getLogger("chromadb").setLevel(logging.ERROR)
 
@@ -23,7 +25,7 @@ class ChromaDBConfig:
 
 class ChromaDBConnection:
     _instance: Optional["ChromaDBConnection"] = None
-    _client: Optional[chromadb.ClientAPI] = None
+    _client: Optional["chromadb.ClientAPI"] = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -33,6 +35,8 @@ class ChromaDBConnection:
     def __init__(self):
         if self._client is None:
             config = ChromaDBConfig()
+            # chromadb(onnxruntime 등 포함)는 실제 연결 시점에 import
+            import chromadb
             from chromadb.config import Settings
             
             if config.mode == "server":
@@ -49,18 +53,19 @@ class ChromaDBConnection:
                 )
 
     @property
-    def client(self) -> chromadb.ClientAPI:
+    def client(self) -> "chromadb.ClientAPI":
         return self._client
 
-    def get_collection(self, collection_name: str = None):
+    def get_collection(self, collection_name: str = None, metadata: Optional[dict] = None):
         config = ChromaDBConfig()
         name = collection_name or config.collection_name
         return self._client.get_or_create_collection(
-            name=name, metadata={"description": "Upstage Solar2 embeddings collection"}
+            name=name,
+            metadata={"description": "Upstage Solar2 embeddings collection", **(metadata or {})},
         )
 
 
-def get_chroma_client() -> chromadb.ClientAPI:
+def get_chroma_client() -> "chromadb.ClientAPI":
     """ChromaDB 클라이언트를 반환하는 의존성 함수"""
     connection = ChromaDBConnection()
     return connection.client
@@ -0,0 +1,171 @@
+"""
+요청 마감 시간. /agent/chat 등에 deadline_seconds(없으면 REQUEST_DEADLINE_SECONDS)를 주면
+RunnableConfig["configurable"]["deadline"]으로 모든 노드에 전달되고, 각 단계는 남은 시간을 보고
+정해진 방식으로 품질을 낮춘다.
+
+    augmentation        남은 시간 < DEADLINE_MIN_AUGMENT_SECONDS       구글 보강 생략, 현재 정보로 답변
+    augment_tool_rounds 남은 시간 < DEADLINE_MIN_TOOL_ROUND_SECONDS    보강 도구 호출을 더 하지 않고 종료
+    answer_max_tokens   남은 시간 < DEADLINE_MIN_FULL_ANSWER_SECONDS   답변 max_tokens를 DEADLINE_REDUCED_MAX_TOKENS로
+    evaluation          남은 시간 < DEADLINE_MIN_EVAL_SECONDS          평가를 응답 뒤 백그라운드로 미룸
+
+적용한 단계는 응답의 deadline.degraded에 남는다.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.core.metrics import counter, gauge
+
+load_dotenv()
+
+logger = logging.getLogger("deadline")
+
+DEADLINE_DEGRADED_TOTAL = counter(
+    "deadline_degraded_total", "마감 시간이 부족해 단계를 축소/생략한 횟수", ["stage"]
+)
+DEADLINE_MISSED_TOTAL = counter("deadline_missed_total", "마감 시간을 넘겨 끝난 요청 수")
+DEFERRED_TASKS_TOTAL = counter(
+    "deferred_tasks_total", "응답 뒤로 미룬 작업 결과 (ok, error, dropped: 대기열 가득 참)", ["task", "result"]
+)
+DEFERRED_TASKS_PENDING = gauge("deferred_tasks_pending", "실행 대기 중이거나 실행 중인 미룬 작업 수")
+
+STAGE_AUGMENTATION = "augmentation"
+STAGE_AUGMENT_TOOL_ROUNDS = "augment_tool_rounds"
+STAGE_ANSWER_MAX_TOKENS = "answer_max_tokens"
+STAGE_EVALUATION = "evaluation"
+
+
+class DeadlineConfig:
+    def __init__(self):
+        # 요청에 deadline_seconds가 없을 때 쓰는 기본값. 0 이하면 마감 없음
+        self.default_seconds = float(os.getenv("REQUEST_DEADLINE_SECONDS", "0"))
+        # 클라이언트가 보낸 값의 상한
+        self.max_seconds = float(os.getenv("REQUEST_DEADLINE_MAX_SECONDS", "120"))
+        # 단계를 원래대로 진행하는 데 필요한 최소 남은 시간(초)
+        self.min_augment = float(os.getenv("DEADLINE_MIN_AUGMENT_SECONDS", "15"))
+        self.min_tool_round = float(os.getenv("DEADLINE_MIN_TOOL_ROUND_SECONDS", "8"))
+        self.min_full_answer = float(os.getenv("DEADLINE_MIN_FULL_ANSWER_SECONDS", "10"))
+        self.min_eval = float(os.getenv("DEADLINE_MIN_EVAL_SECONDS", "5"))
+        self.reduced_max_tokens = int(os.getenv("DEADLINE_REDUCED_MAX_TOKENS", "512"))
+        # 미룬 평가를 돌리는 스레드 수와 대기 한도. 한도를 넘으면 평가를 버린다
+        self.deferred_workers = int(os.getenv("DEADLINE_DEFERRED_WORKERS", "1"))
+        self.deferred_max_pending = int(os.getenv("DEADLINE_DEFERRED_MAX_PENDING", "32"))
+
+    def stage_minimum(self, stage: str) -> float:
+        return {
+            STAGE_AUGMENTATION: self.min_augment,
+            STAGE_AUGMENT_TOOL_ROUNDS: self.min_tool_round,
+            STAGE_ANSWER_MAX_TOKENS: self.min_full_answer,
+            STAGE_EVALUATION: self.min_eval,
+        }[stage]
+
+
+class Deadline:
+    """요청 하나의 마감 시각과 적용한 품질 저하 목록. 그래프 작업 스레드에서 같이 쓴다."""
+
+    def __init__(self, seconds: float, config: Optional[DeadlineConfig] = None):
+        self.seconds = seconds
+        self.config = config or DeadlineConfig()
+        self.expires_at = time.monotonic() + seconds
+        self.degraded: List[str] = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, stage: str) -> bool:
+        """남은 시간이 단계 최소치 이상이면 True. 아니면 저하를 기록하고 False."""
+        if self.remaining() >= self.config.stage_minimum(stage):
+            return True
+        with self._lock:
+            if stage not in self.degraded:
+                self.degraded.append(stage)
+        DEADLINE_DEGRADED_TOTAL.inc(stage=stage)
+        return False
+
+    def finish(self):
+        if self.expired:
+            DEADLINE_MISSED_TOTAL.inc()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            degraded = list(self.degraded)
+        return {
+            "seconds": self.seconds,
+            "remaining_ms": round(self.remaining() * 1000, 1),
+            "degraded": degraded,
+        }
+
+
+def resolve_deadline(requested: Optional[float], config: Optional[DeadlineConfig] = None) -> Optional[Deadline]:
+    """요청 값(없으면 기본값)으로 Deadline을 만든다. 마감이 없으면 None."""
+    config = config or DeadlineConfig()
+    seconds = requested if requested is not None else config.default_seconds
+    if seconds is None or seconds <= 0:
+        return None
+    return Deadline(min(seconds, config.max_seconds), config)
+
+
+def get_deadline(config: Optional[Dict[str, Any]]) -> Optional[Deadline]:
+    if not config:
+        return None
+    return (config.get("configurable") or {}).get("deadline")
+
+
+def check_deadline(config: Optional[Dict[str, Any]], stage: str) -> bool:
+    """
+    RunnableConfig에 마감이 없거나 단계에 필요한 시간이 남았으면 True.
+    부족하면 해당 단계를 저하한 것으로 기록하고 False를 반환한다. (check_budget과 같은 방식)
+    """
+    deadline = get_deadline(config)
+    return deadline is None or deadline.allows(stage)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending = 0
+_executor_lock = threading.Lock()
+
+
+def run_deferred(task: str, fn: Callable[[], Any], config: Optional[DeadlineConfig] = None) -> bool:
+    """
+    응답에 필요 없는 작업을 요청 밖 백그라운드 스레드로 넘긴다. 대기열이 가득 차면 버리고 False.
+    요청의 contextvar(취소 토큰, 사용량 집계)는 넘기지 않는다.
+    """
+    global _executor, _pending
+    config = config or DeadlineConfig()
+    with _executor_lock:
+        if _pending >= config.deferred_max_pending:
+            DEFERRED_TASKS_TOTAL.inc(task=task, result="dropped")
+            return False
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, config.deferred_workers), thread_name_prefix="deferred"
+            )
+        _pending += 1
+        DEFERRED_TASKS_PENDING.inc()
+
+    def _run():
+        global _pending
+        try:
+            fn()
+            DEFERRED_TASKS_TOTAL.inc(task=task, result="ok")
+        except Exception as e:
+            DEFERRED_TASKS_TOTAL.inc(task=task, result="error")
+            logger.warning(f"Deferred {task} failed: {e}")
+        finally:
+            with _executor_lock:
+                _pending -= 1
+            DEFERRED_TASKS_PENDING.dec()
+
+    # 새 스레드는 빈 컨텍스트로 시작하므로 요청의 취소/사용량 contextvar가 따라가지 않는다
+    _executor.submit(_run)
+    return True
@@ -0,0 +1,277 @@
+"""
+오프라인 임베딩 빌드. 서빙과 분리해 코퍼스 임베딩을 한 번 계산해 두고, 다시 돌리면 바뀐 문서만 임베딩한다.
+
+    python -m app.core.embedding_build
+    python -m app.core.embedding_build --source resources/의료데이터 --out ./embeddings --concurrency 8
+
+출력 (<out>/<모델 이름>/):
+    shard-00000.f32     float32 (shard_rows, dim) 고정 크기. np.memmap으로 바로 열 수 있다
+    shard-00000.jsonl   채워진 행마다 {"row", "hash"} (내용 sha256). 벡터를 쓴 뒤에 추가한다
+    index.json          모델, 차원, 샤드당 행 수
+    snapshot/           현재 코퍼스(id/문서/메타데이터 + 임베딩) 스냅샷. app.core.snapshot import 또는
+                        SNAPSHOT_BOOTSTRAP_PATH로 서빙 노드에 바로 넣는다
+
+같은 내용은 모델이 같으면 다시 임베딩하지 않는다. 중간에 멈춰도 다음 실행은 이어서 한다.
+"""
+import argparse
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.core.snapshot import write_snapshot
+
+load_dotenv()
+
+logger = logging.getLogger("embedding_build")
+
+
+class EmbeddingBuildConfig:
+    def __init__(self):
+        self.source = os.getenv("EMBED_BUILD_SOURCE", "resources/의료데이터")
+        self.out_dir = os.getenv("EMBED_BUILD_DIR", "./embeddings")
+        self.model = os.getenv("UPSTAGE_EMBEDDING_MODEL", "solar-embedding-1-large")
+        self.shard_rows = int(os.getenv("EMBED_BUILD_SHARD_ROWS", "4096"))
+        self.batch_size = int(os.getenv("EMBED_BUILD_BATCH_SIZE", "64"))
+        self.concurrency = int(os.getenv("EMBED_BUILD_CONCURRENCY", "4"))
+        self.snapshot_part_size = int(os.getenv("SNAPSHOT_PART_SIZE", "10000"))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def model_dir_name(model: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", model)
+
+
+class EmbeddingStore:
+    """
+    내용 해시 -> 벡터 저장소. 고정 크기 float32 샤드 파일에 행을 이어 쓰고, 행을 다 쓴 뒤에
+    sidecar에 해시를 기록한다. sidecar에 없는 행은 쓰다 만 것으로 보고 다음에 덮어쓴다.
+    """
+
+    def __init__(self, path: str, model: str, shard_rows: int = 4096):
+        self.path = path
+        self.model = model
+        self.shard_rows = shard_rows
+        self.dim: Optional[int] = None
+        self._rows: Dict[str, Tuple[int, int]] = {}
+        self._next = 0
+        self._maps: Dict[int, np.memmap] = {}
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.path, "index.json")
+
+    def _load(self):
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        if index["model"] != self.model:
+            raise ValueError(f"Store at {self.path} was built with {index['model']}, not {self.model}")
+        self.dim = index["dim"]
+        self.shard_rows = index["shard_rows"]
+        shard = 0
+        while os.path.exists(self._sidecar(shard)):
+            entries, torn = self._read_sidecar(self._sidecar(shard))
+            if torn:
+                # 깨진 줄 뒤에 이어 쓰면 다음 재개 때도 같은 곳에서 읽기가 끊기므로 유효한 줄만 남겨 다시 쓴다
+                self._rewrite_sidecar(self._sidecar(shard), entries)
+            for entry in entries:
+                self._rows[entry["hash"]] = (shard, entry["row"])
+                self._next = max(self._next, shard * self.shard_rows + entry["row"] + 1)
+            shard += 1
+
+    @staticmethod
+    def _read_sidecar(path: str) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        유효한 항목과, 다시 써야 하는지(쓰다 만 줄이 있었는지)를 반환한다. 예전 버전이 깨진 줄 뒤에 이어 쓴
+        파일이면 같은 행 번호가 두 번 나올 수 있는데, 나중 항목이 그 행의 실제 벡터이므로 그것만 남긴다.
+        """
+        rows: Dict[int, Dict[str, Any]] = {}
+        torn = False
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    # 쓰는 도중 종료된 마지막 줄
+                    torn = True
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    torn = True
+                    continue
+                if entry["row"] in rows:
+                    torn = True
+                    del rows[entry["row"]]
+                rows[entry["row"]] = entry
+        return list(rows.values()), torn
+
+    @staticmethod
+    def _rewrite_sidecar(path: str, entries: List[Dict[str, Any]]):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps({"row": e["row"], "hash": e["hash"]}) + "\n" for e in entries)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _sidecar(self, shard: int) -> str:
+        return os.path.join(self.path, f"shard-{shard:05d}.jsonl")
+
+    def _vectors_path(self, shard: int) -> str:
+        return os.path.join(self.path, f"shard-{shard:05d}.f32")
+
+    def _map(self, shard: int) -> np.memmap:
+        mapped = self._maps.get(shard)
+        if mapped is None:
+            path = self._vectors_path(shard)
+            mode = "r+" if os.path.exists(path) else "w+"
+            mapped = np.memmap(path, dtype=np.float32, mode=mode, shape=(self.shard_rows, self.dim))
+            self._maps[shard] = mapped
+        return mapped
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, keys: Sequence[str], vectors: Sequence[Sequence[float]]):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(self._index_path, "w", encoding="utf-8") as f:
+                    json.dump({"model": self.model, "dim": self.dim, "shard_rows": self.shard_rows}, f)
+            written: Dict[int, List[str]] = {}
+            for key, vector in zip(keys, vectors):
+                if key in self._rows:
+                    continue
+                shard, row = divmod(self._next, self.shard_rows)
+                self._map(shard)[row] = vector
+                written.setdefault(shard, []).append(json.dumps({"row": row, "hash": key}))
+                self._rows[key] = (shard, row)
+                self._next += 1
+            for shard, lines in written.items():
+                self._map(shard).flush()
+                with open(self._sidecar(shard), "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+
+    def get(self, keys: Sequence[str]) -> np.ndarray:
+        with self._lock:
+            return np.stack([self._map(s)[r] for s, r in (self._rows[k] for k in keys)])
+
+
+def build_embeddings(
+    documents: List[Dict],
+    embed: Callable[[List[str]], List[List[float]]],
+    config: Optional[EmbeddingBuildConfig] = None,
+) -> Dict[str, int]:
+    """
+    load_medical_data 형식의 문서를 서빙과 같은 규칙으로 청크로 나눠 임베딩하고 스냅샷을 만든다.
+    이미 저장된 내용은 건너뛴다. {"chunks", "embedded", "reused"}를 반환한다.
+    """
+    from app.service.chunker import TextChunker
+    from app.service.vector_service import split_documents
+
+    config = config or EmbeddingBuildConfig()
+    model_path = os.path.join(config.out_dir, model_dir_name(config.model))
+    store = EmbeddingStore(model_path, config.model, config.shard_rows)
+
+    texts, metadatas, ids = split_documents(
+        TextChunker(),
+        [d["content"] for d in documents],
+        [d["metadata"] for d in documents],
+        [d["id"] for d in documents],
+    )
+    keys = [content_hash(t) for t in texts]
+    pending: Dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key not in store and key not in pending:
+            pending[key] = text
+    logger.info(f"{len(texts)} chunks, {len(texts) - len(pending)} already embedded, {len(pending)} to embed")
+
+    started = time.perf_counter()
+    items = list(pending.items())
+    batches = [items[i:i + config.batch_size] for i in range(0, len(items), config.batch_size)]
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, config.concurrency), thread_name_prefix="embed-build") as pool:
+        # 작업 스레드는 contextvar를 물려받지 않으므로 호출 측의 우선순위/추적 컨텍스트를 복사해 넘긴다
+        futures = {
+            pool.submit(contextvars.copy_context().run, embed, [text for _, text in batch]): batch
+            for batch in batches
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            # 끝난 배치부터 바로 저장하므로 중간에 실패해도 다음 실행은 나머지만 한다
+            store.add([key for key, _ in batch], future.result())
+            done += len(batch)
+            logger.info(f"Embedded {done}/{len(items)} chunks ({time.perf_counter() - started:.1f}s)")
+
+    snapshot_path = os.path.join(model_path, "snapshot")
+    tmp_path = snapshot_path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    step = config.snapshot_part_size
+    parts = (
+        (
+            ids[i:i + step],
+            texts[i:i + step],
+            (metadatas or [None] * len(texts))[i:i + step],
+            store.get(keys[i:i + step]),
+        )
+        for i in range(0, len(texts), step)
+    )
+    write_snapshot(tmp_path, parts, collection=config.model)
+    shutil.rmtree(snapshot_path, ignore_errors=True)
+    os.replace(tmp_path, snapshot_path)
+    return {"chunks": len(texts), "embedded": len(items), "reused": len(texts) - len(items)}
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.core.admission import admission_priority, PRIORITY_BULK
+    from app.core.seed import load_medical_data
+    from app.service.embedding_service import EmbeddingService
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    config = EmbeddingBuildConfig()
+    parser = argparse.ArgumentParser(prog="python -m app.core.embedding_build", description="오프라인 임베딩 빌드")
+    parser.add_argument("--source", default=config.source)
+    parser.add_argument("--out", default=config.out_dir)
+    parser.add_argument("--concurrency", type=int, default=config.concurrency)
+    parser.add_argument("--batch-size", type=int, default=config.batch_size)
+    args = parser.parse_args(argv)
+    config.source, config.out_dir = args.source, args.out
+    config.concurrency, config.batch_size = args.concurrency, args.batch_size
+
+    documents = load_medical_data(config.source)
+    if not documents:
+        print(f"[!] No documents found in {config.source}")
+        raise SystemExit(1)
+    embedding_service = EmbeddingService()
+    # 서빙 트래픽과 같은 프로세스에서 돌더라도 실시간 요청보다 뒤로 밀리게 한다
+    with admission_priority(PRIORITY_BULK):
+        stats = build_embeddings(documents, embedding_service.create_embeddings, config)
+    print(
+        f"[✓] {stats['chunks']} chunks: embedded {stats['embedded']}, reused {stats['reused']}. "
+        f"Snapshot: {os.path.join(config.out_dir, model_dir_name(config.model), 'snapshot')}"
+    )
+
+
+if __name__ == "__main__":
+    main()
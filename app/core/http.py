@@ -0,0 +1,168 @@
+import importlib.util
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from app.core.admission import UpstreamOverloaded, admission_lane, current_priority, get_controller
+from app.core.cancellation import check_cancelled
+from app.core.metrics import counter, gauge, histogram
+
+load_dotenv()
+
+logger = logging.getLogger("http")
+
+# 업스트림별 기본 주소. 같은 호스트를 쓰는 클라이언트(채팅/임베딩/OpenAI)는 하나의 풀을 공유한다.
+UPSTREAM_BASE_URLS = {
+    "upstage": "https://api.upstage.ai",
+    "serper": "https://google.serper.dev",
+}
+
+HTTP_REQUESTS_TOTAL = counter(
+    "upstream_http_requests_total", "업스트림 HTTP 요청 수", ["upstream", "status"]
+)
+HTTP_REQUEST_SECONDS = histogram(
+    "upstream_http_request_seconds", "업스트림 HTTP 요청 지연 시간", ["upstream"]
+)
+HTTP_IN_FLIGHT = gauge(
+    "upstream_http_in_flight", "진행 중인 업스트림 HTTP 요청 수", ["upstream"]
+)
+POOL_CONNECTIONS = gauge(
+    "upstream_http_pool_connections", "풀에 열려 있는 연결 수", ["upstream", "state"]
+)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class HttpPoolConfig:
+    """업스트림별 풀 설정. UPSTAGE_HTTP_MAX_CONNECTIONS처럼 접두어로 개별 조정 가능."""
+
+    def __init__(self, upstream: str):
+        prefix = upstream.upper()
+
+        def _env(name: str, default: str) -> str:
+            return os.getenv(f"{prefix}_HTTP_{name}", os.getenv(f"HTTP_{name}", default))
+
+        self.upstream = upstream
+        self.base_url = os.getenv(f"{prefix}_BASE_URL", UPSTREAM_BASE_URLS.get(upstream, ""))
+        self.max_connections = int(_env("MAX_CONNECTIONS", "50"))
+        self.max_keepalive_connections = int(_env("MAX_KEEPALIVE", "20"))
+        # httpx 기본값(5초)은 요청 간격보다 짧아 매번 TLS 핸드셰이크가 다시 발생한다
+        self.keepalive_expiry = float(_env("KEEPALIVE_EXPIRY", "120"))
+        self.connect_timeout = float(_env("CONNECT_TIMEOUT", "5"))
+        self.read_timeout = float(_env("READ_TIMEOUT", "60"))
+        self.http2 = _env("HTTP2", "true").lower() == "true" and HTTP2_AVAILABLE
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """요청 수, 지연 시간, 동시 요청 수를 기록하는 전송 계층 래퍼"""
+
+    def __init__(self, upstream: str, transport: httpx.HTTPTransport):
+        self.upstream = upstream
+        self._transport = transport
+        pool = getattr(transport, "_pool", None)
+        if pool is not None:
+            POOL_CONNECTIONS.set_function(
+                lambda: len(pool.connections), upstream=upstream, state="open"
+            )
+            POOL_CONNECTIONS.set_function(
+                lambda: sum(1 for c in pool.connections if c.is_idle()),
+                upstream=upstream,
+                state="idle",
+            )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        # 취소된 요청의 남은 업스트림 호출(재시도 포함)은 수용 제어 자리를 잡기 전에 끊는다
+        check_cancelled(f"http:{self.upstream}")
+        # 프로세스 전역 수용 제어: 레인별 속도/동시 실행 상한과 우선순위 대기열.
+        # 자리는 응답 헤더를 받을 때까지 점유한다 (본문은 작아서 따로 잡지 않음)
+        lane = admission_lane(self.upstream, request)
+        controller = get_controller(lane) if lane else None
+        if controller is not None and controller.config.enabled:
+            try:
+                controller.acquire(current_priority())
+            except UpstreamOverloaded as e:
+                HTTP_REQUESTS_TOTAL.inc(upstream=self.upstream, status="shed")
+                return e.to_response(request)
+        else:
+            controller = None
+
+        HTTP_IN_FLIGHT.inc(upstream=self.upstream)
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = self._transport.handle_request(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            if controller is not None:
+                controller.release()
+            HTTP_IN_FLIGHT.dec(upstream=self.upstream)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, upstream=self.upstream)
+            HTTP_REQUESTS_TOTAL.inc(upstream=self.upstream, status=status)
+
+    def close(self):
+        self._transport.close()
+
+
+_clients: Dict[str, httpx.Client] = {}
+_lock = threading.Lock()
+
+
+def _build_client(config: HttpPoolConfig) -> httpx.Client:
+    limits = httpx.Limits(
+        max_connections=config.max_connections,
+        max_keepalive_connections=config.max_keepalive_connections,
+        keepalive_expiry=config.keepalive_expiry,
+    )
+    transport = httpx.HTTPTransport(limits=limits, http2=config.http2, retries=1)
+    logger.info(
+        f"HTTP pool for {config.upstream}: max={config.max_connections}, "
+        f"keepalive={config.max_keepalive_connections}, http2={config.http2}"
+    )
+    return httpx.Client(
+        transport=InstrumentedTransport(config.upstream, transport),
+        timeout=httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+        follow_redirects=True,
+    )
+
+
+def get_http_client(upstream: str) -> httpx.Client:
+    """업스트림별 프로세스 공용 httpx.Client (커넥션 풀 공유)"""
+    client = _clients.get(upstream)
+    if client is not None and not client.is_closed:
+        return client
+    with _lock:
+        client = _clients.get(upstream)
+        if client is None or client.is_closed:
+            client = _build_client(HttpPoolConfig(upstream))
+            _clients[upstream] = client
+        return client
+
+
+def warm_up_http_clients(upstreams: Optional[Iterable[str]] = None):
+    """
+    기동 시 각 업스트림에 연결을 미리 열어 TLS 핸드셰이크 비용이
+    첫 사용자 요청의 지연 시간에 포함되지 않게 한다.
+    """
+    if os.getenv("HTTP_WARM_UP", "true").lower() != "true":
+        return
+    for upstream in upstreams or UPSTREAM_BASE_URLS.keys():
+        config = HttpPoolConfig(upstream)
+        if not config.base_url:
+            continue
+        try:
+            get_http_client(upstream).head(config.base_url)
+        except Exception as e:
+            logger.warning(f"HTTP warm-up failed for {upstream}: {e}")
+
+
+def close_http_clients():
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,56 @@
+import threading
+from typing import Any, Callable
+
+
+class LazyObject:
+    """
+    첫 속성 접근 시 factory로 실제 객체를 만드는 프록시.
+    모듈 전역(채팅 모델, 컴파일된 그래프 등)을 import 시점이 아니라 처음 쓸 때 생성한다.
+    """
+
+    __slots__ = ("_lazy_factory", "_lazy_instance", "_lazy_lock")
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, "_lazy_factory", factory)
+        object.__setattr__(self, "_lazy_instance", None)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+
+    def _lazy_resolve(self) -> Any:
+        instance = self._lazy_instance
+        if instance is None:
+            with self._lazy_lock:
+                instance = self._lazy_instance
+                if instance is None:
+                    instance = self._lazy_factory()
+                    object.__setattr__(self, "_lazy_instance", instance)
+        return instance
+
+    @property
+    def is_resolved(self) -> bool:
+        return self._lazy_instance is not None
+
+    def __getattr__(self, name: str) -> Any:
+        # mock.patch/inspect 등의 내부 속성 탐색(__func__, _is_coroutine 등)만으로
+        # 객체가 생성되지 않도록, 생성 전에는 '_'로 시작하는 이름을 넘기지 않는다
+        if name.startswith("_") and self._lazy_instance is None:
+            raise AttributeError(name)
+        return getattr(self._lazy_resolve(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._lazy_resolve(), name, value)
+
+    def __repr__(self) -> str:
+        if self._lazy_instance is None:
+            return f"<LazyObject {getattr(self._lazy_factory, '__name__', 'factory')} (unresolved)>"
+        return repr(self._lazy_instance)
+
+
+def lazy(factory: Callable[[], Any]) -> LazyObject:
+    return LazyObject(factory)
+
+
+def resolve(obj: Any) -> Any:
+    """LazyObject면 실제 객체를 만들어 반환하고, 아니면 그대로 반환한다."""
+    if isinstance(obj, LazyObject):
+        return obj._lazy_resolve()
+    return obj
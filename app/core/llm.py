@@ -1,3 +1,9 @@
+from typing import Any
+
+from app.core.cancellation import check_cancelled
+from app.core.resilience import get_policy
+from app.core.tracing import span, SPAN_KIND_CLIENT
+from app.core.usage import record_usage, extract_token_counts
 from app.repository.client.llm_client import UpstageClient
 
 _client = UpstageClient()
@@ -7,3 +13,33 @@ def get_solar_chat():
 
 def get_upstage_embeddings():
     return _client.get_embedding_model()
+
+def invoke_chat(llm: Any, messages: Any, agent_name: str, idempotent: bool = False):
+    """
+    Solar 채팅 호출 공통 진입점. 호출 구간을 LLM span으로 기록하고
+    응답의 토큰 사용량을 요청/노드 단위로 집계한다.
+    idempotent=True(검증/평가처럼 결과를 그대로 다시 받아도 되는 호출)면 헤지 요청 대상이 된다.
+    요청이 취소됐으면 호출하지 않고 RequestCancelled를 던진다.
+    """
+    check_cancelled("llm")
+    with span(
+        "llm.solar_chat",
+        kind=SPAN_KIND_CLIENT,
+        agent=agent_name,
+        **{"gen_ai.system": "upstage", "gen_ai.request.model": _client.chat_model_name},
+    ) as s:
+        response = get_policy("chat").call(
+            lambda: llm.invoke(messages),
+            idempotent=idempotent,
+            # 헤지/타임아웃으로 버려진 호출도 비용은 발생하므로 별도 이름으로 집계
+            on_discarded=lambda discarded: record_usage(f"{agent_name}:discarded", discarded),
+        )
+        record_usage(agent_name, response)
+        if s is not None:
+            if getattr(response, "tool_calls", None):
+                s.set_attribute("tool_calls", len(response.tool_calls))
+            counts = extract_token_counts(response)
+            if counts:
+                s.set_attribute("gen_ai.usage.input_tokens", counts["prompt_tokens"])
+                s.set_attribute("gen_ai.usage.output_tokens", counts["completion_tokens"])
+        return response
@@ -1,41 +1,229 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import random
+import threading
+import zlib
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from typing import Any, Optional
 
-# 로그 디렉토리 생성
-LOG_DIR = "logs"
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
-
-# 로그 파일 경로 설정
-log_filename = f"agent_flow_{datetime.now().strftime('%Y%m%d')}.log"
-log_path = os.path.join(LOG_DIR, log_filename)
-
-# 로거 설정
-logger = logging.getLogger("agent_flow")
-logger.setLevel(logging.INFO)
-
-# 기존 핸들러 제거 (중복 방지)
-if logger.hasHandlers():
-    logger.handlers.clear()
-
-# 파일 핸들러 설정
-file_handler = logging.FileHandler(log_path, encoding="utf-8")
-file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(file_formatter)
-logger.addHandler(file_handler)
-
-# 콘솔 핸들러 설정 (선택 사항)
-console_handler = logging.StreamHandler()
-console_formatter = logging.Formatter('%(message)s')
-console_handler.setFormatter(console_formatter)
-logger.addHandler(console_handler)
-
-from typing import Any
-
-def log_agent_step(agent_name: str, step_description: str, data: Any = None):
-    message = f"[{agent_name}] {step_description}"
-    if data:
-        message += f"\nData: {data}"
-    logger.info(message)
-    logger.info("-" * 50)
+from dotenv import load_dotenv
+
+from app.core.tracing import current_trace_id
+
+load_dotenv()
+
+
+class LoggingConfig:
+    def __init__(self):
+        self.level = os.getenv("LOG_LEVEL", "INFO").upper()
+        self.log_dir = os.getenv("LOG_DIR", "logs")
+        self.file_name = os.getenv("LOG_FILE_NAME", "agent_flow.log")
+        self.backup_days = int(os.getenv("LOG_BACKUP_DAYS", "14"))
+        self.console = os.getenv("LOG_CONSOLE", "true").lower() == "true"
+        self.queue_size = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+        # 긴 답변/도구 결과가 통째로 기록되지 않도록 필드 길이와 리스트 길이를 제한
+        self.max_field_chars = int(os.getenv("LOG_MAX_FIELD_CHARS", "500"))
+        self.max_items = int(os.getenv("LOG_MAX_ITEMS", "20"))
+        # data 페이로드를 남길 요청 비율 (correlation id 단위로 샘플링)
+        self.payload_sample_rate = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "1.0"))
+
+
+def truncate_payload(value: Any, max_chars: int, max_items: int, depth: int = 0) -> Any:
+    if depth > 4:
+        return "..."
+    if isinstance(value, str):
+        if len(value) > max_chars:
+            return f"{value[:max_chars]}...(+{len(value) - max_chars} chars)"
+        return value
+    if isinstance(value, dict):
+        items = list(value.items())
+        result = {
+            str(k): truncate_payload(v, max_chars, max_items, depth + 1)
+            for k, v in items[:max_items]
+        }
+        if len(items) > max_items:
+            result["..."] = f"+{len(items) - max_items} keys"
+        return result
+    if isinstance(value, (list, tuple)):
+        result = [truncate_payload(v, max_chars, max_items, depth + 1) for v in value[:max_items]]
+        if len(value) > max_items:
+            result.append(f"...(+{len(value) - max_items} items)")
+        return result
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return truncate_payload(str(value), max_chars, max_items, depth + 1)
+
+
+class JsonFormatter(logging.Formatter):
+    """리스너 스레드에서 레코드를 JSON 한 줄로 직렬화한다."""
+
+    def __init__(self, config: LoggingConfig):
+        super().__init__()
+        self.config = config
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", None),
+        }
+        for key in ("agent", "step"):
+            if hasattr(record, key):
+                payload[key] = getattr(record, key)
+        if getattr(record, "data", None) is not None:
+            payload["data"] = truncate_payload(
+                record.data, self.config.max_field_chars, self.config.max_items
+            )
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    def __init__(self, config: LoggingConfig):
+        super().__init__()
+        self.config = config
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        cid = getattr(record, "correlation_id", None)
+        if cid:
+            message = f"[{cid[:8]}] {message}"
+        if getattr(record, "data", None) is not None:
+            data = truncate_payload(record.data, 200, 5)
+            message += f" | {json.dumps(data, ensure_ascii=False, default=str)}"
+        return message
+
+
+class CorrelationFilter(logging.Filter):
+    """호출 스레드에서 현재 trace id를 레코드에 붙인다 (리스너 스레드에는 컨텍스트가 없음)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "correlation_id"):
+            record.correlation_id = current_trace_id()
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    포맷팅은 리스너 스레드로 미루고 큐에 넣기만 한다.
+    큐가 가득 차면 호출자를 막지 않고 레코드를 버린 뒤 개수를 센다.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_setup_lock = threading.Lock()
+_config: Optional[LoggingConfig] = None
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+
+def setup_logging() -> LoggingConfig:
+    """최초 사용 시점에 큐 핸들러와 리스너를 구성한다 (import 시 파일을 만들지 않음)."""
+    global _config, _listener, _queue_handler
+    if _config is not None:
+        return _config
+    with _setup_lock:
+        if _config is not None:
+            return _config
+        config = LoggingConfig()
+
+        handlers = []
+        os.makedirs(config.log_dir, exist_ok=True)
+        file_handler = TimedRotatingFileHandler(
+            os.path.join(config.log_dir, config.file_name),
+            when="midnight",
+            backupCount=config.backup_days,
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(JsonFormatter(config))
+        handlers.append(file_handler)
+        if config.console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(ConsoleFormatter(config))
+            handlers.append(console_handler)
+
+        log_queue: queue.Queue = queue.Queue(maxsize=config.queue_size)
+        _queue_handler = NonBlockingQueueHandler(log_queue)
+        _queue_handler.addFilter(CorrelationFilter())
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+        root = logging.getLogger("agent_flow")
+        root.setLevel(config.level)
+        root.handlers.clear()
+        root.addHandler(_queue_handler)
+        root.propagate = False
+
+        _config = config
+        return config
+
+
+def shutdown_logging():
+    """큐에 남은 레코드를 모두 기록하고 리스너를 멈춘다."""
+    global _config, _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+        _listener = None
+        _queue_handler = None
+        _config = None
+
+
+def dropped_records() -> int:
+    return _queue_handler.dropped if _queue_handler else 0
+
+
+def get_logger(name: str) -> logging.Logger:
+    setup_logging()
+    return logging.getLogger(f"agent_flow.{name}")
+
+
+def _payload_sampled(config: LoggingConfig) -> bool:
+    rate = config.payload_sample_rate
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+    # 같은 요청의 레코드는 모두 함께 샘플링되도록 correlation id로 결정
+    cid = current_trace_id()
+    if cid:
+        return zlib.crc32(cid.encode()) % 10_000 < rate * 10_000
+    return random.random() < rate
+
+
+def log_agent_step(
+    agent_name: str, step_description: str, data: Any = None, level: int = logging.INFO
+):
+    config = setup_logging()
+    logger = logging.getLogger("agent_flow")
+    if not logger.isEnabledFor(level):
+        return
+    if data is not None and not _payload_sampled(config):
+        data = None
+    logger.log(
+        level,
+        f"[{agent_name}] {step_description}",
+        extra={"agent": agent_name, "step": step_description, "data": data},
+    )
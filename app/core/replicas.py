@@ -0,0 +1,204 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.core.metrics import counter, gauge
+
+load_dotenv()
+
+logger = logging.getLogger("chroma")
+
+CHROMA_READS_TOTAL = counter(
+    "chroma_reads_total", "Chroma 읽기 요청이 간 노드", ["target"]
+)
+REPLICA_HEALTHY = gauge(
+    "chroma_replica_healthy", "읽기 복제본 상태 (1: 사용 중, 0: 제외됨)", ["replica"]
+)
+REPLICA_LAG = gauge(
+    "chroma_replica_lag_documents", "primary 대비 복제본에 없는 문서 수 (추적 중인 컬렉션 합)", ["replica"]
+)
+REPLICA_EJECTIONS_TOTAL = counter(
+    "chroma_replica_ejections_total", "복제본을 읽기 대상에서 뺀 횟수", ["replica", "reason"]
+)
+
+
+class ReplicaConfig:
+    def __init__(self):
+        # "host:port,host:port" 형식. server 모드에서만 쓴다 (primary는 CHROMA_HOST:CHROMA_PORT)
+        raw = os.getenv("CHROMA_READ_REPLICAS", "")
+        self.addresses = [a.strip() for a in raw.split(",") if a.strip()]
+        self.health_interval = float(os.getenv("CHROMA_REPLICA_HEALTH_INTERVAL", "5"))
+        # primary보다 이만큼 넘게 문서가 적으면 따라잡을 때까지 제외한다
+        self.max_lag = int(os.getenv("CHROMA_REPLICA_MAX_LAG", "100"))
+        # 쓰기 직후 이 시간(초) 동안은 primary에서 읽는다 (복제 지연 중 read-your-writes)
+        self.read_after_write = float(os.getenv("CHROMA_REPLICA_READ_AFTER_WRITE", "10"))
+
+
+class Replica:
+    def __init__(self, address: str, client: Any = None):
+        self.address = address
+        self._client = client
+        # 첫 점검을 통과하기 전까지는 읽기를 보내지 않는다
+        self.healthy = False
+        self.lag = 0
+        self._collections: Dict[str, Any] = {}
+        REPLICA_HEALTHY.set_function(lambda: 1.0 if self.healthy else 0.0, replica=address)
+        REPLICA_LAG.set_function(lambda: float(self.lag), replica=address)
+
+    @property
+    def client(self):
+        if self._client is None:
+            import chromadb
+
+            host, _, port = self.address.rpartition(":")
+            self._client = chromadb.HttpClient(host=host, port=int(port))
+        return self._client
+
+    def collection(self, name: str):
+        # 복제본에는 쓰지 않으므로 get_or_create가 아니라 get (없으면 예외 → 제외)
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self.client.get_collection(name)
+            self._collections[name] = collection
+        return collection
+
+
+class ReplicaPool:
+    """
+    읽기 복제본 목록과 상태. 읽기는 건강한 복제본에 돌아가며 보내고, 실패하거나 primary보다
+    많이 뒤처진 복제본은 백그라운드 점검이 다시 통과시킬 때까지 제외한다.
+    복제 자체(primary → replica 동기화)는 Chroma 밖에서 한다 (예: 스냅샷 복원).
+    """
+
+    def __init__(self, replicas: List[Replica], config: Optional[ReplicaConfig] = None):
+        self.replicas = replicas
+        self.config = config or ReplicaConfig()
+        self._cycle = itertools.cycle(range(len(replicas))) if replicas else None
+        self._primaries: Dict[str, Any] = {}
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- routing ---------------------------------------------------------
+
+    def track(self, name: str, primary_collection: Any):
+        """lag 점검 대상 컬렉션을 등록한다."""
+        with self._lock:
+            self._primaries[name] = primary_collection
+
+    def note_write(self):
+        self._last_write = time.monotonic()
+
+    def choose(self) -> Optional[Replica]:
+        """읽기를 보낼 복제본. 최근에 쓴 적이 있거나 건강한 복제본이 없으면 None (primary)."""
+        if time.monotonic() - self._last_write < self.config.read_after_write:
+            return None
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[next(self._cycle)]
+                if replica.healthy:
+                    return replica
+        return None
+
+    def eject(self, replica: Replica, reason: str):
+        if replica.healthy:
+            logger.warning(f"Ejecting Chroma replica {replica.address}: {reason}")
+            REPLICA_EJECTIONS_TOTAL.inc(replica=replica.address, reason=reason)
+        replica.healthy = False
+
+    def read(self, name: str, primary_collection: Any, fn: Callable[[Any], Any]) -> Any:
+        """복제본에서 fn(collection)을 실행하고, 실패하면 그 복제본을 빼고 primary에서 다시 실행한다."""
+        replica = self.choose()
+        if replica is not None:
+            try:
+                result = fn(replica.collection(name))
+                CHROMA_READS_TOTAL.inc(target="replica")
+                return result
+            except Exception as e:
+                self.eject(replica, "error")
+                logger.debug(f"Replica read failed on {replica.address}: {e}")
+        CHROMA_READS_TOTAL.inc(target="primary")
+        return fn(primary_collection)
+
+    # --- health checks ---------------------------------------------------
+
+    def check(self):
+        """복제본마다 heartbeat와 추적 중인 컬렉션의 문서 수 차이를 확인한다."""
+        with self._lock:
+            primaries = dict(self._primaries)
+        try:
+            primary_counts = {name: c.count() for name, c in primaries.items()}
+        except Exception as e:
+            # primary를 못 읽으면 lag을 판단할 수 없으니 상태를 바꾸지 않는다
+            logger.warning(f"Chroma primary count failed during replica check: {e}")
+            return
+        for replica in self.replicas:
+            try:
+                replica.client.heartbeat()
+                lag = sum(
+                    max(0, count - replica.collection(name).count())
+                    for name, count in primary_counts.items()
+                )
+            except Exception as e:
+                replica._collections.clear()
+                self.eject(replica, "unreachable")
+                logger.debug(f"Replica health check failed on {replica.address}: {e}")
+                continue
+            replica.lag = lag
+            if lag > self.config.max_lag:
+                self.eject(replica, "lag")
+            elif not replica.healthy:
+                logger.info(f"Chroma replica {replica.address} admitted for reads (lag {lag})")
+                replica.healthy = True
+
+    def start(self):
+        if self._thread is not None or not self.replicas:
+            return
+        self._thread = threading.Thread(target=self._run, name="chroma-replica-health", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            self.check()
+            if self._stop.wait(self.config.health_interval):
+                return
+
+
+_pool: Optional[ReplicaPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_replica_pool() -> Optional[ReplicaPool]:
+    """server 모드에서 CHROMA_READ_REPLICAS가 있으면 공용 ReplicaPool, 아니면 None."""
+    global _pool
+    if _pool is None:
+        if os.getenv("CHROMA_MODE", "local") != "server":
+            return None
+        config = ReplicaConfig()
+        if not config.addresses:
+            return None
+        with _pool_lock:
+            if _pool is None:
+                _pool = ReplicaPool([Replica(a) for a in config.addresses], config)
+                _pool.start()
+    return _pool
+
+
+def close_replica_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.stop()
+            _pool = None
@@ -0,0 +1,302 @@
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+from app.core.admission import find_overload
+from app.core.cancellation import RequestCancelled, check_cancelled, current_cancel_token, find_cancelled, CANCELLED_CALLS_TOTAL
+from app.core.metrics import counter, histogram
+
+load_dotenv()
+
+RESILIENCE_ATTEMPTS_TOTAL = counter(
+    "upstream_call_attempts_total",
+    "정책 계층이 보낸 업스트림 호출 수 (primary/hedge/retry)",
+    ["policy", "kind"],
+)
+RESILIENCE_HEDGE_OUTCOME_TOTAL = counter(
+    "upstream_hedge_outcome_total",
+    "헤지 요청 결과 (won: 헤지가 먼저 응답, lost: 원 요청이 먼저 응답)",
+    ["policy", "outcome"],
+)
+RESILIENCE_TIMEOUTS_TOTAL = counter(
+    "upstream_call_timeouts_total", "호출별 타임아웃 발생 수", ["policy"]
+)
+RESILIENCE_CALL_SECONDS = histogram(
+    "upstream_call_seconds", "재시도/헤지를 포함한 정책 호출 전체 지연 시간", ["policy"]
+)
+
+
+class UpstreamTimeout(TimeoutError):
+    """정책의 호출별 타임아웃 안에 응답이 오지 않은 경우"""
+
+
+class ResilienceConfig:
+    """
+    정책별 설정. RESILIENCE_CHAT_TIMEOUT처럼 정책 접두어로 개별 조정하고,
+    없으면 RESILIENCE_TIMEOUT 등 공통 값을 쓴다. 기본은 비활성(opt-in).
+    """
+
+    def __init__(self, policy: str):
+        prefix = policy.upper()
+
+        def _env(name: str, default: str) -> str:
+            return os.getenv(f"RESILIENCE_{prefix}_{name}", os.getenv(f"RESILIENCE_{name}", default))
+
+        self.policy = policy
+        self.enabled = _env("ENABLED", "false").lower() == "true"
+        # 시도 하나의 최대 대기 시간(초), 0 이하면 제한 없음
+        self.timeout = float(_env("TIMEOUT", "30"))
+        self.max_retries = int(_env("MAX_RETRIES", "2"))
+        self.backoff_base = float(_env("BACKOFF_BASE", "0.5"))
+        self.backoff_max = float(_env("BACKOFF_MAX", "8"))
+        # 호출 대비 재시도 비율 상한 (장애 시 재시도 폭주 방지)
+        self.retry_ratio = float(_env("RETRY_RATIO", "0.2"))
+        self.hedge = _env("HEDGE", "true").lower() == "true"
+        # 최근 지연 시간의 이 백분위를 넘기면 헤지 요청을 보낸다
+        self.hedge_percentile = float(_env("HEDGE_PERCENTILE", "95"))
+        self.hedge_min_delay = float(_env("HEDGE_MIN_DELAY", "0.2"))
+        self.hedge_min_samples = int(_env("HEDGE_MIN_SAMPLES", "20"))
+        # 호출 대비 헤지 비율 상한 (비용이 두 배로 늘지 않도록)
+        self.hedge_ratio = float(_env("HEDGE_RATIO", "0.1"))
+        self.window = int(_env("LATENCY_WINDOW", "500"))
+
+
+class _RatioBudget:
+    """호출마다 ratio만큼 적립하고 한 번 쓸 때 1을 소모하는 예산 (재시도/헤지 비율 제한)"""
+
+    def __init__(self, ratio: float, cap: float = 10.0):
+        self.ratio = ratio
+        self.cap = cap
+        self._balance = min(cap, 1.0) if ratio > 0 else 0.0
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._balance = min(self.cap, self._balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._balance >= 1.0:
+                self._balance -= 1.0
+                return True
+            return False
+
+
+class _LatencyWindow:
+    def __init__(self, size: int):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * p / 100))
+        return samples[index]
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    타임아웃, 연결 오류, 429/5xx는 재시도한다. 수용 제어 거절(부하 차단)은
+    재시도하면 부하만 키우므로 제외한다. 요청 취소도 재시도하지 않는다.
+    """
+    if find_overload(exc) is not None or find_cancelled(exc) is not None:
+        return False
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, (TimeoutError, httpx.TransportError)):
+            return True
+        status = getattr(exc, "status_code", None)
+        if isinstance(status, int) and (status in (408, 409, 429) or status >= 500):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("RESILIENCE_MAX_WORKERS", "32")),
+                    thread_name_prefix="upstream-call",
+                )
+    return _executor
+
+
+class ResiliencePolicy:
+    """
+    업스트림 호출 정책: 시도별 타임아웃, 지터 백오프 재시도, 멱등 호출에 대한 헤지 요청.
+    비활성이면 fn을 그대로 호출한다.
+    """
+
+    def __init__(self, name: str, config: Optional[ResilienceConfig] = None):
+        self.name = name
+        self.config = config or ResilienceConfig(name)
+        self._latency = _LatencyWindow(self.config.window)
+        self._retry_budget = _RatioBudget(self.config.retry_ratio)
+        self._hedge_budget = _RatioBudget(self.config.hedge_ratio)
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.config.hedge or len(self._latency) < self.config.hedge_min_samples:
+            return None
+        observed = self._latency.percentile(self.config.hedge_percentile)
+        return max(self.config.hedge_min_delay, observed)
+
+    def backoff(self, attempt: int) -> float:
+        # full jitter: [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.config.backoff_max, self.config.backoff_base * 2 ** attempt))
+
+    def call(
+        self,
+        fn: Callable[[], Any],
+        idempotent: bool = False,
+        on_discarded: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """
+        fn을 정책에 따라 실행한다. on_discarded는 헤지/타임아웃으로 버려진 시도가
+        뒤늦게 성공했을 때 그 결과로 호출된다 (버려진 호출의 토큰 집계용).
+        """
+        check_cancelled(self.name)
+        if not self.config.enabled:
+            return fn()
+        self._retry_budget.deposit()
+        self._hedge_budget.deposit()
+        start = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    return self._attempt(fn, idempotent, on_discarded, retry=attempt > 0)
+                except Exception as e:
+                    if (
+                        attempt >= self.config.max_retries
+                        or not is_retryable(e)
+                        or not self._retry_budget.try_spend()
+                    ):
+                        raise
+                    time.sleep(self.backoff(attempt))
+                    check_cancelled(self.name)
+                    attempt += 1
+        finally:
+            RESILIENCE_CALL_SECONDS.observe(time.perf_counter() - start, policy=self.name)
+
+    def _submit(self, fn: Callable[[], Any], kind: str) -> Tuple[Future, contextvars.Context, float]:
+        # 시도마다 컨텍스트를 복사해 trace span/토큰 집계/우선순위가 작업 스레드로 전달되게 한다
+        ctx = contextvars.copy_context()
+        RESILIENCE_ATTEMPTS_TOTAL.inc(policy=self.name, kind=kind)
+        return _get_executor().submit(ctx.run, fn), ctx, time.perf_counter()
+
+    def _attempt(self, fn, idempotent, on_discarded, retry: bool) -> Any:
+        now = time.perf_counter()
+        deadline = now + self.config.timeout if self.config.timeout > 0 else None
+        delay = self.hedge_delay() if idempotent else None
+        hedge_at = now + delay if delay is not None else None
+
+        pending: Dict[Future, Tuple[str, contextvars.Context, float]] = {}
+        future, ctx, submitted = self._submit(fn, "retry" if retry else "primary")
+        pending[future] = ("primary", ctx, submitted)
+        error: Optional[BaseException] = None
+        # 요청이 취소되면 응답을 기다리지 않고 바로 돌아간다 (진행 중인 시도는 버린 호출로 집계)
+        token = current_cancel_token()
+        cancelled = token.as_future() if token is not None else None
+
+        while pending:
+            wake_at = min((t for t in (deadline, hedge_at) if t is not None), default=None)
+            timeout = max(0.0, wake_at - time.perf_counter()) if wake_at is not None else None
+            waiting = list(pending) + ([cancelled] if cancelled is not None else [])
+            done, _ = wait(waiting, timeout=timeout, return_when=FIRST_COMPLETED)
+            if cancelled is not None and cancelled in done:
+                CANCELLED_CALLS_TOTAL.inc(stage=self.name)
+                self._discard(pending, on_discarded)
+                raise RequestCancelled(self.name, token.reason)
+
+            for future in done:
+                kind, _, submitted = pending.pop(future)
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                self._latency.observe(time.perf_counter() - submitted)
+                if hedge_at is None and delay is not None:
+                    # 헤지를 보낸 상태에서 먼저 끝난 쪽을 기록
+                    outcome = "won" if kind == "hedge" else "lost"
+                    RESILIENCE_HEDGE_OUTCOME_TOTAL.inc(policy=self.name, outcome=outcome)
+                self._discard(pending, on_discarded)
+                return future.result()
+
+            if not pending:
+                break
+            now = time.perf_counter()
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                if self._hedge_budget.try_spend():
+                    future, ctx, submitted = self._submit(fn, "hedge")
+                    pending[future] = ("hedge", ctx, submitted)
+                else:
+                    delay = None
+            if deadline is not None and now >= deadline:
+                RESILIENCE_TIMEOUTS_TOTAL.inc(policy=self.name)
+                self._discard(pending, on_discarded)
+                raise UpstreamTimeout(
+                    f"{self.name} call did not complete within {self.config.timeout}s"
+                )
+
+        raise error
+
+    @staticmethod
+    def _discard(pending, on_discarded):
+        """남은 시도는 취소할 수 없으므로 끝날 때 결과만 집계 콜백으로 넘긴다."""
+        if on_discarded is None:
+            return
+        for future, (_, ctx, _) in pending.items():
+            def _done(f: Future, ctx=ctx):
+                if not f.cancelled() and f.exception() is None:
+                    ctx.run(on_discarded, f.result())
+            future.add_done_callback(_done)
+
+
+_policies: Dict[str, ResiliencePolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def get_policy(name: str) -> ResiliencePolicy:
+    policy = _policies.get(name)
+    if policy is None:
+        with _policies_lock:
+            policy = _policies.get(name)
+            if policy is None:
+                policy = ResiliencePolicy(name)
+                _policies[name] = policy
+    return policy
+
+
+def reset_policies():
+    with _policies_lock:
+        _policies.clear()
+
+
+def sdk_max_retries(name: str) -> int:
+    """정책이 재시도를 맡으면 SDK 자체 재시도는 끈다 (중복 재시도 방지)."""
+    return 0 if ResilienceConfig(name).enabled else 2
@@ -1,10 +1,12 @@
 import os
 import json
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.service.vector_service import VectorService
-from app.repository.vector.vector_repo import ChromaDBRepository
+from app.repository.vector.factory import create_vector_repository
 from app.service.embedding_service import EmbeddingService
+from app.core.admission import admission_priority, PRIORITY_BULK
+from app.core.snapshot import MANIFEST, SnapshotConfig, import_snapshot
 
 # 전역 로깅 설정 (콘솔 출력 보장)
 logging.basicConfig(
@@ -54,8 +56,14 @@ def load_medical_data(base_path: str = "resources/의료데이터") -> List[Dict
     print(f"[*] Loaded {len(documents)} documents from {total_files} JSON files.")
     return documents
 
-def seed_data_if_empty():
-    repo = ChromaDBRepository()
+def seed_data_if_empty(vector_service: Optional[VectorService] = None):
+    # 기동 직후 시딩이 실시간 질의의 임베딩/채팅 호출을 밀어내지 않도록 최하위 우선순위로 보낸다
+    with admission_priority(PRIORITY_BULK):
+        _seed_data_if_empty(vector_service)
+
+def _seed_data_if_empty(vector_service: Optional[VectorService] = None):
+    # 앱에서는 컨테이너의 VectorService를 재사용하고, 단독 실행 시에만 새로 만든다
+    repo = vector_service.vector_repository if vector_service else create_vector_repository()
     info = repo.get_collection_info()
     
     if info["count"] > 0:
@@ -65,6 +73,16 @@ def seed_data_if_empty():
 
     logger.info(f"Collection {info['name']} is empty. Starting data seed...")
     print(f"[*] Collection {info['name']} is empty. Starting data seed...")
+
+    snapshot_path = SnapshotConfig().bootstrap_path
+    if snapshot_path and os.path.exists(os.path.join(snapshot_path, MANIFEST)):
+        # 임베딩 API 없이 스냅샷에서 복원 (디스크 속도로 끝난다)
+        restored = import_snapshot(repo, snapshot_path)
+        if vector_service is not None:
+            vector_service.domain_router.invalidate()
+        logger.info(f"Restored {restored} documents from snapshot {snapshot_path}.")
+        print(f"[✓] Restored {restored} documents from snapshot {snapshot_path}.")
+        return
     
     medical_docs = load_medical_data()
     if not medical_docs:
@@ -77,8 +95,8 @@ def seed_data_if_empty():
     else:
         logger.warning("UPSTAGE_API_KEY not found. Seeding might fail if embeddings are required.")
 
-    embedding_service = EmbeddingService()
-    vector_service = VectorService(repo, embedding_service)
+    if vector_service is None:
+        vector_service = VectorService(repo, EmbeddingService())
     
     # 데이터를 배치로 나누어 삽입 (ChromaDB나 API 제한 고려)
     batch_size = 50 # 100에서 50으로 축소하여 안정성 확보 및 로그 빈도 증가
@@ -0,0 +1,100 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from app.core.cancellation import cancel_requested, find_cancelled
+from app.core.metrics import counter, gauge
+
+load_dotenv()
+
+SINGLEFLIGHT_CALLS_TOTAL = counter(
+    "singleflight_calls_total",
+    "동일 요청 병합 결과 (leader: 실제 실행, coalesced: 진행 중인 실행 결과를 공유)",
+    ["group", "role"],
+)
+SINGLEFLIGHT_IN_FLIGHT = gauge(
+    "singleflight_in_flight", "실행 중인 고유 키 수", ["group"]
+)
+
+
+def singleflight_enabled() -> bool:
+    return os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() == "true"
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출을 하나로 합친다. 먼저 온 호출(leader)만 fn을 실행하고,
+    실행 중에 들어온 호출은 그 결과(또는 예외)를 그대로 받는다. 결과를 캐시하지는 않는다.
+    """
+
+    def __init__(self, group: str):
+        self.group = group
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        SINGLEFLIGHT_IN_FLIGHT.set_function(lambda: len(self._calls), group=group)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """(결과, 공유 여부)를 반환한다."""
+        if not singleflight_enabled():
+            return fn(), False
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            SINGLEFLIGHT_CALLS_TOTAL.inc(group=self.group, role="coalesced")
+            call.event.wait()
+            if call.error is not None:
+                # SDK 호출 중 취소되면 RequestCancelled가 APIConnectionError 등에 감싸져 올라오므로 체인에서 찾는다
+                if find_cancelled(call.error) is not None and not cancel_requested():
+                    # leader의 요청이 취소된 것이지 이 요청이 취소된 게 아니므로 직접 다시 실행한다
+                    return self.do(key, fn)
+                raise call.error
+            return call.result, True
+
+        SINGLEFLIGHT_CALLS_TOTAL.inc(group=self.group, role="leader")
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_group(name: str) -> SingleFlight:
+    group = _groups.get(name)
+    if group is None:
+        with _groups_lock:
+            group = _groups.get(name)
+            if group is None:
+                group = SingleFlight(name)
+                _groups[name] = group
+    return group
+
+
+def normalize_key(text: str) -> str:
+    """공백/대소문자 차이만 있는 질의를 같은 키로 본다."""
+    return " ".join(text.split()).lower()
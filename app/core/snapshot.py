@@ -0,0 +1,241 @@
+"""
+벡터 저장소 스냅샷 내보내기/복원. 임베딩을 다시 만들지 않고 새 노드를 채운다.
+
+    python -m app.core.snapshot export --out ./snapshots/2024-06-01
+    python -m app.core.snapshot verify --src ./snapshots/2024-06-01
+    python -m app.core.snapshot import --src ./snapshots/2024-06-01
+
+스냅샷 디렉터리 구성 (part 단위로 같은 순서):
+    embeddings-00000.npy   float32 (rows, dim)
+    records-00000.jsonl    {"id", "document", "metadata"} 한 줄에 한 문서
+    manifest.json          문서 수, 차원, 파일별 sha256. 마지막에 쓰므로 있으면 완성된 스냅샷이다
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.repository.vector.vector_repo import VectorRepository
+
+load_dotenv()
+
+logger = logging.getLogger("snapshot")
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class SnapshotConfig:
+    def __init__(self):
+        self.part_size = int(os.getenv("SNAPSHOT_PART_SIZE", "10000"))
+        self.batch_size = int(os.getenv("SNAPSHOT_BATCH_SIZE", "1000"))
+        # 비어 있는 저장소를 시딩할 때 재임베딩 대신 복원할 스냅샷 경로
+        self.bootstrap_path = os.getenv("SNAPSHOT_BOOTSTRAP_PATH", "")
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_snapshot(
+    repository: VectorRepository, out_dir: str, config: Optional[SnapshotConfig] = None
+) -> Dict[str, Any]:
+    """저장소 전체를 part 단위로 읽어 out_dir에 쓰고 manifest를 반환한다."""
+    config = config or SnapshotConfig()
+
+    def pages():
+        offset = 0
+        while True:
+            result = repository.get(
+                include=["embeddings", "documents", "metadatas"], limit=config.part_size, offset=offset
+            )
+            if not result["ids"]:
+                return
+            yield result["ids"], result["documents"], result["metadatas"], result["embeddings"]
+            offset += len(result["ids"])
+            if len(result["ids"]) < config.part_size:
+                return
+
+    return write_snapshot(out_dir, pages(), repository.get_collection_info()["name"])
+
+
+def write_snapshot(out_dir: str, parts: Iterable[Tuple[List[str], List[str], List[Any], Any]], collection: str) -> Dict[str, Any]:
+    """(ids, documents, metadatas, embeddings) 묶음마다 part 하나를 쓰고 마지막에 manifest를 쓴다."""
+    os.makedirs(out_dir, exist_ok=True)
+    if os.path.exists(os.path.join(out_dir, MANIFEST)):
+        raise SnapshotError(f"Snapshot already exists in {out_dir}")
+
+    started = time.perf_counter()
+    files: List[Dict[str, Any]] = []
+    total = 0
+    dim: Optional[int] = None
+    for ids, documents, metadatas, embeddings in parts:
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if dim is None:
+            dim = int(embeddings.shape[1])
+        elif embeddings.shape[1] != dim:
+            raise SnapshotError(f"Embedding dimension changed from {dim} to {embeddings.shape[1]}")
+
+        part = len(files)
+        npy_name = f"embeddings-{part:05d}.npy"
+        jsonl_name = f"records-{part:05d}.jsonl"
+        np.save(os.path.join(out_dir, npy_name), embeddings)
+        with open(os.path.join(out_dir, jsonl_name), "w", encoding="utf-8") as f:
+            for doc_id, document, metadata in zip(ids, documents, metadatas):
+                f.write(json.dumps({"id": doc_id, "document": document, "metadata": metadata}, ensure_ascii=False))
+                f.write("\n")
+        files.append({
+            "rows": len(ids),
+            "embeddings": npy_name,
+            "embeddings_sha256": _sha256(os.path.join(out_dir, npy_name)),
+            "records": jsonl_name,
+            "records_sha256": _sha256(os.path.join(out_dir, jsonl_name)),
+        })
+        total += len(ids)
+        logger.info(f"Wrote {total} documents")
+
+    manifest = {
+        "version": FORMAT_VERSION,
+        "collection": collection,
+        "count": total,
+        "dim": dim,
+        "dtype": "float32",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "parts": files,
+    }
+    with open(os.path.join(out_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    logger.info(f"Snapshot of {total} documents written to {out_dir} in {time.perf_counter() - started:.1f}s")
+    return manifest
+
+
+def load_manifest(src_dir: str) -> Dict[str, Any]:
+    path = os.path.join(src_dir, MANIFEST)
+    if not os.path.exists(path):
+        raise SnapshotError(f"No manifest in {src_dir} (incomplete snapshot?)")
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {manifest.get('version')}")
+    return manifest
+
+
+def verify_snapshot(src_dir: str) -> Dict[str, Any]:
+    """모든 파일의 sha256과 행 수를 확인한다. 어긋나면 SnapshotError."""
+    manifest = load_manifest(src_dir)
+    rows = 0
+    for part in manifest["parts"]:
+        for kind in ("embeddings", "records"):
+            path = os.path.join(src_dir, part[kind])
+            if not os.path.exists(path):
+                raise SnapshotError(f"Missing file {part[kind]}")
+            if _sha256(path) != part[f"{kind}_sha256"]:
+                raise SnapshotError(f"Checksum mismatch for {part[kind]}")
+        shape = np.load(os.path.join(src_dir, part["embeddings"]), mmap_mode="r").shape
+        if shape != (part["rows"], manifest["dim"]):
+            raise SnapshotError(f"Unexpected shape {shape} in {part['embeddings']}")
+        rows += part["rows"]
+    if rows != manifest["count"]:
+        raise SnapshotError(f"Snapshot has {rows} rows, manifest says {manifest['count']}")
+    return manifest
+
+
+def import_snapshot(
+    repository: VectorRepository,
+    src_dir: str,
+    force: bool = False,
+    config: Optional[SnapshotConfig] = None,
+) -> int:
+    """
+    스냅샷을 검증한 뒤 임베딩 호출 없이 저장소에 넣는다. 기본적으로 비어 있는 저장소에만 복원한다.
+    임베딩은 mmap으로 읽어 part 전체를 메모리에 올리지 않는다. 넣은 문서 수를 반환한다.
+    """
+    config = config or SnapshotConfig()
+    manifest = verify_snapshot(src_dir)
+    existing = repository.get_collection_info()["count"]
+    if existing and not force:
+        raise SnapshotError(f"Target already has {existing} documents (use --force to add anyway)")
+
+    started = time.perf_counter()
+    restored = 0
+    for part in manifest["parts"]:
+        embeddings = np.load(os.path.join(src_dir, part["embeddings"]), mmap_mode="r")
+        with open(os.path.join(src_dir, part["records"]), encoding="utf-8") as f:
+            batch: List[Dict[str, Any]] = []
+            row = 0
+            for line in f:
+                batch.append(json.loads(line))
+                if len(batch) >= config.batch_size:
+                    _insert(repository, batch, embeddings[row:row + len(batch)])
+                    row += len(batch)
+                    batch = []
+            if batch:
+                _insert(repository, batch, embeddings[row:row + len(batch)])
+                row += len(batch)
+        restored += row
+        logger.info(f"Restored {restored}/{manifest['count']} documents")
+
+    logger.info(f"Snapshot restored from {src_dir} in {time.perf_counter() - started:.1f}s")
+    return restored
+
+
+def _insert(repository: VectorRepository, records: List[Dict[str, Any]], embeddings: np.ndarray):
+    repository.add_documents(
+        documents=[r["document"] for r in records],
+        embeddings=np.ascontiguousarray(embeddings).tolist(),
+        metadatas=[r["metadata"] for r in records],
+        ids=[r["id"] for r in records],
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.repository.vector.factory import create_vector_repository
+    from app.repository.vector.vector_repo import ChromaDBRepository
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(prog="python -m app.core.snapshot", description="벡터 저장소 스냅샷")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_parser = sub.add_parser("export", help="저장소를 스냅샷으로 내보낸다")
+    export_parser.add_argument("--out", required=True)
+    export_parser.add_argument("--collection", help="지정하면 해당 단일 컬렉션만 (기본: 설정된 저장소 구성)")
+    verify_parser = sub.add_parser("verify", help="체크섬과 행 수 확인")
+    verify_parser.add_argument("--src", required=True)
+    import_parser = sub.add_parser("import", help="스냅샷을 비어 있는 저장소에 복원한다")
+    import_parser.add_argument("--src", required=True)
+    import_parser.add_argument("--collection")
+    import_parser.add_argument("--force", action="store_true", help="비어 있지 않아도 추가")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "verify":
+            manifest = verify_snapshot(args.src)
+            print(f"[✓] {manifest['count']} documents, dim {manifest['dim']}, {len(manifest['parts'])} parts OK")
+            return
+        repository = ChromaDBRepository(args.collection) if args.collection else create_vector_repository()
+        if args.command == "export":
+            manifest = export_snapshot(repository, args.out)
+            print(f"[✓] Exported {manifest['count']} documents to {args.out}")
+        else:
+            restored = import_snapshot(repository, args.src, force=args.force)
+            print(f"[✓] Restored {restored} documents")
+    except SnapshotError as e:
+        print(f"[!] {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import asyncio
+import os
+import zlib
+from typing import Any, AsyncIterator, Dict, Hashable, List, Optional, Set
+
+import orjson
+from dotenv import load_dotenv
+
+from app.core.cancellation import CancelToken
+from app.core.metrics import counter
+
+load_dotenv()
+
+# 응답 상세 수준
+#   answer: 최종 답변만
+#   status: 최상위 노드 진행 상황 + 노드별 마지막 메시지 + 도구 호출 이름/인자 (UI 기본)
+#   debug:  서브그래프 내부 노드와 도구 출력까지 전부
+VERBOSITY_ANSWER = "answer"
+VERBOSITY_STATUS = "status"
+VERBOSITY_DEBUG = "debug"
+VERBOSITIES = (VERBOSITY_ANSWER, VERBOSITY_STATUS, VERBOSITY_DEBUG)
+
+STREAM_BYTES_TOTAL = counter(
+    "chat_stream_bytes_total", "스트리밍 응답으로 보낸 바이트 수 (압축 시 압축 후)", ["verbosity", "encoding"]
+)
+STREAM_EVENTS_TOTAL = counter(
+    "chat_stream_events_total", "그래프 이벤트 처리 결과 (sent: 전송, skipped: 상세 수준/중복으로 생략)", ["verbosity", "result"]
+)
+
+
+class StreamConfig:
+    def __init__(self):
+        self.default_verbosity = os.getenv("STREAM_DEFAULT_VERBOSITY", VERBOSITY_STATUS)
+        # 클라이언트가 Accept-Encoding: gzip을 보낼 때만 적용. 이벤트마다 flush해서 실시간성은 유지된다
+        self.gzip = os.getenv("STREAM_GZIP", "false").lower() == "true"
+        self.gzip_level = int(os.getenv("STREAM_GZIP_LEVEL", "6"))
+        # 다음 이벤트를 보내기 전이라도 클라이언트 연결 종료를 이 간격(초)으로 확인해 실행을 취소한다
+        self.disconnect_poll = float(os.getenv("STREAM_DISCONNECT_POLL", "0.5"))
+
+
+def resolve_verbosity(requested: Optional[str], default: str) -> str:
+    verbosity = requested or default
+    if verbosity not in VERBOSITIES:
+        raise ValueError(f"Unknown verbosity '{verbosity}' (expected one of {', '.join(VERBOSITIES)})")
+    return verbosity
+
+
+def _default(obj: Any) -> Any:
+    if hasattr(obj, "content"):
+        return message_to_dict(obj)
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def message_to_dict(message: Any, tool_calls: bool = True) -> Dict[str, Any]:
+    msg_dict = {"role": getattr(message, "type", "unknown"), "content": getattr(message, "content", str(message))}
+    if tool_calls and getattr(message, "tool_calls", None):
+        msg_dict["tool_calls"] = message.tool_calls
+    return msg_dict
+
+
+def _is_tool_output(message: Any) -> bool:
+    return getattr(message, "type", None) == "tool"
+
+
+def serialize_result(result: Dict[str, Any], verbosity: str = VERBOSITY_DEBUG) -> Dict[str, Any]:
+    """그래프 최종 상태를 응답용 dict로 바꾼다. /agent/chat과 /agent/{name}이 같이 쓴다."""
+    serialized: Dict[str, Any] = {}
+    for key, value in result.items():
+        if not isinstance(value, list):
+            serialized[key] = value
+        elif verbosity == VERBOSITY_DEBUG:
+            serialized[key] = [message_to_dict(m) for m in value]
+        elif verbosity == VERBOSITY_STATUS:
+            serialized[key] = [message_to_dict(m, tool_calls=False) for m in value if not _is_tool_output(m)]
+        elif key == "answer_logs" and value:
+            # answer: 마지막 답변 한 건만
+            serialized[key] = [message_to_dict(value[-1], tool_calls=False)]
+    return serialized
+
+
+def _message_key(message: Any) -> Hashable:
+    message_id = getattr(message, "id", None)
+    if message_id:
+        return message_id
+    return (getattr(message, "type", None), hash(str(getattr(message, "content", message))))
+
+
+class SSEEncoder:
+    """
+    LangGraph updates 스트림을 SSE 프레임(bytes)으로 바꾼다. 요청마다 하나씩 만든다.
+    노드가 돌려준 메시지 목록 중 이 스트림에서 아직 보내지 않은 메시지만, 값이 바뀐 상태 필드만 보낸다.
+
+    프레임 (data: 뒤 JSON):
+        {"trace_id": ...}                          첫 프레임
+        {"<node>": {"<key>": [새 메시지], ...}}     최상위 노드 업데이트 (status/debug)
+        {"ns": [...], "<node>": {...}}             서브그래프 내부 노드 업데이트 (debug)
+        {"tool_calls": [{"name", "args"}], "node"} 서브그래프 도구 호출 (status)
+        {"answer": "..."}                          답변 (answer)
+        {"token_usage": {...}, "deadline": {...}}  마지막 사용량 (status/debug), 마감 저하 내역 (마감이 있을 때)
+        [DONE]
+    """
+
+    def __init__(self, trace_id: str, verbosity: str = VERBOSITY_STATUS):
+        self.trace_id = trace_id
+        self.verbosity = verbosity
+        self._sent: Dict[str, Set[Hashable]] = {}
+        self._scalars: Dict[str, Any] = {}
+
+    def start(self) -> bytes:
+        return self._frame({"trace_id": self.trace_id})
+
+    def done(self) -> bytes:
+        return b"data: [DONE]\n\n"
+
+    def error(self, payload: Dict[str, Any]) -> bytes:
+        return self._frame({**payload, "trace_id": self.trace_id})
+
+    def payload(self, event: Any) -> Optional[Dict[str, Any]]:
+        """그래프 이벤트 하나를 보낼 dict로 줄인다. 보낼 내용이 없으면 None. (WebSocket도 이 형식을 쓴다)"""
+        namespace: tuple = ()
+        if isinstance(event, tuple):
+            namespace, event = event
+        payload = self._payload(namespace, event)
+        STREAM_EVENTS_TOTAL.inc(verbosity=self.verbosity, result="sent" if payload else "skipped")
+        return payload
+
+    def encode(self, event: Any) -> Optional[bytes]:
+        """보낼 내용이 없으면 None."""
+        payload = self.payload(event)
+        return self._frame(payload) if payload else None
+
+    def _frame(self, payload: Dict[str, Any]) -> bytes:
+        return b"data: " + dumps(payload) + b"\n\n"
+
+    def _new_messages(self, key: str, messages: List[Any]) -> List[Any]:
+        sent = self._sent.setdefault(key, set())
+        new = []
+        for message in messages:
+            message_key = _message_key(message)
+            if message_key not in sent:
+                sent.add(message_key)
+                new.append(message)
+        return new
+
+    def _payload(self, namespace: tuple, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if "token_usage" in event:
+            # 마감 저하 내역은 answer 수준에서도 보낸다 (답변이 왜 짧거나 보강 없이 나왔는지)
+            if self.verbosity == VERBOSITY_ANSWER:
+                return {"deadline": event["deadline"]} if "deadline" in event else None
+            return dict(event)
+
+        if namespace:
+            # 서브그래프 내부 노드: 키가 "messages"라 최상위 *_logs와 중복 판정이 섞이지 않는다
+            if self.verbosity == VERBOSITY_ANSWER:
+                return None
+            if self.verbosity == VERBOSITY_STATUS:
+                calls = [
+                    {"name": call["name"], "args": call["args"]}
+                    for update in event.values() if update
+                    for m in self._new_messages("messages", update.get("messages", []))
+                    for call in (getattr(m, "tool_calls", None) or [])
+                ]
+                return {"node": next(iter(event)), "tool_calls": calls} if calls else None
+            payload = self._updates(event, debug=True)
+            return {"ns": list(namespace), **payload} if payload else None
+
+        if self.verbosity == VERBOSITY_ANSWER:
+            for update in event.values():
+                answers = [
+                    m for m in self._new_messages("answer_logs", (update or {}).get("answer_logs", []))
+                    if getattr(m, "type", None) == "ai"
+                ]
+                if answers:
+                    return {"answer": answers[-1].content}
+            return None
+        return self._updates(event, debug=self.verbosity == VERBOSITY_DEBUG)
+
+    def _updates(self, event: Dict[str, Any], debug: bool) -> Optional[Dict[str, Any]]:
+        payload: Dict[str, Any] = {}
+        for node_name, update in event.items():
+            node_payload: Dict[str, Any] = {}
+            for key, value in (update or {}).items():
+                if isinstance(value, list):
+                    new = self._new_messages(key, value)
+                    if debug:
+                        messages = [message_to_dict(m) for m in new]
+                    else:
+                        # status: 도구 출력은 빼고 노드가 남긴 마지막 메시지만
+                        visible = [m for m in new if not _is_tool_output(m)]
+                        messages = [message_to_dict(visible[-1], tool_calls=False)] if visible else []
+                    if messages:
+                        node_payload[key] = messages
+                elif self._scalars.get(key, ...) != value:
+                    self._scalars[key] = value
+                    node_payload[key] = value
+            # 값이 바뀌지 않았어도 노드 진행 자체는 알린다
+            payload[node_name] = node_payload
+        return payload or None
+
+
+async def gzip_stream(frames: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """프레임마다 sync flush해서 압축해도 이벤트가 버퍼에 묶이지 않게 한다."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for frame in frames:
+        yield compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+async def count_bytes(frames: AsyncIterator[bytes], verbosity: str, encoding: str) -> AsyncIterator[bytes]:
+    async for frame in frames:
+        STREAM_BYTES_TOTAL.inc(len(frame), verbosity=verbosity, encoding=encoding)
+        yield frame
+
+
+async def watch_disconnect(request: Any, token: CancelToken, interval: float):
+    """
+    노드가 오래 걸리면 전송 실패로 연결 종료를 알아차리기까지 한참 걸리므로, 따로 확인해 토큰을 취소한다.
+    토큰이 취소되면 그래프 작업 스레드의 다음 LLM/임베딩/검색 호출이 시작되지 않는다.
+    """
+    while not token.cancelled:
+        if await request.is_disconnected():
+            token.cancel("client_disconnected")
+            return
+        await asyncio.sleep(interval)
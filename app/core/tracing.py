@@ -0,0 +1,257 @@
+import contextvars
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# OTLP span kind / status code 값 (opentelemetry-proto 기준)
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+
+class TracingConfig:
+    def __init__(self):
+        self.enabled = os.getenv("TRACE_ENABLED", "true").lower() == "true"
+        self.export_path = os.getenv("TRACE_EXPORT_PATH", "logs/traces.jsonl")
+        self.service_name = os.getenv("TRACE_SERVICE_NAME", "medical-qa-agent")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP JSON은 int64를 문자열로 인코딩한다
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+class Span:
+    """하나의 작업 구간. 종료 시 같은 trace의 버퍼에 쌓인다."""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent: Optional["Span"] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status_code = STATUS_CODE_OK
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    @property
+    def is_root(self) -> bool:
+        return self.parent_span_id is None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException):
+        self.status_code = STATUS_CODE_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns or time.time_ns()
+        return (end_ns - self.start_ns) / 1_000_000
+
+    def to_otlp(self) -> Dict[str, Any]:
+        data = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            data["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            data["status"]["message"] = self.status_message
+        return data
+
+
+class FileSpanExporter:
+    """
+    trace 단위로 span을 모았다가 루트 span이 끝나면 OTLP JSON(ExportTraceServiceRequest)
+    한 줄로 파일에 기록한다. 요청당 한 번만 디스크에 쓴다.
+    """
+
+    def __init__(self, path: str, service_name: str):
+        self.path = path
+        self.service_name = service_name
+        self._pending: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+
+    def on_end(self, span: Span):
+        with self._lock:
+            self._pending.setdefault(span.trace_id, []).append(span)
+            if not span.is_root:
+                return
+            spans = self._pending.pop(span.trace_id, [])
+        self.export(spans)
+
+    def export(self, spans: List[Span]):
+        if not spans:
+            return
+        record = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes(
+                            {"service.name": self.service_name}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "app.core.tracing"},
+                            "spans": [s.to_otlp() for s in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        line = json.dumps(record, ensure_ascii=False)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+_config: Optional[TracingConfig] = None
+_exporter: Optional[FileSpanExporter] = None
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def _get_exporter() -> Optional[FileSpanExporter]:
+    global _config, _exporter
+    if _config is None:
+        _config = TracingConfig()
+    if not _config.enabled:
+        return None
+    if _exporter is None:
+        _exporter = FileSpanExporter(_config.export_path, _config.service_name)
+    return _exporter
+
+
+def set_exporter(exporter: Optional[FileSpanExporter]):
+    """테스트나 다른 저장 위치를 위해 exporter를 교체한다."""
+    global _config, _exporter
+    _config = TracingConfig()
+    _config.enabled = exporter is not None
+    _exporter = exporter
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    active = _current_span.get()
+    return active.trace_id if active else None
+
+
+@contextmanager
+def _activate(active: Span):
+    token = _current_span.set(active)
+    try:
+        yield active
+    except BaseException as e:
+        active.record_exception(e)
+        raise
+    finally:
+        active.end()
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # 스트리밍 제너레이터가 다른 컨텍스트에서 닫힌 경우
+            pass
+        exporter = _get_exporter()
+        if exporter:
+            exporter.on_end(active)
+
+
+def new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+
+@contextmanager
+def start_trace(
+    name: str,
+    kind: int = SPAN_KIND_SERVER,
+    trace_id: Optional[str] = None,
+    **attributes,
+):
+    """요청 하나에 대한 루트 span을 연다. trace_id를 주지 않으면 새로 발급한다."""
+    root = Span(name, trace_id or new_trace_id(), kind=kind, attributes=attributes)
+    with _activate(root):
+        yield root
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """
+    현재 trace 안에 자식 span을 연다. 진행 중인 trace가 없으면(예: 시딩 스레드)
+    아무것도 기록하지 않는다.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, parent.trace_id, parent=parent, kind=kind, attributes=attributes)
+    with _activate(child):
+        yield child
+
+
+def traced(name: str, **attributes):
+    """그래프 노드 함수를 span으로 감싸는 데코레이터"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
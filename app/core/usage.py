@@ -0,0 +1,233 @@
+import contextvars
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.core.metrics import counter, histogram
+
+load_dotenv()
+
+TOKENS_TOTAL = counter(
+    "llm_tokens_total", "Solar 채팅 토큰 사용량", ["agent", "type"]
+)
+LLM_CALLS_TOTAL = counter("llm_calls_total", "Solar 채팅 호출 수", ["agent"])
+PROMPT_TOKENS_PER_CALL = histogram(
+    "llm_prompt_tokens_per_call",
+    "호출당 프롬프트 토큰 수 (히스토리 증가 추적용)",
+    ["agent"],
+    buckets=(256, 512, 1024, 2048, 4096, 8192, 16384, 32768),
+)
+REQUEST_TOKENS = histogram(
+    "request_tokens",
+    "요청당 총 토큰 수",
+    buckets=(1000, 2500, 5000, 10000, 20000, 40000, 80000),
+)
+BUDGET_EXCEEDED_TOTAL = counter(
+    "token_budget_exceeded_total", "토큰 예산 초과로 단계를 건너뛴 횟수", ["scope", "stage"]
+)
+
+
+class TokenBudgetConfig:
+    def __init__(self):
+        # 0 이하면 제한 없음
+        self.per_request = int(os.getenv("TOKEN_BUDGET_PER_REQUEST", "0"))
+        self.per_session = int(os.getenv("TOKEN_BUDGET_PER_SESSION", "0"))
+        self.max_tracked_sessions = int(os.getenv("TOKEN_BUDGET_MAX_SESSIONS", "10000"))
+        # 1M 토큰당 USD 단가 (비용 추정용)
+        self.prompt_price_per_1m = float(os.getenv("TOKEN_PRICE_PROMPT_PER_1M", "0"))
+        self.completion_price_per_1m = float(os.getenv("TOKEN_PRICE_COMPLETION_PER_1M", "0"))
+
+
+class _SessionLedger:
+    """세션별 누적 토큰. 오래된 세션부터 밀어내는 LRU."""
+
+    def __init__(self):
+        self._totals: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> int:
+        with self._lock:
+            return self._totals.get(session_id, 0)
+
+    def add(self, session_id: str, tokens: int, max_sessions: int):
+        with self._lock:
+            self._totals[session_id] = self._totals.get(session_id, 0) + tokens
+            self._totals.move_to_end(session_id)
+            while len(self._totals) > max_sessions:
+                self._totals.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._totals.clear()
+
+
+_sessions = _SessionLedger()
+
+
+def extract_token_counts(message: Any) -> Optional[Dict[str, int]]:
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return {
+            "prompt_tokens": int(usage.get("input_tokens", 0)),
+            "completion_tokens": int(usage.get("output_tokens", 0)),
+        }
+    metadata = getattr(message, "response_metadata", None) or {}
+    token_usage = metadata.get("token_usage")
+    if token_usage:
+        return {
+            "prompt_tokens": int(token_usage.get("prompt_tokens", 0)),
+            "completion_tokens": int(token_usage.get("completion_tokens", 0)),
+        }
+    return None
+
+
+class UsageTracker:
+    """요청 하나의 노드별 토큰 사용량과 예산 상태"""
+
+    def __init__(self, session_id: Optional[str] = None, config: Optional[TokenBudgetConfig] = None):
+        self.session_id = session_id
+        self.config = config or TokenBudgetConfig()
+        self.by_agent: Dict[str, Dict[str, int]] = {}
+        self.degraded: List[str] = []
+        # 검색 컨텍스트 조립 전/후 토큰 (추정치, 노드별)
+        self.context: Dict[str, Dict[str, int]] = {}
+        self._session_start = _sessions.get(session_id) if session_id else 0
+        self._lock = threading.Lock()
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(v["prompt_tokens"] for v in self.by_agent.values())
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(v["completion_tokens"] for v in self.by_agent.values())
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def cost_usd(self) -> float:
+        return (
+            self.prompt_tokens * self.config.prompt_price_per_1m
+            + self.completion_tokens * self.config.completion_price_per_1m
+        ) / 1_000_000
+
+    def record(self, agent_name: str, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            entry = self.by_agent.setdefault(
+                agent_name, {"prompt_tokens": 0, "completion_tokens": 0, "calls": 0}
+            )
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            entry["calls"] += 1
+
+    def record_context(self, node: str, input_tokens: int, output_tokens: int):
+        with self._lock:
+            entry = self.context.setdefault(node, {"input_tokens": 0, "output_tokens": 0})
+            entry["input_tokens"] += input_tokens
+            entry["output_tokens"] += output_tokens
+
+    def exceeded_scope(self) -> Optional[str]:
+        """예산을 넘었으면 'request' 또는 'session'을 반환한다."""
+        total = self.total_tokens
+        if self.config.per_request > 0 and total >= self.config.per_request:
+            return "request"
+        if (
+            self.session_id
+            and self.config.per_session > 0
+            and self._session_start + total >= self.config.per_session
+        ):
+            return "session"
+        return None
+
+    def mark_degraded(self, stage: str, scope: str):
+        with self._lock:
+            self.degraded.append(f"{stage}:{scope}_token_budget")
+        BUDGET_EXCEEDED_TOTAL.inc(scope=scope, stage=stage)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            by_agent = {k: dict(v) for k, v in self.by_agent.items()}
+            degraded = list(self.degraded)
+            context = {k: dict(v) for k, v in self.context.items()}
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "by_agent": by_agent,
+            "context": context,
+            "budget": {
+                "per_request": self.config.per_request or None,
+                "per_session": self.config.per_session or None,
+                "session_total": self._session_start + self.total_tokens if self.session_id else None,
+                "degraded": degraded,
+            },
+        }
+
+
+_current_tracker: contextvars.ContextVar[Optional[UsageTracker]] = contextvars.ContextVar(
+    "usage_tracker", default=None
+)
+
+
+def current_usage() -> Optional[UsageTracker]:
+    return _current_tracker.get()
+
+
+@contextmanager
+def track_usage(session_id: Optional[str] = None):
+    """요청 범위의 UsageTracker를 열고, 끝나면 세션 누적치와 메트릭에 반영한다."""
+    tracker = UsageTracker(session_id)
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        try:
+            _current_tracker.reset(token)
+        except ValueError:
+            pass
+        REQUEST_TOKENS.observe(tracker.total_tokens)
+        if session_id:
+            _sessions.add(session_id, tracker.total_tokens, tracker.config.max_tracked_sessions)
+
+
+def record_usage(agent_name: str, message: Any):
+    """Solar 응답 메시지의 토큰 사용량을 현재 요청과 메트릭에 기록한다."""
+    counts = extract_token_counts(message)
+    LLM_CALLS_TOTAL.inc(agent=agent_name)
+    if not counts:
+        return
+    TOKENS_TOTAL.inc(counts["prompt_tokens"], agent=agent_name, type="prompt")
+    TOKENS_TOTAL.inc(counts["completion_tokens"], agent=agent_name, type="completion")
+    PROMPT_TOKENS_PER_CALL.observe(counts["prompt_tokens"], agent=agent_name)
+    tracker = _current_tracker.get()
+    if tracker is not None:
+        tracker.record(agent_name, counts["prompt_tokens"], counts["completion_tokens"])
+
+
+def record_context_tokens(node: str, input_tokens: int, output_tokens: int):
+    """검색 컨텍스트 조립 전/후 토큰 수를 현재 요청에 기록한다."""
+    tracker = _current_tracker.get()
+    if tracker is not None:
+        tracker.record_context(node, input_tokens, output_tokens)
+
+
+def check_budget(stage: str) -> bool:
+    """
+    현재 요청이 예산 안에 있으면 True. 초과했다면 해당 단계를 건너뛴 것으로 기록하고
+    False를 반환한다.
+    """
+    tracker = _current_tracker.get()
+    if tracker is None:
+        return True
+    scope = tracker.exceeded_scope()
+    if scope is None:
+        return True
+    tracker.mark_degraded(stage, scope)
+    return False
@@ -1,28 +1,104 @@
-from fastapi.params import Depends
+import logging
+import threading
+from typing import Optional
 
-from app.repository.vector.vector_repo import VectorRepository, ChromaDBRepository
+from app.core.http import warm_up_http_clients
+from app.core.lazy import resolve
+from app.core.replicas import close_replica_pool
+from app.repository.vector.factory import create_vector_repository
+from app.repository.vector.vector_repo import VectorRepository
 from app.service.vector_service import VectorService
 from app.service.embedding_service import EmbeddingService
 from app.service.agent_service import AgentService
+from app.service.knowledge_writer import KnowledgeWriter, KnowledgeWriterConfig
+
+logger = logging.getLogger("deps")
+
+
+class ServiceContainer:
+    """
+    앱 수명 동안 한 번만 만들어지는 서비스 묶음.
+    컬렉션 조회(get_or_create_collection)와 클라이언트 생성을 요청마다 반복하지 않는다.
+    """
+
+    def __init__(self):
+        # 단일 컬렉션 / 도메인 파티션 / 해시 샤드 중 설정에 맞는 저장소
+        self.vector_repository: VectorRepository = create_vector_repository()
+        self.embedding_service = EmbeddingService()
+        self.vector_service = VectorService(
+            vector_repository=self.vector_repository,
+            embedding_service=self.embedding_service,
+        )
+        writer_config = KnowledgeWriterConfig()
+        self.knowledge_writer: Optional[KnowledgeWriter] = None
+        if writer_config.enabled:
+            self.knowledge_writer = KnowledgeWriter(self.vector_service, writer_config)
+            self.knowledge_writer.start()
+        self.agent_service = AgentService(
+            vector_service=self.vector_service, knowledge_writer=self.knowledge_writer
+        )
+        self.ready = False
+
+    def warm_up(self):
+        """업스트림 연결을 열고 HNSW 인덱스를 메모리에 올린 뒤 ready 상태로 전환한다."""
+        warm_up_http_clients()
+        # 컴파일을 미뤄둔 그래프를 요청 전에 빌드
+        for graph in self.agent_service.graphs.values():
+            resolve(graph)
+        try:
+            self.vector_repository.warm_up()
+        except Exception as e:
+            logger.warning(f"Vector index warm-up failed: {e}")
+        self.ready = True
+
+    def close(self):
+        self.ready = False
+        if self.knowledge_writer is not None:
+            # 남은 지식 문서를 저장하고 종료 (실패분은 spill 파일에 남아 다음 기동 때 복구)
+            self.knowledge_writer.stop()
+        close_replica_pool()
+
+
+_container: Optional[ServiceContainer] = None
+_lock = threading.Lock()
+
+
+def init_container() -> ServiceContainer:
+    global _container
+    with _lock:
+        if _container is None:
+            _container = ServiceContainer()
+        return _container
+
+
+def get_container() -> ServiceContainer:
+    # lifespan 밖(스크립트, 통합 테스트)에서 호출되면 그 자리에서 생성
+    return _container or init_container()
+
+
+def container_ready() -> bool:
+    return _container is not None and _container.ready
+
+
+def shutdown_container():
+    global _container
+    with _lock:
+        if _container is not None:
+            _container.close()
+        _container = None
+
 
 def get_vector_repository() -> VectorRepository:
-    return ChromaDBRepository()
+    return get_container().vector_repository
 
 
 def get_embedding_service() -> EmbeddingService:
-    return EmbeddingService()
+    return get_container().embedding_service
 
 
-def get_vector_service(
-    vector_repo: VectorRepository = Depends(get_vector_repository),
-    embedding_service: EmbeddingService = Depends(get_embedding_service),
-) -> VectorService:
-    return VectorService(
-        vector_repository=vector_repo, embedding_service=embedding_service
-    )
+def get_vector_service() -> VectorService:
+    return get_container().vector_service
 
 
-def get_agent_service(
-    vector_service: VectorService = Depends(get_vector_service),
-) -> AgentService:
-    return AgentService(vector_service=vector_service)
+def get_agent_service() -> AgentService:
+    return get_container().agent_service
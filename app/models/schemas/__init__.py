@@ -5,7 +5,9 @@ from .agent import (
     ChatRequest, 
     ChatResponse,
     Message,
-    AgentRunRequest
+    AgentRunRequest,
+    BatchQuery,
+    BatchChatRequest
 )
 
 __all__ = [
@@ -15,5 +17,7 @@ __all__ = [
     "ChatRequest",
     "ChatResponse",
     "Message",
-    "AgentRunRequest"
+    "AgentRunRequest",
+    "BatchQuery",
+    "BatchChatRequest"
 ]
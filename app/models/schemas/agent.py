@@ -1,5 +1,5 @@
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
+from typing import List, Dict, Any, Literal, Optional, Union
+from pydantic import BaseModel, Field
 
 
 class AddKnowledgeRequest(BaseModel):
@@ -18,6 +18,10 @@ class StatsResponse(BaseModel):
 class ChatRequest(BaseModel):
     query: str
     session_id: Optional[str] = None
+    # answer | status | debug (비우면 엔드포인트 기본값: 스트림은 STREAM_DEFAULT_VERBOSITY, 그 외 debug)
+    verbosity: Optional[Literal["answer", "status", "debug"]] = None
+    # 요청 마감(초). 비우면 REQUEST_DEADLINE_SECONDS, 시간이 부족한 단계는 축소/생략된다
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
 
 class Message(BaseModel):
     role: str
@@ -28,12 +32,29 @@ class ChatResponse(BaseModel):
     user_query: str
     process_status: Optional[str] = None
     loop_count: Optional[int] = None
+    answer_path: Optional[str] = None
     build_logs: Optional[List[Message]] = None
     augment_logs: Optional[List[Message]] = None
     extract_logs: Optional[List[Message]] = None
     answer_logs: Optional[List[Message]] = None
     eval_logs: Optional[List[Message]] = None
+    trace_id: Optional[str] = None
+    token_usage: Optional[Dict[str, Any]] = None
+    deadline: Optional[Dict[str, Any]] = None
 
 class AgentRunRequest(BaseModel):
     inputs: Dict[str, Any]
     session_id: Optional[str] = None
+    verbosity: Optional[Literal["answer", "status", "debug"]] = None
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
+
+class BatchQuery(BaseModel):
+    query: str
+    id: Optional[str] = None
+
+class BatchChatRequest(BaseModel):
+    # 질문 문자열 또는 {"id", "query"}. 결과 줄의 id로 돌려받는다 (없으면 순번)
+    queries: List[Union[str, BatchQuery]] = Field(min_length=1)
+    # 동시에 실행할 질문 수 (BATCH_CHAT_CONCURRENCY보다 크게는 못 올린다)
+    concurrency: Optional[int] = Field(default=None, gt=0)
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
@@ -0,0 +1,170 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from app.core.metrics import counter, histogram
+
+load_dotenv()
+
+logger = logging.getLogger("search_cache")
+
+SEARCH_CACHE_REQUESTS_TOTAL = counter(
+    "search_cache_requests_total", "검색 결과 캐시 조회 결과", ["result"]
+)
+SEARCH_CACHE_LOOKUP_SECONDS = histogram(
+    "search_cache_lookup_seconds",
+    "검색 결과 캐시 조회 시간",
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005, 0.01, 0.05),
+)
+
+
+class SearchCacheConfig:
+    def __init__(self):
+        self.enabled = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+        self.path = os.getenv("SEARCH_CACHE_PATH", "./cache/search_cache.sqlite3")
+        self.ttl = float(os.getenv("SEARCH_CACHE_TTL", "86400"))
+        # 실패/빈 결과는 짧게만 기억한다 (같은 실패를 반복 호출하지 않도록)
+        self.negative_ttl = float(os.getenv("SEARCH_CACHE_NEGATIVE_TTL", "60"))
+        self.max_entries = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "10000"))
+
+
+class CachedSearchFailure(Exception):
+    """negative cache에 남아 있는 최근 실패"""
+
+
+class SearchResultCache:
+    """
+    검색 결과의 디스크(SQLite) TTL 캐시. 같은 파일을 여러 워커 프로세스가 공유한다.
+    조회 시에는 쓰기를 하지 않고, 항목 수가 상한을 넘으면 만료가 가까운 것부터 지운다.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS search_cache (
+            key TEXT PRIMARY KEY,
+            query TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            expires_at REAL NOT NULL
+        )
+    """
+
+    def __init__(self, config: Optional[SearchCacheConfig] = None):
+        self.config = config or SearchCacheConfig()
+        directory = os.path.dirname(self.config.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute(self._SCHEMA)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_expires ON search_cache(expires_at)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 연결은 스레드 간 공유하지 않고 스레드마다 하나씩 연다
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.config.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(query: str, scope: str = "") -> str:
+        """공백/대소문자/유니코드 정규화 형태만 다른 질의는 같은 키로 본다."""
+        normalized = " ".join(unicodedata.normalize("NFKC", query).split()).lower()
+        return hashlib.sha256(f"{scope}|{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """(result, error) 또는 None(미스/만료)"""
+        start = time.perf_counter()
+        try:
+            row = self._conn().execute(
+                "SELECT result, error FROM search_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Search cache read failed: {e}")
+            row = None
+        SEARCH_CACHE_LOOKUP_SECONDS.observe(time.perf_counter() - start)
+        if row is None:
+            SEARCH_CACHE_REQUESTS_TOTAL.inc(result="miss")
+            return None
+        SEARCH_CACHE_REQUESTS_TOTAL.inc(result="negative_hit" if row[1] else "hit")
+        return row[0], row[1]
+
+    def put(self, key: str, query: str, result: str, ttl: Optional[float] = None):
+        self._store(key, query, result, None, self.config.ttl if ttl is None else ttl)
+
+    def put_failure(self, key: str, query: str, error: str):
+        self._store(key, query, None, error, self.config.negative_ttl)
+
+    def _store(self, key, query, result, error, ttl):
+        if ttl <= 0:
+            return
+        try:
+            with self._write_lock:
+                conn = self._conn()
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, query, result, error, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, query, result, error, time.time() + ttl),
+                )
+                self._writes += 1
+                if self._writes % 100 == 1:
+                    self._prune(conn)
+                conn.commit()
+        except sqlite3.Error as e:
+            # 캐시 쓰기 실패가 검색 자체를 실패시키지 않도록 한다
+            logger.warning(f"Search cache write failed: {e}")
+
+    def _prune(self, conn: sqlite3.Connection):
+        conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (time.time(),))
+        (count,) = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+        overflow = count - self.config.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM search_cache WHERE key IN "
+                "(SELECT key FROM search_cache ORDER BY expires_at LIMIT ?)",
+                (overflow,),
+            )
+
+    def clear(self):
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute("DELETE FROM search_cache")
+            conn.commit()
+
+    def __len__(self) -> int:
+        (count,) = self._conn().execute(
+            "SELECT COUNT(*) FROM search_cache WHERE expires_at > ?", (time.time(),)
+        ).fetchone()
+        return count
+
+
+_caches: Dict[str, SearchResultCache] = {}
+_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchResultCache]:
+    """설정된 경로의 프로세스 공용 캐시. 비활성이면 None."""
+    config = SearchCacheConfig()
+    if not config.enabled:
+        return None
+    cache = _caches.get(config.path)
+    if cache is None:
+        with _lock:
+            cache = _caches.get(config.path)
+            if cache is None:
+                cache = SearchResultCache(config)
+                _caches[config.path] = cache
+    return cache
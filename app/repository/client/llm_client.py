@@ -1,9 +1,14 @@
 import os
-from typing import Any
-from langchain_upstage import ChatUpstage, UpstageEmbeddings
+import threading
+from typing import Any, TYPE_CHECKING
 from dotenv import load_dotenv
+from app.core.http import get_http_client
+from app.core.resilience import sdk_max_retries
 from app.repository.client.base import BaseLLMClient
 
+if TYPE_CHECKING:
+    from langchain_upstage import ChatUpstage, UpstageEmbeddings
+
 load_dotenv()
 
 class UpstageClient(BaseLLMClient):
@@ -13,13 +18,40 @@ class UpstageClient(BaseLLMClient):
         self.embedding_model_name = os.getenv("UPSTAGE_EMBEDDING_MODEL", "solar-embedding-1-large")
         self._chat_instance = None
         self._embedding_instance = None
+        # 그래프/배치/resilience 작업 스레드가 동시에 처음 호출해도 클라이언트를 하나만 만든다
+        self._lock = threading.Lock()
+
+    def get_chat_model(self) -> "ChatUpstage":
+        instance = self._chat_instance
+        if instance is None:
+            with self._lock:
+                instance = self._chat_instance
+                if instance is None:
+                    # langchain_upstage(openai, tokenizers 포함)는 무거우므로 처음 사용할 때 import
+                    from langchain_upstage import ChatUpstage
+
+                    instance = ChatUpstage(
+                        api_key=self.api_key,
+                        model=self.chat_model_name,
+                        http_client=get_http_client("upstage"),
+                        max_retries=sdk_max_retries("chat"),
+                    )
+                    self._chat_instance = instance
+        return instance
 
-    def get_chat_model(self) -> ChatUpstage:
-        if self._chat_instance is None:
-            self._chat_instance = ChatUpstage(api_key=self.api_key, model=self.chat_model_name)
-        return self._chat_instance
+    def get_embedding_model(self) -> "UpstageEmbeddings":
+        instance = self._embedding_instance
+        if instance is None:
+            with self._lock:
+                instance = self._embedding_instance
+                if instance is None:
+                    from langchain_upstage import UpstageEmbeddings
 
-    def get_embedding_model(self) -> UpstageEmbeddings:
-        if self._embedding_instance is None:
-            self._embedding_instance = UpstageEmbeddings(api_key=self.api_key, model=self.embedding_model_name)
-        return self._embedding_instance
+                    instance = UpstageEmbeddings(
+                        api_key=self.api_key,
+                        model=self.embedding_model_name,
+                        http_client=get_http_client("upstage"),
+                        max_retries=sdk_max_retries("embeddings"),
+                    )
+                    self._embedding_instance = instance
+        return instance
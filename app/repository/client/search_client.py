@@ -1,9 +1,82 @@
-from langchain_community.utilities import GoogleSerperAPIWrapper
+from functools import lru_cache
+from typing import Any, Optional
+
+from app.core.admission import find_overload
+from app.core.cancellation import find_cancelled
+from app.core.http import get_http_client, HttpPoolConfig
+from app.repository.cache.search_cache import (
+    CachedSearchFailure,
+    SearchResultCache,
+    get_search_cache,
+)
 from app.repository.client.base import BaseSearchClient
 
+# GoogleSerperAPIWrapper가 결과가 없을 때 돌려주는 문구
+NO_RESULT_MESSAGE = "No good Google Search Result was found"
+
+
+def _serper_api_results(
+    self, search_term: str, search_type: str = "search", **kwargs: Any
+) -> dict:
+    headers = {
+        "X-API-KEY": self.serper_api_key or "",
+        "Content-Type": "application/json",
+    }
+    params = {
+        "q": search_term,
+        **{key: value for key, value in kwargs.items() if value is not None},
+    }
+    base_url = HttpPoolConfig("serper").base_url
+    response = get_http_client("serper").post(
+        f"{base_url}/{search_type}", headers=headers, params=params
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+@lru_cache(maxsize=None)
+def pooled_serper_wrapper_class():
+    """
+    결과 파싱은 GoogleSerperAPIWrapper를 그대로 쓰고, 요청만 공용 커넥션 풀
+    (requests 대신 httpx)로 보내는 서브클래스. langchain_community는 무거워서
+    클라이언트를 처음 만들 때 import 한다.
+    """
+    from langchain_community.utilities import GoogleSerperAPIWrapper
+
+    return type(
+        "PooledGoogleSerperAPIWrapper",
+        (GoogleSerperAPIWrapper,),
+        {"_google_serper_api_results": _serper_api_results},
+    )
+
+
 class SerperSearchClient(BaseSearchClient):
-    def __init__(self):
-        self._search = GoogleSerperAPIWrapper()
+    def __init__(self, cache: Optional[SearchResultCache] = None):
+        self._search = pooled_serper_wrapper_class()()
+        self._cache = cache if cache is not None else get_search_cache()
+        # 결과 형태를 바꾸는 설정이 다르면 캐시도 따로 쓴다
+        self._scope = f"{self._search.type}:{self._search.k}:{self._search.gl}:{self._search.hl}"
 
     def search(self, query: str) -> str:
-        return self._search.run(query)
+        if self._cache is None:
+            return self._search.run(query)
+
+        key = self._cache.make_key(query, self._scope)
+        cached = self._cache.get(key)
+        if cached is not None:
+            result, error = cached
+            if error is not None:
+                raise CachedSearchFailure(error)
+            return result
+
+        try:
+            result = self._search.run(query)
+        except Exception as e:
+            # 과부하 거절과 요청 취소는 이 요청만의 일시적인 상태라 기억하지 않는다
+            # (취소를 기억하면 같은 질의를 하는 다른 클라이언트까지 실패한다)
+            if find_overload(e) is None and find_cancelled(e) is None:
+                self._cache.put_failure(key, query, f"{type(e).__name__}: {e}")
+            raise
+        ttl = self._cache.config.negative_ttl if result == NO_RESULT_MESSAGE else None
+        self._cache.put(key, query, result, ttl=ttl)
+        return result
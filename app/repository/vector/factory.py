@@ -0,0 +1,19 @@
+from app.repository.vector.partitioned_repo import (
+    PartitionedChromaRepository,
+    partition_by_domain_enabled,
+)
+from app.repository.vector.sharded_repo import ShardConfig, ShardedChromaRepository
+from app.repository.vector.vector_repo import ChromaDBRepository, VectorRepository
+
+
+def create_vector_repository() -> VectorRepository:
+    """
+    설정에 맞는 저장소를 만든다.
+    CHROMA_PARTITION_BY_DOMAIN이면 도메인별 컬렉션, CHROMA_SHARDS > 1이면 해시 샤드,
+    아니면 기존 단일 컬렉션.
+    """
+    if partition_by_domain_enabled():
+        return PartitionedChromaRepository()
+    if ShardConfig().shards > 1:
+        return ShardedChromaRepository()
+    return ChromaDBRepository()
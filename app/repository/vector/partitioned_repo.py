@@ -0,0 +1,219 @@
+import hashlib
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+from dotenv import load_dotenv
+
+from app.core.db import ChromaDBConfig, ChromaDBConnection
+from app.core.metrics import histogram
+from app.repository.vector.scatter import scatter_query
+from app.repository.vector.vector_repo import ChromaDBRepository, VectorRepository
+
+load_dotenv()
+
+PARTITIONS_QUERIED = histogram(
+    "vector_partitions_queried",
+    "검색 한 번이 조회한 도메인 파티션 수",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+
+# domain 메타데이터가 없는 문서(외부 검색으로 보강한 지식 등)가 들어가는 파티션
+DEFAULT_PARTITION = "__default__"
+
+
+def partition_by_domain_enabled() -> bool:
+    return os.getenv("CHROMA_PARTITION_BY_DOMAIN", "false").lower() == "true"
+
+
+def partition_collection_name(base: str, domain: str) -> str:
+    """
+    Chroma 컬렉션 이름은 [a-zA-Z0-9._-] 3~63자만 허용하므로 도메인 값(한글 등)은 해시로 바꾼다.
+    실제 도메인 값은 컬렉션 메타데이터에 남긴다.
+    """
+    digest = hashlib.sha1(domain.encode("utf-8")).hexdigest()[:12]
+    return f"{base[:44]}-part-{digest}"
+
+
+def where_domains(where: Optional[Dict[str, Any]]) -> Optional[Set[str]]:
+    """
+    where 필터가 domain을 확정하면 해당 도메인 집합을, 아니면 None(전체 파티션)을 반환한다.
+    {"domain": x}, {"domain": {"$eq": x}}, {"domain": {"$in": [...]}}, 그리고 이를 포함한 $and를 지원한다.
+    """
+    if not where:
+        return None
+    if "$and" in where:
+        found = [where_domains(clause) for clause in where["$and"]]
+        found = [f for f in found if f is not None]
+        if not found:
+            return None
+        return set.intersection(*found)
+    condition = where.get("domain")
+    if condition is None:
+        return None
+    if not isinstance(condition, dict):
+        return {str(condition)}
+    if "$eq" in condition:
+        return {str(condition["$eq"])}
+    if "$in" in condition:
+        return {str(v) for v in condition["$in"]}
+    return None
+
+
+def strip_domain(where: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    파티션 안의 문서는 모두 같은 domain이라 domain 조건은 필요 없다. Chroma는 where가 있으면
+    메타데이터로 후보를 먼저 거르므로, 남은 조건이 없으면 순수 벡터 검색이 된다.
+    """
+    if not where:
+        return None
+    if "$and" in where:
+        clauses = [c for c in (strip_domain(c) for c in where["$and"]) if c]
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+    rest = {k: v for k, v in where.items() if k != "domain"}
+    return rest or None
+
+
+class PartitionedChromaRepository(VectorRepository):
+    """
+    domain 메타데이터별로 컬렉션을 나눠 저장한다. where 필터가 도메인을 확정하면 그 파티션만,
+    아니면 모든 파티션을 조회해 거리순으로 합친다 (scatter-gather).
+    """
+
+    def __init__(self, base_name: Optional[str] = None):
+        self.base_name = base_name or ChromaDBConfig().collection_name
+        self._connection = ChromaDBConnection()
+        self._partitions: Dict[str, ChromaDBRepository] = {}
+        self._lock = threading.Lock()
+        self._discover()
+
+    def _discover(self):
+        for collection in self._connection.client.list_collections():
+            metadata = collection.metadata or {}
+            if metadata.get("partition_of") == self.base_name:
+                self._partition(str(metadata["domain"]))
+
+    def _partition(self, domain: str, create: bool = True) -> Optional[ChromaDBRepository]:
+        repo = self._partitions.get(domain)
+        if repo is None and create:
+            with self._lock:
+                repo = self._partitions.get(domain)
+                if repo is None:
+                    repo = ChromaDBRepository(
+                        partition_collection_name(self.base_name, domain),
+                        metadata={"partition_of": self.base_name, "domain": domain},
+                    )
+                    self._partitions[domain] = repo
+        return repo
+
+    def partitions(self) -> Dict[str, ChromaDBRepository]:
+        # 다른 요청 스레드가 _partition()으로 새 도메인을 추가할 수 있으므로 잠금 안에서 복사해 순회한다
+        with self._lock:
+            return dict(self._partitions)
+
+    @property
+    def domains(self) -> List[str]:
+        return [d for d in self.partitions() if d != DEFAULT_PARTITION]
+
+    def _targets(self, where: Optional[Dict[str, Any]]) -> List[ChromaDBRepository]:
+        domains = where_domains(where)
+        if domains is None:
+            return list(self.partitions().values())
+        return [p for p in (self._partition(d, create=False) for d in domains) if p is not None]
+
+    def add_documents(
+        self,
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ):
+        if ids is None:
+            ids = [f"doc_{i}" for i in range(len(documents))]
+        groups: Dict[str, List[int]] = {}
+        for i in range(len(documents)):
+            metadata = metadatas[i] if metadatas else None
+            domain = (metadata or {}).get("domain")
+            groups.setdefault(str(domain) if domain is not None else DEFAULT_PARTITION, []).append(i)
+
+        for domain, indices in groups.items():
+            self._partition(domain).add_documents(
+                documents=[documents[i] for i in indices],
+                embeddings=[embeddings[i] for i in indices],
+                metadatas=[metadatas[i] for i in indices] if metadatas else None,
+                ids=[ids[i] for i in indices],
+            )
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        include: List[str] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        if include is None:
+            include = ["documents", "metadatas", "distances"]
+        targets = self._targets(where)
+        if where_domains(where) is not None:
+            where = strip_domain(where)
+        PARTITIONS_QUERIED.observe(len(targets))
+        if not targets:
+            empty = {"ids": [[] for _ in query_embeddings]}
+            empty.update({field: [[] for _ in query_embeddings] for field in include})
+            return empty
+        return scatter_query(targets, query_embeddings, n_results, include, where)
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        include: List[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        if include is None:
+            include = ["documents", "metadatas"]
+        merged: Dict[str, List[Any]] = {"ids": [], **{field: [] for field in include}}
+        if ids is not None or where is not None:
+            for partition in self._targets(where):
+                result = partition.get(ids=ids, where=where, include=include)
+                for field in merged:
+                    merged[field].extend(list(result[field]))
+            end = None if limit is None else (offset or 0) + limit
+            return {field: values[offset or 0:end] for field, values in merged.items()}
+
+        # 전체 조회의 limit/offset은 파티션을 이어 붙인 순서 기준. 건너뛸 파티션은 개수만 센다
+        skip = offset or 0
+        for partition in self.partitions().values():
+            remaining = None if limit is None else limit - len(merged["ids"])
+            if remaining is not None and remaining <= 0:
+                break
+            count = partition.collection.count()
+            if skip >= count:
+                skip -= count
+                continue
+            result = partition.get(include=include, limit=remaining, offset=skip)
+            skip = 0
+            for field in merged:
+                merged[field].extend(list(result[field]))
+        return merged
+
+    def delete_documents(
+        self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None
+    ):
+        for partition in self._targets(where):
+            partition.delete_documents(ids=ids, where=where)
+
+    def get_collection_info(self) -> Dict[str, Any]:
+        partitions = self.partitions()
+        return {
+            "name": self.base_name,
+            "count": sum(p.collection.count() for p in partitions.values()),
+            "metadata": {"partitions": len(partitions)},
+        }
+
+    def warm_up(self):
+        for partition in self.partitions().values():
+            partition.warm_up()
@@ -0,0 +1,86 @@
+import contextvars
+import heapq
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from dotenv import load_dotenv
+
+from app.core.tracing import span, SPAN_KIND_CLIENT
+
+load_dotenv()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("VECTOR_SCATTER_WORKERS", "8")),
+                    thread_name_prefix="vector-scatter",
+                )
+    return _executor
+
+
+def merge_query_results(
+    partials: Sequence[Dict[str, Any]], n_queries: int, n_results: int, fields: List[str]
+) -> Dict[str, List[List[Any]]]:
+    """
+    컬렉션별 query 결과를 질의마다 거리순 top-k로 합친다. fields에는 "ids"와 "distances"가
+    있어야 한다. 재배치 중에 같은 문서가 두 곳에 잠시 있을 수 있어 id로 한 번 더 거른다.
+    """
+    merged: Dict[str, List[List[Any]]] = {field: [] for field in fields}
+    for q in range(n_queries):
+        rows = []
+        for partial in partials:
+            for i in range(len(partial["ids"][q])):
+                rows.append({field: partial[field][q][i] for field in fields})
+        seen = set()
+        best = []
+        for row in heapq.nsmallest(len(rows), rows, key=lambda row: row["distances"]):
+            if row["ids"] in seen:
+                continue
+            seen.add(row["ids"])
+            best.append(row)
+            if len(best) >= n_results:
+                break
+        for field in fields:
+            merged[field].append([row[field] for row in best])
+    return merged
+
+
+def scatter_query(
+    repositories: Sequence[Any],
+    query_embeddings: List[List[float]],
+    n_results: int,
+    include: List[str],
+    where: Optional[Dict[str, Any]] = None,
+) -> Dict[str, List[List[Any]]]:
+    """여러 컬렉션에 같은 질의를 동시에 보내고 거리순으로 합친다."""
+    fields = ["ids", *include] if "distances" in include else ["ids", *include, "distances"]
+    with span("chroma.scatter_query", kind=SPAN_KIND_CLIENT, targets=len(repositories)):
+        if len(repositories) == 1:
+            partials = [repositories[0].query(query_embeddings, n_results=n_results, include=fields[1:], where=where)]
+        else:
+            # 컬렉션별 chroma.query span이 현재 trace 아래에 남도록 컨텍스트를 복사해 넘긴다
+            futures = [
+                _get_executor().submit(
+                    contextvars.copy_context().run,
+                    repo.query,
+                    query_embeddings,
+                    n_results=n_results,
+                    include=fields[1:],
+                    where=where,
+                )
+                for repo in repositories
+            ]
+            partials = [f.result() for f in futures]
+    merged = merge_query_results(partials, len(query_embeddings), n_results, fields)
+    if "distances" not in include:
+        merged.pop("distances")
+    return merged
@@ -0,0 +1,232 @@
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.core.db import ChromaDBConfig, ChromaDBConnection
+from app.core.metrics import counter
+from app.repository.vector.scatter import scatter_query
+from app.repository.vector.vector_repo import ChromaDBRepository, VectorRepository
+
+load_dotenv()
+
+logger = logging.getLogger("chroma")
+
+SHARD_REBALANCED_TOTAL = counter(
+    "vector_shard_rebalanced_documents_total", "샤드 수 변경으로 다른 샤드로 옮긴 문서 수"
+)
+
+
+class ShardConfig:
+    def __init__(self):
+        self.shards = int(os.getenv("CHROMA_SHARDS", "1"))
+        # 기동 시 기존 샤드 배치가 설정과 다르면 바로 재배치한다 (끄면 rebalance()를 직접 호출)
+        self.auto_rebalance = os.getenv("CHROMA_SHARD_AUTO_REBALANCE", "true").lower() == "true"
+        self.rebalance_page_size = int(os.getenv("CHROMA_SHARD_REBALANCE_PAGE", "500"))
+
+
+def shard_key(doc_id: str) -> str:
+    """청크 ID(parent#n)는 부모 ID로 묶어 같은 문서의 청크가 한 샤드에 모이게 한다."""
+    return doc_id.split("#", 1)[0]
+
+
+def shard_for(doc_id: str, shards: int) -> int:
+    digest = hashlib.sha1(shard_key(doc_id).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shards
+
+
+def shard_collection_name(base: str, index: int) -> str:
+    # 0번 샤드는 기존 단일 컬렉션을 그대로 쓴다 (샤드 1개 = 기존 구성)
+    return base if index == 0 else f"{base[:50]}-shard-{index}"
+
+
+class ShardedChromaRepository(VectorRepository):
+    """
+    문서 ID 해시로 N개 컬렉션에 나눠 저장한다. 검색은 모든 샤드에 동시에 보내고 거리순 top-k로
+    합친다. 샤드 수가 바뀌면 해시가 달라진 문서만 새 샤드로 옮긴다.
+    """
+
+    def __init__(self, base_name: Optional[str] = None, config: Optional[ShardConfig] = None):
+        self.base_name = base_name or ChromaDBConfig().collection_name
+        self.config = config or ShardConfig()
+        self.shard_count = max(1, self.config.shards)
+        self._connection = ChromaDBConnection()
+        self._shards: Dict[int, ChromaDBRepository] = {}
+        self._lock = threading.Lock()
+        for index in range(self.shard_count):
+            self._shard(index)
+        self._discover()
+        if self.needs_rebalance():
+            logger.warning(
+                f"Shard layout of {self.base_name} differs from CHROMA_SHARDS={self.shard_count}"
+            )
+            if self.config.auto_rebalance:
+                self.rebalance()
+
+    def _shard(self, index: int) -> ChromaDBRepository:
+        repo = self._shards.get(index)
+        if repo is None:
+            with self._lock:
+                repo = self._shards.get(index)
+                if repo is None:
+                    metadata = {"shard_of": self.base_name, "shard_index": index} if index else None
+                    repo = ChromaDBRepository(shard_collection_name(self.base_name, index), metadata)
+                    self._shards[index] = repo
+        return repo
+
+    def _discover(self):
+        # 이전 설정에서 만들어진 (지금 설정 범위 밖의) 샤드도 재배치가 끝날 때까지 조회 대상에 둔다
+        for collection in self._connection.client.list_collections():
+            metadata = collection.metadata or {}
+            if metadata.get("shard_of") == self.base_name:
+                self._shard(int(metadata["shard_index"]))
+
+    def shards(self) -> Dict[int, ChromaDBRepository]:
+        # 다른 요청 스레드가 _shard()로 샤드를 추가할 수 있으므로 잠금 안에서 복사해 순회한다
+        with self._lock:
+            return dict(self._shards)
+
+    def needs_rebalance(self) -> bool:
+        shards = self.shards()
+        if any(index >= self.shard_count for index in shards):
+            return True
+        # 샤드 수를 늘린 경우: 기존 샤드에 새 해시와 맞지 않는 문서가 남아 있는지 본다
+        for index, repo in shards.items():
+            sample = repo.collection.get(include=[], limit=self.config.rebalance_page_size)
+            if any(shard_for(doc_id, self.shard_count) != index for doc_id in sample["ids"]):
+                return True
+        return False
+
+    def rebalance(self) -> int:
+        """해시가 맞지 않는 문서를 제 샤드로 옮기고, 범위 밖 샤드는 비운 뒤 지운다. 옮긴 문서 수를 반환한다."""
+        moved = 0
+        page = self.config.rebalance_page_size
+        for index, repo in sorted(self.shards().items()):
+            offset = 0
+            while True:
+                # 복제본은 재배치 중간 상태를 늦게 보므로 primary 컬렉션에서 직접 읽는다
+                result = repo.collection.get(
+                    include=["documents", "metadatas", "embeddings"], limit=page, offset=offset
+                )
+                ids = result["ids"]
+                if not ids:
+                    break
+                targets: Dict[int, List[int]] = {}
+                for i, doc_id in enumerate(ids):
+                    target = shard_for(doc_id, self.shard_count)
+                    if target != index:
+                        targets.setdefault(target, []).append(i)
+                for target, positions in targets.items():
+                    # upsert라 중간에 멈췄다가 다시 돌려도 중복이 생기지 않는다
+                    self._shard(target).collection.upsert(
+                        ids=[ids[i] for i in positions],
+                        embeddings=[result["embeddings"][i] for i in positions],
+                        documents=[result["documents"][i] for i in positions],
+                        metadatas=[result["metadatas"][i] for i in positions],
+                    )
+                moved_ids = [ids[i] for positions in targets.values() for i in positions]
+                if moved_ids:
+                    repo.collection.delete(ids=moved_ids)
+                    repo.mark_written()
+                    moved += len(moved_ids)
+                # 옮긴 만큼 뒤 문서가 앞으로 당겨진다
+                offset += len(ids) - len(moved_ids)
+                if len(ids) < page:
+                    break
+
+        for index, repo in self.shards().items():
+            if index < self.shard_count:
+                continue
+            self._connection.client.delete_collection(repo.collection.name)
+            with self._lock:
+                self._shards.pop(index, None)
+        SHARD_REBALANCED_TOTAL.inc(moved)
+        logger.info(f"Rebalanced {moved} documents into {self.shard_count} shards of {self.base_name}")
+        return moved
+
+    def add_documents(
+        self,
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ):
+        if ids is None:
+            ids = [f"doc_{i}" for i in range(len(documents))]
+        groups: Dict[int, List[int]] = {}
+        for i, doc_id in enumerate(ids):
+            groups.setdefault(shard_for(doc_id, self.shard_count), []).append(i)
+        for index, positions in groups.items():
+            self._shard(index).add_documents(
+                documents=[documents[i] for i in positions],
+                embeddings=[embeddings[i] for i in positions],
+                metadatas=[metadatas[i] for i in positions] if metadatas else None,
+                ids=[ids[i] for i in positions],
+            )
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        include: List[str] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        if include is None:
+            include = ["documents", "metadatas", "distances"]
+        return scatter_query(list(self.shards().values()), query_embeddings, n_results, include, where)
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        include: List[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        if include is None:
+            include = ["documents", "metadatas"]
+        merged: Dict[str, List[Any]] = {"ids": [], **{field: [] for field in include}}
+        if ids is not None or where is not None:
+            for repo in self.shards().values():
+                result = repo.get(ids=ids, where=where, include=include)
+                for field in merged:
+                    merged[field].extend(list(result[field]))
+            end = None if limit is None else (offset or 0) + limit
+            return {field: values[offset or 0:end] for field, values in merged.items()}
+
+        # 전체 조회의 limit/offset은 샤드 번호 순으로 이어 붙인 순서 기준. 건너뛸 샤드는 개수만 센다
+        skip = offset or 0
+        for _, repo in sorted(self.shards().items()):
+            remaining = None if limit is None else limit - len(merged["ids"])
+            if remaining is not None and remaining <= 0:
+                break
+            count = repo.collection.count()
+            if skip >= count:
+                skip -= count
+                continue
+            result = repo.get(include=include, limit=remaining, offset=skip)
+            skip = 0
+            for field in merged:
+                merged[field].extend(list(result[field]))
+        return merged
+
+    def delete_documents(
+        self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None
+    ):
+        for repo in self.shards().values():
+            repo.delete_documents(ids=ids, where=where)
+
+    def get_collection_info(self) -> Dict[str, Any]:
+        counts = {index: repo.collection.count() for index, repo in sorted(self.shards().items())}
+        return {
+            "name": self.base_name,
+            "count": sum(counts.values()),
+            "metadata": {"shards": self.shard_count, "shard_counts": counts},
+        }
+
+    def warm_up(self):
+        for repo in self.shards().values():
+            repo.warm_up()
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.core.db import ChromaDBConnection
+from app.core.replicas import get_replica_pool
+from app.core.tracing import span, SPAN_KIND_CLIENT
 
 
 class VectorRepository(ABC):
@@ -20,22 +22,56 @@ class VectorRepository(ABC):
         query_embeddings: List[List[float]],
         n_results: int = 5,
         include: List[str] = None,
+        where: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         pass
 
     @abstractmethod
-    def delete_documents(self, ids: List[str]):
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        include: List[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def delete_documents(
+        self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None
+    ):
         pass
 
     @abstractmethod
     def get_collection_info(self) -> Dict[str, Any]:
         pass
 
+    def warm_up(self):
+        """인덱스를 미리 로드하는 훅. 기본 구현은 아무것도 하지 않는다."""
+        pass
+
 
 class ChromaDBRepository(VectorRepository):
-    def __init__(self, collection_name: str = None):
+    def __init__(self, collection_name: str = None, metadata: Optional[Dict[str, Any]] = None):
         self._connection = ChromaDBConnection()
-        self.collection = self._connection.get_collection(collection_name)
+        self.collection = self._connection.get_collection(collection_name, metadata)
+        # server 모드에서 읽기 복제본이 설정되어 있으면 읽기는 복제본으로, 쓰기는 primary로 보낸다
+        self._replicas = get_replica_pool()
+        if self._replicas is not None:
+            self._replicas.track(self.collection.name, self.collection)
+
+    def _read(self, fn):
+        replicas = getattr(self, "_replicas", None)
+        if replicas is None:
+            return fn(self.collection)
+        return replicas.read(self.collection.name, self.collection, fn)
+
+    def mark_written(self):
+        """직후 읽기가 아직 복제되지 않은 복제본으로 가지 않도록 primary 읽기 구간을 연다."""
+        replicas = getattr(self, "_replicas", None)
+        if replicas is not None:
+            replicas.note_write()
 
     def add_documents(
         self,
@@ -50,29 +86,72 @@ class ChromaDBRepository(VectorRepository):
         if metadatas is None:
             metadatas = [{"text": doc} for doc in documents]
 
-        self.collection.add(
-            embeddings=embeddings, documents=documents, metadatas=metadatas, ids=ids
-        )
+        with span("chroma.add", kind=SPAN_KIND_CLIENT, documents=len(documents)):
+            self.collection.add(
+                embeddings=embeddings, documents=documents, metadatas=metadatas, ids=ids
+            )
+        self.mark_written()
 
     def query(
         self,
         query_embeddings: List[List[float]],
         n_results: int = 5,
         include: List[str] = None,
+        where: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         if include is None:
             include = ["documents", "metadatas", "distances"]
 
-        return self.collection.query(
-            query_embeddings=query_embeddings, n_results=n_results, include=include
-        )
+        with span(
+            "chroma.query",
+            kind=SPAN_KIND_CLIENT,
+            n_results=n_results,
+            collection=self.collection.name,
+            filtered=where is not None,
+        ):
+            return self._read(
+                lambda collection: collection.query(
+                    query_embeddings=query_embeddings, n_results=n_results, include=include, where=where
+                )
+            )
 
-    def delete_documents(self, ids: List[str]):
-        self.collection.delete(ids=ids)
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        include: List[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        if include is None:
+            include = ["documents", "metadatas"]
+
+        with span("chroma.get", kind=SPAN_KIND_CLIENT):
+            return self._read(
+                lambda collection: collection.get(
+                    ids=ids, where=where, include=include, limit=limit, offset=offset
+                )
+            )
+
+    def delete_documents(
+        self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None
+    ):
+        self.collection.delete(ids=ids, where=where)
+        self.mark_written()
 
     def get_collection_info(self) -> Dict[str, Any]:
         return {
             "name": self.collection.name,
-            "count": self.collection.count(),
+            "count": self._read(lambda collection: collection.count()),
             "metadata": self.collection.metadata,
         }
+
+    def warm_up(self):
+        # 저장된 임베딩 하나로 질의해 HNSW 인덱스를 로드한다 (임베딩 API 호출 없음)
+        sample = self.collection.peek(limit=1)
+        embeddings = sample.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            return
+        self.collection.query(
+            query_embeddings=[list(embeddings[0])], n_results=1, include=[]
+        )
@@ -1,30 +1,56 @@
 import os
-from typing import List, Dict, Any
+import time
+import uuid
+from typing import List, Dict, Any, Optional
 
 from openai import OpenAI  # openai==1.52.2
 from langchain_core.messages import HumanMessage
 
 from dotenv import load_dotenv
+from app.core.admission import admission_priority, PRIORITY_BULK
+from app.core.deadline import Deadline, resolve_deadline
+from app.core.http import get_http_client
+from app.core.metrics import histogram
+from app.core.singleflight import get_group, normalize_key
+from app.core.tracing import current_span
+from app.core.usage import track_usage
+from app.service.knowledge_writer import KnowledgeWriter
 from app.service.vector_service import VectorService
-from app.agents import (
-    super_graph, 
-    info_extract_graph, 
-    knowledge_augment_graph,
-    answer_gen_graph, 
-    evaluate_graph
-)
 
 load_dotenv()
 
+GRAPH_RUN_SECONDS = histogram(
+    "graph_run_seconds", "super 그래프 실행 시간 (답변 컨텍스트 경로별)", ["path"]
+)
+
 
 class AgentService:
-    def __init__(self, vector_service: VectorService):
+    def __init__(
+        self,
+        vector_service: VectorService,
+        knowledge_writer: Optional[KnowledgeWriter] = None,
+    ):
         api_key = os.getenv("UPSTAGE_API_KEY")
         if not api_key:
             raise ValueError("UPSTAGE_API_KEY environment variable is required")
 
-        self.client = OpenAI(api_key=api_key, base_url="https://api.upstage.ai/v1")
+        # 공용 커넥션 풀을 사용하므로 서비스마다 새 풀이 생기지 않는다
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url="https://api.upstage.ai/v1",
+            http_client=get_http_client("upstage"),
+        )
         self.vector_service = vector_service
+        self.knowledge_writer = knowledge_writer
+        # langgraph/에이전트 모듈은 서비스 생성 시점에 import (앱 import 시간 단축)
+        from app.agents import (
+            super_graph,
+            info_extract_graph,
+            knowledge_augment_graph,
+            answer_gen_graph,
+            evaluate_graph
+        )
+
         self.graphs = {
             "super": super_graph,
             "extractor": info_extract_graph,
@@ -38,7 +64,8 @@ class AgentService:
         self, documents: List[str], metadatas: List[Dict[str, Any]] = None
     ) -> Dict[str, str]:
         try:
-            self.vector_service.add_documents(documents, metadatas)
+            with admission_priority(PRIORITY_BULK):
+                self.vector_service.add_documents(documents, metadatas)
             return {
                 "status": "success",
                 "message": f"Added {len(documents)} documents to knowledge base",
@@ -49,7 +76,31 @@ class AgentService:
     def get_knowledge_stats(self) -> Dict[str, Any]:
         return self.vector_service.get_collection_info()
 
-    def run_agent(self, agent_name: str, inputs: Dict[str, Any], session_id: str = None) -> Dict[str, Any]:
+    def _build_config(self, session_id: Optional[str], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        configurable = {
+            "vector_service": self.vector_service,
+            "knowledge_writer": self.knowledge_writer,
+            # 이 실행에서 큐에 넣은 지식 문서를 같은 실행의 검색이 볼 수 있도록 묶는 키
+            "write_scope": uuid.uuid4().hex,
+            # 노드가 남은 시간을 보고 단계를 줄인다 (app.core.deadline)
+            "deadline": deadline,
+        }
+        # super 그래프는 체크포인터가 있어 thread_id가 반드시 필요하다. 세션이 없으면 이 실행 전용 thread를 쓰고
+        # 끝나면 지운다 (_release_run)
+        configurable["thread_id"] = session_id or f"oneshot-{uuid.uuid4().hex}"
+        return {"configurable": configurable}
+
+    def _release_run(self, graph: Any, config: Dict[str, Any], session_id: Optional[str]):
+        configurable = config["configurable"]
+        if self.knowledge_writer is not None:
+            self.knowledge_writer.release_scope(configurable["write_scope"])
+        checkpointer = getattr(graph, "checkpointer", None)
+        if not session_id and checkpointer is not None:
+            checkpointer.delete_thread(configurable["thread_id"])
+
+    def run_agent(
+        self, agent_name: str, inputs: Dict[str, Any], session_id: str = None, deadline_seconds: Optional[float] = None
+    ) -> Dict[str, Any]:
         graph = self.graphs.get(agent_name)
         if not graph:
             raise ValueError(f"Agent '{agent_name}' not found")
@@ -67,14 +118,46 @@ class AgentService:
             full_inputs.update(inputs)
             inputs = full_inputs
 
-        config = {"configurable": {"vector_service": self.vector_service}}
-        if session_id:
-            config["configurable"]["thread_id"] = session_id
+        deadline = resolve_deadline(deadline_seconds)
+        config = self._build_config(session_id, deadline)
             
-        result = graph.invoke(inputs, config=config)
+        shared = False
+        started = time.perf_counter()
+        with track_usage(session_id) as usage:
+            try:
+                if agent_name == "super" and not session_id:
+                    # 세션 없는 동일 질의는 진행 중인 실행 하나의 결과를 함께 받는다
+                    # (세션이 있으면 체크포인트 상태가 달라 합칠 수 없다)
+                    # 마감이 다르면 적용되는 저하도 달라지므로 마감 값이 같은 요청끼리만 합친다
+                    key = normalize_key(inputs["user_query"])
+                    if deadline is not None:
+                        key = f"{key}|deadline={deadline.seconds}"
+                    result, shared = get_group("super_graph").do(
+                        key,
+                        lambda: graph.invoke(inputs, config=config),
+                    )
+                else:
+                    result = graph.invoke(inputs, config=config)
+            finally:
+                self._release_run(graph, config, session_id)
+                if deadline is not None:
+                    deadline.finish()
+        result = dict(result)
+        if agent_name == "super" and not shared:
+            GRAPH_RUN_SECONDS.observe(time.perf_counter() - started, path=result.get("answer_path") or "unknown")
+        result["token_usage"] = usage.snapshot()
+        if deadline is not None:
+            result["deadline"] = deadline.snapshot()
+        if shared:
+            result["token_usage"]["coalesced"] = True
+            active_span = current_span()
+            if active_span is not None:
+                active_span.set_attribute("coalesced", True)
         return result
 
-    async def stream_agent(self, agent_name: str, inputs: Dict[str, Any], session_id: str = None):
+    async def stream_agent(
+        self, agent_name: str, inputs: Dict[str, Any], session_id: str = None, deadline_seconds: Optional[float] = None
+    ):
         graph = self.graphs.get(agent_name)
         if not graph:
             raise ValueError(f"Agent '{agent_name}' not found")
@@ -91,12 +174,31 @@ class AgentService:
             full_inputs.update(inputs)
             inputs = full_inputs
 
-        config = {"configurable": {"vector_service": self.vector_service}}
-        if session_id:
-            config["configurable"]["thread_id"] = session_id
+        deadline = resolve_deadline(deadline_seconds)
+        config = self._build_config(session_id, deadline)
         
         # graph.astream uses the async streaming interface of LangGraph
         # subgraphs=True allows capturing events from internal nodes of subgraphs
-        async for event in graph.astream(inputs, config=config, stream_mode="updates", subgraphs=True):
-            yield event
+        started = time.perf_counter()
+        path = None
+        with track_usage(session_id) as usage:
+            try:
+                async for event in graph.astream(inputs, config=config, stream_mode="updates", subgraphs=True):
+                    namespace, update = event
+                    if not namespace:
+                        for node_update in update.values():
+                            if isinstance(node_update, dict):
+                                path = node_update.get("answer_path", path)
+                    yield event
+            finally:
+                self._release_run(graph, config, session_id)
+                if deadline is not None:
+                    deadline.finish()
+        if agent_name == "super":
+            GRAPH_RUN_SECONDS.observe(time.perf_counter() - started, path=path or "unknown")
+        # 마지막 이벤트로 요청 전체의 토큰 사용량(과 마감 저하 내역) 전달
+        final = {"token_usage": usage.snapshot()}
+        if deadline is not None:
+            final["deadline"] = deadline.snapshot()
+        yield final
 
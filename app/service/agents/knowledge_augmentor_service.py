@@ -1,21 +1,62 @@
+import os
 from typing import Dict, Any, List
-from langchain_core.messages import HumanMessage, SystemMessage, BaseMessage
+from dotenv import load_dotenv
+from langchain_core.messages import HumanMessage, SystemMessage, BaseMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
 from app.agents.subgraphs.knowledge_augmentor import knowledge_augment_graph
 
+load_dotenv()
+
+# 보강 직후 경로
+#   off:    항상 info_extract_agent_workflow로 돌아가 검색/검증을 다시 한다
+#   direct: 보강으로 가져온 내용을 그대로 답변 컨텍스트로 넘긴다 (LLM 호출 없음)
+#   verify: 보강 내용을 MedicalInfoVerifier로 한 번만 검증해 넘긴다
+FAST_PATH_OFF = "off"
+FAST_PATH_DIRECT = "direct"
+FAST_PATH_VERIFY = "verify"
+FAST_PATH_MODES = (FAST_PATH_OFF, FAST_PATH_DIRECT, FAST_PATH_VERIFY)
+
+
+class AugmentFastPathConfig:
+    def __init__(self):
+        self.mode = os.getenv("AUGMENT_FAST_PATH", FAST_PATH_VERIFY)
+        if self.mode not in FAST_PATH_MODES:
+            raise ValueError(f"AUGMENT_FAST_PATH must be one of {', '.join(FAST_PATH_MODES)}, got '{self.mode}'")
+
+
 class KnowledgeAugmentorService:
     def run(self, query: str, config: RunnableConfig = None, history: List[BaseMessage] = None) -> Dict[str, Any]:
         messages = []
         if history:
             messages.extend(history)
         messages.append(HumanMessage(content=f"Search and add info for: {query}"))
-        
+
         sub_result = knowledge_augment_graph.invoke({"messages": messages}, config=config)
-        
+
         # Filter messages
         new_messages = [msg for msg in sub_result["messages"] if not isinstance(msg, HumanMessage) and not isinstance(msg, SystemMessage)]
-        
+
         return {
             "augment_logs": new_messages,
             "process_status": "augmented"
         }
+
+    def augmented_documents(self, augment_logs: List[BaseMessage]) -> List[str]:
+        """
+        보강 단계에서 얻은 내용. 에이전트가 골라 저장한 add_to_medical_qa 내용을 우선하고,
+        저장한 것이 없으면 google_search 결과를 쓴다.
+        """
+        added = [
+            call["args"].get("content", "")
+            for m in augment_logs
+            for call in (getattr(m, "tool_calls", None) or [])
+            if call["name"] == "add_to_medical_qa"
+        ]
+        added = [c for c in added if c.strip()]
+        if added:
+            return added
+        return [
+            m.content for m in augment_logs
+            if isinstance(m, ToolMessage) and m.name == "google_search"
+            and m.content.strip() and not m.content.startswith("Google Search Error")
+        ]
@@ -0,0 +1,113 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 문장 끝: 마침표/물음표/느낌표(전각 포함) 뒤 공백, 또는 줄바꿈.
+# 한국어 평서문 종결(…다. …요.)도 마침표로 끝나므로 같은 규칙으로 나뉜다.
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…。？！])\s+|\n+")
+
+
+class ChunkerConfig:
+    def __init__(self):
+        self.enabled = os.getenv("CHUNK_ENABLED", "true").lower() == "true"
+        # 글자 수 기준 (Solar 토크나이저 기준 한국어는 대략 1.5~2자당 1토큰)
+        self.chunk_size = int(os.getenv("CHUNK_SIZE", "500"))
+        self.chunk_overlap = int(os.getenv("CHUNK_OVERLAP", "100"))
+        # 검색 결과에서 같은 부모의 청크를 하나로 합칠지 여부 (search_medical_qa 기본값)
+        self.collapse_results = os.getenv("CHUNK_COLLAPSE_RESULTS", "true").lower() == "true"
+
+
+@dataclass
+class Chunk:
+    text: str
+    start: int
+    end: int
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """원문 기준 (start, end) 문장 구간. 공백만 있는 구간은 버린다."""
+    spans = []
+    position = 0
+    for match in _SENTENCE_BOUNDARY.finditer(text):
+        if text[position:match.start()].strip():
+            spans.append((position, match.start()))
+        position = match.end()
+    if text[position:].strip():
+        spans.append((position, len(text)))
+    return spans
+
+
+class TextChunker:
+    """
+    문장 단위로 chunk_size 이내의 청크를 만들고, 앞 청크의 끝 문장들(chunk_overlap 이내)을
+    다음 청크 앞에 겹쳐 넣는다. 청크는 원문의 연속 구간이라 offset으로 원문을 복원할 수 있다.
+    """
+
+    def __init__(self, config: ChunkerConfig = None):
+        self.config = config or ChunkerConfig()
+
+    def split(self, text: str) -> List[Chunk]:
+        size = self.config.chunk_size
+        if not self.config.enabled or size <= 0 or len(text) <= size:
+            return [Chunk(text, 0, len(text))]
+
+        spans: List[Tuple[int, int]] = []
+        for start, end in split_sentences(text):
+            # 한 문장이 청크보다 길면 글자 단위로 자른다
+            while end - start > size:
+                spans.append((start, start + size))
+                start += max(1, size - self.config.chunk_overlap)
+            spans.append((start, end))
+
+        chunks: List[Chunk] = []
+        current: List[Tuple[int, int]] = []
+        for span in spans:
+            if current and span[1] - current[0][0] > size:
+                chunks.append(self._make_chunk(text, current))
+                current = self._overlap_tail(current, span, size)
+            current.append(span)
+        if current:
+            chunks.append(self._make_chunk(text, current))
+        return chunks
+
+    def _overlap_tail(self, spans, next_span, size) -> List[Tuple[int, int]]:
+        tail: List[Tuple[int, int]] = []
+        for span in reversed(spans):
+            if span[1] - span[0] + sum(e - s for s, e in tail) > self.config.chunk_overlap:
+                break
+            # 겹침을 넣어도 다음 문장과 합쳐 청크 크기를 넘지 않아야 한다
+            if next_span[1] - span[0] > size:
+                break
+            tail.insert(0, span)
+        return tail
+
+    @staticmethod
+    def _make_chunk(text: str, spans: List[Tuple[int, int]]) -> Chunk:
+        start, end = spans[0][0], spans[-1][1]
+        return Chunk(text[start:end], start, end)
+
+
+def merge_chunks(chunks: List[Tuple[int, int, int, str]]) -> str:
+    """
+    (chunk_index, start, end, text) 청크들을 원문 순서로 이어 붙인다. 겹친 부분은 한 번만 쓰고,
+    사이가 빠진(인접하지 않은) 청크 사이에는 생략 표시를 넣는다.
+    """
+    merged = ""
+    prev_index = cursor = None
+    for index, start, end, text in sorted(chunks):
+        if cursor is None:
+            merged = text
+        elif end <= cursor:
+            continue
+        elif start < cursor:
+            merged += text[cursor - start:]
+        else:
+            merged += (" " if index == prev_index + 1 else " … ") + text
+        prev_index = index
+        cursor = end if cursor is None else max(cursor, end)
+    return merged
@@ -0,0 +1,173 @@
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from dotenv import load_dotenv
+
+from app.core.metrics import counter, histogram
+from app.core.usage import record_context_tokens
+from app.service.chunker import split_sentences
+
+load_dotenv()
+
+CONTEXT_TOKENS_TOTAL = counter(
+    "context_tokens_total", "컨텍스트 조립 전후 토큰 수 (추정치)", ["node", "stage"]
+)
+CONTEXT_COMPRESSION_RATIO = histogram(
+    "context_compression_ratio",
+    "조립 후/조립 전 토큰 비율",
+    ["node"],
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+)
+
+
+class ContextConfig:
+    def __init__(self):
+        self.enabled = os.getenv("CONTEXT_ASSEMBLY_ENABLED", "true").lower() == "true"
+        self.token_budget = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200"))
+        self.max_sentences_per_passage = int(os.getenv("CONTEXT_MAX_SENTENCES", "6"))
+        # 문자 bigram Jaccard 유사도가 이 값 이상이면 같은 내용으로 본다
+        self.dedup_threshold = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.8"))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Solar 토크나이저 없이 쓰는 근사치. 한국어는 대략 글자당 0.7~1토큰, 영어는 4글자당 1토큰이라
+    UTF-8 바이트 수 / 4 가 두 경우 모두 크게 벗어나지 않는다.
+    """
+    if not text:
+        return 0
+    return max(1, math.ceil(len(text.encode("utf-8")) / 4))
+
+
+def _bigrams(text: str) -> Set[str]:
+    # 한국어는 어절에 조사가 붙어 단어 일치가 잘 안 되므로 공백을 뺀 문자 bigram을 쓴다
+    compact = "".join(text.lower().split())
+    return {compact[i:i + 2] for i in range(len(compact) - 1)}
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class Passage:
+    text: str
+    score: float
+    rank: int
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class AssembledContext:
+    passages: List[Passage]
+    input_tokens: int
+    output_tokens: int
+    dropped: int
+
+    def render(self) -> str:
+        return "\n\n".join(f"Source {i + 1}:\n{p.text}" for i, p in enumerate(self.passages))
+
+
+class ContextAssembler:
+    """
+    검색 결과를 토큰 예산 안의 컨텍스트로 줄인다.
+    1) 질의와 겹치는 문장만 남기고 2) 겹치는 passage를 합치고 3) 관련도 순으로 예산까지 채운다.
+    """
+
+    def __init__(self, config: Optional[ContextConfig] = None):
+        self.config = config or ContextConfig()
+
+    def assemble(
+        self,
+        query: str,
+        documents: Sequence[str],
+        metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+        node: str = "search_medical_qa",
+    ) -> AssembledContext:
+        input_tokens = sum(estimate_tokens(d) for d in documents)
+        if not self.config.enabled:
+            passages = [Passage(d, 0.0, i) for i, d in enumerate(documents)]
+            return AssembledContext(passages, input_tokens, input_tokens, 0)
+
+        query_grams = _bigrams(query)
+        candidates = []
+        for rank, document in enumerate(documents):
+            text, lexical = self._trim(document, query_grams)
+            if not text:
+                continue
+            # 벡터 검색 순위를 사전 점수로 두고, 질의와의 어휘 겹침으로 보정한다
+            score = 0.7 * lexical + 0.3 / (1 + rank)
+            metadata = dict(metadatas[rank]) if metadatas and metadatas[rank] else {}
+            candidates.append(Passage(text, score, rank, metadata))
+        candidates.sort(key=lambda p: p.score, reverse=True)
+
+        selected: List[Passage] = []
+        selected_grams: List[Set[str]] = []
+        seen_sentences: Set[str] = set()
+        used = 0
+        for passage in candidates:
+            grams = _bigrams(passage.text)
+            if any(_jaccard(grams, other) >= self.config.dedup_threshold for other in selected_grams):
+                continue
+            # 청크 겹침 등으로 이미 들어간 문장은 빼고, 예산에 맞는 문장까지만 넣는다
+            kept = []
+            for sentence in self._sentences(passage.text):
+                key = " ".join(sentence.split())
+                if key in seen_sentences:
+                    continue
+                cost = estimate_tokens(sentence)
+                if used + cost > self.config.token_budget:
+                    break
+                kept.append(sentence)
+                seen_sentences.add(key)
+                used += cost
+            if kept:
+                passage.text = " ".join(kept)
+                selected.append(passage)
+                selected_grams.append(grams)
+            if used >= self.config.token_budget:
+                break
+
+        output_tokens = sum(estimate_tokens(p.text) for p in selected)
+        CONTEXT_TOKENS_TOTAL.inc(input_tokens, node=node, stage="input")
+        CONTEXT_TOKENS_TOTAL.inc(output_tokens, node=node, stage="output")
+        if input_tokens:
+            CONTEXT_COMPRESSION_RATIO.observe(output_tokens / input_tokens, node=node)
+        record_context_tokens(node, input_tokens, output_tokens)
+        return AssembledContext(selected, input_tokens, output_tokens, len(documents) - len(selected))
+
+    @staticmethod
+    def _sentences(text: str) -> List[str]:
+        return [text[s:e].strip() for s, e in split_sentences(text)]
+
+    def _trim(self, document: str, query_grams: Set[str]):
+        """
+        질의와 겹치는 문장과 그 바로 다음 문장(질문 뒤의 답변, 주장 뒤의 근거)을 원래 순서대로 남긴다.
+        겹치는 문장이 없으면 앞부분만 남긴다.
+        """
+        sentences = self._sentences(document)
+        if not sentences:
+            return "", 0.0
+        scored = sorted(
+            (
+                (len(_bigrams(s) & query_grams) / len(query_grams) if query_grams else 0.0, i)
+                for i, s in enumerate(sentences)
+            ),
+            reverse=True,
+        )
+        best = scored[0][0]
+        # 가장 잘 맞는 문장의 절반 이상 겹치는 문장만 기준으로 삼는다 (공통 어휘 한두 개로 다 남지 않도록)
+        anchors = [i for score, i in scored if score > 0 and score >= best / 2] or [0]
+        keep: List[int] = []
+        for i in anchors:
+            for j in (i, i + 1):
+                if j < len(sentences) and j not in keep:
+                    keep.append(j)
+            if len(keep) >= self.config.max_sentences_per_passage:
+                break
+        keep = sorted(keep[: self.config.max_sentences_per_passage])
+        return " ".join(sentences[i] for i in keep), best
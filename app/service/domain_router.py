@@ -0,0 +1,122 @@
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.core.metrics import counter
+from app.repository.vector.vector_repo import VectorRepository
+
+load_dotenv()
+
+logger = logging.getLogger("domain_router")
+
+DOMAIN_INFERENCE_TOTAL = counter(
+    "domain_inference_total",
+    "질의 도메인 추론 결과 (hit: 필터 적용, miss: 확신 부족으로 전체 검색, fallback: 필터 결과가 없어 전체 재검색)",
+    ["result"],
+)
+
+
+class DomainRouterConfig:
+    def __init__(self):
+        # 질의 임베딩과 도메인별 중심 벡터를 비교해 domain 필터를 자동으로 건다
+        self.infer = os.getenv("SEARCH_INFER_DOMAIN", "false").lower() == "true"
+        # 가장 가까운 도메인의 코사인 유사도 하한과, 두 번째 도메인과의 차이 하한
+        self.min_similarity = float(os.getenv("SEARCH_DOMAIN_MIN_SIMILARITY", "0.3"))
+        self.min_margin = float(os.getenv("SEARCH_DOMAIN_MIN_MARGIN", "0.05"))
+        # 처음 중심 벡터를 계산할 때 저장소를 이 크기 단위로 나눠 읽는다
+        self.scan_page_size = int(os.getenv("SEARCH_DOMAIN_SCAN_PAGE", "1000"))
+
+
+class DomainRouter:
+    """
+    domain 메타데이터별 임베딩 합계(중심 벡터)를 들고 있다가, 이미 계산된 질의 임베딩만으로
+    가장 가까운 도메인을 고른다. 추가 API 호출이 없고 도메인 수만큼의 내적이면 끝난다.
+    중심 벡터는 처음 쓸 때 저장소를 한 번 훑어 만들고, 이후 추가되는 문서로 갱신한다.
+    """
+
+    def __init__(self, repository: VectorRepository, config: Optional[DomainRouterConfig] = None):
+        self.repository = repository
+        self.config = config or DomainRouterConfig()
+        self._sums: Dict[str, np.ndarray] = {}
+        self._counts: Dict[str, int] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def observe(self, embeddings: Sequence[Sequence[float]], metadatas: Optional[Sequence[Optional[Dict[str, Any]]]]):
+        """새로 저장한 문서를 중심 벡터에 반영한다. 아직 한 번도 훑지 않았다면 첫 조회 때 함께 읽힌다."""
+        if not metadatas or not self._loaded:
+            return
+        with self._lock:
+            self._accumulate(embeddings, metadatas)
+
+    def invalidate(self):
+        """저장소를 우회해 대량으로 채운 뒤(스냅샷 복원 등) 다음 조회 때 중심 벡터를 다시 만든다."""
+        with self._lock:
+            self._sums.clear()
+            self._counts.clear()
+            self._loaded = False
+
+    def _accumulate(self, embeddings, metadatas):
+        for embedding, metadata in zip(embeddings, metadatas):
+            domain = (metadata or {}).get("domain")
+            if domain is None:
+                continue
+            vector = np.asarray(embedding, dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            if norm == 0:
+                continue
+            if domain in self._sums:
+                self._sums[domain] += vector / norm
+            else:
+                self._sums[domain] = vector / norm
+            self._counts[domain] = self._counts.get(domain, 0) + 1
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            page = self.config.scan_page_size
+            offset = 0
+            while True:
+                result = self.repository.get(
+                    include=["embeddings", "metadatas"], limit=page, offset=offset
+                )
+                self._accumulate(result["embeddings"], result["metadatas"])
+                count = len(result["ids"])
+                offset += count
+                if count < page:
+                    break
+            self._loaded = True
+            logger.info(f"Domain centroids built for {len(self._sums)} domains from {offset} documents")
+
+    @property
+    def domains(self) -> List[str]:
+        if not self._loaded:
+            self._load()
+        return list(self._sums)
+
+    def infer(self, query_embedding: Sequence[float]) -> Optional[str]:
+        """확신할 수 있을 때만 도메인을 반환한다. 아니면 None (전체 검색)."""
+        if not self._loaded:
+            self._load()
+        with self._lock:
+            if not self._sums:
+                return None
+            domains = list(self._sums)
+            centroids = np.stack([self._sums[d] for d in domains])
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        query = np.array(query_embedding, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+        similarity = centroids @ query
+        order = np.argsort(similarity)[::-1]
+        best = float(similarity[order[0]])
+        runner_up = float(similarity[order[1]]) if len(order) > 1 else -1.0
+        if best < self.config.min_similarity or best - runner_up < self.config.min_margin:
+            DOMAIN_INFERENCE_TOTAL.inc(result="miss")
+            return None
+        DOMAIN_INFERENCE_TOTAL.inc(result="hit")
+        return domains[int(order[0])]
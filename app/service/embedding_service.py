@@ -1,16 +1,217 @@
 import os
-from typing import List
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 from openai import OpenAI
 from dotenv import load_dotenv
 
+from app.core.cancellation import check_cancelled, find_cancelled
 from app.core.llm import get_upstage_embeddings
+from app.core.lazy import lazy
+from app.core.metrics import counter, histogram
+from app.core.resilience import get_policy
+from app.core.singleflight import get_group
+from app.core.tracing import span, SPAN_KIND_CLIENT
 
-class EmbeddingService:
+load_dotenv()
+
+QUERY_EMBEDDING_CACHE_TOTAL = counter(
+    "query_embedding_cache_total", "질의 임베딩 캐시 조회 결과", ["result"]
+)
+QUERY_EMBEDDING_BATCH_SIZE = histogram(
+    "query_embedding_batch_size",
+    "업스트림 호출 한 번에 묶은 질의 수",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+
+class EmbeddingQueryConfig:
     def __init__(self):
-        self._embeddings = get_upstage_embeddings()
+        # 질의 임베딩 LRU 크기 (0이면 캐시하지 않음)
+        self.cache_size = int(os.getenv("EMBED_QUERY_CACHE_SIZE", "1024"))
+        # 이 시간(ms) 동안 들어온 질의 임베딩을 한 번에 요청한다. 0이면 query_batching() 범위에서만 묶는다
+        self.batch_window = float(os.getenv("EMBED_QUERY_BATCH_WINDOW_MS", "0")) / 1000
+        self.batch_max = int(os.getenv("EMBED_QUERY_BATCH_MAX", "64"))
+
+
+_batch_window: ContextVar[Optional[float]] = ContextVar("embedding_batch_window", default=None)
+
+
+@contextmanager
+def query_batching(window_seconds: float) -> Iterator[None]:
+    """
+    범위 안의 질의 임베딩을 window_seconds 동안 모아 한 번에 요청한다. 대량 배치 실행처럼 지연보다
+    업스트림 요청 수가 중요한 작업에서만 쓴다. (그래프 작업 스레드에도 contextvar로 전달된다)
+    """
+    token = _batch_window.set(window_seconds)
+    try:
+        yield
+    finally:
+        _batch_window.reset(token)
+
+
+class _QueryBatcher:
+    """
+    먼저 도착한 호출이 leader가 되어 window 동안(또는 batch_max가 찰 때까지) 모인 질의를 한 번에 요청한다.
+    나머지는 leader의 결과를 기다린다. leader 호출이 진행되는 동안 도착한 질의는 다음 묶음이 된다.
+    """
+
+    def __init__(self, embed_many, batch_max: int):
+        self._embed_many = embed_many
+        self._batch_max = max(1, batch_max)
+        self._pending: List[Tuple[str, Future]] = []
+        self._collecting = False
+        self._full = threading.Event()
+        self._lock = threading.Lock()
+
+    def embed(self, text: str, window: float) -> List[float]:
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((text, future))
+            leader = not self._collecting
+            self._collecting = True
+            if len(self._pending) >= self._batch_max:
+                self._full.set()
+        if leader:
+            self._full.wait(window)
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._collecting = False
+                self._full.clear()
+            self._flush(batch)
+        return future.result()
+
+    def _flush(self, batch: List[Tuple[str, Future]]):
+        unique = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            vectors: Dict[str, List[float]] = {}
+            for i in range(0, len(unique), self._batch_max):
+                chunk = unique[i:i + self._batch_max]
+                vectors.update(zip(chunk, self._embed_many(chunk)))
+        except BaseException as e:
+            for _, future in batch:
+                future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for text, future in batch:
+            future.set_result(vectors[text])
+
+
+class EmbeddingService:
+    def __init__(self, query_config: Optional[EmbeddingQueryConfig] = None):
+        self._embeddings = lazy(get_upstage_embeddings)
+        self.query_config = query_config or EmbeddingQueryConfig()
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._batcher = _QueryBatcher(self._embed_queries, self.query_config.batch_max)
 
     def create_embeddings(self, texts: List[str]) -> List[List[float]]:
-        return self._embeddings.embed_documents(texts)
+        check_cancelled("embedding")
+        with span("embedding.create_embeddings", kind=SPAN_KIND_CLIENT, texts=len(texts)):
+            # 동시에 들어온 같은 텍스트 묶음은 업스트림 호출 하나를 공유한다
+            embeddings, _ = get_group("embeddings").do(
+                ("documents", tuple(texts)),
+                lambda: get_policy("embeddings").call(
+                    lambda: self._embeddings.embed_documents(texts), idempotent=True
+                ),
+            )
+            return embeddings
 
     def create_embedding(self, text: str) -> List[float]:
-        return self._embeddings.embed_query(text)
+        check_cancelled("embedding")
+        cached = self._cache_get(text)
+        if cached is not None:
+            return cached
+        window = _batch_window.get()
+        if window is None and self.query_config.batch_window > 0:
+            window = self.query_config.batch_window
+        with span("embedding.create_embedding", kind=SPAN_KIND_CLIENT, batched=window is not None):
+            if window is not None:
+                try:
+                    embedding = self._batcher.embed(text, window)
+                except Exception as e:
+                    # 묶음의 leader 요청이 취소돼 실패했다면 이 요청은 따로 다시 한다
+                    if find_cancelled(e) is None:
+                        raise
+                    check_cancelled("embedding")
+                    embedding = self._embed_query(text)
+            else:
+                embedding = self._embed_query(text)
+        self._cache_put(text, embedding)
+        return embedding
+
+    def prime_queries(self, texts: Sequence[str]) -> int:
+        """
+        곧 검색할 질의들의 임베딩을 batch_max개씩 한 번에 받아 캐시에 넣는다. 새로 임베딩한 수를 반환한다.
+        캐시를 끈 경우(EMBED_QUERY_CACHE_SIZE=0)에는 아무것도 하지 않는다.
+        """
+        if self.query_config.cache_size <= 0:
+            return 0
+        missing = [t for t in dict.fromkeys(texts) if self._cache_peek(t) is None]
+        step = max(1, self.query_config.batch_max)
+        for i in range(0, len(missing), step):
+            check_cancelled("embedding")
+            chunk = missing[i:i + step]
+            with span("embedding.prime_queries", kind=SPAN_KIND_CLIENT, texts=len(chunk)):
+                for text, vector in zip(chunk, self._embed_queries(chunk)):
+                    self._cache_put(text, vector)
+        return len(missing)
+
+    # --- upstream --------------------------------------------------------
+
+    def _embed_query(self, text: str) -> List[float]:
+        embedding, _ = get_group("embeddings").do(
+            ("query", text),
+            lambda: get_policy("embeddings").call(
+                lambda: self._embeddings.embed_query(text), idempotent=True
+            ),
+        )
+        return embedding
+
+    def _embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """질의 여러 개를 요청 한 번으로 임베딩한다 (embed_query와 같은 -query 모델)."""
+        QUERY_EMBEDDING_BATCH_SIZE.observe(len(texts))
+        if len(texts) == 1:
+            return [self._embed_query(texts[0])]
+
+        def call():
+            # embed_query와 같은 요청 파라미터(model_kwargs/dimensions 포함, 모델명 정규화 후 -query)를 쓴다
+            params = self._embeddings._invocation_params
+            params["model"] = params["model"] + "-query"
+            response = self._embeddings.client.create(input=list(texts), **params)
+            return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+        embeddings, _ = get_group("embeddings").do(
+            ("queries", tuple(texts)),
+            lambda: get_policy("embeddings").call(call, idempotent=True),
+        )
+        return embeddings
+
+    # --- cache -----------------------------------------------------------
+
+    def _cache_peek(self, text: str) -> Optional[List[float]]:
+        with self._cache_lock:
+            return self._cache.get(text)
+
+    def _cache_get(self, text: str) -> Optional[List[float]]:
+        if self.query_config.cache_size <= 0:
+            return None
+        with self._cache_lock:
+            embedding = self._cache.get(text)
+            if embedding is not None:
+                self._cache.move_to_end(text)
+        QUERY_EMBEDDING_CACHE_TOTAL.inc(result="hit" if embedding is not None else "miss")
+        return embedding
+
+    def _cache_put(self, text: str, embedding: List[float]):
+        if self.query_config.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[text] = embedding
+            self._cache.move_to_end(text)
+            while len(self._cache) > self.query_config.cache_size:
+                self._cache.popitem(last=False)
@@ -0,0 +1,389 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 동작 (단일 프로세스 실행 가정)
+    fcntl = None
+
+from dotenv import load_dotenv
+
+from app.core.admission import admission_priority, PRIORITY_AUGMENT
+from app.core.metrics import counter, gauge, histogram
+from app.service.vector_service import VectorService
+
+load_dotenv()
+
+logger = logging.getLogger("knowledge_writer")
+
+WRITER_QUEUE_DEPTH = gauge("knowledge_writer_queue_depth", "저장 대기 중인 지식 문서 수")
+WRITER_WRITES_TOTAL = counter(
+    "knowledge_writer_writes_total", "지식 문서 저장 결과", ["result"]
+)
+WRITER_BATCH_SIZE = histogram(
+    "knowledge_writer_batch_size",
+    "한 번에 임베딩/저장한 문서 수",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+WRITER_FLUSH_SECONDS = histogram(
+    "knowledge_writer_flush_seconds", "배치 하나의 임베딩+저장 시간"
+)
+WRITER_RYW_WAIT_SECONDS = histogram(
+    "knowledge_writer_read_your_writes_wait_seconds",
+    "같은 요청의 쓰기가 반영될 때까지 검색이 기다린 시간",
+)
+
+
+class KnowledgeWriterConfig:
+    def __init__(self):
+        self.enabled = os.getenv("KNOWLEDGE_WRITER_ENABLED", "true").lower() == "true"
+        self.max_queue = int(os.getenv("KNOWLEDGE_WRITER_MAX_QUEUE", "1000"))
+        self.batch_size = int(os.getenv("KNOWLEDGE_WRITER_BATCH_SIZE", "32"))
+        self.flush_interval = float(os.getenv("KNOWLEDGE_WRITER_FLUSH_INTERVAL", "0.5"))
+        # 큐에 들어간 문서를 먼저 기록해 두는 파일 (비정상 종료 후 재기동 시 복구).
+        # 실제 파일은 프로세스마다 따로 쓴다: knowledge_spill.<pid>.jsonl
+        self.spill_path = os.getenv("KNOWLEDGE_WRITER_SPILL_PATH", "./cache/knowledge_spill.jsonl")
+        self.fsync = os.getenv("KNOWLEDGE_WRITER_FSYNC", "true").lower() == "true"
+        # 같은 요청의 검색이 직전 쓰기를 볼 수 있도록 기다리는 최대 시간(초), 0이면 기다리지 않음
+        self.read_your_writes_timeout = float(os.getenv("KNOWLEDGE_WRITER_RYW_TIMEOUT", "5"))
+        self.retry_interval = float(os.getenv("KNOWLEDGE_WRITER_RETRY_INTERVAL", "2"))
+        # 한 문서를 단독으로 이만큼 저장하지 못하면 재시도를 멈추고 spill 파일에만 남긴다 (재기동 시 다시 시도)
+        self.max_attempts = int(os.getenv("KNOWLEDGE_WRITER_MAX_ATTEMPTS", "5"))
+
+
+def document_id(content: str, metadata: Dict[str, Any]) -> str:
+    """내용 기반 ID. 같은 문서를 여러 번 저장해도 한 번만 들어간다."""
+    payload = content + json.dumps(metadata, sort_keys=True, ensure_ascii=False)
+    return "kb_" + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def process_spill_path(base: str, pid: Optional[int] = None) -> str:
+    """프로세스별 spill 파일 경로. uvicorn 워커들이 서로의 대기 문서를 덮어쓰지 않도록 pid를 붙인다."""
+    root, ext = os.path.splitext(base)
+    return f"{root}.{pid or os.getpid()}{ext}"
+
+
+def _spill_owner(path: str, base: str) -> Optional[int]:
+    """process_spill_path로 만든 파일이면 그 pid. 예전 공용 파일(base)이면 None."""
+    root, ext = os.path.splitext(base)
+    middle = path[len(root) + 1:len(path) - len(ext)]
+    return int(middle) if middle.isdigit() else None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def _spill_lock(base: str) -> Iterator[None]:
+    """여러 워커가 동시에 기동해도 종료된 프로세스의 spill 파일을 한 워커만 가져가도록 잠근다."""
+    if fcntl is None:
+        yield
+        return
+    directory = os.path.dirname(base)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(base + ".lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class KnowledgeWriter:
+    """
+    add_to_medical_qa의 write-behind 저장소. 도구 호출은 문서를 큐에 넣고 바로 반환하고,
+    백그라운드 스레드가 여러 요청의 문서를 모아 임베딩 한 번 + collection.add 한 번으로 저장한다.
+    """
+
+    def __init__(self, vector_service: VectorService, config: Optional[KnowledgeWriterConfig] = None):
+        self.vector_service = vector_service
+        self.config = config or KnowledgeWriterConfig()
+        self.spill_path = process_spill_path(self.config.spill_path)
+        # id -> record (삽입 순서 유지). 저장이 끝날 때까지 남아 있다
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # 계속 실패해 재시도를 멈춘 문서. spill 파일에는 남는다
+        self._parked: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._in_flight: Set[str] = set()
+        self._scopes: Dict[str, Set[str]] = {}
+        self._cond = threading.Condition()
+        self._flush_requested = False
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        WRITER_QUEUE_DEPTH.set_function(lambda: len(self._pending))
+
+    # --- lifecycle -------------------------------------------------------
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._recover()
+        self._thread = threading.Thread(target=self._run, name="knowledge-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """남은 문서를 저장하고 스레드를 멈춘다. 저장하지 못한 문서는 spill 파일에 남는다."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _recover(self):
+        """
+        이 프로세스의 이전 실행(같은 pid)과 이미 종료된 프로세스가 남긴 spill 파일을 가져온다.
+        살아 있는 다른 워커의 파일은 건드리지 않는다. 가져온 문서를 이 프로세스의 spill 파일에 먼저 쓴 뒤
+        원래 파일을 지운다.
+        """
+        base = self.config.spill_path
+        root, ext = os.path.splitext(base)
+        with _spill_lock(base), self._cond:
+            adopted = []
+            for path in [base] + sorted(glob.glob(f"{glob.escape(root)}.*{ext}")):
+                if not os.path.exists(path):
+                    continue
+                owner = _spill_owner(path, base)
+                if path != base and owner is None:
+                    continue
+                if owner is not None and owner != os.getpid() and _pid_alive(owner):
+                    continue
+                recovered = self._read_spill(path)
+                if recovered:
+                    logger.info(f"Recovered {recovered} pending knowledge documents from {path}")
+                adopted.append(path)
+            if not adopted:
+                return
+            self._rewrite_spill()
+            for path in adopted:
+                if path != self.spill_path and os.path.exists(path):
+                    os.remove(path)
+
+    def _read_spill(self, path: str) -> int:
+        recovered = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 쓰는 도중 종료된 마지막 줄
+                    continue
+                if record["id"] not in self._pending:
+                    record["scope"] = None
+                    self._pending[record["id"]] = record
+                    recovered += 1
+        return recovered
+
+    # --- producer side ---------------------------------------------------
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @property
+    def parked(self) -> int:
+        return len(self._parked)
+
+    def submit(self, content: str, metadata: Dict[str, Any], scope: Optional[str] = None) -> str:
+        """
+        문서를 저장 대기열에 넣고 ID를 반환한다. 대기열이 가득 차면 호출한 스레드에서
+        바로 저장한다 (배압).
+        """
+        doc_id = document_id(content, metadata)
+        record = {"id": doc_id, "content": content, "metadata": metadata}
+        with self._cond:
+            if doc_id in self._pending or doc_id in self._parked:
+                if doc_id in self._pending:
+                    self._track_scope(scope, doc_id)
+                WRITER_WRITES_TOTAL.inc(result="deduplicated")
+                return doc_id
+            full = len(self._pending) >= self.config.max_queue
+            if not full:
+                self._append_spill(record)
+                self._pending[doc_id] = dict(record, scope=scope)
+                self._track_scope(scope, doc_id)
+                if len(self._pending) >= self.config.batch_size:
+                    self._cond.notify_all()
+        if full:
+            self.vector_service.add_documents([content], [metadata], ids=[doc_id])
+            WRITER_WRITES_TOTAL.inc(result="sync_fallback")
+        return doc_id
+
+    def _track_scope(self, scope: Optional[str], doc_id: str):
+        if scope:
+            self._scopes.setdefault(scope, set()).add(doc_id)
+
+    def wait_for_scope(self, scope: Optional[str], timeout: Optional[float] = None) -> bool:
+        """
+        scope(요청)가 넣은 문서가 모두 저장될 때까지 기다린다 (read-your-writes).
+        즉시 저장을 요청하므로 flush 주기만큼 기다리지 않는다. 시간 안에 끝나면 True.
+        """
+        if not scope:
+            return True
+        if timeout is None:
+            timeout = self.config.read_your_writes_timeout
+        start = time.monotonic()
+        with self._cond:
+            if not self._scopes.get(scope):
+                self._scopes.pop(scope, None)
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            done = self._cond.wait_for(lambda: not self._scopes.get(scope), timeout)
+            if done:
+                self._scopes.pop(scope, None)
+        WRITER_RYW_WAIT_SECONDS.observe(time.monotonic() - start)
+        return done
+
+    def release_scope(self, scope: Optional[str]):
+        """요청이 끝나면 scope 추적만 정리한다 (문서 저장은 계속된다)."""
+        if scope:
+            with self._cond:
+                self._scopes.pop(scope, None)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """대기 중인 문서를 모두 저장할 때까지 기다린다."""
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._pending, timeout)
+
+    # --- spill file ------------------------------------------------------
+
+    def _append_spill(self, record: Dict[str, Any]):
+        path = self.spill_path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if self.config.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _rewrite_spill(self):
+        """저장이 끝난 문서를 spill 파일에서 뺀다 (남은 대기분만 다시 쓴 뒤 교체). 이 프로세스의 파일만 다룬다."""
+        path = self.spill_path
+        if not self._pending and not self._parked:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in list(self._pending.values()) + list(self._parked.values()):
+                data = {k: record[k] for k in ("id", "content", "metadata")}
+                f.write(json.dumps(data, ensure_ascii=False) + "\n")
+            if self.config.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    # --- writer thread ---------------------------------------------------
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        for doc_id, record in self._pending.items():
+            if doc_id in self._in_flight:
+                continue
+            if record.get("attempts"):
+                # 실패한 배치에 있던 문서는 하나씩 저장해 문제 문서만 가려낸다
+                if batch:
+                    continue
+                batch = [record]
+                break
+            batch.append(record)
+            if len(batch) >= self.config.batch_size:
+                break
+        self._in_flight.update(r["id"] for r in batch)
+        return batch
+
+    def _has_retries(self) -> bool:
+        return any(record.get("attempts") for record in self._pending.values())
+
+    def _run(self):
+        with admission_priority(PRIORITY_AUGMENT):
+            while True:
+                with self._cond:
+                    if not self._stopping and not self._flush_requested:
+                        self._cond.wait_for(
+                            lambda: self._stopping
+                            or self._flush_requested
+                            or len(self._pending) >= self.config.batch_size
+                            or self._has_retries(),
+                            self.config.flush_interval,
+                        )
+                    self._flush_requested = False
+                    stopping = self._stopping
+                    batch = self._take_batch()
+                if batch:
+                    ok = self._write(batch)
+                    # 여러 문서 배치가 실패하면 기다리지 않고 바로 하나씩 나눠 다시 시도한다
+                    if not ok and not stopping and len(batch) == 1:
+                        time.sleep(self.config.retry_interval)
+                    elif ok:
+                        continue
+                if stopping:
+                    return
+
+    def _park(self, record: Dict[str, Any]):
+        """재시도를 멈춘다. 뒤에 쌓인 문서가 막히지 않도록 대기열에서 빼고 spill 파일에만 남긴다."""
+        logger.error(
+            f"Giving up on knowledge document {record['id']} after {record['attempts']} attempts; "
+            f"kept in {self.spill_path} for the next restart"
+        )
+        WRITER_WRITES_TOTAL.inc(result="abandoned")
+        self._pending.pop(record["id"], None)
+        self._parked[record["id"]] = record
+        for ids in self._scopes.values():
+            ids.discard(record["id"])
+        self._cond.notify_all()
+
+    def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        start = time.perf_counter()
+        try:
+            self.vector_service.add_documents(
+                [r["content"] for r in batch],
+                [r["metadata"] for r in batch],
+                ids=[r["id"] for r in batch],
+            )
+        except Exception as e:
+            logger.error(f"Knowledge batch write failed ({len(batch)} docs): {e}")
+            WRITER_WRITES_TOTAL.inc(len(batch), result="error")
+            with self._cond:
+                self._in_flight.difference_update(r["id"] for r in batch)
+                for record in batch:
+                    record["attempts"] = record.get("attempts", 0) + 1
+                if len(batch) == 1 and batch[0]["attempts"] >= self.config.max_attempts:
+                    self._park(batch[0])
+            return False
+
+        WRITER_FLUSH_SECONDS.observe(time.perf_counter() - start)
+        WRITER_BATCH_SIZE.observe(len(batch))
+        WRITER_WRITES_TOTAL.inc(len(batch), result="ok")
+        with self._cond:
+            for record in batch:
+                self._pending.pop(record["id"], None)
+                self._in_flight.discard(record["id"])
+                for ids in self._scopes.values():
+                    ids.discard(record["id"])
+            try:
+                self._rewrite_spill()
+            except OSError as e:
+                logger.warning(f"Knowledge spill file rewrite failed: {e}")
+            self._cond.notify_all()
+        return True
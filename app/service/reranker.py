@@ -0,0 +1,64 @@
+import os
+from typing import List, Optional, Sequence
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class RetrievalConfig:
+    def __init__(self):
+        # 후보를 더 가져와 MMR로 서로 비슷한 결과(같은 질문의 다른 표현 등)를 걸러낸다
+        self.mmr_enabled = os.getenv("SEARCH_MMR_ENABLED", "false").lower() == "true"
+        # 1.0이면 관련도만, 0.0이면 다양성만 본다
+        self.mmr_lambda = float(os.getenv("SEARCH_MMR_LAMBDA", "0.7"))
+        self.fetch_multiplier = int(os.getenv("SEARCH_MMR_FETCH_MULTIPLIER", "4"))
+        # Chroma가 돌려준 거리 기준 (기본 컬렉션은 l2 제곱 거리, 정규화 임베딩이면 2 - 2·cos).
+        # 비워 두면 자르지 않는다
+        max_distance = os.getenv("SEARCH_MAX_DISTANCE", "")
+        self.max_distance: Optional[float] = float(max_distance) if max_distance else None
+        # 거리로 잘라도 최소한 남길 결과 수 (0이면 모두 잘려 결과 없음이 될 수 있다)
+        self.min_results = int(os.getenv("SEARCH_MIN_RESULTS", "0"))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def mmr(
+    query_embedding: Sequence[float],
+    embeddings: Sequence[Sequence[float]],
+    k: int,
+    lambda_mult: float = 0.7,
+) -> List[int]:
+    """
+    Maximal Marginal Relevance. 질의와의 코사인 유사도에서 이미 고른 결과와의 최대 유사도를
+    빼서 점수를 매기고, 점수가 가장 높은 후보를 하나씩 고른다. 고른 순서대로 인덱스를 반환한다.
+    """
+    if k <= 0 or len(embeddings) == 0:
+        return []
+    candidates = _normalize(np.asarray(embeddings, dtype=np.float32))
+    query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+
+    selected = [int(np.argmax(relevance))]
+    # 후보별로 지금까지 고른 결과와의 최대 유사도
+    redundancy = similarity[selected[0]].copy()
+    while len(selected) < min(k, len(candidates)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        np.maximum(redundancy, similarity[best], out=redundancy)
+    return selected
+
+
+def distance_cutoff(distances: Sequence[float], max_distance: Optional[float], min_results: int = 0) -> int:
+    """거리 오름차순 결과에서 남길 개수. max_distance를 넘는 결과부터 자른다."""
+    if max_distance is None:
+        return len(distances)
+    keep = sum(1 for d in distances if d <= max_distance)
+    return max(keep, min(min_results, len(distances)))
@@ -1,14 +1,77 @@
-from typing import List, Dict, Any, Optional
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple
+from .chunker import TextChunker, merge_chunks
+from .domain_router import DOMAIN_INFERENCE_TOTAL, DomainRouter
 from .embedding_service import EmbeddingService
+from .reranker import RetrievalConfig, distance_cutoff, mmr
+from ..core.cancellation import check_cancelled
+from ..core.metrics import counter, histogram
+from ..core.tracing import span
 from ..repository.vector.vector_repo import VectorRepository
 
+# 청크 위치 메타데이터 (부모 문서 복원용). 검색 결과를 부모로 합칠 때는 떼어낸다
+CHUNK_METADATA_KEYS = ("parent_id", "chunk_index", "chunk_count", "chunk_start", "chunk_end")
+
+VECTOR_SEARCH_RESULTS = histogram(
+    "vector_search_results",
+    "검색 한 번이 돌려준 결과 수 (거리 컷/MMR 적용 후)",
+    buckets=(0, 1, 2, 3, 4, 5, 8, 10, 20),
+)
+VECTOR_SEARCH_DROPPED_TOTAL = counter(
+    "vector_search_dropped_total", "검색 후보 중 버린 결과 수", ["reason"]
+)
+
+
+def split_documents(
+    chunker: TextChunker,
+    documents: List[str],
+    metadatas: Optional[List[Dict[str, Any]]],
+    ids: Optional[List[str]],
+) -> Tuple[List[str], Optional[List[Optional[Dict[str, Any]]]], List[str]]:
+    """문서를 저장 단위(청크 텍스트, 메타데이터, ID)로 펼친다. 오프라인 임베딩 빌드도 같은 규칙을 쓴다."""
+    texts, chunk_metadatas, chunk_ids = [], [], []
+    chunked = False
+    for i, document in enumerate(documents):
+        parent_id = ids[i] if ids else "doc_" + hashlib.sha256(document.encode("utf-8")).hexdigest()[:32]
+        metadata = dict(metadatas[i]) if metadatas and metadatas[i] else {}
+        chunks = chunker.split(document)
+        if len(chunks) == 1:
+            texts.append(document)
+            chunk_metadatas.append(metadata or None)
+            chunk_ids.append(parent_id)
+            continue
+        chunked = True
+        for index, chunk in enumerate(chunks):
+            texts.append(chunk.text)
+            chunk_metadatas.append({
+                **metadata,
+                "parent_id": parent_id,
+                "chunk_index": index,
+                "chunk_count": len(chunks),
+                "chunk_start": chunk.start,
+                "chunk_end": chunk.end,
+            })
+            chunk_ids.append(f"{parent_id}#{index}")
+    if metadatas is None and not chunked:
+        # 기존과 같이 저장소 기본 메타데이터를 쓰게 둔다
+        chunk_metadatas = None
+    return texts, chunk_metadatas, chunk_ids
+
 
 class VectorService:
     def __init__(
-        self, vector_repository: VectorRepository, embedding_service: EmbeddingService
+        self,
+        vector_repository: VectorRepository,
+        embedding_service: EmbeddingService,
+        chunker: Optional[TextChunker] = None,
+        retrieval_config: Optional[RetrievalConfig] = None,
+        domain_router: Optional[DomainRouter] = None,
     ):
         self.vector_repository = vector_repository
         self.embedding_service = embedding_service
+        self.chunker = chunker or TextChunker()
+        self.retrieval_config = retrieval_config or RetrievalConfig()
+        self.domain_router = domain_router or DomainRouter(vector_repository)
 
     def add_documents(
         self,
@@ -16,29 +79,153 @@ class VectorService:
         metadatas: List[Dict[str, Any]] = None,
         ids: List[str] = None
     ):
-            
-        embeddings = self.embedding_service.create_embeddings(documents)
+        # 긴 문서는 문장 단위 청크로 나눠 청크마다 임베딩한다 (배치 전체가 임베딩 한 번)
+        chunk_texts, chunk_metadatas, chunk_ids = split_documents(self.chunker, documents, metadatas, ids)
+        embeddings = self.embedding_service.create_embeddings(chunk_texts)
         self.vector_repository.add_documents(
-            documents=documents, embeddings=embeddings, metadatas=metadatas, ids=ids
+            documents=chunk_texts, embeddings=embeddings, metadatas=chunk_metadatas, ids=chunk_ids
         )
+        self.domain_router.observe(embeddings, chunk_metadatas)
 
-    def search(self, query: str, n_results: int = 5) -> Dict[str, Any]:
-        query_embedding = self.embedding_service.create_embedding(query)
+    def search(
+        self,
+        query: str,
+        n_results: int = 5,
+        collapse: Optional[bool] = None,
+        expand: bool = False,
+        use_mmr: Optional[bool] = None,
+        max_distance: Optional[float] = None,
+        where: Optional[Dict[str, Any]] = None,
+        infer_domain: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """
+        collapse=True면 같은 부모 문서의 청크들을 하나의 결과로 합친다 (None이면 설정값).
+        expand=True면 합친 결과 대신 부모 문서 전체를 돌려준다.
+        use_mmr=True면 후보를 더 가져와 서로 비슷한 결과를 걸러낸다 (None이면 설정값).
+        max_distance보다 먼 결과는 버리므로 n_results보다 적게(0개도) 돌려줄 수 있다.
+        where는 Chroma 메타데이터 필터 (예: {"domain": "..."}). where가 없고 infer_domain이면
+        (None이면 설정값) 질의 임베딩으로 도메인을 추론해 필터를 건다.
+        """
+        check_cancelled("search")
+        config = self.retrieval_config
+        if collapse is None:
+            collapse = self.chunker.config.collapse_results
+        if use_mmr is None:
+            use_mmr = config.mmr_enabled
+        if max_distance is None:
+            max_distance = config.max_distance
+        if infer_domain is None:
+            infer_domain = self.domain_router.config.infer
+        # 합치면 결과 수가 줄어들므로 넉넉히 가져온다
+        keep = n_results * 3 if collapse else n_results
+        fetch = max(keep, n_results * config.fetch_multiplier) if use_mmr else keep
+        include = ["documents", "metadatas", "distances"]
+        if use_mmr:
+            include.append("embeddings")
+        with span("vector.search", n_results=n_results, collapse=collapse, mmr=use_mmr) as s:
+            query_embedding = self.embedding_service.create_embedding(query)
 
-        results = self.vector_repository.query(
-            query_embeddings=[query_embedding],
-            n_results=n_results,
-            include=["documents", "metadatas", "distances"],
-        )
+            inferred = False
+            if where is None and infer_domain:
+                domain = self.domain_router.infer(query_embedding)
+                if domain is not None:
+                    where, inferred = {"domain": domain}, True
+            if s is not None and where is not None:
+                s.set_attribute("where", str(where))
+
+            results = self.vector_repository.query(
+                query_embeddings=[query_embedding],
+                n_results=fetch,
+                include=include,
+                where=where,
+            )
+            if inferred and not results["ids"][0]:
+                # 추론한 도메인이 틀렸을 수 있으니 필터 없이 다시 찾는다
+                DOMAIN_INFERENCE_TOTAL.inc(result="fallback")
+                results = self.vector_repository.query(
+                    query_embeddings=[query_embedding], n_results=fetch, include=include
+                )
+
+            documents = results["documents"][0]
+            metadatas = results["metadatas"][0]
+            distances = results["distances"][0]
+            ids = (results.get("ids") or [[None] * len(documents)])[0]
+
+            cut = distance_cutoff(distances, max_distance, config.min_results)
+            if cut < len(documents):
+                VECTOR_SEARCH_DROPPED_TOTAL.inc(len(documents) - cut, reason="distance")
+            order = list(range(cut))
+            if use_mmr and cut:
+                embeddings = results["embeddings"][0][:cut]
+                order = mmr(query_embedding, embeddings, min(keep, cut), config.mmr_lambda)
+                VECTOR_SEARCH_DROPPED_TOTAL.inc(cut - len(order), reason="mmr")
+            else:
+                order = order[:keep]
+            ids, documents, metadatas, distances = (
+                [ids[i] for i in order],
+                [documents[i] for i in order],
+                [metadatas[i] for i in order],
+                [distances[i] for i in order],
+            )
+
+            if collapse:
+                documents, metadatas, distances = self._collapse(ids, documents, metadatas, distances, expand)
+            documents, metadatas, distances = (
+                documents[:n_results], metadatas[:n_results], distances[:n_results]
+            )
+            VECTOR_SEARCH_RESULTS.observe(len(documents))
+            if s is not None:
+                s.set_attribute("results", len(documents))
 
         return {
-            "documents": results["documents"][0],
-            "metadatas": results["metadatas"][0],
-            "distances": results["distances"][0],
+            "documents": documents,
+            "metadatas": metadatas,
+            "distances": distances,
         }
 
+    def _collapse(self, ids, documents, metadatas, distances, expand: bool):
+        groups: Dict[str, Dict[str, Any]] = {}
+        for doc_id, document, metadata, distance in zip(ids, documents, metadatas, distances):
+            metadata = metadata or {}
+            parent_id = metadata.get("parent_id") or doc_id or document
+            group = groups.setdefault(parent_id, {"chunks": [], "metadata": metadata, "distance": distance})
+            group["distance"] = min(group["distance"], distance)
+            group["chunks"].append((
+                metadata.get("chunk_index", 0),
+                metadata.get("chunk_start", 0),
+                metadata.get("chunk_end", len(document)),
+                document,
+            ))
+
+        # 부모는 처음 나온 순서대로 둔다 (거리순 입력이면 거리순, MMR이면 MMR 순서)
+        collapsed = groups.items()
+        out_documents, out_metadatas, out_distances = [], [], []
+        for parent_id, group in collapsed:
+            metadata = {k: v for k, v in group["metadata"].items() if k not in CHUNK_METADATA_KEYS}
+            if "parent_id" in group["metadata"]:
+                metadata["parent_id"] = parent_id
+                metadata["matched_chunks"] = len(group["chunks"])
+            text = self.get_parent_document(parent_id) if expand else None
+            out_documents.append(text or merge_chunks(group["chunks"]))
+            out_metadatas.append(metadata)
+            out_distances.append(group["distance"])
+        return out_documents, out_metadatas, out_distances
+
+    def get_parent_document(self, parent_id: str) -> Optional[str]:
+        """청크로 저장된 문서를 원문 순서대로 다시 합친다. 청크가 없으면 단일 문서를 찾는다."""
+        result = self.vector_repository.get(where={"parent_id": parent_id})
+        if result["documents"]:
+            return merge_chunks([
+                (m["chunk_index"], m["chunk_start"], m["chunk_end"], d)
+                for d, m in zip(result["documents"], result["metadatas"])
+            ])
+        result = self.vector_repository.get(ids=[parent_id])
+        return result["documents"][0] if result["documents"] else None
+
     def delete_document(self, doc_id: str):
         self.vector_repository.delete_documents([doc_id])
+        # 청크로 나뉘어 저장된 문서면 청크도 함께 지운다
+        self.vector_repository.delete_documents(where={"parent_id": doc_id})
 
     def get_collection_info(self) -> Dict[str, Any]:
         return self.vector_repository.get_collection_info()
@@ -0,0 +1,161 @@
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.core import admission
+from app.core.admission import (
+    AdmissionConfig,
+    AdmissionController,
+    UpstreamOverloaded,
+    admission_priority,
+    find_overload,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+)
+from app.core.http import InstrumentedTransport
+
+
+def _controller(monkeypatch, **env) -> AdmissionController:
+    for name, value in env.items():
+        monkeypatch.setenv(f"ADMISSION_TEST_{name}", str(value))
+    return AdmissionController("test", AdmissionConfig("test"))
+
+
+class TestAdmissionController:
+    @pytest.mark.unit
+    def test_interactive_is_served_before_queued_bulk(self, monkeypatch):
+        controller = _controller(monkeypatch, MAX_CONCURRENCY=1, BULK_SHARE=1)
+        controller.acquire(PRIORITY_BULK)
+        order = []
+
+        def worker(priority):
+            controller.acquire(priority)
+            order.append(priority)
+            controller.release()
+
+        bulk = threading.Thread(target=worker, args=(PRIORITY_BULK,))
+        bulk.start()
+        while controller.queued(PRIORITY_BULK) == 0:
+            time.sleep(0.001)
+        interactive = threading.Thread(target=worker, args=(PRIORITY_INTERACTIVE,))
+        interactive.start()
+        while controller.queued(PRIORITY_INTERACTIVE) == 0:
+            time.sleep(0.001)
+
+        controller.release()
+        bulk.join(2)
+        interactive.join(2)
+        assert order == [PRIORITY_INTERACTIVE, PRIORITY_BULK]
+
+    @pytest.mark.unit
+    def test_bulk_cannot_take_reserved_capacity(self, monkeypatch):
+        controller = _controller(monkeypatch, MAX_CONCURRENCY=2, BULK_SHARE=0.5)
+        controller.acquire(PRIORITY_BULK)
+
+        with pytest.raises(UpstreamOverloaded) as exc:
+            controller.acquire(PRIORITY_BULK, timeout=0.05)
+        assert exc.value.reason == "deadline"
+        # 남은 자리는 대화형 요청 몫
+        assert controller.acquire(PRIORITY_INTERACTIVE, timeout=0.05) < 0.05
+
+    @pytest.mark.unit
+    def test_full_queue_sheds_immediately(self, monkeypatch):
+        controller = _controller(monkeypatch, MAX_CONCURRENCY=1, MAX_QUEUE=1)
+        controller.acquire()
+        waiter = threading.Thread(target=lambda: controller.acquire(timeout=1))
+        waiter.start()
+        while controller.queued() == 0:
+            time.sleep(0.001)
+
+        start = time.monotonic()
+        with pytest.raises(UpstreamOverloaded) as exc:
+            controller.acquire()
+        assert exc.value.reason == "queue_full"
+        assert time.monotonic() - start < 0.1
+        controller.release()
+        waiter.join(2)
+
+    @pytest.mark.unit
+    def test_token_bucket_limits_rate(self, monkeypatch):
+        controller = _controller(monkeypatch, RATE=20, BURST=1, MAX_CONCURRENCY=10)
+        start = time.monotonic()
+        for _ in range(3):
+            controller.acquire()
+            controller.release()
+        # 버스트 1개 이후 초당 20개 → 나머지 2개에 약 0.1초
+        assert time.monotonic() - start >= 0.09
+
+
+class TestAdmissionTransport:
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        admission.reset_controllers()
+        yield
+        admission.reset_controllers()
+
+    @pytest.mark.unit
+    def test_rejected_call_becomes_non_retryable_503(self, monkeypatch):
+        monkeypatch.setenv("ADMISSION_EMBEDDINGS_MAX_CONCURRENCY", "2")
+        monkeypatch.setenv("ADMISSION_EMBEDDINGS_BULK_SHARE", "0.5")
+        monkeypatch.setenv("ADMISSION_EMBEDDINGS_TIMEOUT_BULK", "0")
+        admission.get_controller("embeddings").acquire(PRIORITY_BULK)
+        client = httpx.Client(
+            transport=InstrumentedTransport(
+                "upstage", httpx.MockTransport(lambda r: httpx.Response(200, json={}))
+            )
+        )
+
+        with admission_priority(PRIORITY_BULK):
+            response = client.post("https://api.upstage.ai/v1/solar/embeddings")
+        assert response.status_code == 503
+        assert response.headers["x-should-retry"] == "false"
+
+        with pytest.raises(httpx.HTTPStatusError) as exc:
+            response.raise_for_status()
+        overload = find_overload(exc.value)
+        assert overload.lane == "embeddings"
+        assert overload.reason == "deadline"
+
+        # 채팅 레인과 대화형 우선순위는 영향을 받지 않는다
+        assert client.post("https://api.upstage.ai/v1/solar/chat/completions").status_code == 200
+
+
+class TestKnowledgeRoutes:
+    @pytest.mark.unit
+    async def test_waiting_bulk_write_does_not_block_event_loop(self):
+        import asyncio
+
+        from fastapi import FastAPI
+
+        from app.api.route import agent_routers
+        from app.deps import get_agent_service
+
+        released = threading.Event()
+        started = threading.Event()
+
+        class WaitingAgentService:
+            def add_knowledge(self, documents, metadatas=None):
+                # bulk 우선순위로 수용 한도를 기다리는 상황
+                started.set()
+                released.wait(2)
+                return {"status": "success", "message": f"Added {len(documents)} documents"}
+
+            def get_knowledge_stats(self):
+                return {"name": "medical_qa", "count": 3}
+
+        app = FastAPI()
+        app.include_router(agent_routers.router)
+        app.dependency_overrides[get_agent_service] = WaitingAgentService
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            write = asyncio.create_task(client.post("/agent/knowledge", json={"documents": ["새 문서"]}))
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+            # 쓰기가 기다리는 동안에도 다른 요청은 바로 처리된다
+            stats = await asyncio.wait_for(client.get("/agent/stats"), timeout=1)
+            assert stats.json()["count"] == 3
+            assert not write.done()
+            released.set()
+            assert (await write).json()["status"] == "success"
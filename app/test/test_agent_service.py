@@ -0,0 +1,120 @@
+import re
+import threading
+import time
+from collections import Counter
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+
+from app.agents.subgraphs import answer_gen, evaluator, info_extractor, knowledge_augmentor
+from app.core.singleflight import SINGLEFLIGHT_CALLS_TOTAL
+from app.service.agent_service import AgentService
+
+
+class FakeVectorService:
+    def __init__(self, embedding_service=None):
+        self.embedding_service = embedding_service
+        self.queries = []
+
+    def search(self, query, n_results=5, where=None):
+        self.queries.append(query)
+        if self.embedding_service is not None:
+            self.embedding_service.create_embedding(query)
+        return {"documents": ["두통에는 휴식과 수분 섭취가 도움이 된다."], "metadatas": None}
+
+    def add_documents(self, documents, metadatas=None):
+        pass
+
+    def get_collection_info(self):
+        return {}
+
+
+class FakeChat:
+    """실제 super 그래프의 invoke_chat 대역: 내부 검색 한 번 -> 검증 성공 -> 답변 -> 평가."""
+
+    def __init__(self, gate: threading.Event = None):
+        self.calls = Counter()
+        self.gate = gate
+        self._lock = threading.Lock()
+
+    def __call__(self, llm, messages, agent_name, idempotent=False):
+        with self._lock:
+            self.calls[agent_name] += 1
+        if agent_name == "MedicalInfoExtractor":
+            if not any(isinstance(m, ToolMessage) for m in messages):
+                if self.gate is not None:
+                    self.gate.wait(2)
+                # 프롬프트의 "Original User Query"를 그대로 검색한다
+                match = re.search(r'"(.+?)"', messages[-1].content)
+                query = match.group(1) if match else messages[-1].content
+                return AIMessage(content="", tool_calls=[{"name": "search_medical_qa", "args": {"query": query}, "id": "s1"}])
+            return AIMessage(content="done")
+        if agent_name == "MedicalInfoVerifier":
+            return AIMessage(content='{"status": "success", "medical_context": "휴식과 수분 섭취"}')
+        if agent_name == "MedicalEvaluator":
+            return AIMessage(content='{"final_score": 8}')
+        return AIMessage(content=f"답변: {messages[-1].content}")
+
+
+def make_agent_service(monkeypatch, chat: FakeChat, vector_service=None) -> AgentService:
+    monkeypatch.setenv("UPSTAGE_API_KEY", "test")
+    monkeypatch.setenv("AUGMENT_FAST_PATH", "verify")
+    for module in (answer_gen, evaluator, info_extractor, knowledge_augmentor):
+        monkeypatch.setattr(module, "invoke_chat", chat)
+    return AgentService(vector_service=vector_service or FakeVectorService())
+
+
+def _oneshot_threads(service: AgentService):
+    return [t for t in service.graphs["super"].checkpointer.storage if str(t).startswith("oneshot-")]
+
+
+class TestAgentServiceRun:
+    @pytest.mark.unit
+    def test_sessionless_run_uses_throwaway_thread(self, monkeypatch):
+        chat = FakeChat()
+        service = make_agent_service(monkeypatch, chat)
+
+        result = service.run_agent("super", {"user_query": "두통이 계속돼요", "process_status": "start"})
+
+        assert result["answer_logs"][-1].content.startswith("답변")
+        assert result["process_status"]
+        assert chat.calls["MedicalInfoVerifier"] == 1
+        # 세션 없는 실행의 체크포인트는 끝나면 지운다
+        assert _oneshot_threads(service) == []
+
+    @pytest.mark.unit
+    def test_concurrent_identical_queries_share_one_invocation(self, monkeypatch):
+        gate = threading.Event()
+        chat = FakeChat(gate=gate)
+        service = make_agent_service(monkeypatch, chat)
+        before = SINGLEFLIGHT_CALLS_TOTAL.value(group="super_graph", role="coalesced")
+        results = []
+
+        def ask():
+            results.append(service.run_agent("super", {"user_query": "감기 증상", "process_status": "start"}))
+
+        threads = [threading.Thread(target=ask) for _ in range(2)]
+        for t in threads:
+            t.start()
+        deadline = time.monotonic() + 2
+        while SINGLEFLIGHT_CALLS_TOTAL.value(group="super_graph", role="coalesced") < before + 1:
+            if time.monotonic() > deadline:
+                break
+            time.sleep(0.001)
+        gate.set()
+        for t in threads:
+            t.join()
+
+        assert len(results) == 2
+        assert chat.calls["MedicalInfoVerifier"] == 1
+        assert [bool(r["token_usage"].get("coalesced")) for r in results].count(True) == 1
+        assert results[0]["answer_logs"][-1].content == results[1]["answer_logs"][-1].content
+        assert _oneshot_threads(service) == []
+
+    @pytest.mark.unit
+    def test_session_run_keeps_checkpoint(self, monkeypatch):
+        service = make_agent_service(monkeypatch, FakeChat())
+        service.run_agent("super", {"user_query": "두통", "process_status": "start"}, session_id="s-1")
+        checkpointer = service.graphs["super"].checkpointer
+        assert "s-1" in checkpointer.storage
+        checkpointer.delete_thread("s-1")
@@ -0,0 +1,246 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_upstage import UpstageEmbeddings
+from openai.types import CreateEmbeddingResponse, Embedding
+
+from app.api.route import agent_routers
+from app.core.admission import current_priority, PRIORITY_BULK
+from app.core.batch_chat import BatchChatConfig, parse_item, read_items, run_batch, write_jsonl, _completed_ids
+from app.core.cancellation import CancelToken
+from app.deps import get_agent_service
+from app.service import embedding_service as embedding_module
+from app.service.embedding_service import EmbeddingService, query_batching
+from app.test.test_agent_service import FakeChat, FakeVectorService, make_agent_service
+
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.primed = []
+
+    def prime_queries(self, texts):
+        self.primed.append(list(texts))
+        return len(texts)
+
+
+class FakeAgentService:
+    def __init__(self, delay: float = 0.02, fail_on: str = None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.vector_service = SimpleNamespace(embedding_service=FakeEmbeddingService())
+        self.running = 0
+        self.max_running = 0
+        self.contexts = []
+        self._lock = threading.Lock()
+
+    def run_agent(self, name, inputs, session_id=None, deadline_seconds=None):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.contexts.append((current_priority(), embedding_module._batch_window.get()))
+        try:
+            time.sleep(self.delay)
+            if inputs["user_query"] == self.fail_on:
+                raise RuntimeError("upstream failed")
+            return {
+                "user_query": inputs["user_query"],
+                "answer_logs": [HumanMessage(content=inputs["user_query"]), AIMessage(content=f"답변: {inputs['user_query']}")],
+                "eval_logs": [AIMessage(content='{"final_score": 8.5}')],
+                "answer_path": "rag",
+                "process_status": "audit_complete",
+                "token_usage": {"total_tokens": 100},
+            }
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def _items(n):
+    return [{"index": i, "id": str(i), "query": f"질문 {i}"} for i in range(n)]
+
+
+class TestBatchRunner:
+    @pytest.mark.unit
+    def test_parse_item(self):
+        assert parse_item("두통이 있어요\n", 0) == {"index": 0, "id": "0", "query": "두통이 있어요"}
+        assert parse_item('{"id": "faq-7", "query": "감기"}', 3) == {"index": 3, "id": "faq-7", "query": "감기"}
+        assert parse_item("   ", 1) is None
+        with pytest.raises(ValueError):
+            parse_item('{"id": 1}', 0)
+        assert [i["index"] for i in read_items(["a", "", "b"])] == [0, 1]
+
+    @pytest.mark.unit
+    def test_bounded_concurrency_and_records(self, monkeypatch):
+        monkeypatch.setenv("BATCH_CHAT_PRIME_CHUNK", "4")
+        service = FakeAgentService(fail_on="질문 3")
+
+        records = list(run_batch(service, _items(10), BatchChatConfig(), concurrency=3))
+
+        assert sorted(r["index"] for r in records) == list(range(10))
+        assert service.max_running <= 3
+        ok = next(r for r in records if r["index"] == 0)
+        assert ok["answer"] == "답변: 질문 0"
+        assert ok["score"] == 8.5 and ok["answer_path"] == "rag" and ok["total_tokens"] == 100
+        failed = next(r for r in records if r["index"] == 3)
+        assert failed["error"] == "upstream failed"
+        # 작업 스레드에서도 bulk 우선순위와 임베딩 묶음 범위가 적용된다
+        assert set(service.contexts) == {(PRIORITY_BULK, BatchChatConfig().embed_window)}
+        # 다음 질문들의 질의 임베딩을 묶음 단위로 미리 받는다
+        primed = service.vector_service.embedding_service.primed
+        assert [len(p) for p in primed] == [4, 4, 2]
+
+    @pytest.mark.unit
+    def test_cancel_stops_new_queries(self):
+        service = FakeAgentService(delay=0.05)
+        token = CancelToken("test")
+        seen = []
+        for record in run_batch(service, _items(20), BatchChatConfig(), concurrency=2, cancel_token=token):
+            seen.append(record)
+            token.cancel("client_disconnected")
+        assert len(seen) <= 2
+
+    @pytest.mark.unit
+    def test_resume_skips_completed_ids(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        with open(path, "w", encoding="utf-8") as f:
+            write_jsonl([{"id": "a", "answer": "x"}, {"id": "b", "error": "boom"}], f)
+            f.write('{"id": "c", "ans')
+        assert _completed_ids(str(path)) == {"a"}
+
+
+class TestBatchOnSuperGraph:
+    @pytest.mark.unit
+    def test_runs_real_graph_and_primes_query_embeddings(self, monkeypatch):
+        embedding_service = EmbeddingService()
+        fake = _upstage_embeddings()
+        embedding_service._embeddings = fake
+        vector_service = FakeVectorService(embedding_service)
+        chat = FakeChat()
+        service = make_agent_service(monkeypatch, chat, vector_service)
+
+        records = list(run_batch(service, _items(6), BatchChatConfig(), concurrency=3))
+
+        assert sorted(r["index"] for r in records) == list(range(6))
+        assert all("error" not in r for r in records), records
+        assert all(f'"{r["query"]}"' in r["answer"] for r in records)
+        assert all(r["score"] == 8 and r["answer_path"] == "rag" for r in records)
+        assert chat.calls["MedicalInfoVerifier"] == 6
+        # 검색 질의 임베딩은 미리 받은 묶음 요청 한 번으로 끝난다
+        assert sorted(vector_service.queries) == sorted(f"질문 {i}" for i in range(6))
+        fake.client.create.assert_called_once()
+        assert isinstance(fake.client.create.call_args.kwargs["input"], list)
+
+
+def _upstage_embeddings() -> UpstageEmbeddings:
+    """요청 파라미터는 실제 UpstageEmbeddings가 만들고, 업스트림(client.create)만 가짜로 바꾼다."""
+    # 접미사가 붙은 모델명도 embed_query처럼 정규화돼야 한다 (...-query-query가 되면 안 된다)
+    embeddings = UpstageEmbeddings(
+        api_key="test", model="solar-embedding-1-large-query", dimensions=2, model_kwargs={"encoding_format": "float"}
+    )
+
+    def create(input, **params):
+        # 단건(embed_query)은 두 번째 값이 -1, 묶음은 묶음 안의 위치
+        texts = [input] if isinstance(input, str) else input
+        data = [
+            Embedding(embedding=[float(len(t)), -1.0 if isinstance(input, str) else float(i)], index=i, object="embedding")
+            for i, t in enumerate(texts)
+        ]
+        return CreateEmbeddingResponse(
+            data=data, model=params["model"], object="list", usage={"prompt_tokens": 0, "total_tokens": 0}
+        )
+
+    embeddings.client = Mock()
+    embeddings.client.create.side_effect = create
+    return embeddings
+
+
+class TestQueryEmbeddings:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        monkeypatch.setenv("EMBED_QUERY_BATCH_MAX", "8")
+        service = EmbeddingService()
+        service._embeddings = _upstage_embeddings()
+        return service
+
+    @pytest.mark.unit
+    def test_prime_then_cache_hit(self, service):
+        create = service._embeddings.client.create
+        assert service.prime_queries(["두통", "감기", "두통"]) == 2
+        create.assert_called_once()
+        assert create.call_args.kwargs == {
+            "input": ["두통", "감기"],
+            "model": "solar-embedding-1-large-query",
+            "encoding_format": "float",
+            "dimensions": 2,
+        }
+
+        assert service.create_embedding("감기") == [2.0, 1.0]
+        create.assert_called_once()
+        assert service.prime_queries(["두통"]) == 0
+
+    @pytest.mark.unit
+    def test_batched_request_matches_embed_query_params(self, service):
+        service.create_embedding("두통")
+        single = dict(service._embeddings.client.create.call_args.kwargs)
+        service.prime_queries(["감기", "기침"])
+        batched = dict(service._embeddings.client.create.call_args.kwargs)
+        assert single.pop("input") == "두통" and batched.pop("input") == ["감기", "기침"]
+        assert batched == single
+
+    @pytest.mark.unit
+    def test_concurrent_queries_share_one_request(self, service):
+        results = {}
+
+        def search(text):
+            with query_batching(0.2):
+                results[text] = service.create_embedding(text)
+
+        threads = [threading.Thread(target=search, args=(f"질문{i}",)) for i in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert service._embeddings.client.create.call_count == 1
+        assert sorted(service._embeddings.client.create.call_args.kwargs["input"]) == sorted(results)
+        assert all(results[t][0] == float(len(t)) for t in results)
+
+    @pytest.mark.unit
+    def test_without_batching_uses_single_query(self, service):
+        assert service.create_embedding("두통") == [2.0, -1.0]
+        assert service._embeddings.client.create.call_args.kwargs["input"] == "두통"
+
+
+@pytest.fixture
+def client():
+    service = FakeAgentService(delay=0)
+    app = FastAPI()
+    app.include_router(agent_routers.router)
+    app.dependency_overrides[get_agent_service] = lambda: service
+    return TestClient(app)
+
+
+class TestBatchRoute:
+    @pytest.mark.unit
+    def test_streams_ndjson(self, client):
+        response = client.post(
+            "/agent/chat/batch",
+            json={"queries": ["두통", {"id": "faq-1", "query": "감기"}], "concurrency": 2},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert {r["id"]: r["answer"] for r in records} == {"0": "답변: 두통", "faq-1": "답변: 감기"}
+
+    @pytest.mark.unit
+    def test_rejects_oversized_batch(self, client, monkeypatch):
+        monkeypatch.setattr(agent_routers.batch_config, "max_queries", 2)
+        response = client.post("/agent/chat/batch", json={"queries": ["a", "b", "c"]})
+        assert response.status_code == 413
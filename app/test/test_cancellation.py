@@ -0,0 +1,203 @@
+import asyncio
+import contextvars
+import threading
+import time
+from typing import TypedDict
+
+import httpx
+import openai
+import pytest
+from langgraph.graph import END, StateGraph
+
+from app.api.route import agent_routers
+from app.core.cancellation import (
+    CANCELLED_CALLS_TOTAL,
+    REQUESTS_CANCELLED_TOTAL,
+    RequestCancelled,
+    cancel_scope,
+    check_cancelled,
+    current_cancel_token,
+    find_cancelled,
+)
+from app.core.http import InstrumentedTransport
+from app.core.resilience import ResilienceConfig, ResiliencePolicy, is_retryable
+from app.core.singleflight import SINGLEFLIGHT_CALLS_TOTAL, SingleFlight
+
+
+def _policy(monkeypatch) -> ResiliencePolicy:
+    monkeypatch.setenv("RESILIENCE_CANCEL_ENABLED", "true")
+    monkeypatch.setenv("RESILIENCE_CANCEL_TIMEOUT", "10")
+    return ResiliencePolicy("cancel", ResilienceConfig("cancel"))
+
+
+class TestCancellation:
+    @pytest.mark.unit
+    def test_check_cancelled_raises_once_token_is_cancelled(self):
+        before = REQUESTS_CANCELLED_TOTAL.value(endpoint="test", reason="client_disconnected")
+        with cancel_scope("test") as token:
+            check_cancelled("llm")
+            assert token.cancel("client_disconnected")
+            assert not token.cancel("client_disconnected")
+            with pytest.raises(RequestCancelled) as exc:
+                check_cancelled("llm")
+        assert exc.value.reason == "client_disconnected"
+        assert REQUESTS_CANCELLED_TOTAL.value(endpoint="test", reason="client_disconnected") == before + 1
+        assert current_cancel_token() is None
+        check_cancelled("llm")
+
+        wrapped = RuntimeError("sdk error")
+        wrapped.__cause__ = exc.value
+        assert find_cancelled(wrapped) is exc.value
+        assert not is_retryable(wrapped)
+
+    @pytest.mark.unit
+    def test_policy_stops_waiting_for_in_flight_call(self, monkeypatch):
+        policy = _policy(monkeypatch)
+        before = CANCELLED_CALLS_TOTAL.value(stage="cancel")
+        with cancel_scope("test") as token:
+            threading.Timer(0.05, token.cancel, args=("client_disconnected",)).start()
+            started = time.perf_counter()
+            with pytest.raises(RequestCancelled):
+                policy.call(lambda: time.sleep(1))
+        assert time.perf_counter() - started < 0.5
+        assert CANCELLED_CALLS_TOTAL.value(stage="cancel") == before + 1
+
+    @pytest.mark.unit
+    def test_transport_does_not_send_cancelled_requests(self):
+        sent = []
+        client = httpx.Client(
+            transport=InstrumentedTransport("serper", httpx.MockTransport(lambda r: sent.append(r) or httpx.Response(200)))
+        )
+        with cancel_scope("test") as token:
+            assert client.get("https://example.test/").status_code == 200
+            token.cancel("client_disconnected")
+            with pytest.raises(RequestCancelled):
+                client.get("https://example.test/")
+        assert len(sent) == 1
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("wrapped", [False, True])
+    def test_coalesced_caller_reruns_when_leader_is_cancelled(self, wrapped):
+        group = SingleFlight("cancel_test")
+        leader_started, release = threading.Event(), threading.Event()
+        calls, results = [], {}
+
+        def fn():
+            calls.append(1)
+            if len(calls) == 1:
+                leader_started.set()
+                release.wait()
+                cancelled = RequestCancelled("embedding", "client_disconnected")
+                if not wrapped:
+                    raise cancelled
+                # OpenAI SDK는 transport 예외를 APIConnectionError로 감싼다 (raise ... from err)
+                request = httpx.Request("POST", "https://api.upstage.ai/v1/embeddings")
+                raise openai.APIConnectionError(request=request) from cancelled
+            return "fresh"
+
+        def leader():
+            try:
+                group.do("key", fn)
+            except Exception as e:
+                if find_cancelled(e) is not None:
+                    results["leader"] = "cancelled"
+
+        def follower():
+            results["follower"] = group.do("key", fn)[0]
+
+        leader_thread = threading.Thread(target=leader)
+        leader_thread.start()
+        leader_started.wait()
+        before = SINGLEFLIGHT_CALLS_TOTAL.value(group="cancel_test", role="coalesced")
+        follower_thread = threading.Thread(target=follower)
+        follower_thread.start()
+        while SINGLEFLIGHT_CALLS_TOTAL.value(group="cancel_test", role="coalesced") == before:
+            time.sleep(0.001)
+        release.set()
+        leader_thread.join()
+        follower_thread.join()
+        assert results == {"leader": "cancelled", "follower": "fresh"}
+
+    @pytest.mark.unit
+    def test_graph_nodes_see_request_token(self):
+        class State(TypedDict):
+            seen: bool
+
+        def node(state):
+            return {"seen": current_cancel_token() is not None}
+
+        graph = StateGraph(State)
+        graph.add_node("node", node)
+        graph.set_entry_point("node")
+        graph.add_edge("node", END)
+        compiled = graph.compile()
+
+        async def run():
+            with cancel_scope("test"):
+                return [event async for event in compiled.astream({"seen": False}, stream_mode="updates")]
+
+        assert asyncio.run(run()) == [{"node": {"seen": True}}]
+
+
+class SlowAgentService:
+    def __init__(self):
+        self.outcome = None
+
+    def _work(self):
+        # 노드 안에서 LLM 호출을 반복하는 상황: 취소되면 다음 호출이 시작되지 않는다
+        deadline = time.monotonic() + 5
+        try:
+            while time.monotonic() < deadline:
+                check_cancelled("llm")
+                time.sleep(0.01)
+            self.outcome = "finished"
+        except RequestCancelled:
+            self.outcome = "cancelled"
+
+    async def stream_agent(self, name, inputs, session_id=None, deadline_seconds=None):
+        yield ((), {"info_extract_agent_workflow": {"loop_count": 1}})
+        # LangGraph가 동기 노드를 돌리는 방식과 같이 컨텍스트를 복사해 작업 스레드에서 실행
+        await asyncio.get_running_loop().run_in_executor(None, contextvars.copy_context().run, self._work)
+        yield ((), {"answer_gen_agent_workflow": {"process_status": "answered"}})
+
+
+class TestStreamDisconnect:
+    @pytest.mark.unit
+    def test_disconnect_cancels_in_flight_work(self, monkeypatch):
+        from fastapi import FastAPI
+        from app.deps import get_agent_service
+
+        monkeypatch.setattr(agent_routers.stream_config, "disconnect_poll", 0.02)
+        service = SlowAgentService()
+        app = FastAPI()
+        app.include_router(agent_routers.router)
+        app.dependency_overrides[get_agent_service] = lambda: service
+
+        messages = [{"type": "http.request", "body": '{"query": "두통"}'.encode(), "more_body": False}]
+        sent = []
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            # 첫 이벤트를 받은 뒤 브라우저 탭을 닫음
+            while not any(m.get("body") for m in sent if m["type"] == "http.response.body"):
+                await asyncio.sleep(0.01)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+            "method": "POST", "scheme": "http", "path": "/agent/chat/stream", "raw_path": b"/agent/chat/stream",
+            "root_path": "", "query_string": b"", "headers": [(b"content-type", b"application/json")],
+            "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+        }
+        before = REQUESTS_CANCELLED_TOTAL.value(endpoint="/agent/chat/stream", reason="client_disconnected")
+        started = time.perf_counter()
+        asyncio.run(asyncio.wait_for(app(scope, receive, send), 5))
+        assert service.outcome == "cancelled"
+        assert time.perf_counter() - started < 2
+        assert REQUESTS_CANCELLED_TOTAL.value(endpoint="/agent/chat/stream", reason="client_disconnected") == before + 1
+        body = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+        assert b"answer_gen_agent_workflow" not in body and b"error" not in body
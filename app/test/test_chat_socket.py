@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+from app.api.route import agent_routers
+from app.core.chat_socket import ChatSocketConfig, ChatSocketSession
+from app.deps import get_agent_service
+
+
+class FakeAgentService:
+    def __init__(self):
+        self.sessions = []
+        self.release = asyncio.Event()
+        self.block = False
+
+    async def stream_agent(self, name, inputs, session_id=None, deadline_seconds=None):
+        self.sessions.append(session_id)
+        yield ((), {"info_extract_agent_workflow": {"extract_logs": [AIMessage(content='{"status": "success"}')]}})
+        if self.block:
+            await self.release.wait()
+        yield ((), {"answer_gen_agent_workflow": {"answer_logs": [AIMessage(content=f"답변: {inputs['user_query']}")]}})
+        yield {"token_usage": {"total": {"input": 10, "output": 5}}}
+
+
+@pytest.fixture
+def service():
+    return FakeAgentService()
+
+
+@pytest.fixture
+def client(service):
+    app = FastAPI()
+    app.include_router(agent_routers.router)
+    app.dependency_overrides[get_agent_service] = lambda: service
+    return TestClient(app)
+
+
+def _until(ws, kind):
+    messages = []
+    while True:
+        message = ws.receive_json()
+        messages.append(message)
+        if message["type"] == kind:
+            return messages
+
+
+class TestChatSocket:
+    @pytest.mark.unit
+    def test_multiple_turns_share_one_session(self, client, service):
+        with client.websocket_connect("/agent/ws?session_id=s-1") as ws:
+            assert ws.receive_json() == {"type": "session", "session_id": "s-1"}
+            for turn, query in enumerate(["두통", "열도 나요"], start=1):
+                ws.send_json({"type": "turn", "query": query, "verbosity": "answer"})
+                messages = _until(ws, "turn_end")
+                assert messages[0]["type"] == "turn_start" and messages[0]["turn"] == turn
+                assert {"type": "event", "turn": turn, "data": {"answer": f"답변: {query}"}} in messages
+            ws.send_json({"type": "ping"})
+            assert ws.receive_json() == {"type": "pong"}
+        assert service.sessions == ["s-1", "s-1"]
+
+    @pytest.mark.unit
+    def test_cancel_and_reject_overlapping_turn(self, client, service):
+        service.block = True
+        with client.websocket_connect("/agent/ws") as ws:
+            session_id = ws.receive_json()["session_id"]
+            ws.send_json({"type": "turn", "query": "두통"})
+            messages = _until(ws, "event")
+            assert messages[-1]["data"]["info_extract_agent_workflow"]["extract_logs"][0]["content"] == '{"status": "success"}'
+
+            ws.send_json({"type": "turn", "query": "또"})
+            assert ws.receive_json() == {"type": "error", "turn": 1, "error": "turn in progress"}
+            ws.send_json({"type": "cancel"})
+            assert ws.receive_json() == {"type": "cancelled", "turn": 1}
+
+            ws.send_json({"type": "turn", "query": ""})
+            assert ws.receive_json()["type"] == "error"
+            ws.send_text("not json")
+            assert ws.receive_json() == {"type": "error", "error": "invalid message"}
+        assert service.sessions == [session_id]
+
+    @pytest.mark.unit
+    def test_slow_client_is_closed(self, service, monkeypatch):
+        monkeypatch.setenv("WS_SEND_QUEUE_SIZE", "1")
+        monkeypatch.setenv("WS_SEND_TIMEOUT", "0.05")
+
+        class StalledSocket:
+            def __init__(self):
+                self.closed = None
+                self.inbox = asyncio.Queue()
+
+            async def accept(self):
+                await self.inbox.put('{"type": "turn", "query": "두통", "verbosity": "debug"}')
+
+            async def receive_text(self):
+                return await self.inbox.get()
+
+            async def send_text(self, text):
+                await asyncio.sleep(3600)
+
+            async def close(self, code, reason):
+                self.closed = code
+
+        socket = StalledSocket()
+        asyncio.run(asyncio.wait_for(ChatSocketSession(socket, service, config=ChatSocketConfig()).run(), 5))
+        assert socket.closed == 1013
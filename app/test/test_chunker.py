@@ -0,0 +1,102 @@
+from unittest.mock import Mock
+
+import chromadb
+import pytest
+
+from app.repository.vector.vector_repo import ChromaDBRepository
+from app.service.chunker import ChunkerConfig, TextChunker, merge_chunks, split_sentences
+from app.service.vector_service import VectorService
+
+TEXT = (
+    "고혈압은 혈압이 지속적으로 높은 상태입니다. 주요 원인은 유전과 생활습관입니다. "
+    "짠 음식을 줄이는 것이 중요합니다!\n운동은 주 3회 이상 권장됩니다. "
+    "약물 치료가 필요할 수 있나요? 의사와 상담하세요. 정기 검진을 받으세요."
+)
+
+
+@pytest.fixture
+def chunker(monkeypatch):
+    monkeypatch.setenv("CHUNK_SIZE", "80")
+    monkeypatch.setenv("CHUNK_OVERLAP", "30")
+    return TextChunker(ChunkerConfig())
+
+
+class TestTextChunker:
+    @pytest.mark.unit
+    def test_splits_korean_sentences(self):
+        sentences = [TEXT[s:e] for s, e in split_sentences(TEXT)]
+        assert sentences[0] == "고혈압은 혈압이 지속적으로 높은 상태입니다."
+        assert sentences[2] == "짠 음식을 줄이는 것이 중요합니다!"
+        assert sentences[4] == "약물 치료가 필요할 수 있나요?"
+
+    @pytest.mark.unit
+    def test_chunks_respect_size_and_overlap(self, chunker):
+        chunks = chunker.split(TEXT)
+        assert len(chunks) > 1
+        assert all(len(c.text) <= 80 for c in chunks)
+        assert all(TEXT[c.start:c.end] == c.text for c in chunks)
+        # 다음 청크는 앞 청크의 마지막 문장과 겹친다
+        assert chunks[1].start < chunks[0].end
+
+    @pytest.mark.unit
+    def test_long_sentence_is_hard_split(self, chunker):
+        chunks = chunker.split("가" * 200)
+        assert all(len(c.text) <= 80 for c in chunks)
+        assert chunks[-1].end == 200
+
+    @pytest.mark.unit
+    def test_short_text_is_single_chunk(self, chunker):
+        assert [c.text for c in chunker.split("짧은 문서입니다.")] == ["짧은 문서입니다."]
+
+    @pytest.mark.unit
+    def test_merge_removes_overlap(self, chunker):
+        chunks = chunker.split(TEXT)
+        merged = merge_chunks([(i, c.start, c.end, c.text) for i, c in enumerate(chunks)])
+        assert merged.replace("\n", " ") == TEXT.replace("\n", " ")
+
+
+class TestChunkedVectorService:
+    @pytest.fixture
+    def service(self, chunker):
+        repo = ChromaDBRepository.__new__(ChromaDBRepository)
+        client = chromadb.EphemeralClient()
+        try:
+            client.delete_collection("chunk_test")
+        except Exception:
+            pass
+        repo.collection = client.get_or_create_collection("chunk_test")
+        embedding_service = Mock()
+        embedding_service.create_embeddings.side_effect = lambda texts: [
+            [1.0, float(i)] for i, _ in enumerate(texts)
+        ]
+        embedding_service.create_embedding.return_value = [1.0, 0.0]
+        return VectorService(repo, embedding_service, chunker)
+
+    @pytest.mark.unit
+    def test_chunks_carry_parent_metadata(self, service):
+        service.add_documents([TEXT], [{"source": "google_search"}], ids=["kb_1"])
+
+        stored = service.vector_repository.get(where={"parent_id": "kb_1"})
+        assert len(stored["ids"]) > 1
+        assert all(m["source"] == "google_search" for m in stored["metadatas"])
+        service.embedding_service.create_embeddings.assert_called_once()
+        assert service.get_parent_document("kb_1").replace("\n", " ") == TEXT.replace("\n", " ")
+
+    @pytest.mark.unit
+    def test_search_collapses_chunks_to_parent(self, service):
+        service.add_documents([TEXT, "감기는 휴식이 중요합니다."], [{"source": "a"}, {"source": "b"}], ids=["kb_1", "kb_2"])
+
+        results = service.search("고혈압", n_results=5, collapse=True)
+        assert len(results["documents"]) == 2
+        parent = results["metadatas"][[m["source"] for m in results["metadatas"]].index("a")]
+        assert parent["parent_id"] == "kb_1"
+        assert "chunk_index" not in parent
+
+        raw = service.search("고혈압", n_results=5, collapse=False)
+        assert len(raw["documents"]) == 3  # 청크 2개 + 단일 문서
+
+    @pytest.mark.unit
+    def test_delete_removes_all_chunks(self, service):
+        service.add_documents([TEXT], [{"source": "a"}], ids=["kb_1"])
+        service.delete_document("kb_1")
+        assert service.get_collection_info()["count"] == 0
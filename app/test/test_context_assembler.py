@@ -0,0 +1,80 @@
+import pytest
+
+from app.core.usage import track_usage
+from app.service.context_assembler import ContextAssembler, ContextConfig, estimate_tokens
+
+QA_HYPERTENSION = (
+    "질문: 고혈압 환자는 어떤 음식을 피해야 하나요?\n"
+    "답변: 짠 음식과 가공식품을 줄이세요. 칼륨이 많은 채소는 도움이 됩니다."
+)
+QA_COLD = "질문: 감기에 걸리면 어떻게 하나요?\n답변: 충분히 쉬고 수분을 섭취하세요."
+LONG_DOC = (
+    "당뇨병은 혈당 조절에 문제가 생기는 질환입니다. 인슐린 분비가 줄어듭니다. "
+    "고혈압 환자는 음식에서 나트륨을 줄여야 합니다. 하루 소금 섭취량은 5g 이하가 권장됩니다. "
+    "당뇨병 환자는 정기적으로 눈 검사를 받아야 합니다. 발 관리도 중요합니다."
+)
+
+
+@pytest.fixture
+def assembler(monkeypatch):
+    monkeypatch.setenv("CONTEXT_ASSEMBLY_ENABLED", "true")
+    monkeypatch.setenv("CONTEXT_TOKEN_BUDGET", "1200")
+    monkeypatch.setenv("CONTEXT_MAX_SENTENCES", "6")
+    monkeypatch.setenv("CONTEXT_DEDUP_THRESHOLD", "0.8")
+    return ContextAssembler(ContextConfig())
+
+
+class TestContextAssembler:
+    @pytest.mark.unit
+    def test_drops_duplicate_passages(self, assembler):
+        context = assembler.assemble("고혈압 음식", [QA_HYPERTENSION, QA_HYPERTENSION + " ", QA_COLD])
+        assert len(context.passages) == 2
+        assert context.dropped == 1
+
+    @pytest.mark.unit
+    def test_trims_to_relevant_sentences(self, assembler):
+        context = assembler.assemble("고혈압 환자 음식", [LONG_DOC])
+        text = context.passages[0].text
+        assert "나트륨" in text
+        # 관련 문장 바로 다음 문장(근거)은 함께 남는다
+        assert "5g" in text
+        assert "발 관리" not in text
+        assert context.output_tokens < context.input_tokens
+
+    @pytest.mark.unit
+    def test_keeps_answer_after_matching_question(self, assembler):
+        context = assembler.assemble("고혈압 환자 음식", [QA_HYPERTENSION])
+        assert "짠 음식" in context.render()
+
+    @pytest.mark.unit
+    def test_orders_by_relevance(self, assembler):
+        context = assembler.assemble("고혈압 음식", [QA_COLD, QA_HYPERTENSION])
+        assert context.passages[0].rank == 1
+        assert context.render().startswith("Source 1:\n질문: 고혈압")
+
+    @pytest.mark.unit
+    def test_respects_token_budget(self, monkeypatch):
+        monkeypatch.setenv("CONTEXT_TOKEN_BUDGET", "40")
+        assembler = ContextAssembler(ContextConfig())
+        context = assembler.assemble("고혈압 음식", [QA_HYPERTENSION, QA_COLD, LONG_DOC])
+        assert context.output_tokens <= 40
+        assert context.passages
+
+    @pytest.mark.unit
+    def test_reports_tokens_to_usage_tracker(self, assembler):
+        with track_usage() as tracker:
+            context = assembler.assemble("고혈압 음식", [QA_HYPERTENSION, QA_COLD])
+        snapshot = tracker.snapshot()["context"]["search_medical_qa"]
+        assert snapshot["input_tokens"] == estimate_tokens(QA_HYPERTENSION) + estimate_tokens(QA_COLD)
+        assert snapshot["output_tokens"] == context.output_tokens
+
+    @pytest.mark.unit
+    def test_disabled_passes_documents_through(self, monkeypatch):
+        monkeypatch.setenv("CONTEXT_ASSEMBLY_ENABLED", "false")
+        context = ContextAssembler(ContextConfig()).assemble("고혈압", [QA_COLD, QA_HYPERTENSION])
+        assert [p.text for p in context.passages] == [QA_COLD, QA_HYPERTENSION]
+        assert context.input_tokens == context.output_tokens
+
+    @pytest.mark.unit
+    def test_empty_results_render_empty(self, assembler):
+        assert assembler.assemble("고혈압", []).render() == ""
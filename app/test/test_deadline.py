@@ -0,0 +1,136 @@
+import threading
+
+import pytest
+from unittest.mock import Mock, patch
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.core import deadline as deadline_module
+from app.core.deadline import (
+    Deadline,
+    DeadlineConfig,
+    DEADLINE_DEGRADED_TOTAL,
+    check_deadline,
+    resolve_deadline,
+    run_deferred,
+)
+from app.agents import workflow
+from app.agents.workflow import check_extract_status, call_evaluate_agent
+from app.agents.subgraphs.knowledge_augmentor import augment_agent
+from app.agents.subgraphs.answer_gen import answer_gen_agent
+from app.core.streaming import SSEEncoder
+
+
+def _config(seconds: float) -> dict:
+    return {"configurable": {"deadline": Deadline(seconds)}}
+
+
+INSUFFICIENT = {"extract_logs": [AIMessage(content='{"status": "insufficient"}')], "loop_count": 1}
+
+
+class TestDeadline:
+    @pytest.mark.unit
+    def test_resolve_deadline_default_and_cap(self, monkeypatch):
+        monkeypatch.setenv("REQUEST_DEADLINE_SECONDS", "0")
+        monkeypatch.setenv("REQUEST_DEADLINE_MAX_SECONDS", "30")
+        assert resolve_deadline(None) is None
+        assert resolve_deadline(10).seconds == 10
+        assert resolve_deadline(300).seconds == 30
+
+        monkeypatch.setenv("REQUEST_DEADLINE_SECONDS", "20")
+        assert resolve_deadline(None).seconds == 20
+
+    @pytest.mark.unit
+    def test_allows_records_each_stage_once(self):
+        deadline = Deadline(3)
+        before = DEADLINE_DEGRADED_TOTAL.value(stage="augmentation")
+
+        assert not deadline.allows("augmentation")
+        assert not deadline.allows("augmentation")
+        assert deadline.allows("evaluation") is False
+        assert deadline.snapshot()["degraded"] == ["augmentation", "evaluation"]
+        assert DEADLINE_DEGRADED_TOTAL.value(stage="augmentation") == before + 2
+
+    @pytest.mark.unit
+    def test_no_deadline_allows_everything(self):
+        assert check_deadline(None, "augmentation")
+        assert check_deadline({"configurable": {}}, "augmentation")
+        assert check_deadline(_config(60), "augmentation")
+
+    @pytest.mark.unit
+    def test_short_deadline_skips_augmentation(self):
+        assert check_extract_status(INSUFFICIENT, _config(60)) == "augment"
+
+        config = _config(5)
+        assert check_extract_status(INSUFFICIENT, config) == "continue"
+        assert config["configurable"]["deadline"].degraded == ["augmentation"]
+
+    @pytest.mark.unit
+    @patch("app.agents.subgraphs.knowledge_augmentor.llm_augment")
+    def test_short_deadline_caps_tool_rounds(self, mock_llm):
+        mock_llm.invoke.return_value = AIMessage(content="", tool_calls=[{"name": "google_search", "args": {}, "id": "2"}])
+        state = {"messages": [
+            HumanMessage(content="Search and add info for: 두통"),
+            AIMessage(content="", tool_calls=[{"name": "google_search", "args": {"query": "두통"}, "id": "1"}]),
+        ]}
+
+        # 첫 라운드는 마감과 관계없이 진행
+        assert augment_agent({"messages": state["messages"][:1]}, _config(1))["messages"][0].tool_calls
+
+        config = _config(1)
+        result = augment_agent(state, config)
+        assert "Deadline reached" in result["messages"][0].content
+        assert config["configurable"]["deadline"].degraded == ["augment_tool_rounds"]
+        assert mock_llm.invoke.call_count == 1
+
+    @pytest.mark.unit
+    @patch("app.agents.subgraphs.answer_gen.solar_chat")
+    def test_short_deadline_reduces_answer_max_tokens(self, mock_llm, monkeypatch):
+        monkeypatch.setenv("DEADLINE_REDUCED_MAX_TOKENS", "256")
+        reduced = Mock()
+        reduced.invoke.return_value = AIMessage(content="짧은 답변")
+        mock_llm.bind.return_value = reduced
+        state = {"messages": [HumanMessage(content="두통")]}
+
+        result = answer_gen_agent(state, _config(3))
+
+        mock_llm.bind.assert_called_once_with(max_tokens=256)
+        assert result["messages"][0].content == "짧은 답변"
+        mock_llm.invoke.assert_not_called()
+
+    @pytest.mark.unit
+    def test_short_deadline_defers_evaluation(self, monkeypatch):
+        ran = threading.Event()
+
+        def fake_run(user_query, answer_logs, extract_logs):
+            ran.set()
+            return {"eval_logs": [AIMessage(content='{"final_score": 9}')], "process_status": "audit_complete"}
+
+        monkeypatch.setattr(workflow.evaluator_service, "run", fake_run)
+        state = {"user_query": "두통", "answer_logs": [AIMessage(content="답변")], "extract_logs": []}
+        config = _config(1)
+
+        result = call_evaluate_agent(state, config)
+
+        assert result == {"eval_logs": [], "process_status": "evaluation_deferred"}
+        assert config["configurable"]["deadline"].degraded == ["evaluation"]
+        assert ran.wait(5)
+
+    @pytest.mark.unit
+    def test_deferred_queue_drops_when_full(self, monkeypatch):
+        monkeypatch.setenv("DEADLINE_DEFERRED_MAX_PENDING", "1")
+        release = threading.Event()
+        config = DeadlineConfig()
+
+        assert run_deferred("test", release.wait, config)
+        assert not run_deferred("test", lambda: None, config)
+        release.set()
+        deadline_module._executor.submit(lambda: None).result(timeout=5)
+        assert deadline_module._pending == 0
+
+    @pytest.mark.unit
+    def test_stream_reports_degradations(self):
+        final = {"token_usage": {"total_tokens": 10}, "deadline": {"seconds": 5, "degraded": ["augmentation"]}}
+
+        assert SSEEncoder("t", "status").payload(final) == final
+        assert SSEEncoder("t", "answer").payload(final) == {"deadline": final["deadline"]}
+        assert SSEEncoder("t", "answer").payload({"token_usage": {}}) is None
@@ -0,0 +1,52 @@
+import pytest
+from unittest.mock import patch, Mock
+
+import chromadb
+
+from app import deps
+from app.repository.vector.vector_repo import ChromaDBRepository
+
+
+class TestServiceContainer:
+    @pytest.fixture
+    def container(self):
+        deps.shutdown_container()
+        with patch("app.deps.create_vector_repository") as repo_cls, \
+                patch("app.deps.EmbeddingService"), \
+                patch("app.deps.AgentService") as agent_cls, \
+                patch("app.deps.warm_up_http_clients") as warm_http:
+            container = deps.init_container()
+            yield container, repo_cls, agent_cls, warm_http
+        deps.shutdown_container()
+
+    @pytest.mark.unit
+    def test_dependencies_are_singletons(self, container):
+        _, repo_cls, agent_cls, _ = container
+        assert deps.get_agent_service() is deps.get_agent_service()
+        assert deps.get_vector_service() is deps.get_vector_service()
+        repo_cls.assert_called_once()
+        agent_cls.assert_called_once()
+
+    @pytest.mark.unit
+    def test_warm_up_marks_ready(self, container):
+        container, _, _, warm_http = container
+        assert not deps.container_ready()
+
+        container.warm_up()
+
+        warm_http.assert_called_once()
+        container.vector_repository.warm_up.assert_called_once()
+        assert deps.container_ready()
+
+    @pytest.mark.unit
+    def test_chroma_warm_up_queries_stored_embedding(self):
+        collection = chromadb.EphemeralClient().get_or_create_collection("warm_up_test")
+        repo = ChromaDBRepository.__new__(ChromaDBRepository)
+        repo.collection = collection
+
+        repo.warm_up()  # 빈 컬렉션이면 아무것도 하지 않음
+
+        collection.add(ids=["a"], embeddings=[[0.1, 0.2, 0.3]], documents=["doc"])
+        repo.collection = Mock(wraps=collection)
+        repo.warm_up()
+        repo.collection.query.assert_called_once()
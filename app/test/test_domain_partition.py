@@ -0,0 +1,131 @@
+from unittest.mock import Mock
+
+import chromadb
+import pytest
+
+from app.core.db import ChromaDBConnection
+from app.repository.vector.partitioned_repo import (
+    PartitionedChromaRepository,
+    strip_domain,
+    where_domains,
+)
+from app.service.chunker import ChunkerConfig, TextChunker
+from app.service.domain_router import DomainRouter, DomainRouterConfig
+from app.service.vector_service import VectorService
+
+# 도메인별로 다른 축에 모인 임베딩
+DOCUMENTS = [
+    ("고혈압 환자는 짠 음식을 피하세요.", {"domain": "cardio", "q_type": "diet"}, [1.0, 0.1, 0.0]),
+    ("고혈압 약은 매일 같은 시간에 드세요.", {"domain": "cardio", "q_type": "drug"}, [0.9, 0.0, 0.1]),
+    ("감기에는 충분한 휴식이 필요합니다.", {"domain": "respiratory", "q_type": "care"}, [0.0, 1.0, 0.1]),
+    ("기침이 2주 이상이면 진료를 받으세요.", {"domain": "respiratory", "q_type": "care"}, [0.1, 0.9, 0.0]),
+    ("외부 검색으로 보강한 문서입니다.", {"source": "google_search"}, [0.5, 0.5, 0.5]),
+]
+EMBEDDINGS = {text: embedding for text, _, embedding in DOCUMENTS}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = chromadb.EphemeralClient()
+    for collection in client.list_collections():
+        if collection.name.startswith("part_test"):
+            client.delete_collection(collection.name)
+    monkeypatch.setattr(ChromaDBConnection, "_instance", None)
+    monkeypatch.setattr(ChromaDBConnection, "_client", client)
+    return client
+
+
+def _service(repo, infer=False, monkeypatch=None):
+    monkeypatch.setenv("CHUNK_ENABLED", "false")
+    monkeypatch.setenv("SEARCH_INFER_DOMAIN", "true" if infer else "false")
+    embedding_service = Mock()
+    embedding_service.create_embeddings.side_effect = lambda texts: [EMBEDDINGS[t] for t in texts]
+    service = VectorService(repo, embedding_service, TextChunker(ChunkerConfig()))
+    service.add_documents(
+        [d[0] for d in DOCUMENTS], [d[1] for d in DOCUMENTS], ids=[f"kb_{i}" for i in range(len(DOCUMENTS))]
+    )
+    return service
+
+
+class TestWhereDomains:
+    @pytest.mark.unit
+    def test_extracts_domains(self):
+        assert where_domains(None) is None
+        assert where_domains({"q_type": "care"}) is None
+        assert where_domains({"domain": "cardio"}) == {"cardio"}
+        assert where_domains({"domain": {"$in": ["a", "b"]}}) == {"a", "b"}
+        assert where_domains({"$and": [{"domain": {"$eq": "a"}}, {"q_type": "care"}]}) == {"a"}
+
+    @pytest.mark.unit
+    def test_strips_domain_for_partition_query(self):
+        assert strip_domain({"domain": "a"}) is None
+        assert strip_domain({"$and": [{"domain": "a"}, {"q_type": "care"}]}) == {"q_type": "care"}
+
+
+class TestPartitionedRepository:
+    @pytest.mark.unit
+    def test_routes_writes_and_filtered_queries(self, client, monkeypatch):
+        repo = PartitionedChromaRepository("part_test")
+        service = _service(repo, monkeypatch=monkeypatch)
+        partitions = repo.partitions()
+        assert sorted(repo.domains) == ["cardio", "respiratory"]
+        assert partitions["cardio"].collection.count() == 2
+        assert repo.get_collection_info()["count"] == len(DOCUMENTS)
+
+        service.embedding_service.create_embedding.return_value = [1.0, 0.0, 0.0]
+        results = service.search("고혈압", n_results=5, collapse=False, where={"domain": "respiratory"})
+        assert {m["domain"] for m in results["metadatas"]} == {"respiratory"}
+
+        # 필터가 없으면 모든 파티션을 거리순으로 합친다
+        results = service.search("고혈압", n_results=3, collapse=False)
+        assert results["documents"][0] == "고혈압 환자는 짠 음식을 피하세요."
+        assert results["distances"] == sorted(results["distances"])
+
+    @pytest.mark.unit
+    def test_discovers_existing_partitions_and_pages(self, client, monkeypatch):
+        _service(PartitionedChromaRepository("part_test"), monkeypatch=monkeypatch)
+        repo = PartitionedChromaRepository("part_test")
+        assert sorted(repo.domains) == ["cardio", "respiratory"]
+        pages = [repo.get(limit=2, offset=offset)["ids"] for offset in (0, 2, 4)]
+        assert sorted(sum(pages, [])) == sorted(f"kb_{i}" for i in range(len(DOCUMENTS)))
+
+        repo.delete_documents(where={"domain": "cardio"})
+        assert repo.get_collection_info()["count"] == len(DOCUMENTS) - 2
+
+    @pytest.mark.unit
+    def test_new_partition_during_iteration(self, client, monkeypatch):
+        repo = PartitionedChromaRepository("part_test")
+        _service(repo, monkeypatch=monkeypatch)
+        # 파티션을 순회하는 도중 다른 요청이 새 도메인 파티션을 만든다
+        racing = Mock()
+        racing.collection.count.side_effect = lambda: repo._partition(f"new_{len(repo.domains)}") and 0
+        racing.get.return_value = {"ids": [], "documents": [], "metadatas": []}
+        repo._partitions["racing"] = racing
+
+        assert repo.get_collection_info()["count"] == len(DOCUMENTS)
+        assert len(repo.get()["ids"]) == len(DOCUMENTS)
+        assert repo.domains
+
+
+class TestDomainInference:
+    @pytest.mark.unit
+    def test_infers_domain_from_centroids(self, client, monkeypatch):
+        repo = PartitionedChromaRepository("part_test")
+        service = _service(repo, infer=True, monkeypatch=monkeypatch)
+        assert service.domain_router.infer([0.05, 1.0, 0.0]) == "respiratory"
+        # 두 도메인 사이의 애매한 질의는 필터를 걸지 않는다
+        assert service.domain_router.infer([1.0, 1.0, 0.05]) is None
+
+        service.embedding_service.create_embedding.return_value = [1.0, 0.05, 0.0]
+        results = service.search("고혈압 음식", n_results=5, collapse=False)
+        assert {m.get("domain") for m in results["metadatas"]} == {"cardio"}
+
+    @pytest.mark.unit
+    def test_centroids_follow_new_documents(self, monkeypatch):
+        repo = Mock()
+        repo.get.return_value = {"ids": ["a"], "embeddings": [[1.0, 0.0]], "metadatas": [{"domain": "a"}]}
+        monkeypatch.setenv("SEARCH_DOMAIN_MIN_MARGIN", "0.05")
+        router = DomainRouter(repo, DomainRouterConfig())
+        assert router.infer([0.0, 1.0]) is None
+        router.observe([[0.0, 1.0]], [{"domain": "b"}])
+        assert router.infer([0.0, 1.0]) == "b"
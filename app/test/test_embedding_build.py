@@ -0,0 +1,121 @@
+import json
+import threading
+
+import chromadb
+import numpy as np
+import pytest
+
+from app.core.admission import admission_priority, current_priority, PRIORITY_BULK
+from app.core.embedding_build import EmbeddingBuildConfig, EmbeddingStore, build_embeddings, content_hash
+from app.core.snapshot import import_snapshot, verify_snapshot
+from app.repository.vector.vector_repo import ChromaDBRepository
+
+DOCUMENTS = [
+    {"id": f"kb_{i}", "content": f"질문: 증상 {i}\n답변: 내용 {i}", "metadata": {"domain": i % 2}}
+    for i in range(10)
+]
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.calls = []
+        self.priorities = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self._lock:
+            self.calls.append(list(texts))
+            self.priorities.add(current_priority())
+        return [[float(len(t)), float(sum(map(ord, t)) % 97), 1.0] for t in texts]
+
+    @property
+    def embedded(self):
+        return sum(len(c) for c in self.calls)
+
+
+@pytest.fixture
+def config(monkeypatch, tmp_path):
+    monkeypatch.setenv("EMBED_BUILD_DIR", str(tmp_path))
+    monkeypatch.setenv("EMBED_BUILD_SHARD_ROWS", "4")
+    monkeypatch.setenv("EMBED_BUILD_BATCH_SIZE", "3")
+    monkeypatch.setenv("EMBED_BUILD_CONCURRENCY", "2")
+    monkeypatch.setenv("UPSTAGE_EMBEDDING_MODEL", "test-model")
+    return EmbeddingBuildConfig()
+
+
+class TestEmbeddingBuild:
+    @pytest.mark.unit
+    def test_store_survives_reopen_and_torn_sidecar(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path), "m", shard_rows=2)
+        store.add(["a", "b", "c"], [[1, 0], [0, 1], [1, 1]])
+        with open(tmp_path / "shard-00001.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"row": 1, "ha')
+
+        reopened = EmbeddingStore(str(tmp_path), "m")
+        assert len(reopened) == 3
+        np.testing.assert_array_equal(reopened.get(["c", "a"]), [[1, 1], [1, 0]])
+        with pytest.raises(ValueError):
+            EmbeddingStore(str(tmp_path), "other")
+
+    @pytest.mark.unit
+    def test_resume_after_torn_write_keeps_later_rows(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path), "m", shard_rows=4)
+        store.add(["a", "b"], [[1, 0], [0, 1]])
+        sidecar = tmp_path / "shard-00000.jsonl"
+        with open(sidecar, "a", encoding="utf-8") as f:
+            f.write('{"row": 2, "ha')  # 행은 썼지만 sidecar 기록 중 종료
+
+        # 첫 재개: 깨진 줄을 정리한 뒤 이어 쓴다
+        resumed = EmbeddingStore(str(tmp_path), "m")
+        assert len(resumed) == 2
+        resumed.add(["c", "d"], [[1, 1], [2, 2]])
+
+        # 두 번째 재개도 첫 재개에서 쓴 행을 모두 본다
+        again = EmbeddingStore(str(tmp_path), "m")
+        assert len(again) == 4 and "d" in again
+        np.testing.assert_array_equal(again.get(["a", "c", "d"]), [[1, 0], [1, 1], [2, 2]])
+        again.add(["e"], [[3, 3]])
+        assert len(EmbeddingStore(str(tmp_path), "m")) == 5
+        rows = [json.loads(line)["row"] for line in open(sidecar, encoding="utf-8")]
+        assert rows == [0, 1, 2, 3]
+
+    @pytest.mark.unit
+    def test_rebuild_embeds_only_changed_content(self, config):
+        embedder = FakeEmbedder()
+        assert build_embeddings(DOCUMENTS, embedder, config) == {"chunks": 10, "embedded": 10, "reused": 0}
+        assert all(len(call) <= 3 for call in embedder.calls)
+
+        changed = [dict(d) for d in DOCUMENTS]
+        changed[3] = {**changed[3], "content": "질문: 바뀐 내용\n답변: 새 답변"}
+        rerun = FakeEmbedder()
+        assert build_embeddings(changed, rerun, config) == {"chunks": 10, "embedded": 1, "reused": 9}
+        assert rerun.calls == [["질문: 바뀐 내용\n답변: 새 답변"]]
+
+    @pytest.mark.unit
+    def test_embed_workers_keep_caller_priority(self, config):
+        embedder = FakeEmbedder()
+        with admission_priority(PRIORITY_BULK):
+            build_embeddings(DOCUMENTS, embedder, config)
+        assert len(embedder.calls) > 1
+        assert embedder.priorities == {PRIORITY_BULK}
+
+    @pytest.mark.unit
+    def test_snapshot_output_imports_without_embedding(self, config, tmp_path):
+        build_embeddings(DOCUMENTS, FakeEmbedder(), config)
+        snapshot = tmp_path / "test-model" / "snapshot"
+        assert verify_snapshot(str(snapshot))["count"] == 10
+
+        client = chromadb.EphemeralClient()
+        try:
+            client.delete_collection("embed_build_target")
+        except Exception:
+            pass
+        repo = ChromaDBRepository.__new__(ChromaDBRepository)
+        repo.collection = client.get_or_create_collection("embed_build_target")
+        assert import_snapshot(repo, str(snapshot)) == 10
+
+        stored = repo.get(ids=["kb_4"], include=["documents", "metadatas", "embeddings"])
+        assert stored["documents"] == [DOCUMENTS[4]["content"]]
+        assert stored["metadatas"] == [{"domain": 0}]
+        assert list(stored["embeddings"][0]) == FakeEmbedder()([DOCUMENTS[4]["content"]])[0]
+        assert content_hash(DOCUMENTS[4]["content"]) in EmbeddingStore(str(tmp_path / "test-model"), "test-model")
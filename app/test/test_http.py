@@ -0,0 +1,41 @@
+import httpx
+import pytest
+
+from app.core import http
+from app.core.http import InstrumentedTransport, get_http_client, HTTP_REQUESTS_TOTAL
+from app.repository.client.search_client import SerperSearchClient
+
+
+class TestSharedHttpClients:
+    @pytest.fixture(autouse=True)
+    def reset_clients(self):
+        http.close_http_clients()
+        yield
+        http.close_http_clients()
+
+    @pytest.mark.unit
+    def test_client_is_shared_per_upstream(self):
+        assert get_http_client("upstage") is get_http_client("upstage")
+        assert get_http_client("upstage") is not get_http_client("serper")
+
+    @pytest.mark.unit
+    def test_serper_search_uses_pooled_client(self, monkeypatch):
+        monkeypatch.setenv("SERPER_API_KEY", "test-key")
+        monkeypatch.setenv("SEARCH_CACHE_ENABLED", "false")
+        seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return httpx.Response(200, json={"organic": [{"snippet": "감기는 바이러스 질환"}]})
+
+        before = HTTP_REQUESTS_TOTAL.value(upstream="serper", status="200")
+        http._clients["serper"] = httpx.Client(
+            transport=InstrumentedTransport("serper", httpx.MockTransport(handler))
+        )
+
+        result = SerperSearchClient().search("감기")
+
+        assert result == "감기는 바이러스 질환"
+        assert seen[0].url.host == "google.serper.dev"
+        assert seen[0].headers["X-API-KEY"] == "test-key"
+        assert HTTP_REQUESTS_TOTAL.value(upstream="serper", status="200") == before + 1
@@ -0,0 +1,174 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from app.service.knowledge_writer import (
+    KnowledgeWriter, KnowledgeWriterConfig, process_spill_path, WRITER_WRITES_TOTAL
+)
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setenv("KNOWLEDGE_WRITER_SPILL_PATH", str(tmp_path / "spill.jsonl"))
+    monkeypatch.setenv("KNOWLEDGE_WRITER_FLUSH_INTERVAL", "10")
+    monkeypatch.setenv("KNOWLEDGE_WRITER_BATCH_SIZE", "8")
+    monkeypatch.setenv("KNOWLEDGE_WRITER_MAX_QUEUE", "20")
+    monkeypatch.setenv("KNOWLEDGE_WRITER_FSYNC", "false")
+    return KnowledgeWriterConfig()
+
+
+class TestKnowledgeWriter:
+    @pytest.mark.unit
+    def test_pending_documents_are_written_in_one_batch(self, config):
+        vector_service = Mock()
+        writer = KnowledgeWriter(vector_service, config)
+        for i in range(5):
+            writer.submit(f"문서 {i}", {"source": "google_search"}, scope=f"req-{i}")
+        vector_service.add_documents.assert_not_called()
+
+        writer.start()
+        assert writer.flush(timeout=2)
+        writer.stop()
+
+        vector_service.add_documents.assert_called_once()
+        documents, metadatas = vector_service.add_documents.call_args.args
+        assert documents == [f"문서 {i}" for i in range(5)]
+        assert len(set(vector_service.add_documents.call_args.kwargs["ids"])) == 5
+
+    @pytest.mark.unit
+    def test_read_your_writes_flushes_without_waiting_for_interval(self, config):
+        vector_service = Mock()
+        writer = KnowledgeWriter(vector_service, config)
+        writer.start()
+        writer.submit("새 지식", {"source": "google_search"}, scope="req-1")
+
+        start = time.monotonic()
+        assert writer.wait_for_scope("req-1", timeout=2)
+        assert time.monotonic() - start < 1
+        vector_service.add_documents.assert_called_once()
+        # 다른 요청의 scope는 기다릴 것이 없다
+        assert writer.wait_for_scope("req-2", timeout=0)
+        writer.stop()
+
+    @pytest.mark.unit
+    def test_duplicate_documents_are_written_once(self, config):
+        vector_service = Mock()
+        writer = KnowledgeWriter(vector_service, config)
+        first = writer.submit("같은 내용", {"source": "google_search"})
+        second = writer.submit("같은 내용", {"source": "google_search"})
+        assert first == second
+        assert writer.pending == 1
+
+    @pytest.mark.unit
+    def test_spill_file_is_recovered_after_crash(self, config):
+        crashed = KnowledgeWriter(Mock(), config)
+        crashed.submit("저장 전 종료된 문서", {"source": "google_search"})
+        with open(crashed.spill_path, "a", encoding="utf-8") as f:
+            f.write('{"id": "partial')  # 쓰는 도중 끊긴 줄
+
+        vector_service = Mock()
+        writer = KnowledgeWriter(vector_service, config)
+        writer.start()
+        assert writer.flush(timeout=2)
+        writer.stop()
+
+        documents, _ = vector_service.add_documents.call_args.args
+        assert documents == ["저장 전 종료된 문서"]
+        assert not os.path.exists(writer.spill_path)
+
+    @pytest.mark.unit
+    def test_flush_keeps_other_workers_spill(self, config):
+        # 같은 KNOWLEDGE_WRITER_SPILL_PATH를 쓰는 살아 있는 다른 워커
+        other = KnowledgeWriter(Mock(), config)
+        other.spill_path = process_spill_path(config.spill_path, os.getppid())
+        other.submit("다른 워커의 문서", {"source": "google_search"})
+
+        vector_service = Mock()
+        writer = KnowledgeWriter(vector_service, config)
+        writer.submit("이 워커의 문서", {"source": "google_search"})
+        writer.start()
+        assert writer.flush(timeout=2)
+        writer.stop()
+
+        assert vector_service.add_documents.call_args.args[0] == ["이 워커의 문서"]
+        with open(other.spill_path, encoding="utf-8") as f:
+            assert [json.loads(line)["content"] for line in f] == ["다른 워커의 문서"]
+
+    @pytest.mark.unit
+    def test_spill_of_exited_worker_is_recovered(self, config):
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        crashed = KnowledgeWriter(Mock(), config)
+        crashed.spill_path = process_spill_path(config.spill_path, exited.pid)
+        crashed.submit("종료된 워커의 문서", {"source": "google_search"})
+
+        vector_service = Mock()
+        writer = KnowledgeWriter(vector_service, config)
+        writer.start()
+        assert writer.flush(timeout=2)
+        writer.stop()
+
+        assert vector_service.add_documents.call_args.args[0] == ["종료된 워커의 문서"]
+        assert not os.path.exists(crashed.spill_path)
+
+    @pytest.mark.unit
+    def test_failed_batch_stays_in_spill_file(self, config, monkeypatch):
+        monkeypatch.setattr(config, "retry_interval", 0.01)
+        monkeypatch.setattr(config, "max_attempts", 1000)
+        vector_service = Mock()
+        vector_service.add_documents.side_effect = RuntimeError("chroma locked")
+        writer = KnowledgeWriter(vector_service, config)
+        writer.submit("재시도할 문서", {"source": "google_search"})
+        writer.start()
+        assert not writer.flush(timeout=0.2)
+        writer.stop()
+
+        with open(writer.spill_path, encoding="utf-8") as f:
+            assert [json.loads(line)["content"] for line in f] == ["재시도할 문서"]
+
+    @pytest.mark.unit
+    def test_bad_document_is_isolated_and_parked(self, config, monkeypatch):
+        monkeypatch.setattr(config, "retry_interval", 0.01)
+        monkeypatch.setattr(config, "max_attempts", 3)
+        vector_service = Mock()
+        written = []
+
+        def add_documents(documents, metadatas, ids):
+            if "깨진 문서" in documents:
+                raise ValueError("invalid metadata")
+            written.extend(documents)
+
+        vector_service.add_documents.side_effect = add_documents
+        writer = KnowledgeWriter(vector_service, config)
+        for content in ("문서 1", "깨진 문서", "문서 2"):
+            writer.submit(content, {"source": "google_search"}, scope="req-1")
+        before = WRITER_WRITES_TOTAL.value(result="abandoned")
+        writer.start()
+        assert writer.flush(timeout=2)
+        # 재시도를 멈춘 문서를 기다리느라 검색이 막히지 않는다
+        assert writer.wait_for_scope("req-1", timeout=0)
+        writer.stop()
+
+        assert sorted(written) == ["문서 1", "문서 2"]
+        assert writer.parked == 1
+        assert WRITER_WRITES_TOTAL.value(result="abandoned") == before + 1
+        # 3개 배치 1번 -> 하나씩: 문서 1, 깨진 문서 (단독 2번 더 실패해 총 3번에서 멈춤), 문서 2
+        assert vector_service.add_documents.call_count == 5
+        with open(writer.spill_path, encoding="utf-8") as f:
+            assert [json.loads(line)["content"] for line in f] == ["깨진 문서"]
+
+    @pytest.mark.unit
+    def test_full_queue_writes_synchronously(self, config, monkeypatch):
+        monkeypatch.setattr(config, "max_queue", 1)
+        vector_service = Mock()
+        writer = KnowledgeWriter(vector_service, config)
+        writer.submit("첫 문서", {})
+        writer.submit("두 번째 문서", {})
+        assert writer.pending == 1
+        vector_service.add_documents.assert_called_once()
+        assert vector_service.add_documents.call_args.args[0] == ["두 번째 문서"]
@@ -0,0 +1,68 @@
+from unittest import mock
+
+import pytest
+
+from app.core.lazy import lazy, resolve
+
+
+class TestLazyObject:
+    @pytest.mark.unit
+    def test_factory_runs_once_on_first_use(self):
+        factory = mock.Mock(return_value=mock.Mock(name="client", value=3))
+        proxy = lazy(factory)
+
+        assert not proxy.is_resolved
+        factory.assert_not_called()
+
+        assert proxy.value == 3
+        assert proxy.value == 3
+        assert resolve(proxy) is factory.return_value
+        factory.assert_called_once()
+
+    @pytest.mark.unit
+    def test_private_probe_does_not_construct(self):
+        factory = mock.Mock()
+        proxy = lazy(factory)
+
+        assert not hasattr(proxy, "_is_coroutine")
+        factory.assert_not_called()
+
+    @pytest.mark.unit
+    def test_resolve_passes_through_plain_objects(self):
+        obj = object()
+        assert resolve(obj) is obj
+
+
+class TestUpstageClient:
+    @pytest.mark.unit
+    def test_concurrent_first_use_builds_one_client(self, monkeypatch):
+        import threading
+        import time
+
+        import langchain_upstage
+        from app.repository.client.llm_client import UpstageClient
+
+        built = []
+
+        def slow_model(**kwargs):
+            # 클라이언트/커넥션 준비에 시간이 걸리는 동안 다른 스레드가 들어온다
+            time.sleep(0.05)
+            built.append(kwargs["model"])
+            return mock.Mock()
+
+        monkeypatch.setattr(langchain_upstage, "ChatUpstage", slow_model)
+        monkeypatch.setattr(langchain_upstage, "UpstageEmbeddings", slow_model)
+        client = UpstageClient()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append((client.get_chat_model(), client.get_embedding_model())))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(built) == 2
+        assert len({id(chat) for chat, _ in results}) == 1
+        assert len({id(embedding) for _, embedding in results}) == 1
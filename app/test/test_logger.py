@@ -0,0 +1,62 @@
+import json
+import logging
+import pytest
+
+from app.core import logger as agent_logger
+from app.core.logger import LoggingConfig, JsonFormatter, log_agent_step, truncate_payload
+from app.core.tracing import start_trace
+
+
+class TestStructuredLogging:
+    @pytest.fixture
+    def log_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("LOG_DIR", str(tmp_path))
+        monkeypatch.setenv("LOG_CONSOLE", "false")
+        monkeypatch.setenv("LOG_MAX_FIELD_CHARS", "10")
+        agent_logger.shutdown_logging()
+        yield tmp_path
+        agent_logger.shutdown_logging()
+
+    def _records(self, log_dir):
+        agent_logger.shutdown_logging()
+        with open(log_dir / "agent_flow.log", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    @pytest.mark.unit
+    def test_log_agent_step_writes_json_with_correlation_id(self, log_dir):
+        with start_trace("POST /agent/chat") as trace:
+            log_agent_step("MedicalConsultant", "답변 생성 완료", {"answer": "가" * 50})
+
+        records = self._records(log_dir)
+        assert len(records) == 1
+        record = records[0]
+        assert record["agent"] == "MedicalConsultant"
+        assert record["correlation_id"] == trace.trace_id
+        assert record["data"]["answer"].startswith("가" * 10)
+        assert "+40 chars" in record["data"]["answer"]
+
+    @pytest.mark.unit
+    def test_payload_sampling_drops_data_only(self, log_dir, monkeypatch):
+        monkeypatch.setenv("LOG_PAYLOAD_SAMPLE_RATE", "0")
+        log_agent_step("Workflow", "Step 4 완료", {"score": 9})
+
+        record = self._records(log_dir)[0]
+        assert record["step"] == "Step 4 완료"
+        assert "data" not in record
+
+    @pytest.mark.unit
+    def test_truncate_payload_caps_lists(self):
+        result = truncate_payload(list(range(30)), max_chars=10, max_items=3)
+        assert result == [0, 1, 2, "...(+27 items)"]
+
+    @pytest.mark.unit
+    def test_json_formatter_includes_exception(self):
+        formatter = JsonFormatter(LoggingConfig())
+        try:
+            raise ValueError("bad")
+        except ValueError:
+            import sys
+            record = logging.LogRecord("agent_flow", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+        payload = json.loads(formatter.format(record))
+        assert payload["level"] == "ERROR"
+        assert "ValueError: bad" in payload["exc_info"]
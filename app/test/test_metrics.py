@@ -0,0 +1,32 @@
+import pytest
+
+from app.core.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    @pytest.mark.unit
+    def test_render_prometheus_text(self):
+        registry = MetricsRegistry()
+        calls = registry.counter("calls_total", "calls", ["agent"])
+        depth = registry.gauge("queue_depth", "depth")
+        latency = registry.histogram("latency_seconds", "latency", buckets=(0.1, 1.0))
+
+        calls.inc(agent="extractor")
+        calls.inc(2, agent="extractor")
+        depth.set_function(lambda: 7)
+        latency.observe(0.05)
+        latency.observe(0.5)
+
+        text = registry.render()
+        assert 'calls_total{agent="extractor"} 3.0' in text
+        assert "queue_depth 7.0" in text
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+        assert "latency_seconds_count 2" in text
+
+    @pytest.mark.unit
+    def test_same_name_returns_same_metric(self):
+        registry = MetricsRegistry()
+        assert registry.counter("a_total", "a") is registry.counter("a_total", "a")
+        with pytest.raises(ValueError):
+            registry.gauge("a_total", "a")
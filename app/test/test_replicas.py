@@ -0,0 +1,104 @@
+from unittest.mock import Mock
+
+import chromadb
+import pytest
+
+from app.core.replicas import Replica, ReplicaConfig, ReplicaPool
+from app.repository.vector.vector_repo import ChromaDBRepository
+
+
+@pytest.fixture
+def config(monkeypatch):
+    monkeypatch.setenv("CHROMA_REPLICA_MAX_LAG", "1")
+    monkeypatch.setenv("CHROMA_REPLICA_READ_AFTER_WRITE", "0")
+    return ReplicaConfig()
+
+
+@pytest.fixture
+def primary():
+    client = chromadb.EphemeralClient()
+    for name in ("replica_primary", "replica_copy"):
+        try:
+            client.delete_collection(name)
+        except Exception:
+            pass
+    collection = client.get_or_create_collection("replica_primary")
+    collection.add(ids=["a", "b"], embeddings=[[1.0, 0.0], [0.0, 1.0]], documents=["A", "B"])
+    return collection
+
+
+def _replica(address, collection):
+    client = Mock()
+    client.get_collection.return_value = collection
+    return Replica(address, client=client)
+
+
+def _repo(primary, pool):
+    repo = ChromaDBRepository.__new__(ChromaDBRepository)
+    repo.collection = primary
+    repo._replicas = pool
+    pool.track(primary.name, primary)
+    return repo
+
+
+class TestReplicaPool:
+    @pytest.mark.unit
+    def test_reads_round_robin_and_writes_go_to_primary(self, config, primary):
+        copies = [Mock(wraps=primary), Mock(wraps=primary)]
+        pool = ReplicaPool([_replica("r1:8000", copies[0]), _replica("r2:8000", copies[1])], config)
+        repo = _repo(primary, pool)
+        pool.check()
+
+        for _ in range(4):
+            assert repo.query([[1.0, 0.0]], n_results=1)["ids"] == [["a"]]
+        assert copies[0].query.call_count == 2
+        assert copies[1].query.call_count == 2
+
+        repo.add_documents(["C"], [[0.5, 0.5]], ids=["c"])
+        copies[0].add.assert_not_called()
+        assert primary.count() == 3
+
+    @pytest.mark.unit
+    def test_failed_replica_is_ejected_and_read_falls_back(self, config, primary):
+        broken = Mock()
+        broken.query.side_effect = ConnectionError("down")
+        broken.count.return_value = primary.count()
+        replica = _replica("r1:8000", broken)
+        pool = ReplicaPool([replica], config)
+        repo = _repo(primary, pool)
+        pool.check()
+        assert replica.healthy
+
+        assert repo.query([[1.0, 0.0]], n_results=1)["ids"] == [["a"]]
+        assert not replica.healthy
+
+        # 점검을 다시 통과하면 복귀한다
+        pool.check()
+        assert replica.healthy
+
+    @pytest.mark.unit
+    def test_lagging_replica_is_ejected(self, config, primary):
+        stale = chromadb.EphemeralClient().get_or_create_collection("replica_copy")
+        stale.add(ids=["a"], embeddings=[[1.0, 0.0]], documents=["A"])
+        replica = _replica("r1:8000", stale)
+        pool = ReplicaPool([replica], config)
+        _repo(primary, pool)
+
+        pool.check()
+        assert replica.healthy and replica.lag == 1
+
+        primary.add(ids=["c"], embeddings=[[0.5, 0.5]], documents=["C"])
+        pool.check()
+        assert not replica.healthy and replica.lag == 2
+
+    @pytest.mark.unit
+    def test_reads_stay_on_primary_right_after_write(self, monkeypatch, primary):
+        monkeypatch.setenv("CHROMA_REPLICA_READ_AFTER_WRITE", "60")
+        copy = Mock(wraps=primary)
+        pool = ReplicaPool([_replica("r1:8000", copy)], ReplicaConfig())
+        repo = _repo(primary, pool)
+        pool.check()
+
+        repo.add_documents(["C"], [[0.5, 0.5]], ids=["c"])
+        repo.get(ids=["c"])
+        copy.get.assert_not_called()
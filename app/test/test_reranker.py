@@ -0,0 +1,80 @@
+from unittest.mock import Mock
+
+import chromadb
+import pytest
+
+from app.repository.vector.vector_repo import ChromaDBRepository
+from app.service.chunker import ChunkerConfig, TextChunker
+from app.service.reranker import RetrievalConfig, distance_cutoff, mmr
+from app.service.vector_service import VectorService
+
+# 0,1은 거의 같은 문서(같은 질문의 다른 표현), 2는 조금 덜 관련 있지만 다른 내용, 3은 무관
+DOCUMENTS = {
+    "고혈압 환자는 짠 음식을 피하세요.": [1.0, 0.05, 0.0],
+    "고혈압이 있으면 짠 음식을 줄이세요.": [1.0, 0.06, 0.0],
+    "고혈압에는 규칙적인 운동이 도움이 됩니다.": [0.8, 0.0, 0.6],
+    "감기는 충분한 휴식이 중요합니다.": [0.0, 1.0, 0.0],
+}
+QUERY = [1.0, 0.0, 0.1]
+
+
+class TestMMR:
+    @pytest.mark.unit
+    def test_prefers_diverse_results(self):
+        embeddings = list(DOCUMENTS.values())
+        assert mmr(QUERY, embeddings, k=2, lambda_mult=0.5) == [0, 2]
+        # 관련도만 보면 거의 같은 문서를 연달아 고른다
+        assert mmr(QUERY, embeddings, k=2, lambda_mult=1.0) == [0, 1]
+
+    @pytest.mark.unit
+    def test_k_larger_than_candidates(self):
+        assert sorted(mmr(QUERY, list(DOCUMENTS.values()), k=10)) == [0, 1, 2, 3]
+        assert mmr(QUERY, [], k=3) == []
+
+    @pytest.mark.unit
+    def test_distance_cutoff(self):
+        assert distance_cutoff([0.1, 0.4, 0.9], None) == 3
+        assert distance_cutoff([0.1, 0.4, 0.9], 0.5) == 2
+        assert distance_cutoff([0.8, 0.9], 0.5) == 0
+        assert distance_cutoff([0.8, 0.9], 0.5, min_results=1) == 1
+
+
+class TestVectorServiceRerank:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        monkeypatch.setenv("CHUNK_ENABLED", "false")
+        monkeypatch.setenv("SEARCH_MMR_ENABLED", "false")
+        monkeypatch.setenv("SEARCH_MMR_LAMBDA", "0.5")
+        monkeypatch.delenv("SEARCH_MAX_DISTANCE", raising=False)
+        repo = ChromaDBRepository.__new__(ChromaDBRepository)
+        client = chromadb.EphemeralClient()
+        try:
+            client.delete_collection("rerank_test")
+        except Exception:
+            pass
+        repo.collection = client.get_or_create_collection("rerank_test")
+        embedding_service = Mock()
+        embedding_service.create_embeddings.side_effect = lambda texts: [DOCUMENTS[t] for t in texts]
+        embedding_service.create_embedding.return_value = QUERY
+        service = VectorService(repo, embedding_service, TextChunker(ChunkerConfig()), RetrievalConfig())
+        service.add_documents(list(DOCUMENTS), ids=[f"kb_{i}" for i in range(len(DOCUMENTS))])
+        return service
+
+    @pytest.mark.unit
+    def test_mmr_skips_near_duplicates(self, service):
+        plain = service.search("고혈압 음식", n_results=2, collapse=False)
+        assert plain["documents"][1] == "고혈압이 있으면 짠 음식을 줄이세요."
+
+        diverse = service.search("고혈압 음식", n_results=2, collapse=False, use_mmr=True)
+        assert diverse["documents"] == [
+            "고혈압 환자는 짠 음식을 피하세요.",
+            "고혈압에는 규칙적인 운동이 도움이 됩니다.",
+        ]
+
+    @pytest.mark.unit
+    def test_distance_cutoff_returns_fewer_results(self, service):
+        results = service.search("고혈압 음식", n_results=4, collapse=False, max_distance=0.5)
+        assert len(results["documents"]) == 3
+        assert all(d <= 0.5 for d in results["distances"])
+
+        assert service.search("고혈압 음식", n_results=4, max_distance=0.001)["documents"] == []
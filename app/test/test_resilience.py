@@ -0,0 +1,104 @@
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.core.resilience import (
+    ResilienceConfig,
+    ResiliencePolicy,
+    UpstreamTimeout,
+    is_retryable,
+    RESILIENCE_ATTEMPTS_TOTAL,
+)
+
+
+def _policy(monkeypatch, name="test", **env) -> ResiliencePolicy:
+    monkeypatch.setenv(f"RESILIENCE_{name.upper()}_ENABLED", "true")
+    monkeypatch.setenv(f"RESILIENCE_{name.upper()}_BACKOFF_BASE", "0.001")
+    for key, value in env.items():
+        monkeypatch.setenv(f"RESILIENCE_{name.upper()}_{key}", str(value))
+    return ResiliencePolicy(name, ResilienceConfig(name))
+
+
+class TestResiliencePolicy:
+    @pytest.mark.unit
+    def test_disabled_policy_calls_through(self, monkeypatch):
+        monkeypatch.delenv("RESILIENCE_ENABLED", raising=False)
+        policy = ResiliencePolicy("off", ResilienceConfig("off"))
+        assert policy.call(lambda: threading.current_thread().name) == threading.current_thread().name
+
+    @pytest.mark.unit
+    def test_retries_transient_errors(self, monkeypatch):
+        policy = _policy(monkeypatch, RETRY_RATIO=10)
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise httpx.ConnectError("reset")
+            return "ok"
+
+        assert policy.call(flaky) == "ok"
+        assert len(calls) == 3
+
+    @pytest.mark.unit
+    def test_non_retryable_error_is_raised_once(self, monkeypatch):
+        policy = _policy(monkeypatch, RETRY_RATIO=10)
+        calls = []
+
+        def bad_request():
+            calls.append(1)
+            raise ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            policy.call(bad_request)
+        assert len(calls) == 1
+        assert not is_retryable(ValueError())
+
+    @pytest.mark.unit
+    def test_per_call_timeout(self, monkeypatch):
+        policy = _policy(monkeypatch, TIMEOUT=0.05, MAX_RETRIES=0)
+        with pytest.raises(UpstreamTimeout):
+            policy.call(lambda: time.sleep(0.5))
+
+    @pytest.mark.unit
+    def test_slow_idempotent_call_is_hedged(self, monkeypatch):
+        policy = _policy(
+            monkeypatch, name="hedge", HEDGE_MIN_SAMPLES=5, HEDGE_MIN_DELAY=0.01, HEDGE_RATIO=1
+        )
+        for _ in range(5):
+            policy.call(lambda: None, idempotent=True)
+        assert policy.hedge_delay() == pytest.approx(0.01, abs=0.01)
+
+        calls = []
+        discarded = []
+
+        def slow_first():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.3)
+                return "slow"
+            return "fast"
+
+        before = RESILIENCE_ATTEMPTS_TOTAL.value(policy="hedge", kind="hedge")
+        start = time.perf_counter()
+        assert policy.call(slow_first, idempotent=True, on_discarded=discarded.append) == "fast"
+        assert time.perf_counter() - start < 0.25
+        assert RESILIENCE_ATTEMPTS_TOTAL.value(policy="hedge", kind="hedge") == before + 1
+
+        # 버려진 원 요청의 결과도 집계 콜백으로 전달된다
+        deadline = time.time() + 2
+        while not discarded and time.time() < deadline:
+            time.sleep(0.01)
+        assert discarded == ["slow"]
+
+    @pytest.mark.unit
+    def test_non_idempotent_call_is_not_hedged(self, monkeypatch):
+        policy = _policy(
+            monkeypatch, name="nohedge", HEDGE_MIN_SAMPLES=1, HEDGE_MIN_DELAY=0.01, HEDGE_RATIO=1
+        )
+        policy.call(lambda: None)
+        calls = []
+        policy.call(lambda: (calls.append(1), time.sleep(0.05)))
+        assert len(calls) == 1
@@ -0,0 +1,106 @@
+import time
+
+import httpx
+import pytest
+
+from app.core import http
+from app.core.cancellation import bind_cancel_token, CancelToken, RequestCancelled
+from app.core.http import InstrumentedTransport
+from app.repository.cache.search_cache import (
+    CachedSearchFailure,
+    SearchCacheConfig,
+    SearchResultCache,
+)
+from app.repository.client.search_client import SerperSearchClient
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEARCH_CACHE_PATH", str(tmp_path / "search.sqlite3"))
+    monkeypatch.setenv("SEARCH_CACHE_MAX_ENTRIES", "5")
+    return SearchResultCache(SearchCacheConfig())
+
+
+class TestSearchResultCache:
+    @pytest.mark.unit
+    def test_normalized_queries_share_entry(self, cache):
+        key = cache.make_key("  당뇨  초기 증상 ")
+        cache.put(key, "당뇨 초기 증상", "갈증, 다뇨")
+        assert cache.get(cache.make_key("당뇨 초기 증상")) == ("갈증, 다뇨", None)
+        assert cache.get(cache.make_key("당뇨 초기 증상", scope="news")) is None
+
+    @pytest.mark.unit
+    def test_expired_entry_is_a_miss(self, cache):
+        key = cache.make_key("감기")
+        cache.put(key, "감기", "휴식", ttl=0.01)
+        time.sleep(0.02)
+        assert cache.get(key) is None
+
+    @pytest.mark.unit
+    def test_size_bound_evicts_oldest(self, cache):
+        for i in range(12):
+            cache.put(cache.make_key(f"q{i}"), f"q{i}", "r", ttl=100 + i)
+        cache.put(cache.make_key("q-last"), "q-last", "r")
+        for i in range(100):
+            cache.put(cache.make_key(f"fill{i}"), f"fill{i}", "r")
+        # 정리는 100번 쓰기마다 한 번 → 마지막 정리 이후 쓰기(12개)만큼만 상한을 넘을 수 있다
+        assert len(cache) <= 5 + 12
+        assert cache.get(cache.make_key("q0")) is None
+
+    @pytest.mark.unit
+    def test_hit_latency_is_sub_millisecond(self, cache):
+        key = cache.make_key("고혈압 식단")
+        cache.put(key, "고혈압 식단", "저염식" * 200)
+        start = time.perf_counter()
+        for _ in range(200):
+            assert cache.get(key) is not None
+        assert (time.perf_counter() - start) / 200 < 0.001
+
+
+class TestCachedSerperSearch:
+    @pytest.fixture(autouse=True)
+    def serper(self, monkeypatch):
+        monkeypatch.setenv("SERPER_API_KEY", "test-key")
+        self.calls = []
+        self.status = 200
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.calls.append(request)
+            if self.status != 200:
+                return httpx.Response(self.status)
+            return httpx.Response(200, json={"organic": [{"snippet": "독감 예방접종은 매년"}]})
+
+        http._clients["serper"] = httpx.Client(
+            transport=InstrumentedTransport("serper", httpx.MockTransport(handler))
+        )
+        yield
+        http.close_http_clients()
+
+    @pytest.mark.unit
+    def test_repeated_search_is_served_from_cache(self, cache):
+        client = SerperSearchClient(cache=cache)
+        assert client.search("독감 예방접종") == "독감 예방접종은 매년"
+        assert client.search("독감  예방접종") == "독감 예방접종은 매년"
+        assert len(self.calls) == 1
+
+    @pytest.mark.unit
+    def test_failed_lookup_is_negatively_cached(self, cache):
+        self.status = 500
+        client = SerperSearchClient(cache=cache)
+        with pytest.raises(httpx.HTTPStatusError):
+            client.search("독감")
+        with pytest.raises(CachedSearchFailure):
+            client.search("독감")
+        assert len(self.calls) == 1
+
+    @pytest.mark.unit
+    def test_cancelled_lookup_is_not_cached(self, cache):
+        client = SerperSearchClient(cache=cache)
+        token = CancelToken("test")
+        token.cancel("client_disconnected")
+        with bind_cancel_token(token):
+            with pytest.raises(RequestCancelled):
+                client.search("독감")
+        # 다른 클라이언트의 같은 질의는 취소의 영향을 받지 않는다
+        assert client.search("독감") == "독감 예방접종은 매년"
+        assert len(self.calls) == 1
@@ -0,0 +1,91 @@
+from unittest.mock import Mock
+
+import chromadb
+import pytest
+
+from app.core.db import ChromaDBConnection
+from app.repository.vector.sharded_repo import ShardConfig, ShardedChromaRepository, shard_for
+
+IDS = [f"kb_{i}" for i in range(40)]
+EMBEDDINGS = [[1.0, i / 40] for i in range(40)]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = chromadb.EphemeralClient()
+    for collection in client.list_collections():
+        if collection.name.startswith("shard_test"):
+            client.delete_collection(collection.name)
+    monkeypatch.setattr(ChromaDBConnection, "_instance", None)
+    monkeypatch.setattr(ChromaDBConnection, "_client", client)
+    return client
+
+
+def _repo(monkeypatch, shards: int) -> ShardedChromaRepository:
+    monkeypatch.setenv("CHROMA_SHARDS", str(shards))
+    monkeypatch.setenv("CHROMA_SHARD_AUTO_REBALANCE", "true")
+    return ShardedChromaRepository("shard_test", ShardConfig())
+
+
+def _fill(repo):
+    repo.add_documents(
+        documents=[f"문서 {i}" for i in range(40)],
+        embeddings=EMBEDDINGS,
+        metadatas=[{"n": i} for i in range(40)],
+        ids=IDS,
+    )
+
+
+class TestShardedRepository:
+    @pytest.mark.unit
+    def test_chunks_follow_parent_shard(self):
+        assert shard_for("kb_1#0", 8) == shard_for("kb_1#3", 8) == shard_for("kb_1", 8)
+
+    @pytest.mark.unit
+    def test_spreads_documents_and_merges_top_k(self, client, monkeypatch):
+        repo = _repo(monkeypatch, 4)
+        _fill(repo)
+        counts = repo.get_collection_info()["metadata"]["shard_counts"]
+        assert sum(counts.values()) == 40
+        assert all(count > 0 for count in counts.values())
+
+        results = repo.query([[1.0, 0.0]], n_results=5)
+        assert results["ids"][0] == IDS[:5]
+        assert results["distances"][0] == sorted(results["distances"][0])
+        assert repo.get(ids=["kb_7"])["documents"] == ["문서 7"]
+
+    @pytest.mark.unit
+    def test_rebalances_when_shard_count_changes(self, client, monkeypatch):
+        _fill(_repo(monkeypatch, 1))
+
+        grown = _repo(monkeypatch, 4)
+        assert not grown.needs_rebalance()
+        for index, shard in grown.shards().items():
+            assert all(shard_for(doc_id, 4) == index for doc_id in shard.get()["ids"])
+        assert grown.get_collection_info()["count"] == 40
+
+        shrunk = _repo(monkeypatch, 2)
+        assert sorted(shrunk.shards()) == [0, 1]
+        assert shrunk.get_collection_info()["count"] == 40
+        assert not [c for c in client.list_collections() if c.name.startswith("shard_test-shard-3")]
+        assert shrunk.query([[1.0, 0.0]], n_results=3)["ids"][0] == IDS[:3]
+
+    @pytest.mark.unit
+    def test_new_shard_during_iteration(self, client, monkeypatch):
+        repo = _repo(monkeypatch, 4)
+        _fill(repo)
+
+        def add_shard(*args, **kwargs):
+            # 샤드를 순회하는 도중 다른 요청이 새 샤드 컬렉션을 만든다
+            repo._shard(len(repo.shards()) + 10)
+            return {"ids": [], "documents": [], "metadatas": []}
+
+        racing = Mock()
+        racing.get.side_effect = add_shard
+        racing.delete_documents.side_effect = add_shard
+        racing.collection.count.return_value = 0
+        repo._shards = {5: racing, **repo._shards}
+
+        assert repo.get(ids=["kb_7"])["documents"] == ["문서 7"]
+        repo.delete_documents(ids=["kb_7"])
+        assert repo.get_collection_info()["count"] == 39
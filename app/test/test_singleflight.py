@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from app.core.singleflight import SingleFlight, normalize_key, SINGLEFLIGHT_CALLS_TOTAL
+
+
+class TestSingleFlight:
+    @pytest.mark.unit
+    def test_concurrent_callers_share_one_execution(self):
+        group = SingleFlight("test_share")
+        calls = []
+        release = threading.Event()
+        results = []
+
+        def work():
+            calls.append(1)
+            release.wait(2)
+            return {"answer": "휴식과 수분 섭취"}
+
+        def caller():
+            results.append(group.do("감기", work))
+
+        threads = [threading.Thread(target=caller) for _ in range(4)]
+        for t in threads:
+            t.start()
+        while SINGLEFLIGHT_CALLS_TOTAL.value(group="test_share", role="coalesced") < 3:
+            time.sleep(0.001)
+        release.set()
+        for t in threads:
+            t.join(2)
+
+        assert len(calls) == 1
+        assert sorted(shared for _, shared in results) == [False, True, True, True]
+        assert all(result is results[0][0] for result, _ in results)
+        assert SINGLEFLIGHT_CALLS_TOTAL.value(group="test_share", role="leader") == 1
+
+    @pytest.mark.unit
+    def test_error_is_delivered_to_waiters_and_key_is_released(self):
+        group = SingleFlight("test_error")
+        started = threading.Event()
+        errors = []
+
+        def failing():
+            started.set()
+            time.sleep(0.05)
+            raise RuntimeError("upstream down")
+
+        def caller():
+            try:
+                group.do("key", failing)
+            except RuntimeError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=caller)
+        leader.start()
+        started.wait(1)
+        waiter = threading.Thread(target=caller)
+        waiter.start()
+        leader.join(2)
+        waiter.join(2)
+
+        assert len(errors) == 2
+        # 실패한 키는 남지 않으므로 다음 호출은 새로 실행된다
+        assert group.do("key", lambda: "ok") == ("ok", False)
+
+    @pytest.mark.unit
+    def test_disabled_runs_every_call(self, monkeypatch):
+        monkeypatch.setenv("SINGLEFLIGHT_ENABLED", "false")
+        assert SingleFlight("test_off").do("k", lambda: 1) == (1, False)
+
+    @pytest.mark.unit
+    def test_normalize_key(self):
+        assert normalize_key("  감기  증상 ") == normalize_key("감기 증상")
+        assert normalize_key("Flu Symptoms") == "flu symptoms"
@@ -0,0 +1,80 @@
+import json
+import os
+
+import chromadb
+import pytest
+
+from app.core.snapshot import (
+    SnapshotConfig,
+    SnapshotError,
+    export_snapshot,
+    import_snapshot,
+    verify_snapshot,
+)
+from app.repository.vector.vector_repo import ChromaDBRepository
+
+
+def _repo(name: str) -> ChromaDBRepository:
+    client = chromadb.EphemeralClient()
+    try:
+        client.delete_collection(name)
+    except Exception:
+        pass
+    repo = ChromaDBRepository.__new__(ChromaDBRepository)
+    repo.collection = client.get_or_create_collection(name)
+    return repo
+
+
+@pytest.fixture
+def config(monkeypatch):
+    monkeypatch.setenv("SNAPSHOT_PART_SIZE", "4")
+    monkeypatch.setenv("SNAPSHOT_BATCH_SIZE", "3")
+    return SnapshotConfig()
+
+
+@pytest.fixture
+def source():
+    repo = _repo("snapshot_source")
+    repo.add_documents(
+        documents=[f"질문: {i}\n답변: 내용 {i}" for i in range(10)],
+        embeddings=[[float(i), 1.0, 0.5] for i in range(10)],
+        metadatas=[{"domain": "cardio" if i % 2 else "respiratory", "qa_id": i} for i in range(10)],
+        ids=[f"medical_{i}" for i in range(10)],
+    )
+    return repo
+
+
+class TestSnapshot:
+    @pytest.mark.unit
+    def test_round_trip_without_embedding_calls(self, tmp_path, config, source):
+        manifest = export_snapshot(source, str(tmp_path), config)
+        assert manifest["count"] == 10 and manifest["dim"] == 3
+        assert len(manifest["parts"]) == 3
+
+        target = _repo("snapshot_target")
+        assert import_snapshot(target, str(tmp_path), config=config) == 10
+
+        original = source.get(ids=["medical_7"], include=["documents", "metadatas", "embeddings"])
+        restored = target.get(ids=["medical_7"], include=["documents", "metadatas", "embeddings"])
+        assert restored["documents"] == original["documents"]
+        assert restored["metadatas"] == original["metadatas"]
+        assert list(restored["embeddings"][0]) == list(original["embeddings"][0])
+        assert target.query([[7.0, 1.0, 0.5]], n_results=1)["ids"] == [["medical_7"]]
+
+    @pytest.mark.unit
+    def test_detects_corruption(self, tmp_path, config, source):
+        manifest = export_snapshot(source, str(tmp_path), config)
+        with open(tmp_path / manifest["parts"][1]["records"], "a", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "extra", "document": "x", "metadata": None}) + "\n")
+        with pytest.raises(SnapshotError, match="Checksum"):
+            verify_snapshot(str(tmp_path))
+
+    @pytest.mark.unit
+    def test_refuses_non_empty_target_and_incomplete_snapshot(self, tmp_path, config, source):
+        with pytest.raises(SnapshotError, match="manifest"):
+            verify_snapshot(str(tmp_path))
+        export_snapshot(source, str(tmp_path), config)
+        with pytest.raises(SnapshotError, match="already has"):
+            import_snapshot(source, str(tmp_path), config=config)
+        with pytest.raises(SnapshotError, match="already exists"):
+            export_snapshot(source, str(tmp_path), config)
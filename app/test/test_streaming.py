@@ -0,0 +1,153 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from app.api.route import agent_routers
+from app.core.streaming import SSEEncoder, gzip_stream, serialize_result
+from app.deps import get_agent_service
+
+RAW_SEARCH = "질문: 두통이 계속됩니다\n답변: " + "긴 검색 결과 본문 " * 300
+
+
+def _events():
+    call = AIMessage(content="", tool_calls=[{"name": "search_medical_qa", "args": {"query": "두통"}, "id": "c1"}], id="m1")
+    tool = ToolMessage(content=RAW_SEARCH, tool_call_id="c1", id="m2")
+    verdict = AIMessage(content='{"status": "success"}', id="m3")
+    answer = AIMessage(content="충분히 쉬고 증상이 계속되면 진료를 받으세요.", id="m4")
+    score = AIMessage(content='{"final_score": 9}', id="m5")
+    return [
+        (("info_extract_agent_workflow:1",), {"info_extractor": {"messages": [HumanMessage(content="두통", id="h1"), call]}}),
+        (("info_extract_agent_workflow:1",), {"info_extract_tools": {"messages": [tool]}}),
+        (("info_extract_agent_workflow:1",), {"info_verifier": {"messages": [verdict]}}),
+        ((), {"info_extract_agent_workflow": {"extract_logs": [call, tool, verdict], "loop_count": 1}}),
+        ((), {"answer_gen_agent_workflow": {"answer_logs": [answer], "process_status": "answered"}}),
+        ((), {"evaluate_agent_workflow": {"eval_logs": [score], "process_status": "answered"}}),
+        {"token_usage": {"total": {"input": 1200, "output": 300}}},
+    ]
+
+
+def _frames(verbosity):
+    encoder = SSEEncoder("trace-1", verbosity)
+    frames = [encoder.start()] + [encoder.encode(e) for e in _events()] + [encoder.done()]
+    return [f for f in frames if f is not None]
+
+
+def _payloads(frames):
+    return [json.loads(f[len(b"data: "):]) for f in frames if f != b"data: [DONE]\n\n"]
+
+
+def _legacy_bytes():
+    # 이전 구현: 이벤트마다 모든 목록을 통째로 다시 보냄
+    total = 0
+    for event in _events():
+        if isinstance(event, tuple):
+            event = event[1]
+        body = {
+            node: {
+                k: [{"role": m.type, "content": m.content} for m in v] if isinstance(v, list) else v
+                for k, v in update.items()
+            }
+            for node, update in event.items()
+        }
+        total += len(f"data: {json.dumps({**body, 'trace_id': 'trace-1'}, ensure_ascii=False)}\n\n".encode())
+    return total
+
+
+class TestSSEEncoder:
+    @pytest.mark.unit
+    def test_answer_mode_is_order_of_magnitude_smaller(self):
+        payloads = _payloads(_frames("answer"))
+        assert payloads == [{"trace_id": "trace-1"}, {"answer": "충분히 쉬고 증상이 계속되면 진료를 받으세요."}]
+        assert sum(map(len, _frames("answer"))) * 10 < _legacy_bytes()
+
+    @pytest.mark.unit
+    def test_status_mode_hides_tool_output_and_sends_deltas(self):
+        payloads = _payloads(_frames("status"))
+        assert RAW_SEARCH not in json.dumps(payloads, ensure_ascii=False)
+        assert {"node": "info_extractor", "tool_calls": [{"name": "search_medical_qa", "args": {"query": "두통"}}]} in payloads
+        assert {"info_extract_agent_workflow": {"extract_logs": [{"role": "ai", "content": '{"status": "success"}'}], "loop_count": 1}} in payloads
+        # process_status가 바뀌지 않았으므로 평가 노드 이벤트에는 다시 싣지 않는다
+        assert {"evaluate_agent_workflow": {"eval_logs": [{"role": "ai", "content": '{"final_score": 9}'}]}} in payloads
+        assert payloads[-1] == {"token_usage": {"total": {"input": 1200, "output": 300}}}
+
+    @pytest.mark.unit
+    def test_debug_mode_sends_each_message_once_per_channel(self):
+        payloads = _payloads(_frames("debug"))
+        internal = [p for p in payloads if "ns" in p]
+        assert len(internal) == 3
+        assert internal[1]["info_extract_tools"]["messages"][0]["content"] == RAW_SEARCH
+        top = next(p for p in payloads if "info_extract_agent_workflow" in p)
+        assert [m["role"] for m in top["info_extract_agent_workflow"]["extract_logs"]] == ["ai", "tool", "ai"]
+
+        encoder = SSEEncoder("trace-1", "debug")
+        event = ((), {"answer_gen_agent_workflow": {"answer_logs": [AIMessage(content="a", id="x")]}})
+        encoder.encode(event)
+        assert json.loads(encoder.encode(event)[6:]) == {"answer_gen_agent_workflow": {}}
+
+    @pytest.mark.unit
+    def test_gzip_stream_flushes_every_frame(self):
+        async def frames():
+            for frame in _frames("status"):
+                yield frame
+
+        async def collect():
+            return [chunk async for chunk in gzip_stream(frames())]
+
+        chunks = asyncio.run(collect())
+        assert len(chunks) == len(_frames("status")) + 1
+        assert gzip.decompress(b"".join(chunks)) == b"".join(_frames("status"))
+
+    @pytest.mark.unit
+    def test_serialize_result_levels(self):
+        result = {
+            "user_query": "두통",
+            "extract_logs": [AIMessage(content="", tool_calls=[{"name": "t", "args": {}, "id": "1"}]), ToolMessage(content="raw", tool_call_id="1")],
+            "answer_logs": [HumanMessage(content="두통"), AIMessage(content="답변")],
+        }
+        assert serialize_result(result)["extract_logs"][0]["tool_calls"][0]["name"] == "t"
+        assert serialize_result(result, "status")["extract_logs"] == [{"role": "ai", "content": ""}]
+        assert serialize_result(result, "answer") == {"user_query": "두통", "answer_logs": [{"role": "ai", "content": "답변"}]}
+
+
+class FakeAgentService:
+    def run_agent(self, name, inputs, session_id=None, deadline_seconds=None):
+        return {"user_query": inputs.get("user_query", ""), "answer_logs": [AIMessage(content="답변")]}
+
+    async def stream_agent(self, name, inputs, session_id=None, deadline_seconds=None):
+        for event in _events():
+            yield event
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(agent_routers.router)
+    app.dependency_overrides[get_agent_service] = FakeAgentService
+    return TestClient(app)
+
+
+class TestStreamingRoutes:
+    @pytest.mark.unit
+    def test_stream_honours_verbosity_and_gzip(self, client, monkeypatch):
+        monkeypatch.setattr(agent_routers.stream_config, "gzip", True)
+        response = client.post(
+            "/agent/chat/stream",
+            json={"query": "두통", "verbosity": "answer"},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text.encode() == b"".join(_frames("answer")).replace(b"trace-1", response.headers["x-trace-id"].encode())
+
+    @pytest.mark.unit
+    def test_chat_and_named_agent_share_serializer(self, client):
+        chat = client.post("/agent/chat", json={"query": "두통", "verbosity": "answer"})
+        assert chat.json()["answer_logs"] == [{"role": "ai", "content": "답변"}]
+        assert chat.json()["trace_id"] == chat.headers["x-trace-id"]
+        named = client.post("/agent/super", json={"inputs": {"user_query": "두통"}})
+        assert named.json() == {"user_query": "두통", "answer_logs": [{"role": "ai", "content": "답변"}]}
+        assert client.post("/agent/chat", json={"query": "q", "verbosity": "loud"}).status_code == 422
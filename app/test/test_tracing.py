@@ -0,0 +1,66 @@
+import json
+import pytest
+
+from app.core import tracing
+from app.core.tracing import FileSpanExporter, start_trace, span, traced, current_trace_id
+
+
+class TestTracing:
+    @pytest.fixture
+    def exporter(self, tmp_path):
+        exporter = FileSpanExporter(str(tmp_path / "traces.jsonl"), "test-service")
+        tracing.set_exporter(exporter)
+        yield exporter
+        tracing.set_exporter(None)
+
+    def _read_spans(self, exporter):
+        with open(exporter.path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        return records, [
+            s
+            for r in records
+            for rs in r["resourceSpans"]
+            for ss in rs["scopeSpans"]
+            for s in ss["spans"]
+        ]
+
+    @pytest.mark.unit
+    def test_nested_spans_exported_as_one_trace(self, exporter):
+        @traced("super_graph.node")
+        def node():
+            with span("llm.solar_chat", agent="test"):
+                return current_trace_id()
+
+        with start_trace("POST /agent/chat") as root:
+            inner_trace_id = node()
+
+        assert inner_trace_id == root.trace_id
+        records, spans = self._read_spans(exporter)
+        assert len(records) == 1
+        by_name = {s["name"]: s for s in spans}
+        assert set(by_name) == {"POST /agent/chat", "super_graph.node", "llm.solar_chat"}
+        assert "parentSpanId" not in by_name["POST /agent/chat"]
+        assert by_name["super_graph.node"]["parentSpanId"] == root.span_id
+        assert (
+            by_name["llm.solar_chat"]["parentSpanId"]
+            == by_name["super_graph.node"]["spanId"]
+        )
+        assert all(s["traceId"] == root.trace_id for s in spans)
+
+    @pytest.mark.unit
+    def test_span_without_trace_is_noop(self, exporter):
+        with span("embedding.create_embedding") as s:
+            assert s is None
+        assert current_trace_id() is None
+
+    @pytest.mark.unit
+    def test_exception_marks_span_as_error(self, exporter):
+        with pytest.raises(RuntimeError):
+            with start_trace("POST /agent/chat"):
+                with span("tool.google_search"):
+                    raise RuntimeError("boom")
+
+        _, spans = self._read_spans(exporter)
+        failed = next(s for s in spans if s["name"] == "tool.google_search")
+        assert failed["status"]["code"] == tracing.STATUS_CODE_ERROR
+        assert "boom" in failed["status"]["message"]
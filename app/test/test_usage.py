@@ -0,0 +1,68 @@
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.core import usage
+from app.core.usage import track_usage, record_usage, check_budget
+from app.agents.workflow import check_extract_status
+
+
+def _message(prompt: int, completion: int) -> AIMessage:
+    return AIMessage(
+        content="ok",
+        usage_metadata={
+            "input_tokens": prompt,
+            "output_tokens": completion,
+            "total_tokens": prompt + completion,
+        },
+    )
+
+
+class TestTokenUsage:
+    @pytest.fixture(autouse=True)
+    def reset_sessions(self):
+        usage._sessions.clear()
+        yield
+        usage._sessions.clear()
+
+    @pytest.mark.unit
+    def test_usage_aggregated_per_agent(self):
+        with track_usage() as tracker:
+            record_usage("MedicalInfoExtractor", _message(100, 10))
+            record_usage("MedicalInfoExtractor", _message(150, 5))
+            record_usage("MedicalConsultant", _message(300, 200))
+
+        snapshot = tracker.snapshot()
+        assert snapshot["prompt_tokens"] == 550
+        assert snapshot["completion_tokens"] == 215
+        assert snapshot["by_agent"]["MedicalInfoExtractor"] == {
+            "prompt_tokens": 250,
+            "completion_tokens": 15,
+            "calls": 2,
+        }
+
+    @pytest.mark.unit
+    def test_request_budget_skips_augmentation(self, monkeypatch):
+        monkeypatch.setenv("TOKEN_BUDGET_PER_REQUEST", "500")
+        state = {"extract_logs": [AIMessage(content='{"status": "insufficient"}')], "loop_count": 1}
+
+        with track_usage() as tracker:
+            assert check_extract_status(state) == "augment"
+            record_usage("MedicalInfoExtractor", _message(450, 100))
+            assert check_extract_status(state) == "continue"
+
+        assert tracker.snapshot()["budget"]["degraded"] == ["augmentation:request_token_budget"]
+
+    @pytest.mark.unit
+    def test_session_budget_accumulates_across_requests(self, monkeypatch):
+        monkeypatch.setenv("TOKEN_BUDGET_PER_SESSION", "1000")
+
+        with track_usage("session-1"):
+            record_usage("MedicalConsultant", _message(600, 100))
+            assert check_budget("evaluation")
+
+        with track_usage("session-1"):
+            record_usage("MedicalConsultant", _message(200, 100))
+            assert not check_budget("evaluation")
+
+        with track_usage("session-2"):
+            assert check_budget("evaluation")
@@ -8,7 +8,13 @@ from app.agents.subgraphs.knowledge_augmentor import augment_agent, should_conti
 from app.agents.subgraphs.answer_gen import answer_gen_agent
 from app.agents.subgraphs.evaluator import evaluate_agent
 from app.service.agents.info_extractor_service import InfoExtractorService
-from app.agents.workflow import clean_and_parse_json, check_extract_status
+from app.agents.workflow import (
+    clean_and_parse_json,
+    check_extract_status,
+    check_augment_result,
+    call_augment_fast_path,
+)
+from app.service.agents.knowledge_augmentor_service import KnowledgeAugmentorService
 
 class TestWorkflowUnits:
     
@@ -175,3 +181,66 @@ class TestWorkflowUnits:
         input_messages = args[0]["messages"]
         assert any("prev context" in m.content for m in input_messages if isinstance(m, HumanMessage))
         assert any("h1" == m.content for m in input_messages if isinstance(m, HumanMessage))
+
+
+AUGMENT_LOGS = [
+    AIMessage(content="", tool_calls=[{"name": "google_search", "args": {"query": "두통"}, "id": "g1"}]),
+    ToolMessage(content="두통은 긴장성 두통이 가장 흔하다.", tool_call_id="g1", name="google_search"),
+    AIMessage(content="", tool_calls=[{"name": "add_to_medical_qa", "args": {"content": "두통에는 휴식과 수분 섭취가 도움이 된다."}, "id": "a1"}]),
+    ToolMessage(content="Successfully added information to knowledge base.", tool_call_id="a1", name="add_to_medical_qa"),
+    AIMessage(content='{"status": "success"}'),
+]
+
+
+class TestAugmentFastPath:
+
+    @pytest.mark.unit
+    def test_augmented_documents_prefers_saved_content(self):
+        service = KnowledgeAugmentorService()
+        assert service.augmented_documents(AUGMENT_LOGS) == ["두통에는 휴식과 수분 섭취가 도움이 된다."]
+
+        # 저장한 내용이 없으면 검색 결과, 검색 오류는 제외
+        search_only = AUGMENT_LOGS[:2] + [
+            ToolMessage(content="Google Search Error: timeout", tool_call_id="g2", name="google_search")
+        ]
+        assert service.augmented_documents(search_only) == ["두통은 긴장성 두통이 가장 흔하다."]
+        assert service.augmented_documents([AIMessage(content="nothing")]) == []
+
+    @pytest.mark.unit
+    def test_check_augment_result(self, monkeypatch):
+        state = {"augment_logs": AUGMENT_LOGS}
+        monkeypatch.setenv("AUGMENT_FAST_PATH", "verify")
+        assert check_augment_result(state) == "fast"
+        assert check_augment_result({"augment_logs": [AIMessage(content="nothing")]}) == "reextract"
+
+        monkeypatch.setenv("AUGMENT_FAST_PATH", "off")
+        assert check_augment_result(state) == "reextract"
+
+    @pytest.mark.unit
+    def test_direct_fast_path_builds_extract_result(self, monkeypatch):
+        monkeypatch.setenv("AUGMENT_FAST_PATH", "direct")
+        state = {"user_query": "두통에 좋은 방법", "augment_logs": AUGMENT_LOGS, "loop_count": 1}
+
+        result = call_augment_fast_path(state, {})
+
+        parsed = clean_and_parse_json(result["extract_logs"][-1].content)
+        assert parsed["status"] == "success"
+        assert "휴식과 수분 섭취" in parsed["medical_context"]
+        assert result["loop_count"] == 2
+        assert result["answer_path"] == "augment_direct"
+        assert check_extract_status({**state, **result}) == "continue"
+
+    @pytest.mark.unit
+    @patch("app.agents.subgraphs.info_extractor.solar_chat")
+    def test_verify_fast_path_uses_one_verifier_call(self, mock_llm, monkeypatch):
+        monkeypatch.setenv("AUGMENT_FAST_PATH", "verify")
+        mock_llm.invoke.return_value = AIMessage(content='{"status": "success", "medical_context": "휴식"}')
+        state = {"user_query": "두통에 좋은 방법", "augment_logs": AUGMENT_LOGS, "loop_count": 1}
+
+        result = call_augment_fast_path(state, {})
+
+        assert mock_llm.invoke.call_count == 1
+        verify_messages = mock_llm.invoke.call_args[0][0]
+        assert "휴식과 수분 섭취" in verify_messages[-1].content
+        assert result["answer_path"] == "augment_verify"
+        assert clean_and_parse_json(result["extract_logs"][-1].content)["status"] == "success"
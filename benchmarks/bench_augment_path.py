@@ -0,0 +1,121 @@
+"""
+보강 이후 경로 벤치마크: AUGMENT_FAST_PATH=off(내부 검색/검증 재실행), direct(보강 내용 바로 사용),
+verify(보강 내용 검증 한 번)의 요청 지연과 LLM 호출 수를 비교한다.
+
+    python benchmarks/bench_augment_path.py
+    python benchmarks/bench_augment_path.py --runs 20 --llm-ms 800 --search-ms 150
+
+실제 super 그래프를 돌리되 LLM/구글 검색/벡터 검색은 고정 지연 뒤 정해진 응답을 돌려주는 가짜로 바꾼다.
+첫 내부 검색은 항상 "insufficient"라 모든 요청이 보강을 거친다. 결과는 방식별 지연(ms)의 중앙값/p95와
+요청당 LLM 호출 수이며 JSON 한 줄로 출력한다. 답변 품질 차이는 운영의 answer_eval_score{path}로 본다.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+AUGMENTED = "두통이 계속되면 수분 섭취와 휴식이 도움이 되며, 심한 두통은 진료를 받아야 한다."
+
+
+def _fakes(llm_seconds: float, search_seconds: float, calls: Counter):
+    from langchain_core.messages import AIMessage, ToolMessage
+
+    def invoke_chat(llm, messages, agent_name, idempotent=False):
+        calls[agent_name] += 1
+        time.sleep(llm_seconds)
+        tool_results = [m for m in messages if isinstance(m, ToolMessage)] if isinstance(messages, list) else []
+        if agent_name == "MedicalInfoExtractor":
+            if not tool_results:
+                return AIMessage(content="", tool_calls=[{"name": "search_medical_qa", "args": {"query": "두통"}, "id": "s1"}])
+            return AIMessage(content="done")
+        if agent_name == "MedicalInfoVerifier":
+            text = " ".join(str(m.content) for m in messages)
+            status = "success" if AUGMENTED[:10] in text else "insufficient"
+            return AIMessage(content=json.dumps({"status": status, "medical_context": AUGMENTED}, ensure_ascii=False))
+        if agent_name == "KnowledgeAugmentor":
+            if len(tool_results) == 0:
+                return AIMessage(content="", tool_calls=[{"name": "google_search", "args": {"query": "두통"}, "id": "g1"}])
+            if len(tool_results) == 1:
+                return AIMessage(content="", tool_calls=[
+                    {"name": "add_to_medical_qa", "args": {"content": AUGMENTED}, "id": "a1"}
+                ])
+            return AIMessage(content='{"status": "success"}')
+        if agent_name == "MedicalEvaluator":
+            return AIMessage(content='{"final_score": 8}')
+        return AIMessage(content="두통 상담 답변")
+
+    class FakeSearchClient:
+        def search(self, query):
+            time.sleep(search_seconds)
+            return AUGMENTED
+
+    class FakeVectorService:
+        def __init__(self):
+            self.documents = ["감기는 바이러스 감염이다."]
+
+        def search(self, query, n_results=5, where=None):
+            time.sleep(search_seconds)
+            return {"documents": self.documents[-n_results:], "metadatas": None}
+
+        def add_documents(self, documents, metadatas=None):
+            self.documents.extend(documents)
+
+    return invoke_chat, FakeSearchClient(), FakeVectorService
+
+
+def measure(runs: int, llm_ms: float, search_ms: float) -> dict:
+    os.environ.setdefault("UPSTAGE_API_KEY", "bench")
+    from app.agents import tools
+    from app.agents.subgraphs import answer_gen, evaluator, info_extractor, knowledge_augmentor
+    from app.agents.workflow import build_super_graph
+
+    calls: Counter = Counter()
+    invoke_chat, search_client, vector_service_cls = _fakes(llm_ms / 1000, search_ms / 1000, calls)
+    for module in (answer_gen, evaluator, info_extractor, knowledge_augmentor):
+        module.invoke_chat = invoke_chat
+    tools.search_client = search_client
+
+    results = {"runs": runs, "llm_ms": llm_ms, "search_ms": search_ms}
+    for mode in ("off", "direct", "verify"):
+        os.environ["AUGMENT_FAST_PATH"] = mode
+        graph = build_super_graph()
+        samples = []
+        calls.clear()
+        for _ in range(runs):
+            config = {"configurable": {
+                "vector_service": vector_service_cls(),
+                "knowledge_writer": None,
+                "write_scope": uuid.uuid4().hex,
+                "thread_id": uuid.uuid4().hex,
+            }}
+            started = time.perf_counter()
+            state = graph.invoke({"user_query": "두통이 계속돼요", "process_status": "start", "loop_count": 0}, config=config)
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        results[mode] = {
+            "path": state.get("answer_path"),
+            "p50_ms": round(statistics.median(samples), 1),
+            "p95_ms": round(samples[max(0, int(len(samples) * 0.95) - 1)], 1),
+            "llm_calls_per_request": round(sum(calls.values()) / runs, 2),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--llm-ms", type=float, default=300, help="LLM 호출당 지연")
+    parser.add_argument("--search-ms", type=float, default=50, help="구글/벡터 검색당 지연")
+    args = parser.parse_args()
+    print(json.dumps(measure(args.runs, args.llm_ms, args.search_ms)))
+
+
+if __name__ == "__main__":
+    main()
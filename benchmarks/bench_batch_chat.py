@@ -0,0 +1,169 @@
+"""
+대량 질의 처리량 벤치마크: 지금처럼 /agent/chat을 질문마다 하나씩 호출하는 방식과 /agent/chat/batch 한 번으로
+보내는 방식의 처리량(질문/초)과 업스트림 임베딩 요청 수를 비교한다.
+
+    python benchmarks/bench_batch_chat.py
+    python benchmarks/bench_batch_chat.py --queries 500 --concurrency 16 --llm-ms 200 --embed-ms 40
+
+실제 AgentService와 super 그래프를 돌리되 LLM은 고정 지연 뒤 정해진 응답(내부 검색 한 번 -> 검증 성공 -> 답변
+-> 평가)을 돌려주는 가짜로 바꾼다. 검색은 실제 EmbeddingService(질의 임베딩 캐시/묶음 포함)에 지연을 둔 가짜
+업스트림을 붙여 질의 임베딩을 요청한다. 결과는 JSON 한 줄로 출력한다.
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+class FakeEmbeddings:
+    """embed_query / client.create(-query) 호출 수를 세는 업스트림 대역."""
+
+    model = "solar-embedding-1-large"
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.client = SimpleNamespace(create=self._create)
+
+    def _count(self):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+
+    def embed_query(self, text):
+        self._count()
+        return [float(len(text)), 0.0]
+
+    @property
+    def _invocation_params(self):
+        return {"model": self.model}
+
+    def _create(self, input, **params):
+        self._count()
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=[float(len(t)), 0.0]) for i, t in enumerate(input)])
+
+
+def _app(llm_seconds: float, embed_seconds: float):
+    os.environ.setdefault("UPSTAGE_API_KEY", "bench")
+    from fastapi import FastAPI
+    from langchain_core.messages import AIMessage, ToolMessage
+
+    from app.agents.subgraphs import answer_gen, evaluator, info_extractor, knowledge_augmentor
+    from app.api.route import agent_routers
+    from app.deps import get_agent_service
+    from app.service.agent_service import AgentService
+    from app.service.embedding_service import EmbeddingService
+
+    embeddings = FakeEmbeddings(embed_seconds)
+    embedding_service = EmbeddingService()
+    embedding_service._embeddings = embeddings
+
+    def invoke_chat(llm, messages, agent_name, idempotent=False):
+        time.sleep(llm_seconds)
+        if agent_name == "MedicalInfoExtractor":
+            if not any(isinstance(m, ToolMessage) for m in messages):
+                query = re.search(r'"(.+?)"', messages[-1].content).group(1)
+                return AIMessage(content="", tool_calls=[{"name": "search_medical_qa", "args": {"query": query}, "id": "s1"}])
+            return AIMessage(content="done")
+        if agent_name == "MedicalInfoVerifier":
+            return AIMessage(content='{"status": "success", "medical_context": "휴식과 수분 섭취"}')
+        if agent_name == "MedicalEvaluator":
+            return AIMessage(content='{"final_score": 8}')
+        return AIMessage(content="답변")
+
+    class FakeVectorService:
+        """검색마다 실제 EmbeddingService로 질의 임베딩을 만든다 (벡터 검색 자체는 고정 결과)."""
+
+        def __init__(self):
+            self.embedding_service = embedding_service
+
+        def search(self, query, n_results=5, where=None):
+            embedding_service.create_embedding(query)
+            return {"documents": ["두통에는 휴식과 수분 섭취가 도움이 된다."], "metadatas": None}
+
+        def add_documents(self, documents, metadatas=None):
+            pass
+
+    for module in (answer_gen, evaluator, info_extractor, knowledge_augmentor):
+        module.invoke_chat = invoke_chat
+    service = AgentService(vector_service=FakeVectorService())
+
+    app = FastAPI()
+    app.include_router(agent_routers.router)
+    app.dependency_overrides[get_agent_service] = lambda: service
+    return app, embeddings, embedding_service
+
+
+def _serve(app) -> int:
+    import uvicorn
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return port
+
+
+def measure(queries: int, concurrency: int, llm_ms: float, embed_ms: float) -> dict:
+    import httpx
+
+    os.environ["BATCH_CHAT_CONCURRENCY"] = str(concurrency)
+    app, embeddings, embedding_service = _app(llm_ms / 1000, embed_ms / 1000)
+    port = _serve(app)
+    base = f"http://127.0.0.1:{port}/agent"
+    questions = [f"질문 {i}" for i in range(queries)]
+    results = {"queries": queries, "concurrency": concurrency, "llm_ms": llm_ms, "embed_ms": embed_ms}
+
+    with httpx.Client(timeout=None) as client:
+        embeddings.requests = 0
+        embedding_service._cache.clear()
+        started = time.perf_counter()
+        for q in questions:
+            response = client.post(f"{base}/chat", json={"query": q})
+            response.raise_for_status()
+            assert response.json()["answer_logs"][-1]["content"] == "답변", response.text
+        elapsed = time.perf_counter() - started
+        results["sequential_chat"] = {
+            "queries_per_s": round(queries / elapsed, 2),
+            "embedding_requests": embeddings.requests,
+        }
+
+        embeddings.requests = 0
+        embedding_service._cache.clear()
+        started = time.perf_counter()
+        with client.stream("POST", f"{base}/chat/batch", json={"queries": questions}) as response:
+            records = [json.loads(line) for line in response.iter_lines() if line]
+        elapsed = time.perf_counter() - started
+        failed = [r for r in records if "error" in r]
+        assert not failed, failed[:3]
+        results["batch"] = {
+            "queries_per_s": round(len(records) / elapsed, 2),
+            "embedding_requests": embeddings.requests,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--llm-ms", type=float, default=100, help="LLM 호출당 지연")
+    parser.add_argument("--embed-ms", type=float, default=30, help="임베딩 요청당 지연")
+    args = parser.parse_args()
+    print(json.dumps(measure(args.queries, args.concurrency, args.llm_ms, args.embed_ms)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+대화 전송 방식 벤치마크: 턴마다 새 연결로 /agent/chat/stream(SSE)을 여는 방식, keep-alive 연결로 SSE를
+반복하는 방식, /agent/ws 한 연결에서 턴을 이어가는 방식의 턴 지연(요청 전송 ~ 마지막 이벤트 수신)을 비교한다.
+
+    python benchmarks/bench_chat_transport.py
+    python benchmarks/bench_chat_transport.py --turns 200 --events 12 --verbosity debug
+
+LLM/검색 없이 고정된 그래프 이벤트를 바로 내보내는 가짜 AgentService를 붙인 uvicorn 서버를 띄워
+전송 계층 비용만 측정한다. 결과는 방식별 턴 지연(ms)의 중앙값/p95 이며 JSON 한 줄로 출력한다.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _app(events: int):
+    from fastapi import FastAPI
+    from langchain_core.messages import AIMessage, ToolMessage
+
+    from app.api.route import agent_routers
+    from app.deps import get_agent_service
+
+    class FakeAgentService:
+        async def stream_agent(self, name, inputs, session_id=None, deadline_seconds=None):
+            for i in range(max(0, events - 2) // 2):
+                call = AIMessage(content="", tool_calls=[{"name": "search_medical_qa", "args": {"query": "q"}, "id": f"c{i}"}])
+                yield (("info_extract_agent_workflow:1",), {"info_extractor": {"messages": [call]}})
+                yield (("info_extract_agent_workflow:1",), {"info_extract_tools": {
+                    "messages": [ToolMessage(content="검색 결과 " * 200, tool_call_id=f"c{i}")]
+                }})
+            yield ((), {"answer_gen_agent_workflow": {"answer_logs": [AIMessage(content="답변 " * 50)]}})
+            yield {"token_usage": {"total": {"input": 1000, "output": 200}}}
+
+    app = FastAPI()
+    app.include_router(agent_routers.router)
+    app.dependency_overrides[get_agent_service] = FakeAgentService
+    return app
+
+
+def _serve(app) -> int:
+    import uvicorn
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return port
+
+
+def _stats(samples) -> dict:
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(samples[max(0, int(len(samples) * 0.95) - 1)], 2),
+    }
+
+
+def _sse_turn(client, url: str, verbosity: str) -> float:
+    started = time.perf_counter()
+    with client.stream("POST", url, json={"query": "두통", "session_id": "bench", "verbosity": verbosity}) as response:
+        for line in response.iter_lines():
+            if line == "data: [DONE]":
+                break
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(turns: int, events: int, verbosity: str) -> dict:
+    import httpx
+    from websockets.sync.client import connect
+
+    port = _serve(_app(events))
+    base = f"http://127.0.0.1:{port}/agent"
+
+    fresh = []
+    for _ in range(turns):
+        # 턴마다 새 연결 (브라우저가 연결을 재사용하지 못하는 경우)
+        with httpx.Client(timeout=30) as client:
+            fresh.append(_sse_turn(client, f"{base}/chat/stream", verbosity))
+
+    with httpx.Client(timeout=30) as client:
+        keep_alive = [_sse_turn(client, f"{base}/chat/stream", verbosity) for _ in range(turns)]
+
+    ws_turns = []
+    with connect(f"ws://127.0.0.1:{port}/agent/ws?session_id=bench") as ws:
+        ws.recv()
+        for _ in range(turns):
+            started = time.perf_counter()
+            ws.send(json.dumps({"type": "turn", "query": "두통", "verbosity": verbosity}))
+            while json.loads(ws.recv())["type"] != "turn_end":
+                pass
+            ws_turns.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "turns": turns,
+        "events": events,
+        "verbosity": verbosity,
+        "sse_new_connection": _stats(fresh[1:]),
+        "sse_keep_alive": _stats(keep_alive[1:]),
+        "websocket": _stats(ws_turns[1:]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--events", type=int, default=8, help="턴당 그래프 이벤트 수")
+    parser.add_argument("--verbosity", default="status", choices=["answer", "status", "debug"])
+    args = parser.parse_args()
+    print(json.dumps(measure(args.turns, args.events, args.verbosity)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+검색 지연 벤치마크: 코퍼스 크기별로 전체 검색, 단일 컬렉션 + domain 필터, 도메인 파티션 검색,
+해시 샤드 scatter-gather 검색을 비교한다. 컬렉션별 적재(인덱스 빌드) 시간도 함께 출력한다.
+
+    python benchmarks/bench_retrieval.py
+    python benchmarks/bench_retrieval.py --sizes 1000 10000 50000 --domains 16 --dim 512 --shards 8
+
+임베딩 API 없이 도메인별로 모인 합성 임베딩을 임시 Chroma 경로에 넣어 측정한다.
+결과는 질의당 지연(ms)의 중앙값/p95 이며 JSON 한 줄로 출력한다.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _corpus(size: int, domains: int, dim: int, rng: np.random.Generator):
+    centers = rng.normal(size=(domains, dim)).astype(np.float32)
+    labels = rng.integers(0, domains, size=size)
+    embeddings = centers[labels] + 0.5 * rng.normal(size=(size, dim)).astype(np.float32)
+    metadatas = [{"domain": f"d{label}", "q_type": "synthetic"} for label in labels]
+    return centers, embeddings, metadatas
+
+
+def _fill(repo, embeddings, metadatas, batch: int = 2000) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(embeddings), batch):
+        end = min(start + batch, len(embeddings))
+        repo.add_documents(
+            documents=[f"doc {i}" for i in range(start, end)],
+            embeddings=embeddings[start:end].tolist(),
+            metadatas=metadatas[start:end],
+            ids=[f"bench_{i}" for i in range(start, end)],
+        )
+    return round(time.perf_counter() - started, 2)
+
+
+def _time(fn, queries) -> dict:
+    fn(queries[0])  # 인덱스 로드
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 2),
+    }
+
+
+def measure(size: int, domains: int, dim: int, n_queries: int, n_results: int, shards: int) -> dict:
+    from app.core.db import ChromaDBConnection
+    from app.repository.vector.partitioned_repo import PartitionedChromaRepository
+    from app.repository.vector.sharded_repo import ShardConfig, ShardedChromaRepository
+    from app.repository.vector.vector_repo import ChromaDBRepository
+
+    rng = np.random.default_rng(size)
+    centers, embeddings, metadatas = _corpus(size, domains, dim, rng)
+    single = ChromaDBRepository(f"bench_single_{size}")
+    partitioned = PartitionedChromaRepository(f"bench_part_{size}")
+    shard_config = ShardConfig()
+    shard_config.shards = shards
+    sharded = ShardedChromaRepository(f"bench_shard_{size}", shard_config)
+    build = {
+        "single_s": _fill(single, embeddings, metadatas),
+        "partitioned_s": _fill(partitioned, embeddings, metadatas),
+        "sharded_s": _fill(sharded, embeddings, metadatas),
+    }
+    for repo in (single, partitioned, sharded):
+        repo.warm_up()
+
+    labels = rng.integers(0, domains, size=n_queries)
+    queries = [
+        ((centers[label] + 0.5 * rng.normal(size=dim)).tolist(), {"domain": f"d{label}"})
+        for label in labels
+    ]
+    result = {
+        "size": size,
+        "unfiltered": _time(
+            lambda q: single.query([q[0]], n_results=n_results), queries
+        ),
+        "where_filter": _time(
+            lambda q: single.query([q[0]], n_results=n_results, where=q[1]), queries
+        ),
+        "partitioned": _time(
+            lambda q: partitioned.query([q[0]], n_results=n_results, where=q[1]), queries
+        ),
+        "sharded": _time(
+            lambda q: sharded.query([q[0]], n_results=n_results), queries
+        ),
+        "build": build,
+    }
+    client = ChromaDBConnection().client
+    client.delete_collection(single.collection.name)
+    for repo in [*partitioned.partitions().values(), *sharded.shards().values()]:
+        client.delete_collection(repo.collection.name)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--domains", type=int, default=8)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--n-results", type=int, default=15)
+    parser.add_argument("--shards", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ.update({"CHROMA_MODE": "local", "CHROMA_PERSIST_PATH": os.path.join(tmp_dir, "chroma")})
+        for size in args.sizes:
+            print(json.dumps(measure(size, args.domains, args.dim, args.queries, args.n_results, args.shards)))
+
+
+if __name__ == "__main__":
+    main()
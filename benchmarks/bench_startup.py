@@ -0,0 +1,104 @@
+"""
+기동 시간 벤치마크: `import main` 시간과 lifespan 완료(ready)까지의 시간을 측정한다.
+
+    python benchmarks/bench_startup.py                 # 측정 결과 출력
+    python benchmarks/bench_startup.py --check         # 기준값 대비 회귀 시 exit 1
+    python benchmarks/bench_startup.py --update-baseline
+
+각 측정은 새 인터프리터에서 수행하며, 외부 API 없이 돌도록 더미 키와 임시 Chroma 경로,
+HTTP warm-up 비활성화를 사용한다.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "startup_baseline.json")
+
+_PROBE = r"""
+import asyncio, json, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+
+async def _ready():
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter()
+
+t2 = asyncio.run(_ready())
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "ready_ms": (t2 - t0) * 1000}))
+"""
+
+
+def _run_once(tmp_dir: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("UPSTAGE_API_KEY", "benchmark")
+    env.setdefault("SERPER_API_KEY", "benchmark")
+    env.update(
+        {
+            "CHROMA_MODE": "local",
+            "CHROMA_PERSIST_PATH": os.path.join(tmp_dir, "chroma"),
+            "LOG_DIR": os.path.join(tmp_dir, "logs"),
+            "TRACE_EXPORT_PATH": os.path.join(tmp_dir, "traces.jsonl"),
+            "LOG_CONSOLE": "false",
+            "HTTP_WARM_UP": "false",
+        }
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(runs: int) -> dict:
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for _ in range(runs):
+            samples.append(_run_once(tmp_dir))
+    return {
+        key: round(statistics.median(s[key] for s in samples), 1)
+        for key in ("import_ms", "ready_ms")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="기준값 대비 회귀 검사")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="허용 배수 (기본 1.5배)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    result = measure(args.runs)
+    print(json.dumps(result))
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+        return
+
+    if args.check:
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = [
+            f"{key}: {result[key]}ms > {baseline[key]}ms x {args.tolerance}"
+            for key in baseline
+            if result.get(key, 0) > baseline[key] * args.tolerance
+        ]
+        if regressions:
+            print("Startup regression:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -41,6 +41,11 @@ with st.sidebar:
     st.markdown("---")
     st.markdown("### 설정")
     api_url = st.text_input("백엔드 API URL", value=BACKEND_URL)
+    verbosity = st.selectbox(
+        "진행 상황 표시",
+        options=["status", "answer", "debug"],
+        format_func=lambda v: {"status": "노드 진행 상황", "answer": "답변만", "debug": "전체 (디버그)"}[v],
+    )
     
     if st.button("대화 내용 초기화"):
         st.session_state.messages = []
@@ -78,6 +83,8 @@ if prompt := st.chat_input("의료 관련 질문을 입력하세요."):
                 "answer_logs": [],
                 "eval_logs": []
             }
+            token_usage = None
+            deadline_info = None
             
             try:
                 # httpx를 사용하여 스트리밍 요청
@@ -86,7 +93,8 @@ if prompt := st.chat_input("의료 관련 질문을 입력하세요."):
                     f"{api_url}/agent/chat/stream", 
                     json={
                         "query": prompt,
-                        "session_id": st.session_state.session_id
+                        "session_id": st.session_state.session_id,
+                        "verbosity": verbosity
                     },
                     timeout=None
                 ) as response:
@@ -104,8 +112,33 @@ if prompt := st.chat_input("의료 관련 질문을 입력하세요."):
                                         st.error(f"에러 발생: {event['error']}")
                                         break
                                     
-                                    # 이벤트 처리 및 UI 업데이트
+                                    # answer 모드: 답변 본문만 온다
+                                    if "answer" in event:
+                                        full_response_data["answer_logs"].append({"role": "ai", "content": event["answer"]})
+                                        answer_placeholder.markdown(event["answer"])
+                                        continue
+
+                                    # 서브그래프 내부 도구 호출 (status 모드)
+                                    if "tool_calls" in event:
+                                        for tc in event["tool_calls"]:
+                                            status.write(f"🛠️ **도구 호출**: `{tc['name']}` ({tc['args']})")
+                                        continue
+
+                                    # 이벤트 처리 및 UI 업데이트 (메시지는 새로 추가된 것만 온다)
                                     for node_name, update in event.items():
+                                        # trace_id 등 노드 업데이트가 아닌 필드는 건너뜀
+                                        if not isinstance(update, dict):
+                                            continue
+                                        # 마지막 이벤트: 요청 전체 토큰 사용량
+                                        if node_name == "token_usage":
+                                            token_usage = update
+                                            continue
+                                        # 마감 시간이 부족해 축소/생략한 단계
+                                        if node_name == "deadline":
+                                            deadline_info = update
+                                            if update.get("degraded"):
+                                                status.write(f"⏱️ **마감 임박으로 축소한 단계**: {', '.join(update['degraded'])}")
+                                            continue
                                         # 한글 노드 명칭 맵핑
                                         node_display_names = {
                                             "info_extract_agent_workflow": "🔍 지식 추출 프로세스",
@@ -113,17 +146,17 @@ if prompt := st.chat_input("의료 관련 질문을 입력하세요."):
                                             "info_extract_tools": "🛠️ 검색 도구 실행",
                                             "info_verifier": "⚖️ 검색 결과 검증",
                                             "knowledge_augment_workflow": "🌐 외부 지식 보강 (Google)",
+                                            "augment_fast_path": "⚡ 보강 내용으로 바로 컨텍스트 구성",
                                             "answer_gen_agent_workflow": "✍️ 답변 작성",
                                             "evaluate_agent_workflow": "⚖️ 답변 검증 및 평가"
                                         }
                                         display_name = node_display_names.get(node_name, node_name)
                                         
-                                        # 툴 호출 정보 표시
+                                        # 툴 호출 정보 표시 (debug 모드는 서브그래프 메시지가 그대로 온다)
                                         if "messages" in update:
                                             for msg in update["messages"]:
-                                                if "tool_calls" in msg:
-                                                    for tc in msg["tool_calls"]:
-                                                        status.write(f"🛠️ **도구 호출**: `{tc['name']}` ({tc['args']})")
+                                                for tc in msg.get("tool_calls") or []:
+                                                    status.write(f"🛠️ **도구 호출**: `{tc['name']}` ({tc['args']})")
                                         
                                         # 노드별 상세 정보 추출
                                         detail_info = ""
@@ -176,6 +209,10 @@ if prompt := st.chat_input("의료 관련 질문을 입력하세요."):
         
         # 로그 표시
         logs_to_show = {k: v for k, v in full_response_data.items() if v}
+        if token_usage:
+            logs_to_show["token_usage"] = token_usage
+        if deadline_info:
+            logs_to_show["deadline"] = deadline_info
         if logs_to_show:
             with log_placeholder.expander("추론 로그 보기"):
                 st.json(logs_to_show)
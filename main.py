@@ -1,3 +1,7 @@
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi import Request, HTTPException
@@ -5,6 +9,14 @@ from fastapi.responses import JSONResponse
 import asyncio
 from app.api.route.agent_routers import router as agent_router
 from app.core.seed import seed_data_if_empty
+from app.core.logger import shutdown_logging
+from app.core.http import close_http_clients
+from app.core.admission import UpstreamOverloaded
+from app.deps import init_container, shutdown_container
+from app.core.metrics import gauge
+
+STARTUP_SECONDS = gauge("app_startup_seconds", "프로세스 기동 단계별 소요 시간", ["phase"])
+STARTUP_SECONDS.set(time.perf_counter() - _IMPORT_STARTED, phase="import")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -13,9 +25,18 @@ async def lifespan(app: FastAPI):
     # 여기서는 진행 상황을 알 수 있도록 함. 
     # 동기 함수인 경우 루프에서 별도 스레드로 실행 권장
     loop = asyncio.get_event_loop()
-    loop.run_in_executor(None, seed_data_if_empty)
+    # 서비스 컨테이너를 한 번 만들고, 업스트림 연결과 HNSW 인덱스를 미리 준비한 뒤
+    # 요청을 받기 시작한다 (첫 요청이 콜드 스타트 비용을 떠안지 않도록)
+    container = await loop.run_in_executor(None, init_container)
+    await loop.run_in_executor(None, container.warm_up)
+    app.state.container = container
+    STARTUP_SECONDS.set(time.perf_counter() - _IMPORT_STARTED, phase="ready")
+    loop.run_in_executor(None, seed_data_if_empty, container.vector_service)
     yield
-    # 앱 종료 시 실행 (필요한 경우)
+    # 앱 종료 시 실행: 컨테이너/커넥션 풀 정리 및 로그 큐 비우기
+    shutdown_container()
+    close_http_clients()
+    shutdown_logging()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -32,6 +53,16 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"error": "HTTP Exception", "message": exc.detail},
+        headers=getattr(exc, "headers", None),
+    )
+
+
+@app.exception_handler(UpstreamOverloaded)
+async def upstream_overloaded_handler(request: Request, exc: UpstreamOverloaded):
+    return JSONResponse(
+        status_code=503,
+        content={"error": "Service Unavailable", "message": str(exc)},
+        headers={"Retry-After": str(int(max(1, round(exc.retry_after))))},
     )
 
 